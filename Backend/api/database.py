@@ -1,15 +1,26 @@
+import logging
 import os
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
+from .utils.aggregates import recompute_seat_aggregates
+from .utils.db_pool import engine_options, install_statement_deadline, install_statement_timeout
+from .utils.text_search import ensure_search_indexes, register_sqlite_functions
 
 # Load local .env file if it exists, otherwise rely on App Runner env vars
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 if DATABASE_URL:
     if DATABASE_URL.startswith("sqlite"):
-        engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+        engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+        # word_similarity() for the FTS5-backed text search
+        event.listen(engine, "connect", register_sqlite_functions)
+        install_statement_deadline(engine)
         
         # Auto-initialize local SQLite database tables so developers don't have to
         with engine.begin() as conn:
@@ -77,6 +88,12 @@ if DATABASE_URL:
                   UNIQUE(venue_id, section, row, seat_number)
                 );
             """))
+            # Auto-migrate local DB to seat geometry (as in init_db.py)
+            for column in ("x", "y", "z", "orientation"):
+                try:
+                    conn.execute(text(f"ALTER TABLE Seats ADD COLUMN {column} FLOAT;"))
+                except Exception:
+                    pass # Column already exists
             conn.execute(text("""
                 CREATE TABLE IF NOT EXISTS Reviews (
                   id                TEXT PRIMARY KEY,
@@ -112,10 +129,49 @@ if DATABASE_URL:
                   avg_value         FLOAT,
                   avg_overall       FLOAT,
                   avg_price_paid    FLOAT,
+                  visual_sum        INTEGER DEFAULT 0,
+                  sound_sum         INTEGER DEFAULT 0,
+                  value_sum         INTEGER DEFAULT 0,
+                  overall_sum       INTEGER DEFAULT 0,
+                  price_cents_sum   INTEGER DEFAULT 0,
+                  price_count       INTEGER DEFAULT 0,
                   review_count      INTEGER,
                   last_updated      TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 );
             """))
+            # Auto-migrate local DB to integer sums; averages are derived from them
+            migrated_seat_sums = False
+            for column in ("visual_sum", "sound_sum", "value_sum", "overall_sum", "price_cents_sum", "price_count"):
+                try:
+                    conn.execute(text(f"ALTER TABLE SeatAggregates ADD COLUMN {column} INTEGER DEFAULT 0;"))
+                    migrated_seat_sums = True
+                except Exception:
+                    pass # Column already exists
+            if migrated_seat_sums:
+                recompute_seat_aggregates(conn)
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS VenueAggregates (
+                  venue_id          TEXT PRIMARY KEY REFERENCES Venues(id),
+                  rating_sum        INTEGER DEFAULT 0,
+                  review_count      INTEGER DEFAULT 0,
+                  avg_rating        FLOAT,
+                  upcoming_events   INTEGER DEFAULT 0,
+                  last_updated      TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+            """))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS idx_venueaggregates_avg_rating ON VenueAggregates (avg_rating);"
+            ))
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS PlatformStats (
+                  id                INTEGER PRIMARY KEY,
+                  total_venues      INTEGER DEFAULT 0,
+                  total_reviews     INTEGER DEFAULT 0,
+                  rating_sum        INTEGER DEFAULT 0,
+                  last_updated      TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                  last_reconciled   TIMESTAMP
+                );
+            """))
             conn.execute(text("""
                 CREATE TABLE IF NOT EXISTS AI_Predictions (
                   seat_id              TEXT PRIMARY KEY REFERENCES Seats(id),
@@ -163,8 +219,73 @@ if DATABASE_URL:
                   created_at  TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 );
             """))
+            # FTS5 trigram indexes (and sync triggers) for venue/event search,
+            # plus the venue_id indexes
+            ensure_search_indexes(conn)
             
     else:
-        engine = create_engine(DATABASE_URL)
+        # Pool size, overflow, recycling and statement timeout come from DB_* env vars
+        engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+        install_statement_timeout(engine)
+        install_statement_deadline(engine)
 else:
     engine = None
+
+
+# ---------------------------------------------------------------------------
+# Async engine for the hot read routes
+# ---------------------------------------------------------------------------
+
+def async_database_url(database_url: str):
+    """The async-driver form of DATABASE_URL (psycopg for Postgres, aiosqlite for SQLite)."""
+    scheme, _, rest = database_url.partition("://")
+    if scheme.startswith("sqlite"):
+        return f"sqlite+aiosqlite://{rest}"
+    if scheme.startswith("postgresql"):
+        return f"postgresql+psycopg://{rest}"
+    return None
+
+
+def create_async_read_engine(async_url: str):
+    """Async engine with the same pool settings and SQL functions as `engine`."""
+    async_read_engine = create_async_engine(async_url, **engine_options(async_url, use_async=True))
+    if async_read_engine.dialect.name == "sqlite":
+        event.listen(async_read_engine.sync_engine, "connect", register_sqlite_functions)
+    install_statement_timeout(async_read_engine.sync_engine)
+    return async_read_engine
+
+
+# DB_ASYNC: "false" (default) serves run_read() from the threadpool. The
+# async engine has only been measured on SQLite, where aiosqlite (a thread per
+# connection) is slower than the threadpool; it is opt-in until it has been
+# load tested against PostgreSQL (scripts/loadtest_reads.py). "auto" uses it
+# for PostgreSQL only, "true" always. Without an async engine - including
+# when the driver is not installed - run_read() uses the threadpool.
+DB_ASYNC = os.getenv("DB_ASYNC", "false").strip().lower()
+async_engine = None
+if engine is not None and DB_ASYNC not in ("0", "false", "no", "off"):
+    if DB_ASYNC != "auto" or engine.dialect.name == "postgresql":
+        ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_database_url(DATABASE_URL)
+        try:
+            async_engine = create_async_read_engine(ASYNC_DATABASE_URL) if ASYNC_DATABASE_URL else None
+        except ImportError as e:
+            logger.warning("Async database driver unavailable, reads use the threadpool: %s", e)
+
+
+async def run_read(fn, *args, **kwargs):
+    """
+    Run `fn(conn, *args, **kwargs)` - ordinary sync query code - on a read
+    connection and return its result. With the async engine the function
+    runs on the event loop through AsyncConnection.run_sync, so an in-flight
+    query does not hold a worker thread; otherwise it runs on the threadpool
+    against the sync engine.
+    """
+    if async_engine is not None:
+        async with async_engine.connect() as conn:
+            return await conn.run_sync(fn, *args, **kwargs)
+
+    def _run():
+        with engine.connect() as conn:
+            return fn(conn, *args, **kwargs)
+
+    return await run_in_threadpool(_run)
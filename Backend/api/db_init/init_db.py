@@ -26,6 +26,7 @@ def handler(event, context):
         # We will replace the query later when the user provides the specific schema
         create_table_query = """
         CREATE EXTENSION IF NOT EXISTS postgis;
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
         CREATE TABLE IF NOT EXISTS Users (
           id                UUID PRIMARY KEY,
@@ -57,6 +58,17 @@ def handler(event, context):
           ticket_url        TEXT
         );
         
+        -- Text search (see api/utils/text_search.py; expressions must match exactly)
+        CREATE INDEX IF NOT EXISTS idx_venues_search_trgm ON Venues
+          USING GIN (LOWER(COALESCE(name, '') || ' ' || COALESCE(city, '')) gin_trgm_ops);
+        CREATE INDEX IF NOT EXISTS idx_venues_search_tsv ON Venues
+          USING GIN (to_tsvector('simple', LOWER(COALESCE(name, '') || ' ' || COALESCE(city, ''))));
+        CREATE INDEX IF NOT EXISTS idx_events_search_trgm ON Events
+          USING GIN (LOWER(COALESCE(name, '') || ' ' || COALESCE(artist, '')) gin_trgm_ops);
+        CREATE INDEX IF NOT EXISTS idx_events_search_tsv ON Events
+          USING GIN (to_tsvector('simple', LOWER(COALESCE(name, '') || ' ' || COALESCE(artist, ''))));
+        CREATE INDEX IF NOT EXISTS idx_events_venue_id ON Events (venue_id);
+        
         CREATE TABLE IF NOT EXISTS Seats (
           id                   UUID PRIMARY KEY,
           venue_id             UUID REFERENCES Venues(id),
@@ -69,6 +81,7 @@ def handler(event, context):
           orientation          FLOAT,
           distance_to_stage    FLOAT
         );
+        CREATE INDEX IF NOT EXISTS idx_seats_venue_id ON Seats (venue_id);
         
         CREATE TABLE IF NOT EXISTS Reviews (
           id                UUID PRIMARY KEY,
@@ -87,6 +100,7 @@ def handler(event, context):
           images            JSONB,
           created_at        TIMESTAMP
         );
+        CREATE INDEX IF NOT EXISTS idx_reviews_venue_id ON Reviews (venue_id);
         
         CREATE TABLE IF NOT EXISTS SeatAggregates (
           seat_id           UUID PRIMARY KEY REFERENCES Seats(id),
@@ -96,10 +110,38 @@ def handler(event, context):
           avg_overall       FLOAT,
           avg_price_paid    FLOAT,
           
+          -- Exact running totals; the avg_* columns are derived from these
+          visual_sum        INTEGER DEFAULT 0,
+          sound_sum         INTEGER DEFAULT 0,
+          value_sum         INTEGER DEFAULT 0,
+          overall_sum       INTEGER DEFAULT 0,
+          price_cents_sum   BIGINT DEFAULT 0,
+          price_count       INTEGER DEFAULT 0,
+          
           review_count      INTEGER,
           last_updated      TIMESTAMP
         );
         
+        CREATE TABLE IF NOT EXISTS VenueAggregates (
+          venue_id          UUID PRIMARY KEY REFERENCES Venues(id),
+          rating_sum        INTEGER DEFAULT 0,
+          review_count      INTEGER DEFAULT 0,
+          avg_rating        FLOAT,
+          upcoming_events   INTEGER DEFAULT 0,
+          last_updated      TIMESTAMP
+        );
+        
+        CREATE INDEX IF NOT EXISTS idx_venueaggregates_avg_rating ON VenueAggregates (avg_rating);
+        
+        CREATE TABLE IF NOT EXISTS PlatformStats (
+          id                INTEGER PRIMARY KEY,
+          total_venues      INTEGER DEFAULT 0,
+          total_reviews     INTEGER DEFAULT 0,
+          rating_sum        INTEGER DEFAULT 0,
+          last_updated      TIMESTAMP,
+          last_reconciled   TIMESTAMP
+        );
+        
         CREATE TABLE IF NOT EXISTS AI_Predictions (
           seat_id              UUID PRIMARY KEY REFERENCES Seats(id),
           predicted_visual     FLOAT,
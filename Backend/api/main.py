@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import os
@@ -6,10 +7,26 @@ from dotenv import load_dotenv
 # Load environment variables from .env file (for local development)
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the search autocomplete index off the request path
+    from .database import async_engine, engine
+    from .utils.seatmap_client import close_http_client
+    from .utils.suggestions import warm_suggestions
+    if engine:
+        warm_suggestions()
+    yield
+    if async_engine is not None:
+        await async_engine.dispose()
+    await close_http_client()
+
+
 app = FastAPI(
     title="LiveLens API",
     description="Backend API for LiveLens, servicing the mobile and web application. Uses PostgreSQL via SQLAlchemy.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -33,7 +50,41 @@ def health_check():
         "database": db_status
     }
 
-from .routes import mock, auth, google_auth, reviews, review_options, search, ai, review_drafts
+@app.get("/health/db")
+def database_health():
+    """
+    Database round-trip time and connection pool utilisation: checked-out,
+    idle and overflow connections, checkout timeouts and checkout wait
+    percentiles. Used to tune the DB_POOL_* settings under real load.
+    """
+    import time
+    from fastapi import HTTPException
+    from sqlalchemy import text
+    from .database import async_engine, engine
+    from .utils.db_pool import pool_settings, pool_status
+    if not engine:
+        raise HTTPException(status_code=500, detail="Database not configured")
+
+    started = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        database = "connected"
+    except Exception as e:
+        database = f"error: {e}"
+    settings = pool_settings()
+    return {
+        "status": "healthy" if database == "connected" else "unhealthy",
+        "database": database,
+        "dialect": engine.dialect.name,
+        "ping_ms": round((time.perf_counter() - started) * 1000, 3),
+        "pool": pool_status(engine),
+        # Pool behind the async read routes (null when they use the threadpool)
+        "async_pool": pool_status(async_engine.sync_engine) if async_engine is not None else None,
+        "settings": settings,
+    }
+
+from .routes import mock, auth, google_auth, reviews, review_options, search, ai, review_drafts, seatmap
 # TODO: Add more routers here
 app.include_router(mock.router, prefix="/dev", tags=["dev"])
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
@@ -43,3 +94,4 @@ app.include_router(review_options.router, prefix="/review-form", tags=["review-f
 app.include_router(review_drafts.router, prefix="/review-drafts", tags=["review-drafts"])
 app.include_router(search.router, prefix="/search", tags=["search"])
 app.include_router(ai.router, prefix="/ai", tags=["ai"])
+app.include_router(seatmap.router, prefix="/seatmap", tags=["seatmap"])
@@ -1,11 +1,24 @@
 import os
 import json
-from fastapi import APIRouter, HTTPException, Depends
+import time
+import asyncio
+import threading
+from types import SimpleNamespace
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Any, Dict, Union, Optional
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
 from ..database import engine
-from ..utils.seatmap_client import get_seatmap_data
+from ..utils.db_pool import statement_deadline
+from ..utils.ai_cache import (
+    ALL_VENUES, data_version, response_cache, response_cache_key, tool_cache, tool_cache_key,
+)
+from ..utils.ai_executor import (
+    AI_REQUEST_DEADLINE_S, AI_TOOL_DEADLINE_S, acquire_ai_slot, ai_saturated, release_ai_slot, run_blocking, run_tool,
+)
+from ..utils.seatmap_client import get_seatmap_data, seatmap_stats
+from ..utils.venue_resolver import resolve_venue, resolve_venues
 
 try:
     from zhipuai import ZhipuAI
@@ -20,6 +33,9 @@ class AnalyzeRequest(BaseModel):
     # Optional system prompt or extra instructions
     instructions: Optional[str] = None
 
+def _venue_not_found(venue_name: str) -> str:
+    return json.dumps({"error": f"No venue found matching '{venue_name}'."})
+
 def fetch_top_venues(limit: int = 5):
     if not engine:
         return json.dumps({"error": "Database not configured."})
@@ -39,8 +55,11 @@ def fetch_top_venues(limit: int = 5):
 def fetch_venue_stats(venue_name: str):
     if not engine:
         return json.dumps({"error": "Database not configured."})
+    venue_ids = resolve_venues(venue_name, limit=5)
+    if not venue_ids:
+        return _venue_not_found(venue_name)
     query = """
-        SELECT v.name, v.city, v.capacity,
+        SELECT v.id, v.name, v.city, v.capacity,
                AVG(r.overall_rating) as avg_overall,
                AVG(r.rating_visual) as avg_visual,
                AVG(r.rating_sound) as avg_sound,
@@ -48,20 +67,21 @@ def fetch_venue_stats(venue_name: str):
                COUNT(r.id) as review_count
         FROM Venues v
         LEFT JOIN Reviews r ON v.id = r.venue_id
-        WHERE v.name ILIKE :venue_name
+        WHERE v.id IN :venue_ids
         GROUP BY v.id, v.name, v.city, v.capacity
-        LIMIT 5
     """
     with engine.connect() as conn:
-        result = conn.execute(text(query), {"venue_name": f"%{venue_name}%"})
-        venues = [dict(row._mapping) for row in result]
-    if not venues:
-        return json.dumps({"error": f"No venue found matching '{venue_name}'."})
-    return json.dumps(venues, default=str)
+        result = conn.execute(text(query).bindparams(bindparam("venue_ids", expanding=True)), {"venue_ids": venue_ids})
+        venues = {str(row.id): dict(row._mapping) for row in result}
+    # Best match first
+    return json.dumps([venues[venue_id] for venue_id in venue_ids if venue_id in venues], default=str)
 
 def fetch_venue_review_stats(venue_name: str):
     if not engine:
         return json.dumps({"error": "Database not configured."})
+    venue_id = resolve_venue(venue_name)
+    if not venue_id:
+        return _venue_not_found(venue_name)
     query = """
         SELECT
             COUNT(*) as total_reviews,
@@ -71,11 +91,10 @@ def fetch_venue_review_stats(venue_name: str):
             SUM(CASE WHEN overall_rating = 2 THEN 1 ELSE 0 END) as two_star,
             SUM(CASE WHEN overall_rating = 1 THEN 1 ELSE 0 END) as one_star
         FROM Reviews r
-        JOIN Venues v ON r.venue_id = v.id
-        WHERE v.name ILIKE :venue_name
+        WHERE r.venue_id = :venue_id
     """
     with engine.connect() as conn:
-        result = conn.execute(text(query), {"venue_name": f"%{venue_name}%"})
+        result = conn.execute(text(query), {"venue_id": venue_id})
         row = result.fetchone()
         if not row:
             return json.dumps({"error": f"No reviews found for '{venue_name}'."})
@@ -84,12 +103,14 @@ def fetch_venue_review_stats(venue_name: str):
 def fetch_venue_reviews(venue_name: str, limit: int = 5, min_rating: int = None):
     if not engine:
         return json.dumps({"error": "Database not configured."})
+    venue_id = resolve_venue(venue_name)
+    if not venue_id:
+        return _venue_not_found(venue_name)
     query = """
         SELECT r.text, r.overall_rating, r.rating_visual, r.rating_sound, r.rating_value,
                r.section, r.row, r.seat_number, r.created_at
         FROM Reviews r
-        JOIN Venues v ON r.venue_id = v.id
-        WHERE v.name ILIKE :venue_name
+        WHERE r.venue_id = :venue_id
           AND r.text IS NOT NULL AND r.text != ''
           {min_rating_filter}
         ORDER BY r.overall_rating DESC
@@ -97,7 +118,7 @@ def fetch_venue_reviews(venue_name: str, limit: int = 5, min_rating: int = None)
     """
     min_rating_filter = "AND r.overall_rating >= :min_rating" if min_rating is not None else ""
     query = query.format(min_rating_filter=min_rating_filter)
-    params = {"venue_name": f"%{venue_name}%", "limit": limit}
+    params = {"venue_id": venue_id, "limit": limit}
     if min_rating is not None:
         params["min_rating"] = min_rating
     with engine.connect() as conn:
@@ -110,20 +131,22 @@ def fetch_venue_reviews(venue_name: str, limit: int = 5, min_rating: int = None)
 def fetch_best_seats(venue_name: str, limit: int = 10, section: str = None):
     if not engine:
         return json.dumps({"error": "Database not configured."})
+    venue_id = resolve_venue(venue_name)
+    if not venue_id:
+        return _venue_not_found(venue_name)
     section_filter = "AND s.section ILIKE :section" if section else ""
     query = f"""
         SELECT s.section, s.row, s.seat_number,
                sa.avg_overall, sa.avg_visual, sa.avg_sound, sa.avg_value, sa.review_count
         FROM Seats s
-        JOIN Venues v ON s.venue_id = v.id
         JOIN SeatAggregates sa ON s.id = sa.seat_id
-        WHERE v.name ILIKE :venue_name
+        WHERE s.venue_id = :venue_id
           AND sa.review_count >= 1
           {section_filter}
         ORDER BY sa.avg_overall DESC, sa.review_count DESC
         LIMIT :limit
     """
-    params = {"venue_name": f"%{venue_name}%", "limit": limit}
+    params = {"venue_id": venue_id, "limit": limit}
     if section:
         params["section"] = f"%{section}%"
     with engine.connect() as conn:
@@ -136,6 +159,9 @@ def fetch_best_seats(venue_name: str, limit: int = 10, section: str = None):
 def fetch_section_stats(venue_name: str, sort_by: str = "avg_overall"):
     if not engine:
         return json.dumps({"error": "Database not configured."})
+    venue_id = resolve_venue(venue_name)
+    if not venue_id:
+        return _venue_not_found(venue_name)
     allowed = {"avg_overall", "avg_visual", "avg_sound", "avg_value"}
     if sort_by not in allowed:
         sort_by = "avg_overall"
@@ -147,16 +173,15 @@ def fetch_section_stats(venue_name: str, sort_by: str = "avg_overall"):
                ROUND(AVG(sa.avg_value)::numeric, 2) as avg_value,
                SUM(sa.review_count) as total_reviews
         FROM Seats s
-        JOIN Venues v ON s.venue_id = v.id
         JOIN SeatAggregates sa ON s.id = sa.seat_id
-        WHERE v.name ILIKE :venue_name
+        WHERE s.venue_id = :venue_id
           AND sa.review_count >= 1
         GROUP BY s.section
         ORDER BY {sort_by} DESC
         LIMIT 10
     """
     with engine.connect() as conn:
-        result = conn.execute(text(query), {"venue_name": f"%{venue_name}%"})
+        result = conn.execute(text(query), {"venue_id": venue_id})
         sections = [dict(row._mapping) for row in result]
     if not sections:
         return json.dumps({"error": f"No section data found for '{venue_name}'."})
@@ -165,20 +190,22 @@ def fetch_section_stats(venue_name: str, sort_by: str = "avg_overall"):
 def fetch_worst_seats(venue_name: str, limit: int = 5, section: str = None):
     if not engine:
         return json.dumps({"error": "Database not configured."})
+    venue_id = resolve_venue(venue_name)
+    if not venue_id:
+        return _venue_not_found(venue_name)
     section_filter = "AND s.section ILIKE :section" if section else ""
     query = f"""
         SELECT s.section, s.row, s.seat_number,
                sa.avg_overall, sa.avg_visual, sa.avg_sound, sa.avg_value, sa.review_count
         FROM Seats s
-        JOIN Venues v ON s.venue_id = v.id
         JOIN SeatAggregates sa ON s.id = sa.seat_id
-        WHERE v.name ILIKE :venue_name
+        WHERE s.venue_id = :venue_id
           AND sa.review_count >= 2
           {section_filter}
         ORDER BY sa.avg_overall ASC, sa.review_count DESC
         LIMIT :limit
     """
-    params = {"venue_name": f"%{venue_name}%", "limit": limit}
+    params = {"venue_id": venue_id, "limit": limit}
     if section:
         params["section"] = f"%{section}%"
     with engine.connect() as conn:
@@ -191,17 +218,19 @@ def fetch_worst_seats(venue_name: str, limit: int = 5, section: str = None):
 def fetch_past_events(venue_name: str, limit: int = 10):
     if not engine:
         return json.dumps({"error": "Database not configured."})
+    venue_id = resolve_venue(venue_name)
+    if not venue_id:
+        return _venue_not_found(venue_name)
     query = """
         SELECT e.name, e.artist, e.genre, e.event_date
         FROM Events e
-        JOIN Venues v ON e.venue_id = v.id
-        WHERE v.name ILIKE :venue_name
+        WHERE e.venue_id = :venue_id
           AND e.event_date < CURRENT_DATE
         ORDER BY e.event_date DESC
         LIMIT :limit
     """
     with engine.connect() as conn:
-        result = conn.execute(text(query), {"venue_name": f"%{venue_name}%", "limit": limit})
+        result = conn.execute(text(query), {"venue_id": venue_id, "limit": limit})
         events = [dict(row._mapping) for row in result]
     if not events:
         return json.dumps({"message": f"No past events found for '{venue_name}'."})
@@ -210,17 +239,19 @@ def fetch_past_events(venue_name: str, limit: int = 10):
 def fetch_venue_events(venue_name: str):
     if not engine:
         return json.dumps({"error": "Database not configured."})
+    venue_id = resolve_venue(venue_name)
+    if not venue_id:
+        return _venue_not_found(venue_name)
     query = """
         SELECT e.name, e.artist, e.genre, e.event_date, e.ticket_url
         FROM Events e
-        JOIN Venues v ON e.venue_id = v.id
-        WHERE v.name ILIKE :venue_name
+        WHERE e.venue_id = :venue_id
           AND e.event_date >= CURRENT_DATE
         ORDER BY e.event_date ASC
         LIMIT 10
     """
     with engine.connect() as conn:
-        result = conn.execute(text(query), {"venue_name": f"%{venue_name}%"})
+        result = conn.execute(text(query), {"venue_id": venue_id})
         events = [dict(row._mapping) for row in result]
     if not events:
         return json.dumps({"message": f"No upcoming events found for '{venue_name}'."})
@@ -229,13 +260,16 @@ def fetch_venue_events(venue_name: str):
 def fetch_seat_stats(venue_name: str, section: str, row: str, seat_number: str):
     if not engine:
         return json.dumps({"error": "Database not configured."})
+    venue_id = resolve_venue(venue_name)
+    if not venue_id:
+        return _venue_not_found(venue_name)
     query = """
         SELECT v.name as venue_name, s.section, s.row, s.seat_number,
                sa.avg_overall, sa.avg_visual, sa.avg_sound, sa.avg_value, sa.review_count
         FROM Venues v
         JOIN Seats s ON v.id = s.venue_id
         LEFT JOIN SeatAggregates sa ON s.id = sa.seat_id
-        WHERE v.name ILIKE :venue_name 
+        WHERE v.id = :venue_id
           AND s.section ILIKE :section 
           AND s.row ILIKE :row 
           AND s.seat_number ILIKE :seat_number
@@ -243,7 +277,7 @@ def fetch_seat_stats(venue_name: str, section: str, row: str, seat_number: str):
     """
     with engine.connect() as conn:
         result = conn.execute(text(query), {
-            "venue_name": f"%{venue_name}%",
+            "venue_id": venue_id,
             "section": section,
             "row": row,
             "seat_number": seat_number
@@ -419,6 +453,259 @@ TOOLS_SCHEMA = [
     }
 ]
 
+def _build_messages(request: AnalyzeRequest) -> list:
+    """System and user messages for an analyze request."""
+    # Format the input data
+    formatted_input = ""
+    if isinstance(request.input_data, str):
+        formatted_input = request.input_data
+    else:
+        # Convert JSON objects/lists to string representation
+        formatted_input = json.dumps(request.input_data, indent=2)
+        
+    # Construct the final prompt
+    instruction_text = (
+        "You are a helpful venue assistant for the LiveLens application. "
+        "ALWAYS call the appropriate database function(s) before answering any question about a venue. "
+        "Never guess or make up ratings, reviews, or events — always fetch real data from the DB first. "
+        "If the question is about ratings or stars, use get_venue_review_stats. "
+        "If the question is about reviews or comments, use get_venue_reviews. "
+        "If the question is about upcoming events, use get_venue_events. "
+        "If the question is about general venue info or averages, use get_venue_stats. "
+        "If the question is about the best seat or top seats, use get_best_seats (pass section param if user specifies a section). "
+        "If the question is about seats to avoid or worst seats, use get_worst_seats. "
+        "If the question is about which section has the best sound, view, or value, use get_section_stats with the appropriate sort_by. "
+        "If the question is about past events or event history, use get_past_events. "
+        "When presenting seat results, always show the top 3-5 options with section, row, seat number, rating, and review count. "
+        "Emphasize seats with more reviews as they are more reliable. Never pick just one — give a ranked list. "
+        "IMPORTANT: Never use markdown formatting. No **, no ##, no bullet points with -, no headers. Use plain text only."
+    )
+
+    if request.instructions:
+        instruction_text += f"\n{request.instructions}"
+
+    # Support structured input with question + venue context
+    if isinstance(request.input_data, dict):
+        question = request.input_data.get("question", "")
+        venue_name = request.input_data.get("venue_name", "")
+        venue_id = request.input_data.get("venue_id", "")
+        context_parts = []
+        if venue_name:
+            context_parts.append(f"Venue: {venue_name}")
+        if venue_id:
+            context_parts.append(f"Venue ID: {venue_id}")
+        if context_parts:
+            full_prompt = f"{', '.join(context_parts)}\nQuestion: {question}"
+        else:
+            full_prompt = question or formatted_input
+    else:
+        full_prompt = formatted_input
+    
+    return [
+        {"role": "system", "content": instruction_text},
+        {"role": "user", "content": full_prompt}
+    ]
+
+async def _complete(client, messages, deadline: float):
+    """One GLM-4 round trip on the AI executor, bounded by the request deadline."""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise asyncio.TimeoutError
+    return await asyncio.wait_for(
+        run_blocking(
+            client.chat.completions.create,
+            model="glm-4",
+            messages=messages,
+            tools=TOOLS_SCHEMA,
+            temperature=0.7,
+            timeout=min(60, remaining),
+        ),
+        timeout=remaining,
+    )
+
+def _venue_ids_for_names(venue_names) -> set:
+    """
+    Ids of the venues the tools resolve `venue_names` to, for cache
+    invalidation. A name matching nothing depends on every venue, since a
+    venue created later would change the result.
+    """
+    venue_ids = set()
+    for venue_name in venue_names:
+        ids = resolve_venues(venue_name)
+        venue_ids.update(ids or [ALL_VENUES])
+    return venue_ids
+
+def _call_and_cache_tool(function_to_call, function_args: dict, cache_key: tuple, deadline: float) -> str:
+    """
+    Run a tool (on the tool executor) and cache its result unless it is an
+    error. Its queries are cancelled at `deadline`, so a tool the request has
+    given up on frees its worker and connection instead of running on.
+    """
+    if time.monotonic() >= deadline:
+        raise TimeoutError("Tool deadline passed before it started")
+    version = data_version()
+    with statement_deadline(deadline):
+        function_response = function_to_call(**function_args)
+    try:
+        payload = json.loads(function_response)
+    except (TypeError, ValueError):
+        return function_response
+    if isinstance(payload, dict) and "error" in payload:
+        return function_response
+    venue_name = function_args.get("venue_name")
+    # Tools without a venue (get_top_venues) read every venue
+    venue_ids = _venue_ids_for_names([venue_name]) if venue_name else {ALL_VENUES}
+    tool_cache.put(cache_key, function_response, version, venue_ids)
+    return function_response
+
+_TOOL_TIMED_OUT = json.dumps({"error": "Timed out fetching this data."})
+
+async def _run_tool_call(tool_call, deadline: float) -> dict:
+    """
+    Execute one model-requested tool on the tool executor, timing it. Results
+    are served from the tool cache until a review is written for their venue.
+    """
+    started = time.perf_counter()
+    function_name = tool_call.function.name
+    function_to_call = TOOL_FUNCTIONS.get(function_name)
+    status = "ok"
+    function_args = {}
+    cached = False
+    if function_to_call:
+        try:
+            function_args = json.loads(tool_call.function.arguments)
+            cache_key = tool_cache_key(function_name, function_args)
+            function_response = tool_cache.get(cache_key)
+            cached = function_response is not None
+            if not cached:
+                function_response = await run_tool(
+                    _call_and_cache_tool, function_to_call, function_args, cache_key, deadline
+                )
+        except Exception as func_e:
+            # Cancelled at the deadline: the same outcome as still running then
+            timed_out = time.monotonic() >= deadline
+            status = "timeout" if timed_out else "error"
+            function_response = _TOOL_TIMED_OUT if timed_out else json.dumps({"error": str(func_e)})
+    else:
+        status = "error"
+        function_response = json.dumps({"error": f"Function {function_name} not found."})
+    return {
+        "tool_call_id": tool_call.id,
+        "name": function_name,
+        "status": status,
+        "ms": round((time.perf_counter() - started) * 1000, 1),
+        "cached": cached,
+        "args": function_args,
+        "content": function_response,
+    }
+
+async def iter_tool_calls(tool_calls, deadline: float):
+    """
+    Run the model's tool calls concurrently (they are independent reads, each
+    on its own connection) and yield (index, result) as each one finishes.
+    Calls still running after AI_TOOL_DEADLINE_S (or at the request deadline,
+    if sooner) are yielded last as timed out, leaving the model time to answer
+    from the rest; their queries are cancelled at the same deadline.
+    """
+    started = time.perf_counter()
+    tools_deadline = min(time.monotonic() + AI_TOOL_DEADLINE_S, deadline)
+    tasks = {
+        asyncio.ensure_future(_run_tool_call(tool_call, tools_deadline)): i for i, tool_call in enumerate(tool_calls)
+    }
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, timeout=max(0, tools_deadline - time.monotonic()), return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                break
+            for task in done:
+                yield tasks[task], task.result()
+        for task in sorted(pending, key=tasks.get):
+            tool_call = tool_calls[tasks[task]]
+            yield tasks[task], {
+                "tool_call_id": tool_call.id,
+                "name": tool_call.function.name,
+                "status": "timeout",
+                "ms": round((time.perf_counter() - started) * 1000, 1),
+                "cached": False,
+                "args": {},
+                "content": _TOOL_TIMED_OUT,
+            }
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def run_tool_calls(tool_calls, deadline: float) -> list:
+    """The results of iter_tool_calls(), in the order the model asked for them."""
+    results = [None] * len(tool_calls)
+    async for index, result in iter_tool_calls(tool_calls, deadline):
+        results[index] = result
+    return results
+
+def _assistant_message(content, tool_calls) -> dict:
+    """The model's tool-calling turn, as sent back to it with the tool results."""
+    return {
+        "role": "assistant",
+        "content": content or "",
+        "tool_calls": [
+            {
+                "id": tc.id,
+                "type": tc.type,
+                "function": {
+                    "name": tc.function.name,
+                    "arguments": tc.function.arguments
+                }
+            } for tc in tool_calls
+        ]
+    }
+
+_TOOL_METADATA_KEYS = ("name", "tool_call_id", "status", "ms", "cached")
+
+def _tool_metadata(tool_results: list, tools_ms: float) -> dict:
+    return {
+        "tools": [
+            {key: r[key] for key in _TOOL_METADATA_KEYS} for r in tool_results
+        ],
+        "tools_ms": tools_ms,
+    }
+
+def _answer_venue_ids(input_data, tool_results) -> set:
+    """
+    The venues an answer was built from, so review writes to them invalidate
+    its cache entry: the venue the question was asked about, plus the venues
+    matching each tool's venue_name. Tools without one read every venue.
+    """
+    venue_ids = set()
+    if isinstance(input_data, dict) and input_data.get("venue_id"):
+        venue_ids.add(str(input_data["venue_id"]))
+    names = set()
+    for tool_result in tool_results or ():
+        venue_name = tool_result["args"].get("venue_name")
+        if venue_name:
+            names.add(venue_name)
+        else:
+            venue_ids.add(ALL_VENUES)
+    if names:
+        venue_ids |= _venue_ids_for_names(names)
+    return venue_ids
+
+async def _cache_answer(cache_key: str, result: dict, version: int, input_data, tool_results) -> None:
+    """Cache a complete answer; answers with a failed or timed-out tool are not cached."""
+    if not result.get("analysis") or any(r["status"] != "ok" for r in tool_results or ()):
+        return
+    venue_ids = await run_tool(_answer_venue_ids, input_data, tool_results)
+    response_cache.put(cache_key, result, version, venue_ids)
+
+def _cached_metadata(cached: dict) -> dict:
+    return {**cached.get("metadata", {}), "cache": "hit"}
+
+@router.get("/cache/stats")
+def ai_cache_stats():
+    """Hit/miss counters and size of the assistant's answer and tool result caches, and of the seatmap service."""
+    return {"responses": response_cache.stats(), "tools": tool_cache.stats(), "seatmaps": seatmap_stats()}
+
 @router.post("/analyze")
 async def analyze_data(request: AnalyzeRequest):
     """
@@ -426,6 +713,8 @@ async def analyze_data(request: AnalyzeRequest):
     
     This endpoint allows the AI to answer general queries or automatically fetch real-time 
     venue, event, or seat rating statistics from the database before answering.
+    The model calls and the database tools run on separate bounded executors
+    (api/utils/ai_executor.py), never on the event loop.
     
     Expected Input Payload (JSON):
     {
@@ -436,8 +725,21 @@ async def analyze_data(request: AnalyzeRequest):
     Expected Output Response (JSON):
     {
         "status": "success",
-        "analysis": "string"  // The final natural language response from the AI.
+        "analysis": "string",  // The final natural language response from the AI.
+        "metadata": {          // Only when the model called database functions.
+            "tools": [{"name": "get_best_seats", "tool_call_id": "...", "status": "ok", "ms": 12.5, "cached": false}],
+            "tools_ms": 14.2   // Wall time of the tool phase; the calls run concurrently.
+        }
     }
+
+    Answers are cached by normalized prompt and instructions
+    (api/utils/ai_cache.py) until a review is written for a venue they were
+    built from; a cached answer carries "metadata": {"cache": "hit", ...}.
+
+    The whole request is bounded by AI_REQUEST_DEADLINE_S and the tool phase by
+    AI_TOOL_DEADLINE_S: tools still running then are reported to the model as
+    timed out (status "timeout"), and a model call that cannot finish in time
+    fails with 504.
     
     Example Request:
     POST /analyze
@@ -451,131 +753,255 @@ async def analyze_data(request: AnalyzeRequest):
     
     if ZhipuAI is None:
         raise HTTPException(status_code=500, detail="ZhipuAI library is not installed.")
-        
+    
+    messages = _build_messages(request)
+    cache_key = response_cache_key(messages)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return {**cached, "metadata": _cached_metadata(cached)}
+    
+    if not acquire_ai_slot():
+        raise HTTPException(status_code=503, detail="The assistant is busy, please try again shortly.")
+    deadline = time.monotonic() + AI_REQUEST_DEADLINE_S
+    version = data_version()
     try:
         # Initialize ZhipuAI client
         client = ZhipuAI(api_key=zhipu_api_key)
         
-        # Format the input data
-        formatted_input = ""
-        if isinstance(request.input_data, str):
-            formatted_input = request.input_data
-        else:
-            # Convert JSON objects/lists to string representation
-            formatted_input = json.dumps(request.input_data, indent=2)
-            
-        # Construct the final prompt
-        instruction_text = (
-            "You are a helpful venue assistant for the LiveLens application. "
-            "ALWAYS call the appropriate database function(s) before answering any question about a venue. "
-            "Never guess or make up ratings, reviews, or events — always fetch real data from the DB first. "
-            "If the question is about ratings or stars, use get_venue_review_stats. "
-            "If the question is about reviews or comments, use get_venue_reviews. "
-            "If the question is about upcoming events, use get_venue_events. "
-            "If the question is about general venue info or averages, use get_venue_stats. "
-            "If the question is about the best seat or top seats, use get_best_seats (pass section param if user specifies a section). "
-            "If the question is about seats to avoid or worst seats, use get_worst_seats. "
-            "If the question is about which section has the best sound, view, or value, use get_section_stats with the appropriate sort_by. "
-            "If the question is about past events or event history, use get_past_events. "
-            "When presenting seat results, always show the top 3-5 options with section, row, seat number, rating, and review count. "
-            "Emphasize seats with more reviews as they are more reliable. Never pick just one — give a ranked list. "
-            "IMPORTANT: Never use markdown formatting. No **, no ##, no bullet points with -, no headers. Use plain text only."
-        )
-
-        if request.instructions:
-            instruction_text += f"\n{request.instructions}"
-
-        # Support structured input with question + venue context
-        if isinstance(request.input_data, dict):
-            question = request.input_data.get("question", "")
-            venue_name = request.input_data.get("venue_name", "")
-            venue_id = request.input_data.get("venue_id", "")
-            context_parts = []
-            if venue_name:
-                context_parts.append(f"Venue: {venue_name}")
-            if venue_id:
-                context_parts.append(f"Venue ID: {venue_id}")
-            if context_parts:
-                full_prompt = f"{', '.join(context_parts)}\nQuestion: {question}"
-            else:
-                full_prompt = question or formatted_input
-        else:
-            full_prompt = formatted_input
-        
-        # Generate the response using Zhipu GLM-4 model
-        messages = [
-            {"role": "system", "content": instruction_text},
-            {"role": "user", "content": full_prompt}
-        ]
-        
-        response = client.chat.completions.create(
-            model="glm-4",
-            messages=messages,
-            tools=TOOLS_SCHEMA,
-            temperature=0.7,
-            timeout=60,
-        )
+        response = await _complete(client, messages, deadline)
         
         response_message = response.choices[0].message
         
         # Check if the model wants to call a function
         if response_message.tool_calls:
-            assistant_msg = {
-                "role": "assistant",
-                "content": response_message.content or "",
-                "tool_calls": [
-                    {
-                        "id": tc.id,
-                        "type": tc.type,
-                        "function": {
-                            "name": tc.function.name,
-                            "arguments": tc.function.arguments
-                        }
-                    } for tc in response_message.tool_calls
-                ]
-            }
-            messages.append(assistant_msg)
+            messages.append(_assistant_message(response_message.content, response_message.tool_calls))
             
-            for tool_call in response_message.tool_calls:
-                function_name = tool_call.function.name
-                function_to_call = TOOL_FUNCTIONS.get(function_name)
-                
-                if function_to_call:
-                    try:
-                        function_args = json.loads(tool_call.function.arguments)
-                        function_response = function_to_call(**function_args)
-                    except Exception as func_e:
-                        function_response = json.dumps({"error": str(func_e)})
-                else:
-                    function_response = json.dumps({"error": f"Function {function_name} not found."})
-                
+            # The tool calls are independent reads; run them concurrently
+            tools_started = time.perf_counter()
+            tool_results = await run_tool_calls(response_message.tool_calls, deadline)
+            tools_ms = round((time.perf_counter() - tools_started) * 1000, 1)
+            for tool_result in tool_results:
                 messages.append(
                     {
                         "role": "tool",
-                        "content": function_response,
-                        "tool_call_id": tool_call.id,
+                        "content": tool_result["content"],
+                        "tool_call_id": tool_result["tool_call_id"],
                     }
                 )
             
             # Send the updated conversation back to the model
-            second_response = client.chat.completions.create(
-                model="glm-4",
-                messages=messages,
-                tools=TOOLS_SCHEMA,
-                temperature=0.7,
-                timeout=60,
-            )
+            second_response = await _complete(client, messages, deadline)
             final_content = second_response.choices[0].message.content
         else:
             final_content = response_message.content
+            tool_results = None
         
         # Return the generated text
-        return {
+        result = {
             "status": "success",
             "analysis": final_content
         }
+        if tool_results:
+            result["metadata"] = _tool_metadata(tool_results, tools_ms)
+        await _cache_answer(cache_key, result, version, request.input_data, tool_results)
+        return result
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=504,
+            detail=f"The assistant did not answer within {AI_REQUEST_DEADLINE_S:g} seconds.",
+        )
     except Exception as e:
          raise HTTPException(status_code=500, detail=f"Failed to analyze data with ZhipuAI: {str(e)}")
+    finally:
+        release_ai_slot()
+
+
+async def _stream_completion(client, messages, deadline: float):
+    """
+    One streamed GLM-4 round trip. The SDK's stream is a blocking iterator, so
+    a worker on the AI executor drains it into an asyncio queue. Yields
+    ("token", text) for each content delta and finally ("tool_calls", calls)
+    with any tool calls assembled from their deltas.
+    """
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise asyncio.TimeoutError
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    stop = threading.Event()
+
+    def put(kind, item=None):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, (kind, item))
+        except RuntimeError:
+            pass  # the request's event loop is gone
+
+    def drain():
+        try:
+            stream = client.chat.completions.create(
+                model="glm-4",
+                messages=messages,
+                tools=TOOLS_SCHEMA,
+                temperature=0.7,
+                stream=True,
+                timeout=min(60, remaining),
+            )
+            for chunk in stream:
+                if stop.is_set():
+                    # The client went away; stop reading from the model
+                    response = getattr(stream, "response", None)
+                    if response is not None:
+                        response.close()
+                    break
+                put("chunk", chunk)
+        except Exception as e:
+            put("error", e)
+        finally:
+            put("end")
+
+    worker = asyncio.ensure_future(run_blocking(drain))
+    calls = {}
+    try:
+        while True:
+            kind, item = await asyncio.wait_for(queue.get(), timeout=max(0, deadline - time.monotonic()))
+            if kind == "end":
+                break
+            if kind == "error":
+                raise item
+            if not item.choices:
+                continue
+            delta = item.choices[0].delta
+            if delta.content:
+                yield "token", delta.content
+            for tc in delta.tool_calls or []:
+                call = calls.setdefault(tc.index, {"id": f"call_{tc.index}", "type": "function", "name": "", "arguments": ""})
+                call["id"] = tc.id or call["id"]
+                call["type"] = tc.type or call["type"]
+                if tc.function:
+                    call["name"] = tc.function.name or call["name"]
+                    call["arguments"] += tc.function.arguments or ""
+    finally:
+        stop.set()
+    yield "tool_calls", [
+        SimpleNamespace(
+            id=call["id"], type=call["type"],
+            function=SimpleNamespace(name=call["name"], arguments=call["arguments"]),
+        )
+        for _, call in sorted(calls.items())
+    ]
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def _cached_events(cached: dict):
+    yield _sse("token", {"text": cached["analysis"]})
+    yield _sse("done", {"metadata": _cached_metadata(cached)})
+
+async def _analysis_events(client, messages, cache_key: str = None, input_data=None):
+    """The event stream of /analyze/stream; see analyze_data_stream."""
+    deadline = time.monotonic() + AI_REQUEST_DEADLINE_S
+    version = data_version()
+    if not acquire_ai_slot():
+        yield _sse("error", {"status_code": 503, "detail": "The assistant is busy, please try again shortly."})
+        return
+    try:
+        # Send something straight away so the client sees the response start
+        yield ": analysis started\n\n"
+        tool_calls, answer = [], []
+        tool_results = None
+        async for kind, value in _stream_completion(client, messages, deadline):
+            if kind == "token":
+                answer.append(value)
+                yield _sse("token", {"text": value})
+            else:
+                tool_calls = value
+
+        done = {}
+        if tool_calls:
+            # Text before the tool calls is a preamble, not part of the answer
+            # (/analyze returns only the final round's content)
+            preamble, answer = "".join(answer), []
+            messages.append(_assistant_message(preamble, tool_calls))
+            if preamble:
+                yield _sse("preamble", {"text": preamble})
+            for tool_call in tool_calls:
+                yield _sse("tool_start", {
+                    "name": tool_call.function.name,
+                    "tool_call_id": tool_call.id,
+                    "arguments": tool_call.function.arguments,
+                })
+            tools_started = time.perf_counter()
+            tool_results = [None] * len(tool_calls)
+            async for index, tool_result in iter_tool_calls(tool_calls, deadline):
+                tool_results[index] = tool_result
+                yield _sse("tool_done", {key: tool_result[key] for key in _TOOL_METADATA_KEYS})
+            tools_ms = round((time.perf_counter() - tools_started) * 1000, 1)
+            for tool_result in tool_results:
+                messages.append({"role": "tool", "content": tool_result["content"], "tool_call_id": tool_result["tool_call_id"]})
+
+            # Stream the answer built from the tool results
+            async for kind, value in _stream_completion(client, messages, deadline):
+                if kind == "token":
+                    answer.append(value)
+                    yield _sse("token", {"text": value})
+            done["metadata"] = _tool_metadata(tool_results, tools_ms)
+        yield _sse("done", done)
+        if cache_key:
+            result = {"status": "success", "analysis": "".join(answer), **done}
+            await _cache_answer(cache_key, result, version, input_data, tool_results)
+    except asyncio.TimeoutError:
+        yield _sse("error", {
+            "status_code": 504,
+            "detail": f"The assistant did not answer within {AI_REQUEST_DEADLINE_S:g} seconds.",
+        })
+    except Exception as e:
+        yield _sse("error", {"status_code": 500, "detail": f"Failed to analyze data with ZhipuAI: {str(e)}"})
+    finally:
+        release_ai_slot()
+
+
+@router.post("/analyze/stream")
+async def analyze_data_stream(request: AnalyzeRequest):
+    """
+    Streaming variant of /analyze for the chat widgets: same request body and
+    the same tool loop, answered as Server-Sent Events so the client can show
+    progress and the first words of the answer as soon as they exist.
+
+    Events (each `data` is JSON):
+        tool_start  {"name", "tool_call_id", "arguments"}      the model asked for a database function
+        tool_done   {"name", "tool_call_id", "status", "ms", "cached"}   as each function finishes (they run concurrently)
+        token       {"text"}                                   a piece of the answer, in order
+        preamble    {"text"}                                   the tokens so far were the model's lead-in to
+                                                               its tool calls; the answer starts over after it
+        done        {"metadata"?}                              end of the answer; metadata as in /analyze
+        error       {"status_code", "detail"}                  the request failed; nothing follows
+
+    A cached answer (see /analyze) is sent as one token event. Configuration
+    errors and a saturated assistant are reported with a plain HTTP error
+    before the stream starts.
+    """
+    zhipu_api_key = os.getenv("ZHIPUAI_API_KEY")
+    if not zhipu_api_key:
+        raise HTTPException(status_code=500, detail="ZHIPUAI_API_KEY is not configured in the environment.")
+    if ZhipuAI is None:
+        raise HTTPException(status_code=500, detail="ZhipuAI library is not installed.")
+
+    messages = _build_messages(request)
+    cache_key = response_cache_key(messages)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        events = _cached_events(cached)
+    elif ai_saturated():
+        raise HTTPException(status_code=503, detail="The assistant is busy, please try again shortly.")
+    else:
+        client = ZhipuAI(api_key=zhipu_api_key)
+        events = _analysis_events(client, messages, cache_key, request.input_data)
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/seat-view-image")
@@ -598,7 +1024,7 @@ async def get_seat_view_image(
         "pin_y": 300                // pixel y, or null if section unknown
     }
     """
-    data = get_seatmap_data(venue_name, section)
+    data = await get_seatmap_data(venue_name, section)
     if not data:
         raise HTTPException(status_code=502, detail="Seatmap not available for this venue.")
     return data
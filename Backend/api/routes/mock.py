@@ -2,6 +2,12 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import engine
+from ..utils.aggregates import rebuild_venue_aggregates, recompute_seat_aggregates, reconcile_platform_stats
+from ..utils.ai_cache import invalidate_venue_data
+from ..utils.suggestions import invalidate_suggestions
+from ..utils.seat_index import invalidate_seat_index
+from ..utils.venue_resolver import invalidate_venue_names
+import math
 import uuid
 import random
 from datetime import datetime, timedelta
@@ -50,6 +56,10 @@ def add_extra_venues():
                 text(f"SELECT COUNT(*) FROM Venues WHERE name IN ({placeholders})"),
                 name_params,
             ).scalar()
+            reconcile_platform_stats(conn)
+        invalidate_suggestions()
+        invalidate_venue_data()
+        invalidate_venue_names()
         return {"message": f"Extra venues seeded. {inserted} venue(s) now in DB matching this set."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -171,6 +181,11 @@ def add_venue_events():
                 events_data,
             )
 
+            # Refresh upcoming_events in the venue rollup for the seeded venues
+            rebuild_venue_aggregates(conn, [str(row[0]) for row in empty_venues])
+
+        invalidate_suggestions()
+        invalidate_venue_data()
         return {
             "message": f"Seeded {len(events_data)} events across {len(empty_venues)} venue(s).",
             "venues_updated": [row[1] for row in empty_venues],
@@ -243,9 +258,13 @@ def generate_mock_data():
                 for row in range(1, 16): # Rows A-O
                     for seat_num in range(1, 21): # Seat 1-20
                         dist = sec * 15.0 + random.uniform(-2, 2)
+                        # Sections fan out around the stage at (0, 0); rows step away from it
+                        angle = math.radians((sec - 1) * 30 + (seat_num - 10.5) * 1.2)
+                        radius = 10.0 + sec * 5.0 + row * 0.9
                         seats_data.append({
                             "id": str(uuid.uuid4()), "venue_id": scotia_id, "section": str(sec), 
-                            "row": chr(64 + row), "seat_number": str(seat_num), "distance_to_stage": dist
+                            "row": chr(64 + row), "seat_number": str(seat_num), "distance_to_stage": dist,
+                            "x": radius * math.cos(angle), "y": radius * math.sin(angle),
                         })
             
             for v_name, v_id in venue_dict.items():
@@ -254,9 +273,10 @@ def generate_mock_data():
                 for i in range(100):
                     seats_data.append({
                         "id": str(uuid.uuid4()), "venue_id": v_id, "section": "100", 
-                        "row": "A", "seat_number": str(i), "distance_to_stage": 50.0
+                        "row": "A", "seat_number": str(i), "distance_to_stage": 50.0,
+                        "x": i - 49.5, "y": 50.0,
                     })
-            conn.execute(text("INSERT INTO Seats (id, venue_id, section, row, seat_number, distance_to_stage) VALUES (:id, :venue_id, :section, :row, :seat_number, :distance_to_stage) ON CONFLICT DO NOTHING"), seats_data)
+            conn.execute(text("INSERT INTO Seats (id, venue_id, section, row, seat_number, distance_to_stage, x, y) VALUES (:id, :venue_id, :section, :row, :seat_number, :distance_to_stage, :x, :y) ON CONFLICT DO NOTHING"), seats_data)
             
             res_seats = conn.execute(text("SELECT id, venue_id, section FROM Seats")).fetchall()
             seats_by_venue = {str(v_id): [] for v_id in venue_dict.values()}
@@ -308,11 +328,37 @@ def generate_mock_data():
                 VALUES (:id, :user_id, :event_id, :venue_id, :seat_id, :rating_visual, :rating_sound, :rating_value, :overall_rating, :price_paid, :text, :images, :created_at) 
                 ON CONFLICT DO NOTHING
             """), reviews_data)
-            
+
+            # Bulk inserts bypass the per-review rollup maintenance
+            recompute_seat_aggregates(conn)
+            rebuild_venue_aggregates(conn)
+            reconcile_platform_stats(conn)
+
+        invalidate_suggestions()
+        invalidate_venue_data()
+        invalidate_venue_names()
+        invalidate_seat_index()
         return {"message": f"Successfully injected {len(reviews_data)} reviews across {len(venues_data)} venues!"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/rebuild-aggregates")
+def rebuild_aggregates():
+    """Recompute SeatAggregates, VenueAggregates and the PlatformStats counters from the live tables."""
+    if not engine:
+        raise HTTPException(status_code=500, detail="Database not configured")
+    try:
+        with engine.begin() as conn:
+            seats = recompute_seat_aggregates(conn)
+            venues = rebuild_venue_aggregates(conn)
+            stats = reconcile_platform_stats(conn)
+        invalidate_suggestions()
+        invalidate_venue_data()
+        invalidate_venue_names()
+        return {"seat_aggregates": seats, "venue_aggregates": venues, "platform_stats": stats}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/reviews")
 def get_mocked_reviews(limit: int = 20, venue_name: str = "Scotiabank Arena"):
     """Fetch recent mocked reviews joined with Venues, Events, and Seats."""
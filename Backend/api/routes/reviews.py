@@ -2,19 +2,28 @@ import os
 import jwt
 import uuid
 import json
+from collections import Counter
 import boto3
 from datetime import datetime
 from typing import List, Optional
 from botocore.exceptions import NoCredentialsError, ClientError
 from botocore.config import Config
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Body, Depends, HTTPException, UploadFile, File, Form
 from fastapi.security import OAuth2PasswordBearer
-from pydantic import BaseModel
-from sqlalchemy import text
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import bindparam, text
 
-from ..database import engine
+from ..database import engine, run_read
 from ..auth_utils import SECRET_KEY, ALGORITHM
+from ..utils.aggregates import (
+    PLATFORM_APPLY_SQL, SEAT_BY_POSITION, VENUE_APPLY_SQL,
+    apply_reviews_to_platform, rebuild_venue_aggregates, recompute_seat_aggregates,
+    remove_review_from_platform, remove_review_from_seat, remove_review_from_venue,
+    seat_apply_sql, seat_params, touch_seat_aggregate,
+)
+from ..utils.ai_cache import invalidate_venue_data
+from ..utils.suggestions import record_review_counts
 # from ..utils.zhipu_client import extract_tags  # AI tagging disabled
 
 # S3 Configuration
@@ -76,6 +85,62 @@ class ReviewImagesUpdate(BaseModel):
 class SubReviewCreate(BaseModel):
     text: str
 
+_INSERT_SEAT_SQL = """
+    INSERT INTO Seats (id, venue_id, section, row, seat_number)
+    VALUES (:seat_id, :venue_id, :section, :row, :seat_number)
+    ON CONFLICT (venue_id, section, row, seat_number) {on_conflict}
+"""
+
+_REVIEW_COLUMNS = [
+    "id", "user_id", "event_id", "venue_id", "seat_id",
+    "rating_visual", "rating_sound", "rating_value", "overall_rating",
+    "price_paid", "text", "images", "tags", "created_at",
+]
+
+# The seat id is left as a {seat_id} placeholder for the write path to fill
+_INSERT_REVIEW_SQL = f"""
+    INSERT INTO Reviews ({", ".join(_REVIEW_COLUMNS)})
+    VALUES ({", ".join("{seat_id}" if column == "seat_id" else f":{column}" for column in _REVIEW_COLUMNS)})
+"""
+
+
+def _overall_rating(review: ReviewCreate) -> int:
+    return int(round((review.rating_visual + review.rating_sound + review.rating_value) / 3.0))
+
+
+def _review_values(review: ReviewCreate, review_id: str, user_id: str, seat_id: str, created_at: datetime) -> dict:
+    """The Reviews row (_REVIEW_COLUMNS) for a submission."""
+    return {
+        "id": review_id,
+        "user_id": user_id,
+        "event_id": review.event_id,
+        "venue_id": review.venue_id,
+        "seat_id": seat_id,
+        "rating_visual": review.rating_visual,
+        "rating_sound": review.rating_sound,
+        "rating_value": review.rating_value,
+        "overall_rating": _overall_rating(review),
+        "price_paid": review.price_paid,
+        "text": review.text,
+        "images": json.dumps(review.images) if review.images else None,
+        # If anonymous, tag the review so the frontend can hide the author without any new DB column
+        "tags": json.dumps(["anonymous"]) if review.is_anonymous else None,
+        "created_at": created_at,
+    }
+
+# Insert a review (creating its seat if needed) and fold it into the seat,
+# venue and platform rollups. The statements share one params dict; each
+# finds the seat by position instead of depending on an earlier statement's
+# result, so a seat created first by a concurrent request is picked up too.
+_REVIEW_WRITE_STATEMENTS = [
+    _INSERT_SEAT_SQL.format(on_conflict="DO NOTHING"),
+    _INSERT_REVIEW_SQL.format(seat_id=f"(SELECT s.id FROM Seats s WHERE {SEAT_BY_POSITION})"),
+    seat_apply_sql(SEAT_BY_POSITION),
+    VENUE_APPLY_SQL,
+    PLATFORM_APPLY_SQL,
+]
+
+
 @router.post("/")
 def create_review(review: ReviewCreate, user_id: str = Depends(get_current_user)):
     """
@@ -117,122 +182,242 @@ def create_review(review: ReviewCreate, user_id: str = Depends(get_current_user)
     if not engine:
         raise HTTPException(status_code=500, detail="Database not configured")
         
-    overall_rating = int(round((review.rating_visual + review.rating_sound + review.rating_value) / 3.0))
+    overall_rating = _overall_rating(review)
     review_id = str(uuid.uuid4())
-    images_json = json.dumps(review.images) if review.images else None
     
     extracted_tags = []
-    # If anonymous, tag the review so the frontend can hide the author without any new DB column
-    tags_json = json.dumps(["anonymous"]) if review.is_anonymous else None
     
     try:
         with engine.begin() as conn:
-            # 1. Validate User
-            user_exists = conn.execute(text("SELECT 1 FROM Users WHERE id = :user_id"), {"user_id": user_id}).scalar()
+            # 1. Validate user, venue and event in one round trip
+            user_exists, venue_exists, event_exists, event_venue_id = conn.execute(text("""
+                SELECT EXISTS (SELECT 1 FROM Users WHERE id = :user_id),
+                       EXISTS (SELECT 1 FROM Venues WHERE id = :venue_id),
+                       EXISTS (SELECT 1 FROM Events WHERE id = :event_id),
+                       (SELECT venue_id FROM Events WHERE id = :event_id)
+            """), {"user_id": user_id, "venue_id": review.venue_id, "event_id": review.event_id}).fetchone()
+
             if not user_exists:
                 raise HTTPException(status_code=400, detail="Invalid user_id: User does not exist.")
-                
-            # 2. Validate Venue & Event
-            venue_exists = conn.execute(text("SELECT 1 FROM Venues WHERE id = :venue_id"), {"venue_id": review.venue_id}).scalar()
             if not venue_exists:
                 raise HTTPException(status_code=400, detail="Invalid venue_id: Venue does not exist.")
-                
             # We want to make sure the event actually exists and belongs to the specified venue
-            event_row = conn.execute(
-                text("SELECT venue_id FROM Events WHERE id = :event_id"), 
-                {"event_id": review.event_id}
-            ).fetchone()
-            
-            if not event_row:
+            if not event_exists:
                 raise HTTPException(status_code=400, detail="Invalid event_id: Event does not exist.")
-            # if event_row[0] != review.venue_id:
-            #     raise HTTPException(status_code=400, detail="Invalid venue_id: Event does not belong to this venue.")
-            if str(event_row[0]).strip() != str(review.venue_id).strip():
+            if str(event_venue_id).strip() != str(review.venue_id).strip():
                 raise HTTPException(
                     status_code=400, 
-                    detail=f"Mismatch: DB venue {event_row[0]} vs Input venue {review.venue_id}"
-                )                
-            # 3. Handle Seat (Find or Create)
-            upsert_seat_query = text("""
-                INSERT INTO Seats (id, venue_id, section, row, seat_number)
-                VALUES (:id, :v_id, :sec, :row, :num)
-                ON CONFLICT (venue_id, section, row, seat_number) 
-                DO UPDATE SET section = EXCLUDED.section 
-                RETURNING id;
-            """)
-
-            final_seat_id = conn.execute(upsert_seat_query, {
-                "id": str(uuid.uuid4()),
-                "v_id": review.venue_id, 
-                "sec": review.section,
-                "row": review.row,
-                "num": review.seat_number
-            }).scalar()
-
-            conn.execute(text("""
-                INSERT INTO Reviews (
-                    id, user_id, event_id, venue_id, seat_id,
-                    rating_visual, rating_sound, rating_value, overall_rating,
-                    price_paid, text, images, tags, created_at
-                ) VALUES (
-                    :id, :user_id, :event_id, :venue_id, :seat_id,
-                    :r_vis, :r_snd, :r_val, :r_over,
-                    :price, :text, :images, :tags, :created_at
+                    detail=f"Mismatch: DB venue {event_venue_id} vs Input venue {review.venue_id}"
                 )
-            """), {
-                "id": review_id,
-                "user_id": user_id,
-                "event_id": review.event_id,
-                "venue_id": review.venue_id,
-                "seat_id": final_seat_id,
-                "r_vis": review.rating_visual,
-                "r_snd": review.rating_sound,
-                "r_val": review.rating_value,
-                "r_over": overall_rating,
-                "price": review.price_paid,
-                "text": review.text,
-                "images": images_json,
-                "tags": tags_json,
-                "created_at": datetime.utcnow()
-            })
 
-            # 4. Update SeatAggregates
-            conn.execute(text("""
-                INSERT INTO SeatAggregates (
-                    seat_id, avg_visual, avg_sound, avg_value, avg_overall, avg_price_paid, 
-                    review_count, last_updated
-                ) VALUES (
-                    :seat_id, :v, :s, :val, :o, :p, 1, :now
-                )
-                ON CONFLICT (seat_id) DO UPDATE SET
-                    avg_visual = (SeatAggregates.avg_visual * SeatAggregates.review_count + EXCLUDED.avg_visual) / (SeatAggregates.review_count + 1),
-                    avg_sound = (SeatAggregates.avg_sound * SeatAggregates.review_count + EXCLUDED.avg_sound) / (SeatAggregates.review_count + 1),
-                    avg_value = (SeatAggregates.avg_value * SeatAggregates.review_count + EXCLUDED.avg_value) / (SeatAggregates.review_count + 1),
-                    avg_overall = (SeatAggregates.avg_overall * SeatAggregates.review_count + EXCLUDED.avg_overall) / (SeatAggregates.review_count + 1),
-                    avg_price_paid = (SeatAggregates.avg_price_paid * SeatAggregates.review_count + EXCLUDED.avg_price_paid) / (SeatAggregates.review_count + 1),
-                    review_count = SeatAggregates.review_count + 1,
-                    last_updated = EXCLUDED.last_updated;
-            """), {
-                "seat_id": final_seat_id,
-                "v": float(review.rating_visual),
-                "s": float(review.rating_sound),
-                "val": float(review.rating_value),
-                "o": float(overall_rating),
-                "p": float(review.price_paid),
-                "now": datetime.utcnow()
-            })
-            
-            return {
-                "message": "Review submitted successfully", 
-                "review_id": review_id, 
-                "overall_rating": overall_rating
+            # 2. Seat find-or-create, review insert and the seat/venue/platform rollups
+            # The review row's seat_id doubles as the id of a newly created seat
+            values = _review_values(review, review_id, user_id, str(uuid.uuid4()), datetime.utcnow())
+            params = {
+                **values,
+                "section": review.section,
+                "row": review.row,
+                "seat_number": review.seat_number,
+                "rating": overall_rating,
+                **seat_params(values),
             }
+            for statement in _REVIEW_WRITE_STATEMENTS:
+                conn.execute(text(statement), params)
+
+        # Review counts weight the autocomplete ranking
+        record_review_counts({(review.venue_id, review.event_id): 1})
+        invalidate_venue_data([review.venue_id])
+        return {
+            "message": "Review submitted successfully", 
+            "review_id": review_id, 
+            "overall_rating": overall_rating
+        }
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to submit review: {str(e)}")
 
 
+# Lines accepted per POST /reviews/bulk request, and rows per multi-row INSERT
+BULK_MAX_REVIEWS = int(os.getenv("BULK_MAX_REVIEWS", "10000"))
+_BULK_CHUNK_ROWS = 500
+
+
+def _insert_rows(conn, table: str, columns: List[str], rows: List[dict], suffix: str = "") -> None:
+    """Insert rows with one multi-row VALUES statement per chunk."""
+    for start in range(0, len(rows), _BULK_CHUNK_ROWS):
+        chunk = rows[start:start + _BULK_CHUNK_ROWS]
+        params = {}
+        values = []
+        for i, row in enumerate(chunk):
+            values.append("(" + ", ".join(f":{column}_{i}" for column in columns) + ")")
+            params.update({f"{column}_{i}": row[column] for column in columns})
+        conn.execute(
+            text(f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join(values)} {suffix}"),
+            params,
+        )
+
+
+def _normalize_id(value) -> str:
+    return str(value).strip().lower()
+
+
+def _seat_key(venue_id, section, row, seat_number) -> tuple:
+    """A seat position, normalized the same way for request input and Seats rows."""
+    return (_normalize_id(venue_id), *(None if part is None else str(part).strip() for part in (section, row, seat_number)))
+
+
+def _fetch_by_ids(conn, sql: str, ids) -> list:
+    """Run `sql` (which filters on `IN :ids`) for the given ids; skips malformed UUIDs on Postgres."""
+    ids = list(ids)
+    if conn.dialect.name == "postgresql":
+        def _is_uuid(value: str) -> bool:
+            try:
+                uuid.UUID(value)
+                return True
+            except ValueError:
+                return False
+        ids = [i for i in ids if _is_uuid(i)]
+    if not ids:
+        return []
+    stmt = text(sql).bindparams(bindparam("ids", expanding=True))
+    return conn.execute(stmt, {"ids": ids}).fetchall()
+
+
+@router.post("/bulk")
+def bulk_create_reviews(
+    body: bytes = Body(..., media_type="application/x-ndjson"),
+    atomic: bool = False,
+    user_id: str = Depends(get_current_user),
+):
+    """
+    Import many reviews at once from an NDJSON body (one ReviewCreate JSON
+    object per line), all attributed to the authenticated user.
+
+    Send with `Content-Type: application/x-ndjson`. At most BULK_MAX_REVIEWS
+    lines per request; `scripts/import_reviews.py` splits larger files.
+
+    Seats are resolved with multi-row upserts, reviews are written with
+    multi-row INSERTs, and each affected seat and venue rollup is
+    recomputed once for the whole batch.
+
+    - **atomic**: if true, any invalid line rejects the whole request (400)
+      and nothing is written. Otherwise valid lines are imported and invalid
+      ones are reported.
+
+    Response:
+    ```json
+    {
+        "message": "Imported 2 reviews",
+        "inserted": 2,
+        "reviews": [{"line": 1, "review_id": "..."}, {"line": 3, "review_id": "..."}],
+        "errors": [{"line": 2, "detail": "Invalid event_id: Event does not exist."}]
+    }
+    ```
+    """
+    if not engine:
+        raise HTTPException(status_code=500, detail="Database not configured")
+
+    # 1. Parse and validate each line on its own
+    entries = []
+    errors = []
+    lines = [(n, line) for n, line in enumerate(body.decode("utf-8").splitlines(), start=1) if line.strip()]
+    if len(lines) > BULK_MAX_REVIEWS:
+        raise HTTPException(status_code=413, detail=f"Too many reviews: at most {BULK_MAX_REVIEWS} lines per request")
+    for line_no, line in lines:
+        try:
+            entries.append((line_no, ReviewCreate.model_validate_json(line)))
+        except ValidationError as e:
+            first = e.errors()[0]
+            location = ".".join(str(part) for part in first["loc"])
+            errors.append({"line": line_no, "detail": f"{location}: {first['msg']}" if location else first["msg"]})
+
+    try:
+        with engine.begin() as conn:
+            user_exists = conn.execute(text("SELECT 1 FROM Users WHERE id = :user_id"), {"user_id": user_id}).scalar()
+            if not user_exists:
+                raise HTTPException(status_code=400, detail="Invalid user_id: User does not exist.")
+
+            # 2. Check every referenced venue and event with one query each
+            # Keyed by normalized id; values are the ids as stored
+            venues = {_normalize_id(v[0]): str(v[0]) for v in _fetch_by_ids(
+                conn, "SELECT id FROM Venues WHERE id IN :ids", {r.venue_id.strip() for _, r in entries}
+            )}
+            events = {_normalize_id(e[0]): (str(e[0]), e[1]) for e in _fetch_by_ids(
+                conn, "SELECT id, venue_id FROM Events WHERE id IN :ids", {r.event_id.strip() for _, r in entries}
+            )}
+            valid = []
+            for line_no, review in entries:
+                venue_id = venues.get(_normalize_id(review.venue_id))
+                event_id, event_venue_id = events.get(_normalize_id(review.event_id), (None, None))
+                if venue_id is None:
+                    errors.append({"line": line_no, "detail": "Invalid venue_id: Venue does not exist."})
+                elif event_id is None:
+                    errors.append({"line": line_no, "detail": "Invalid event_id: Event does not exist."})
+                elif _normalize_id(event_venue_id) != _normalize_id(venue_id):
+                    errors.append({
+                        "line": line_no,
+                        "detail": f"Mismatch: DB venue {event_venue_id} vs Input venue {review.venue_id}",
+                    })
+                else:
+                    # Write the ids as stored and the seat position as matched below
+                    valid.append((line_no, review.model_copy(update={
+                        "venue_id": venue_id,
+                        "event_id": event_id,
+                        **{field: getattr(review, field).strip() for field in ("section", "row", "seat_number")},
+                    })))
+            errors.sort(key=lambda error: error["line"])
+
+            if atomic and errors:
+                raise HTTPException(status_code=400, detail={"message": "No reviews imported", "errors": errors})
+
+            review_rows = []
+            if valid:
+                # 3. Find-or-create every distinct seat, then map positions to ids
+                positions = {(r.venue_id, r.section, r.row, r.seat_number) for _, r in valid}
+                _insert_rows(conn, "Seats", ["id", "venue_id", "section", "row", "seat_number"], [
+                    {"id": str(uuid.uuid4()), "venue_id": v, "section": sec, "row": row, "seat_number": num}
+                    for v, sec, row, num in positions
+                ], "ON CONFLICT (venue_id, section, row, seat_number) DO NOTHING")
+                seat_rows = conn.execute(
+                    text("""
+                        SELECT id, venue_id, section, row, seat_number FROM Seats
+                        WHERE venue_id IN :venue_ids AND section IN :sections
+                    """).bindparams(bindparam("venue_ids", expanding=True), bindparam("sections", expanding=True)),
+                    {"venue_ids": sorted({p[0] for p in positions}), "sections": sorted({p[1] for p in positions})},
+                ).fetchall()
+                seat_ids = {_seat_key(v, sec, row, num): sid for sid, v, sec, row, num in seat_rows}
+
+                # 4. Insert the reviews
+                created_at = datetime.utcnow()
+                for line_no, review in valid:
+                    seat_id = seat_ids[_seat_key(review.venue_id, review.section, review.row, review.seat_number)]
+                    review_rows.append({
+                        "line": line_no,
+                        **_review_values(review, str(uuid.uuid4()), user_id, seat_id, created_at),
+                    })
+                _insert_rows(conn, "Reviews", _REVIEW_COLUMNS, review_rows)
+
+                # 5. Recompute each affected rollup once for the whole batch
+                recompute_seat_aggregates(conn, seat_ids={r["seat_id"] for r in review_rows})
+                rebuild_venue_aggregates(conn, {r["venue_id"] for r in review_rows})
+                apply_reviews_to_platform(conn, len(review_rows), sum(r["overall_rating"] for r in review_rows))
+
+        if review_rows:
+            record_review_counts(Counter((r["venue_id"], r["event_id"]) for r in review_rows))
+            invalidate_venue_data({r["venue_id"] for r in review_rows})
+        return {
+            "message": f"Imported {len(review_rows)} reviews",
+            "inserted": len(review_rows),
+            "reviews": [{"line": r["line"], "review_id": r["id"]} for r in review_rows],
+            "errors": errors,
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to import reviews: {str(e)}")
+
+
 @router.post("/upload-image")
 def upload_review_image(
     review_id: str,
@@ -316,7 +501,13 @@ def delete_review(review_id: str, user_id: str = Depends(get_current_user)):
         with engine.begin() as conn:
             # Verify the review exists and belongs to the requesting user
             review_row = conn.execute(
-                text("SELECT id FROM Reviews WHERE id = :review_id AND user_id = :user_id"),
+                text("""
+                    SELECT r.id, r.overall_rating, COALESCE(s.venue_id, r.venue_id), r.seat_id,
+                           r.rating_visual, r.rating_sound, r.rating_value, r.price_paid, r.event_id
+                    FROM Reviews r
+                    LEFT JOIN Seats s ON r.seat_id = s.id
+                    WHERE r.id = :review_id AND r.user_id = :user_id
+                """),
                 {"review_id": review_id, "user_id": user_id}
             ).fetchone()
             if not review_row:
@@ -337,7 +528,21 @@ def delete_review(review_id: str, user_id: str = Depends(get_current_user)):
                 {"review_id": review_id}
             )
 
-            return {"message": "Review deleted successfully"}
+            if review_row[3]:
+                remove_review_from_seat(conn, review_row[3], {
+                    "rating_visual": review_row[4],
+                    "rating_sound": review_row[5],
+                    "rating_value": review_row[6],
+                    "overall_rating": review_row[1],
+                    "price_paid": review_row[7],
+                })
+            if review_row[2]:
+                remove_review_from_venue(conn, review_row[2], review_row[1])
+                remove_review_from_platform(conn, review_row[1])
+
+        record_review_counts({(review_row[2], review_row[8]): -1})
+        invalidate_venue_data([review_row[2]] if review_row[2] else [])
+        return {"message": "Review deleted successfully"}
     except HTTPException:
         raise
     except Exception as e:
@@ -345,7 +550,7 @@ def delete_review(review_id: str, user_id: str = Depends(get_current_user)):
 
 
 @router.get("/{review_id}")
-def get_review(review_id: str):
+async def get_review(review_id: str):
     """
     Fetch full details for a single review by its ID.
     Joins with Seats, Venues, and Events to return enriched context.
@@ -353,87 +558,89 @@ def get_review(review_id: str):
     """
     if not engine:
         raise HTTPException(status_code=500, detail="Database not configured")
-    try:
-        with engine.connect() as conn:
-            row = conn.execute(
-                text("""
-                    SELECT
-                        r.id, r.user_id, r.event_id, r.venue_id, r.seat_id,
-                        r.rating_visual, r.rating_sound, r.rating_value, r.overall_rating,
-                        r.price_paid, r.text, r.images, r.tags, r.created_at,
-                        s.section, s.row, s.seat_number,
-                        v.name AS venue_name,
-                        e.name AS event_name, e.event_date
-                    FROM Reviews r
-                    LEFT JOIN Seats   s ON r.seat_id   = s.id
-                    LEFT JOIN Venues  v ON r.venue_id  = v.id
-                    LEFT JOIN Events  e ON r.event_id  = e.id
-                    WHERE r.id = :review_id
-                """),
-                {"review_id": review_id},
-            ).fetchone()
-
-            if not row:
-                raise HTTPException(status_code=404, detail="Review not found")
-
-            # Safely parse JSON-string fields (SQLite stores as text; Postgres may return objects)
-            def _parse_json(val):
-                if val is None:
-                    return []
-                if isinstance(val, (list, dict)):
-                    return val
-                try:
-                    return json.loads(val)
-                except Exception:
-                    return []
-
-            # Fetch sub-reviews for this review
-            sub_rows = conn.execute(
-                text("""
-                    SELECT sr.id, sr.user_id, sr.text, sr.created_at,
-                           u.email
-                    FROM SubReviews sr
-                    LEFT JOIN Users u ON sr.user_id = u.id
-                    WHERE sr.review_id = :review_id
-                    ORDER BY sr.created_at ASC
-                """),
-                {"review_id": review_id},
-            ).fetchall()
+    def _fetch(conn):
+        row = conn.execute(
+            text("""
+                SELECT
+                    r.id, r.user_id, r.event_id, r.venue_id, r.seat_id,
+                    r.rating_visual, r.rating_sound, r.rating_value, r.overall_rating,
+                    r.price_paid, r.text, r.images, r.tags, r.created_at,
+                    s.section, s.row, s.seat_number,
+                    v.name AS venue_name,
+                    e.name AS event_name, e.event_date
+                FROM Reviews r
+                LEFT JOIN Seats   s ON r.seat_id   = s.id
+                LEFT JOIN Venues  v ON r.venue_id  = v.id
+                LEFT JOIN Events  e ON r.event_id  = e.id
+                WHERE r.id = :review_id
+            """),
+            {"review_id": review_id},
+        ).fetchone()
+
+        if not row:
+            raise HTTPException(status_code=404, detail="Review not found")
+
+        # Safely parse JSON-string fields (SQLite stores as text; Postgres may return objects)
+        def _parse_json(val):
+            if val is None:
+                return []
+            if isinstance(val, (list, dict)):
+                return val
+            try:
+                return json.loads(val)
+            except Exception:
+                return []
+
+        # Fetch sub-reviews for this review
+        sub_rows = conn.execute(
+            text("""
+                SELECT sr.id, sr.user_id, sr.text, sr.created_at,
+                       u.email
+                FROM SubReviews sr
+                LEFT JOIN Users u ON sr.user_id = u.id
+                WHERE sr.review_id = :review_id
+                ORDER BY sr.created_at ASC
+            """),
+            {"review_id": review_id},
+        ).fetchall()
+
+        sub_reviews = [
+            {
+                "id": str(sr[0]),
+                "user_id": str(sr[1]) if sr[1] else None,
+                "text": sr[2],
+                "created_at": sr[3],
+                "user_email": sr[4],
+            }
+            for sr in sub_rows
+        ]
 
-            sub_reviews = [
-                {
-                    "id": str(sr[0]),
-                    "user_id": str(sr[1]) if sr[1] else None,
-                    "text": sr[2],
-                    "created_at": sr[3],
-                    "user_email": sr[4],
-                }
-                for sr in sub_rows
-            ]
+        return {
+            "id":             row[0],
+            "user_id":        row[1],
+            "event_id":       row[2],
+            "venue_id":       row[3],
+            "seat_id":        row[4],
+            "rating_visual":  row[5],
+            "rating_sound":   row[6],
+            "rating_value":   row[7],
+            "overall_rating": row[8],
+            "price_paid":     row[9],
+            "text":           row[10],
+            "images":         _parse_json(row[11]),
+            "tags":           _parse_json(row[12]),
+            "created_at":     row[13],
+            "section":        row[14],
+            "row":            row[15],
+            "seat_number":    row[16],
+            "venue_name":     row[17],
+            "event_name":     row[18],
+            "event_date":     row[19],
+            "sub_reviews":    sub_reviews,
+        }
 
-            return {
-                "id":             row[0],
-                "user_id":        row[1],
-                "event_id":       row[2],
-                "venue_id":       row[3],
-                "seat_id":        row[4],
-                "rating_visual":  row[5],
-                "rating_sound":   row[6],
-                "rating_value":   row[7],
-                "overall_rating": row[8],
-                "price_paid":     row[9],
-                "text":           row[10],
-                "images":         _parse_json(row[11]),
-                "tags":           _parse_json(row[12]),
-                "created_at":     row[13],
-                "section":        row[14],
-                "row":            row[15],
-                "seat_number":    row[16],
-                "venue_name":     row[17],
-                "event_name":     row[18],
-                "event_date":     row[19],
-                "sub_reviews":    sub_reviews,
-            }
+    try:
+        return await run_read(_fetch)
     except HTTPException:
         raise
     except Exception as e:
@@ -453,7 +660,7 @@ def update_review_images(review_id: str, payload: ReviewImagesUpdate, user_id: s
         with engine.begin() as conn:
             # First, check if review belongs to user
             review_exists = conn.execute(
-                text("SELECT id FROM Reviews WHERE id = :review_id AND user_id = :user_id"),
+                text("SELECT id, seat_id FROM Reviews WHERE id = :review_id AND user_id = :user_id"),
                 {"review_id": review_id, "user_id": user_id}
             ).fetchone()
             if not review_exists:
@@ -467,6 +674,8 @@ def update_review_images(review_id: str, payload: ReviewImagesUpdate, user_id: s
                 "review_id": review_id,
                 "images": json.dumps(payload.images)
             })
+            if review_exists[1]:
+                touch_seat_aggregate(conn, review_exists[1])
             return {"message": "Images updated successfully"}
     except HTTPException:
         raise
@@ -1,38 +1,46 @@
 from fastapi import APIRouter, HTTPException, Query
 from sqlalchemy import text
-from ...database import engine
+from ...database import engine, run_read
+from ...utils.text_search import event_match
 from typing import Optional
+from .pagination import (
+    count_window, decode_cursor, keyset_condition, order_clause, resolve_total, split_page, validate_count_mode,
+)
 
 router = APIRouter()
 
 
 @router.get("/events")
-def search_events(
-    q: Optional[str] = Query(None, description="Search by event name or artist"),
+async def search_events(
+    q: Optional[str] = Query(None, description="Search by event name, artist, venue name or city"),
     venue_id: Optional[str] = Query(None, description="Filter by venue ID"),
     genre: Optional[str] = Query(None, description="Filter by genre"),
     date_from: Optional[str] = Query(None, description="Filter events on or after this date (YYYY-MM-DD)"),
     date_to: Optional[str] = Query(None, description="Filter events on or before this date (YYYY-MM-DD)"),
-    sort_by: Optional[str] = Query("event_date", description="Sort field: name, event_date, artist"),
+    sort_by: Optional[str] = Query("event_date", description="Sort field: name, event_date, artist, relevance"),
     order: Optional[str] = Query("asc", description="Sort order: asc or desc"),
     limit: int = Query(20, ge=1, le=100, description="Number of results to return"),
     offset: int = Query(0, ge=0, description="Number of results to skip"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor (overrides offset)"),
+    count_mode: str = Query("exact", description="How to compute total: exact, estimated, or none"),
 ):
     """
     Search, filter, and sort events.
 
-    - **q**: Free-text search across event name and artist
+    - **q**: Ranked, typo-tolerant search across event name, artist, venue name and city
     - **venue_id**: Filter by venue
     - **genre**: Exact genre filter
     - **date_from / date_to**: Date range filter (YYYY-MM-DD)
-    - **sort_by**: Field to sort results by (name, event_date, artist)
+    - **sort_by**: Field to sort results by (name, event_date, artist, relevance; relevance requires q)
     - **order**: Sort direction (asc or desc)
     - **limit / offset**: Pagination controls
+    - **cursor**: Keyset pagination; pass the previous response's `next_cursor`
+    - **count_mode**: `exact` (default), `estimated` (planner estimate), or `none` (total is null)
     """
     if not engine:
         raise HTTPException(status_code=500, detail="Database not configured")
 
-    allowed_sort_fields = {"name", "event_date", "artist"}
+    allowed_sort_fields = {"name", "event_date", "artist", "relevance"}
     if sort_by not in allowed_sort_fields:
         raise HTTPException(
             status_code=400,
@@ -45,64 +53,88 @@ def search_events(
             detail="Invalid order. Allowed: asc, desc"
         )
 
-    try:
-        with engine.connect() as conn:
-            conditions = []
-            params = {"limit": limit, "offset": offset}
-
-            if q:
-                conditions.append("(LOWER(name) LIKE :q OR LOWER(artist) LIKE :q)")
-                params["q"] = f"%{q.lower()}%"
-
-            if venue_id:
-                conditions.append("venue_id = :venue_id")
-                params["venue_id"] = venue_id
-
-            if genre:
-                conditions.append("LOWER(genre) = :genre")
-                params["genre"] = genre.lower()
-
-            if date_from:
-                conditions.append("event_date >= :date_from")
-                params["date_from"] = date_from
-
-            if date_to:
-                conditions.append("event_date <= :date_to")
-                params["date_to"] = date_to
-
-            where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
-
-            count_query = text(f"SELECT COUNT(*) FROM Events {where_clause}")
-            total = conn.execute(count_query, params).scalar()
-
-            query = text(f"""
-                SELECT id, venue_id, name, artist, genre, event_date, ticket_url
-                FROM Events
-                {where_clause}
-                ORDER BY {sort_by} {order}
-                LIMIT :limit OFFSET :offset
-            """)
-            result = conn.execute(query, params)
-
-            events = [
-                {
-                    "id": row[0],
-                    "venue_id": row[1],
-                    "name": row[2],
-                    "artist": row[3],
-                    "genre": row[4],
-                    "event_date": row[5],
-                    "ticket_url": row[6],
-                }
-                for row in result
-            ]
-
-            return {
-                "total": total,
-                "limit": limit,
-                "offset": offset,
-                "results": events,
+    if sort_by == "relevance" and not q:
+        raise HTTPException(
+            status_code=400,
+            detail="sort_by=relevance requires q"
+        )
+
+    validate_count_mode(count_mode)
+
+    def _search(conn):
+        conditions = []
+        params = {}
+        score = "NULL"
+
+        if q:
+            match, score = event_match(conn, q, params)
+            conditions.append(match)
+
+        if venue_id:
+            conditions.append("venue_id = :venue_id")
+            params["venue_id"] = venue_id
+
+        if genre:
+            conditions.append("LOWER(genre) = :genre")
+            params["genre"] = genre.lower()
+
+        if date_from:
+            conditions.append("event_date >= :date_from")
+            params["date_from"] = date_from
+
+        if date_to:
+            conditions.append("event_date <= :date_to")
+            params["date_to"] = date_to
+
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        sort_col = score if sort_by == "relevance" else sort_by
+        page_conditions = list(conditions)
+        page_params = {**params, "limit": limit + 1, "offset": offset}
+        if cursor:
+            after_value, after_id = decode_cursor(cursor, sort_by, order)
+            page_conditions.append(keyset_condition(sort_col, "id", order, after_value, after_id, page_params))
+            page_params["offset"] = 0
+        page_where = f"WHERE {' AND '.join(page_conditions)}" if page_conditions else ""
+
+        window = count_window(conn, count_mode, cursor)
+        sort_index = {"name": 2, "artist": 3, "event_date": 5, "relevance": 7}[sort_by]
+        query = text(f"""
+            SELECT id, venue_id, name, artist, genre, event_date, ticket_url,
+                   {score} AS relevance{window}
+            FROM Events
+            {page_where}
+            {order_clause(sort_col, "id", order)}
+            LIMIT :limit OFFSET :offset
+        """)
+        fetched = conn.execute(query, page_params).fetchall()
+        total = resolve_total(conn, count_mode, f"FROM Events {where_clause}", params, fetched, bool(window), page_params["offset"])
+        rows, next_cursor = split_page(fetched, limit, sort_by, order, sort_index, 0)
+
+        events = [
+            {
+                "id": row[0],
+                "venue_id": row[1],
+                "name": row[2],
+                "artist": row[3],
+                "genre": row[4],
+                "event_date": row[5],
+                "ticket_url": row[6],
+                "relevance": round(row[7], 3) if row[7] is not None else None,
             }
+            for row in rows
+        ]
+
+        return {
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": next_cursor,
+            "results": events,
+        }
+
+    try:
+        return await run_read(_search)
     except HTTPException:
         raise
     except Exception as e:
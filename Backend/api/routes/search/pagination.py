@@ -0,0 +1,135 @@
+"""
+Pagination and total-count helpers shared by the search routers.
+
+A cursor is an opaque, URL-safe token encoding the sort field, the sort
+direction and the (sort value, id) of the last row on the previous page.
+The next page is then fetched with a range predicate on (sort value, id)
+instead of OFFSET, so page N costs the same as page 1.
+
+Totals are controlled by count_mode:
+    exact     - COUNT(*) OVER() riding along in the page query (one round trip)
+    estimated - the Postgres planner's row estimate (exact on SQLite)
+    none      - no total at all; cheapest for infinite scroll
+"""
+
+import base64
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import text
+
+COUNT_MODES = ("exact", "estimated", "none")
+
+
+def encode_cursor(sort_by: str, order: str, value: Any, row_id: Any) -> str:
+    """Pack the sort key of the last returned row into an opaque token."""
+    raw = json.dumps([sort_by, order, value, str(row_id)], default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, order: str) -> Tuple[Any, str]:
+    """
+    Unpack a cursor produced by encode_cursor() and return (value, id).
+    Raises 400 if the token is malformed or was issued for a different sort.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        c_sort_by, c_order, value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if c_sort_by != sort_by or c_order != order:
+        raise HTTPException(
+            status_code=400,
+            detail="Cursor does not match the requested sort_by/order"
+        )
+    return value, row_id
+
+
+def order_clause(sort_col: str, id_col: str, order: str) -> str:
+    """
+    ORDER BY clause with a unique id tie-breaker. NULLs always sort last so
+    Postgres and SQLite agree on row order (and so cursors stay valid).
+    """
+    return f"ORDER BY {sort_col} {order} NULLS LAST, {id_col} {order}"
+
+
+def keyset_condition(sort_col: str, id_col: str, order: str, value: Any, row_id: str, params: Dict[str, Any]) -> str:
+    """
+    Build the predicate selecting rows strictly after (value, row_id) in the
+    ordering produced by order_clause(), and add its bind params to `params`.
+    """
+    op = ">" if order == "asc" else "<"
+    params["cursor_id"] = row_id
+
+    if value is None:
+        # Already inside the trailing NULL block: only the id can advance
+        return f"({sort_col} IS NULL AND {id_col} {op} :cursor_id)"
+
+    params["cursor_value"] = value
+    return (
+        f"({sort_col} {op} :cursor_value"
+        f" OR ({sort_col} = :cursor_value AND {id_col} {op} :cursor_id)"
+        f" OR {sort_col} IS NULL)"
+    )
+
+
+def split_page(rows: Sequence, limit: int, sort_by: str, order: str, value_index: int, id_index: int) -> Tuple[List, Optional[str]]:
+    """
+    Given up to limit + 1 fetched rows, return the page and the cursor for
+    the next one (None when this is the last page).
+    """
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor(sort_by, order, last[value_index], last[id_index])
+
+
+def validate_count_mode(count_mode: str) -> None:
+    if count_mode not in COUNT_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid count_mode. Allowed: {', '.join(COUNT_MODES)}"
+        )
+
+
+def count_window(conn, count_mode: str, cursor: Optional[str]) -> str:
+    """
+    Extra select-list column carrying the exact total, or "" when the page
+    query should not compute it. After a cursor the window would only see
+    the remaining rows, so the total is resolved separately instead.
+    """
+    if cursor or count_mode == "none":
+        return ""
+    if count_mode == "estimated" and conn.dialect.name == "postgresql":
+        return ""
+    return ", COUNT(*) OVER() AS total_count"
+
+
+def resolve_total(conn, count_mode: str, from_clause: str, params: Dict[str, Any], rows: Sequence, windowed: bool, offset: int) -> Optional[int]:
+    """
+    Work out the total for a page fetched with the filter-only `from_clause`
+    ("FROM ... WHERE ..."). Reads the window column when present and only
+    falls back to another statement when the page itself cannot answer.
+    """
+    if count_mode == "none":
+        return None
+    if windowed:
+        if rows:
+            return int(rows[0][-1])
+        if offset == 0:
+            return 0
+    if count_mode == "estimated" and conn.dialect.name == "postgresql":
+        return estimate_count(conn, from_clause, params)
+    return conn.execute(text(f"SELECT COUNT(*) {from_clause}"), params).scalar()
+
+
+def estimate_count(conn, from_clause: str, params: Dict[str, Any]) -> int:
+    """Row estimate from the Postgres planner; no rows are read."""
+    plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) SELECT 1 {from_clause}"), params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
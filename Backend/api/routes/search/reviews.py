@@ -1,14 +1,17 @@
 from fastapi import APIRouter, HTTPException, Query
 from sqlalchemy import text
-from ...database import engine
+from ...database import engine, run_read
 from typing import Optional
 import json
+from .pagination import (
+    count_window, decode_cursor, keyset_condition, order_clause, resolve_total, split_page, validate_count_mode,
+)
 
 router = APIRouter()
 
 
 @router.get("/reviews")
-def search_reviews(
+async def search_reviews(
     seat_id: Optional[str] = Query(None, description="Filter by seat ID"),
     event_id: Optional[str] = Query(None, description="Filter by event ID"),
     venue_id: Optional[str] = Query(None, description="Filter by venue ID"),
@@ -18,6 +21,8 @@ def search_reviews(
     order: Optional[str] = Query("desc", description="Sort order: asc or desc"),
     limit: int = Query(20, ge=1, le=100, description="Number of results to return"),
     offset: int = Query(0, ge=0, description="Number of results to skip"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor (overrides offset)"),
+    count_mode: str = Query("exact", description="How to compute total: exact, estimated, or none"),
 ):
     """
     Search, filter, and sort reviews.
@@ -29,6 +34,8 @@ def search_reviews(
     - **sort_by**: Field to sort results by (overall_rating, created_at, price_paid)
     - **order**: Sort direction (asc or desc)
     - **limit / offset**: Pagination controls
+    - **cursor**: Keyset pagination; pass the previous response's `next_cursor`
+    - **count_mode**: `exact` (default), `estimated` (planner estimate), or `none` (total is null)
     """
     if not engine:
         raise HTTPException(status_code=500, detail="Database not configured")
@@ -46,95 +53,110 @@ def search_reviews(
             detail="Invalid order. Allowed: asc, desc"
         )
 
+    validate_count_mode(count_mode)
+
+    def _search(conn):
+        conditions = []
+        params = {}
+
+        if seat_id:
+            conditions.append("r.seat_id = :seat_id")
+            params["seat_id"] = seat_id
+
+        if event_id:
+            conditions.append("r.event_id = :event_id")
+            params["event_id"] = event_id
+
+        if venue_id:
+            conditions.append("r.venue_id = :venue_id")
+            params["venue_id"] = venue_id
+
+        if section:
+            conditions.append("LOWER(s.section) = :section")
+            params["section"] = section.lower()
+
+        if min_rating is not None:
+            conditions.append("r.overall_rating >= :min_rating")
+            params["min_rating"] = min_rating
+
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        count_from = f"""
+            FROM Reviews r
+            LEFT JOIN Events e ON r.event_id = e.id
+            LEFT JOIN Seats s ON r.seat_id = s.id
+            {where_clause}
+        """
+
+        page_conditions = list(conditions)
+        page_params = {**params, "limit": limit + 1, "offset": offset}
+        if cursor:
+            after_value, after_id = decode_cursor(cursor, sort_by, order)
+            page_conditions.append(keyset_condition(f"r.{sort_by}", "r.id", order, after_value, after_id, page_params))
+            page_params["offset"] = 0
+        page_where = f"WHERE {' AND '.join(page_conditions)}" if page_conditions else ""
+
+        window = count_window(conn, count_mode, cursor)
+        sort_index = {"overall_rating": 7, "price_paid": 8, "created_at": 12}[sort_by]
+        query = text(f"""
+            SELECT r.id, r.user_id, r.event_id, r.seat_id,
+                   r.rating_visual, r.rating_sound, r.rating_value, r.overall_rating,
+                   r.price_paid, r.text, r.images, r.tags, r.created_at,
+                   s.section, s.row, s.seat_number,
+                   u.email, u.is_incognito{window}
+            FROM Reviews r
+            LEFT JOIN Events e ON r.event_id = e.id
+            LEFT JOIN Seats s ON r.seat_id = s.id
+            LEFT JOIN Users u ON r.user_id = u.id
+            {page_where}
+            {order_clause(f"r.{sort_by}", "r.id", order)}
+            LIMIT :limit OFFSET :offset
+        """)
+        fetched = conn.execute(query, page_params).fetchall()
+        total = resolve_total(conn, count_mode, count_from, params, fetched, bool(window), page_params["offset"])
+        rows, next_cursor = split_page(fetched, limit, sort_by, order, sort_index, 0)
+
+        reviews = []
+        for row in rows:
+            # Parse tags safely, handling both string (SQLite) and object (Postgres JSONB)
+            tags_data = row[11]
+            if isinstance(tags_data, str):
+                try:
+                    tags_data = json.loads(tags_data)
+                except json.JSONDecodeError:
+                    tags_data = []
+
+            reviews.append({
+                "id": row[0],
+                "user_id": row[1],
+                "event_id": row[2],
+                "seat_id": row[3],
+                "rating_visual": row[4],
+                "rating_sound": row[5],
+                "rating_value": row[6],
+                "overall_rating": row[7],
+                "price_paid": row[8],
+                "text": row[9],
+                "images": row[10],
+                "tags": tags_data,
+                "created_at": row[12],
+                "section": row[13],
+                "row": row[14],
+                "seat_number": row[15],
+                "email": row[16],
+                "is_incognito": bool(row[17]) if row[17] is not None else False,
+            })
+
+        return {
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": next_cursor,
+            "results": reviews,
+        }
+
     try:
-        with engine.connect() as conn:
-            conditions = []
-            params = {"limit": limit, "offset": offset}
-
-            if seat_id:
-                conditions.append("r.seat_id = :seat_id")
-                params["seat_id"] = seat_id
-
-            if event_id:
-                conditions.append("r.event_id = :event_id")
-                params["event_id"] = event_id
-
-            if venue_id:
-                conditions.append("r.venue_id = :venue_id")
-                params["venue_id"] = venue_id
-
-            if section:
-                conditions.append("LOWER(s.section) = :section")
-                params["section"] = section.lower()
-
-            if min_rating is not None:
-                conditions.append("r.overall_rating >= :min_rating")
-                params["min_rating"] = min_rating
-
-            where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
-
-            count_query = text(f"""
-                SELECT COUNT(*)
-                FROM Reviews r
-                LEFT JOIN Events e ON r.event_id = e.id
-                LEFT JOIN Seats s ON r.seat_id = s.id
-                {where_clause}
-            """)
-            total = conn.execute(count_query, params).scalar()
-
-            query = text(f"""
-                SELECT r.id, r.user_id, r.event_id, r.seat_id,
-                       r.rating_visual, r.rating_sound, r.rating_value, r.overall_rating,
-                       r.price_paid, r.text, r.images, r.tags, r.created_at,
-                       s.section, s.row, s.seat_number,
-                       u.email, u.is_incognito
-                FROM Reviews r
-                LEFT JOIN Events e ON r.event_id = e.id
-                LEFT JOIN Seats s ON r.seat_id = s.id
-                LEFT JOIN Users u ON r.user_id = u.id
-                {where_clause}
-                ORDER BY r.{sort_by} {order}
-                LIMIT :limit OFFSET :offset
-            """)
-            result = conn.execute(query, params)
-
-            reviews = []
-            for row in result:
-                # Parse tags safely, handling both string (SQLite) and object (Postgres JSONB)
-                tags_data = row[11]
-                if isinstance(tags_data, str):
-                    try:
-                        tags_data = json.loads(tags_data)
-                    except json.JSONDecodeError:
-                        tags_data = []
-
-                reviews.append({
-                    "id": row[0],
-                    "user_id": row[1],
-                    "event_id": row[2],
-                    "seat_id": row[3],
-                    "rating_visual": row[4],
-                    "rating_sound": row[5],
-                    "rating_value": row[6],
-                    "overall_rating": row[7],
-                    "price_paid": row[8],
-                    "text": row[9],
-                    "images": row[10],
-                    "tags": tags_data,
-                    "created_at": row[12],
-                    "section": row[13],
-                    "row": row[14],
-                    "seat_number": row[15],
-                    "email": row[16],
-                    "is_incognito": bool(row[17]) if row[17] is not None else False,
-                })
-
-            return {
-                "total": total,
-                "limit": limit,
-                "offset": offset,
-                "results": reviews,
-            }
+        return await run_read(_search)
     except HTTPException:
         raise
     except Exception as e:
@@ -1,24 +1,77 @@
+import math
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import text
-from ...database import engine
+from ...database import engine, run_read
+from ...utils.seat_index import cached_seat_index, get_seat_index
 from typing import Optional
+from .pagination import (
+    count_window, decode_cursor, keyset_condition, order_clause, resolve_total, split_page, validate_count_mode,
+)
 
 router = APIRouter()
 
+# Radius matches beyond this many seats are filtered by a distance predicate
+# instead of an id list, to keep the statement small
+SPATIAL_MAX_IDS = 1000
+
+
+def _build_seat_index(venue_id):
+    with engine.connect() as conn:
+        return get_seat_index(conn, venue_id)
+
+
+async def _seat_index(venue_id):
+    """
+    The venue's seat index. A build is CPU work, so it runs on the threadpool
+    even when reads go through the async engine.
+    """
+    index = cached_seat_index(venue_id)
+    if index is None:
+        index = await run_in_threadpool(_build_seat_index, venue_id)
+    return index
+
+
+def _spatial_filter(index, near_x, near_y, around_section, nearest, radius):
+    """
+    (query point, seat ids or None) for the spatial parameters. The ids are
+    the index's answer; None means "every seat within radius", left to SQL.
+    """
+    if around_section is not None:
+        point = index.section_centroid(around_section)
+        if point is None:
+            raise HTTPException(status_code=404, detail="No seat positions for this section")
+    else:
+        point = (near_x, near_y)
+    if nearest is not None:
+        matches = index.nearest(point[0], point[1], nearest, radius)
+    else:
+        matches = index.within(point[0], point[1], radius)
+        if len(matches) > SPATIAL_MAX_IDS:
+            return point, None
+    return point, [seat_id for seat_id, _ in matches]
+
 
 @router.get("/seats")
-def search_seats(
+async def search_seats(
     venue_id: str = Query(..., description="Venue ID (required)"),
     section: Optional[str] = Query(None, description="Filter by section name"),
     min_rating: Optional[float] = Query(None, ge=0, le=5, description="Minimum average overall rating"),
     max_distance: Optional[float] = Query(None, ge=0, description="Maximum distance to stage"),
+    near_x: Optional[float] = Query(None, description="Spatial query point x (venue coordinates)"),
+    near_y: Optional[float] = Query(None, description="Spatial query point y (venue coordinates)"),
+    around_section: Optional[str] = Query(None, description="Use this section's centroid as the query point"),
+    nearest: Optional[int] = Query(None, ge=1, le=2000, description="Only the N seats nearest the query point"),
+    radius: Optional[float] = Query(None, ge=0, description="Only seats within this distance of the query point"),
     sort_by: Optional[str] = Query(
         "distance_to_stage",
-        description="Sort field: distance_to_stage, avg_overall, avg_price_paid, section"
+        description="Sort field: distance_to_stage, avg_overall, avg_price_paid, section, distance"
     ),
     order: Optional[str] = Query("asc", description="Sort order: asc or desc"),
     limit: int = Query(20, ge=1, le=2000, description="Number of results to return"),
     offset: int = Query(0, ge=0, description="Number of results to skip"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor (overrides offset)"),
+    count_mode: str = Query("exact", description="How to compute total: exact, estimated, or none"),
 ):
     """
     Search, filter, and sort seats within a venue.
@@ -27,14 +80,27 @@ def search_seats(
     - **section**: Exact section name filter
     - **min_rating**: Only seats with avg_overall >= this value (from SeatAggregates)
     - **max_distance**: Only seats within this distance from the stage
-    - **sort_by**: Field to sort results by (distance_to_stage, avg_overall, avg_price_paid, section)
+    - **near_x / near_y** or **around_section**: Query point for a spatial search, either
+      explicit venue coordinates or the centroid of a section's seats
+    - **nearest / radius**: With a query point, only the N nearest seats and/or the seats
+      within the radius. Answered from the venue's in-memory seat index
+      (api/utils/seat_index.py); results then carry `distance` from the point
+    - **sort_by**: Field to sort results by (distance_to_stage, avg_overall, avg_price_paid, section,
+      or distance from the query point)
     - **order**: Sort direction (asc or desc)
     - **limit / offset**: Pagination controls
+    - **cursor**: Keyset pagination; pass the previous response's `next_cursor`
+    - **count_mode**: `exact` (default), `estimated` (planner estimate), or `none` (total is null)
+
+    Seats without reviews fall back to their precomputed AI_Predictions row
+    (api/utils/predictions.py) for avg_overall and avg_price_paid, in filters
+    and sorting as well as in the results. Those results carry `predicted: true`
+    and the prediction's `confidence`; other seats `predicted: false`.
     """
     if not engine:
         raise HTTPException(status_code=500, detail="Database not configured")
 
-    allowed_sort_fields = {"distance_to_stage", "avg_overall", "avg_price_paid", "section"}
+    allowed_sort_fields = {"distance_to_stage", "avg_overall", "avg_price_paid", "section", "distance"}
     if sort_by not in allowed_sort_fields:
         raise HTTPException(
             status_code=400,
@@ -47,49 +113,174 @@ def search_seats(
             detail="Invalid order. Allowed: asc, desc"
         )
 
+    validate_count_mode(count_mode)
+
+    spatial = near_x is not None or near_y is not None or around_section is not None
+    if (near_x is None) != (near_y is None):
+        raise HTTPException(status_code=400, detail="near_x and near_y must be given together")
+    if near_x is not None and around_section is not None:
+        raise HTTPException(status_code=400, detail="Use either near_x/near_y or around_section, not both")
+    if spatial and nearest is None and radius is None:
+        raise HTTPException(status_code=400, detail="A spatial search needs nearest and/or radius")
+    if any(value is not None and not math.isfinite(value) for value in (near_x, near_y, radius)):
+        raise HTTPException(status_code=400, detail="near_x, near_y and radius must be finite numbers")
+    if not spatial and (nearest is not None or radius is not None or sort_by == "distance"):
+        raise HTTPException(
+            status_code=400,
+            detail="nearest, radius and sort_by=distance need near_x/near_y or around_section"
+        )
+
+    # Squared distance to the query point, for sorting; NULL for seats without a position
+    distance_sql = "((s.x - :near_x) * (s.x - :near_x) + (s.y - :near_y) * (s.y - :near_y))"
+
+    # Reviewed seats use their aggregates; unreviewed seats their stored prediction, if any
+    rating_sql = "COALESCE(sa.avg_overall, p.predicted_overall)"
+    price_sql = "CASE WHEN sa.avg_overall IS NULL THEN p.predicted_price ELSE sa.avg_price_paid END"
+    confidence_sql = "CASE WHEN sa.avg_overall IS NULL THEN p.confidence END"
+
     # Qualify aggregates columns with table alias to avoid ambiguity
-    sort_col = f"sa.{sort_by}" if sort_by in {"avg_overall", "avg_price_paid"} else f"s.{sort_by}"
+    if sort_by == "distance":
+        sort_col = distance_sql
+    elif sort_by == "avg_overall":
+        sort_col = rating_sql
+    elif sort_by == "avg_price_paid":
+        sort_col = price_sql
+    else:
+        sort_col = f"s.{sort_by}"
+
+    def _search(conn):
+        conditions = ["s.venue_id = :venue_id"]
+        params = {"venue_id": venue_id}
+
+        if section:
+            conditions.append("LOWER(s.section) = :section")
+            params["section"] = section.lower()
+
+        if max_distance is not None:
+            conditions.append("s.distance_to_stage <= :max_distance")
+            params["max_distance"] = max_distance
+
+        if min_rating is not None:
+            conditions.append(f"COALESCE({rating_sql}, 0) >= :min_rating")
+            params["min_rating"] = min_rating
+
+        point = None
+        if spatial:
+            point, seat_ids = _spatial_filter(index, near_x, near_y, around_section, nearest, radius)
+            if seat_ids is None:
+                conditions.append(f"{distance_sql} <= :radius_sq")
+                params.update(near_x=point[0], near_y=point[1], radius_sq=radius * radius)
+            elif seat_ids:
+                names = [f"spatial_{i}" for i in range(len(seat_ids))]
+                conditions.append(f"s.id IN ({', '.join(':' + name for name in names)})")
+                params.update(zip(names, seat_ids))
+            else:
+                conditions.append("1 = 0")
+
+        where_clause = f"WHERE {' AND '.join(conditions)}"
+
+        count_from = f"""
+            FROM Seats s
+            LEFT JOIN SeatAggregates sa ON s.id = sa.seat_id
+            LEFT JOIN AI_Predictions p ON s.id = p.seat_id
+            {where_clause}
+        """
+
+        page_conditions = list(conditions)
+        page_params = {**params, "limit": limit + 1, "offset": offset}
+        if point is not None:
+            page_params.update(near_x=point[0], near_y=point[1])
+        if cursor:
+            after_value, after_id = decode_cursor(cursor, sort_by, order)
+            page_conditions.append(keyset_condition(sort_col, "s.id", order, after_value, after_id, page_params))
+            page_params["offset"] = 0
+        page_where = f"WHERE {' AND '.join(page_conditions)}"
+
+        window = count_window(conn, count_mode, cursor)
+        sort_index = {"section": 2, "distance_to_stage": 5, "avg_overall": 6, "avg_price_paid": 7, "distance": 10}[sort_by]
+        distance_column = f", {distance_sql}" if point is not None else ""
+        query = text(f"""
+            SELECT s.id, s.venue_id, s.section, s.row, s.seat_number,
+                   s.distance_to_stage,
+                   {rating_sql}, {price_sql}, sa.review_count, {confidence_sql}{distance_column}{window}
+            FROM Seats s
+            LEFT JOIN SeatAggregates sa ON s.id = sa.seat_id
+            LEFT JOIN AI_Predictions p ON s.id = p.seat_id
+            {page_where}
+            {order_clause(sort_col, "s.id", order)}
+            LIMIT :limit OFFSET :offset
+        """)
+        fetched = conn.execute(query, page_params).fetchall()
+        total = resolve_total(conn, count_mode, count_from, params, fetched, bool(window), page_params["offset"])
+        rows, next_cursor = split_page(fetched, limit, sort_by, order, sort_index, 0)
+
+        seats = [
+            {
+                "id": row[0],
+                "venue_id": row[1],
+                "section": row[2],
+                "row": row[3],
+                "seat_number": row[4],
+                "distance_to_stage": row[5],
+                "avg_overall": row[6],
+                "avg_price_paid": row[7],
+                "review_count": row[8],
+                "predicted": row[9] is not None,
+                "confidence": row[9],
+            }
+            for row in rows
+        ]
+        if point is not None:
+            for seat, row in zip(seats, rows):
+                seat["distance"] = round(math.sqrt(row[10]), 3) if row[10] is not None else None
+
+        return {
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": next_cursor,
+            "results": seats,
+        }
 
     try:
-        with engine.connect() as conn:
-            conditions = ["s.venue_id = :venue_id"]
-            params = {"venue_id": venue_id, "limit": limit, "offset": offset}
-
-            if section:
-                conditions.append("LOWER(s.section) = :section")
-                params["section"] = section.lower()
-
-            if max_distance is not None:
-                conditions.append("s.distance_to_stage <= :max_distance")
-                params["max_distance"] = max_distance
-
-            if min_rating is not None:
-                conditions.append("COALESCE(sa.avg_overall, 0) >= :min_rating")
-                params["min_rating"] = min_rating
-
-            where_clause = f"WHERE {' AND '.join(conditions)}"
-
-            count_query = text(f"""
-                SELECT COUNT(*)
-                FROM Seats s
-                LEFT JOIN SeatAggregates sa ON s.id = sa.seat_id
-                {where_clause}
-            """)
-            total = conn.execute(count_query, params).scalar()
-
-            query = text(f"""
-                SELECT s.id, s.venue_id, s.section, s.row, s.seat_number,
-                       s.distance_to_stage,
-                       sa.avg_overall, sa.avg_price_paid, sa.review_count
-                FROM Seats s
-                LEFT JOIN SeatAggregates sa ON s.id = sa.seat_id
-                {where_clause}
-                ORDER BY {sort_col} {order}
-                LIMIT :limit OFFSET :offset
-            """)
-            result = conn.execute(query, params)
-
-            seats = [
+        index = await _seat_index(venue_id) if spatial else None
+        return await run_read(_search)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/seats/{seat_id}/similar")
+async def similar_seats(
+    seat_id: str,
+    limit: int = Query(10, ge=1, le=50, description="Number of similar seats to return"),
+):
+    """
+    Seats of the same venue most similar to this one in ratings, price and
+    position, most similar first. Read from SimilarSeats, which the batch job
+    (python -m scripts.rebuild_similar_seats) fills; a seat it has not seen
+    yet has no results.
+    """
+    if not engine:
+        raise HTTPException(status_code=500, detail="Database not configured")
+
+    def _similar(conn):
+        rows = conn.execute(text("""
+            SELECT s.id, s.venue_id, s.section, s.row, s.seat_number, s.distance_to_stage,
+                   sa.avg_overall, sa.avg_price_paid, sa.review_count, ss.similarity_score
+            FROM SimilarSeats ss
+            JOIN Seats s ON s.id = ss.similar_seat_id
+            LEFT JOIN SeatAggregates sa ON sa.seat_id = s.id
+            WHERE ss.seat_id = :seat_id
+            ORDER BY ss.similarity_score DESC, s.id
+            LIMIT :limit
+        """), {"seat_id": seat_id, "limit": limit}).fetchall()
+        if not rows and not conn.execute(text("SELECT 1 FROM Seats WHERE id = :seat_id"), {"seat_id": seat_id}).fetchone():
+            raise HTTPException(status_code=404, detail="Seat not found")
+        return {
+            "seat_id": seat_id,
+            "results": [
                 {
                     "id": row[0],
                     "venue_id": row[1],
@@ -100,16 +291,14 @@ def search_seats(
                     "avg_overall": row[6],
                     "avg_price_paid": row[7],
                     "review_count": row[8],
+                    "similarity": row[9],
                 }
-                for row in result
-            ]
-
-            return {
-                "total": total,
-                "limit": limit,
-                "offset": offset,
-                "results": seats,
-            }
+                for row in rows
+            ],
+        }
+
+    try:
+        return await run_read(_similar)
     except HTTPException:
         raise
     except Exception as e:
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, HTTPException, Query
+from ...database import engine
+from ...utils.suggestions import MAX_SUGGESTIONS, SUGGESTION_TYPES, get_suggestions
+from typing import Optional
+
+router = APIRouter()
+
+
+@router.get("/suggest")
+def suggest(
+    q: str = Query(..., min_length=1, description="Prefix typed so far"),
+    type: Optional[str] = Query(None, description="Only suggest this type: venue, event, artist"),
+    limit: int = Query(8, ge=1, le=MAX_SUGGESTIONS, description="Number of suggestions to return"),
+):
+    """
+    Autocomplete venue names, event names and artists.
+
+    - **q**: Prefix of any word in the name (case-insensitive)
+    - **type**: Restrict to `venue`, `event` or `artist`
+    - **limit**: Number of suggestions (1-10), most reviewed first
+
+    Served from an in-process prefix index, so keystrokes never hit the
+    database; the index is rebuilt in the background after writes.
+    """
+    if not engine:
+        raise HTTPException(status_code=500, detail="Database not configured")
+
+    if type is not None and type not in SUGGESTION_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid type. Allowed: {', '.join(SUGGESTION_TYPES)}"
+        )
+
+    try:
+        results = [
+            {
+                "type": s["type"],
+                "id": s["id"],
+                "text": s["text"],
+                "subtitle": s["subtitle"],
+                "review_count": s["weight"],
+            }
+            for s in get_suggestions(q, limit, type)
+        ]
+        return {"q": q, "results": results}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
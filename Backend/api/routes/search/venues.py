@@ -1,71 +1,84 @@
 import os
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import text
-from ...database import engine
+from ...database import engine, run_read
+from ...utils.aggregates import read_platform_stats, reconcile_platform_stats
+from ...utils.text_search import venue_match
 from typing import Optional
+from .pagination import (
+    count_window, decode_cursor, keyset_condition, order_clause, resolve_total, split_page, validate_count_mode,
+)
 
 router = APIRouter()
 
 @router.get("/venues/stats")
-def get_venue_stats():
-    """Get aggregated platform stats for all venues."""
+async def get_venue_stats():
+    """
+    Get aggregated platform stats for all venues.
+
+    Served from the single-row PlatformStats counters, which review writes keep
+    current; the row is seeded from the live tables on first use.
+    """
     if not engine:
         raise HTTPException(status_code=500, detail="Database not configured")
     try:
-        with engine.connect() as conn:
-            query = text("""
-                SELECT 
-                    COUNT(DISTINCT v.id) as total_venues,
-                    COUNT(r.id) as total_reviews,
-                    COALESCE(ROUND(AVG(r.overall_rating), 1), 0) as avg_rating
-                FROM Venues v
-                LEFT JOIN Seats s ON s.venue_id = v.id
-                LEFT JOIN Reviews r ON r.seat_id = s.id
-            """)
-            row = conn.execute(query).fetchone()
-            
-            # Simple assumption for satisfaction (e.g. % of reviews > 3)
-            # Just mimicking the frontend static for now or calculate:
-            # For simplicity, returning static 98 if missing, or based on avg_rating
-            satisfaction = min(100, max(0, int((float(row[2]) / 5.0) * 100))) if row[2] else 0
-            if row[1] == 0:
-                satisfaction = 100 # default
-                
-            return {
-                "total_venues": row[0],
-                "total_reviews": row[1],
-                "avg_rating": row[2],
-                "satisfaction": satisfaction
-            }
+        stats = await run_read(read_platform_stats)
+        if stats is None:
+            def _seed():
+                with engine.begin() as conn:
+                    return reconcile_platform_stats(conn)
+            stats = await run_in_threadpool(_seed)
+
+        total_reviews = stats["total_reviews"]
+        avg_rating = round(stats["rating_sum"] / total_reviews, 1) if total_reviews else 0
+
+        # Simple assumption for satisfaction (e.g. % of reviews > 3)
+        # Just mimicking the frontend static for now or calculate:
+        # For simplicity, returning static 98 if missing, or based on avg_rating
+        satisfaction = min(100, max(0, int((float(avg_rating) / 5.0) * 100))) if avg_rating else 0
+        if total_reviews == 0:
+            satisfaction = 100 # default
+
+        return {
+            "total_venues": stats["total_venues"],
+            "total_reviews": total_reviews,
+            "avg_rating": avg_rating,
+            "satisfaction": satisfaction
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 
 @router.get("/venues")
-def search_venues(
+async def search_venues(
     q: Optional[str] = Query(None, description="Search by venue name or city"),
     city: Optional[str] = Query(None, description="Filter by city"),
     min_capacity: Optional[int] = Query(None, description="Minimum venue capacity"),
-    sort_by: Optional[str] = Query("name", description="Sort field: name, capacity, city"),
+    sort_by: Optional[str] = Query("name", description="Sort field: name, capacity, city, rating, relevance"),
     order: Optional[str] = Query("asc", description="Sort order: asc or desc"),
     limit: int = Query(20, ge=1, le=100, description="Number of results to return"),
     offset: int = Query(0, ge=0, description="Number of results to skip"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor (overrides offset)"),
+    count_mode: str = Query("exact", description="How to compute total: exact, estimated, or none"),
 ):
     """
     Search, filter, and sort venues.
 
-    - **q**: Free-text search across venue name and city
+    - **q**: Ranked, typo-tolerant search across venue name and city
     - **city**: Exact city filter
     - **min_capacity**: Only return venues with capacity >= this value
-    - **sort_by**: Field to sort results by (name, capacity, city)
+    - **sort_by**: Field to sort results by (name, capacity, city, rating, relevance; relevance requires q)
     - **order**: Sort direction (asc or desc)
     - **limit / offset**: Pagination controls
+    - **cursor**: Keyset pagination; pass the previous response's `next_cursor`
+    - **count_mode**: `exact` (default), `estimated` (planner estimate), or `none` (total is null)
     """
     if not engine:
         raise HTTPException(status_code=500, detail="Database not configured")
 
-    allowed_sort_fields = {"name", "capacity", "city", "rating"}
+    allowed_sort_fields = {"name", "capacity", "city", "rating", "relevance"}
     if sort_by not in allowed_sort_fields:
         raise HTTPException(
             status_code=400,
@@ -78,87 +91,108 @@ def search_venues(
             detail="Invalid order. Allowed: asc, desc"
         )
 
+    if sort_by == "relevance" and not q:
+        raise HTTPException(
+            status_code=400,
+            detail="sort_by=relevance requires q"
+        )
+
+    validate_count_mode(count_mode)
+
+    def _search(conn):
+        conditions = []
+        params = {}
+        score = "NULL"
+
+        if q:
+            match, score = venue_match(conn, q, params)
+            conditions.append(match)
+
+        if city:
+            conditions.append("LOWER(v.city) = :city")
+            params["city"] = city.lower()
+
+        if min_capacity is not None:
+            conditions.append("v.capacity >= :min_capacity")
+            params["min_capacity"] = min_capacity
+
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        # Ratings and counts come from the VenueAggregates rollup
+        sort_col = {"rating": "va.avg_rating", "relevance": score}.get(sort_by, f"v.{sort_by}")
+        page_conditions = list(conditions)
+        page_params = {**params, "limit": limit + 1, "offset": offset}
+        if cursor:
+            after_value, after_id = decode_cursor(cursor, sort_by, order)
+            page_conditions.append(keyset_condition(sort_col, "v.id", order, after_value, after_id, page_params))
+            page_params["offset"] = 0
+        page_where = f"WHERE {' AND '.join(page_conditions)}" if page_conditions else ""
+
+        window = count_window(conn, count_mode, cursor)
+        sort_index = {"name": 1, "city": 2, "capacity": 3, "rating": 5, "relevance": 10}[sort_by]
+        query = text(f"""
+            SELECT v.id, v.name, v.city, v.capacity, v.tags,
+                   va.avg_rating,
+                   COALESCE(va.review_count, 0) as review_count,
+                   v.seat_map_2d_url, v.seat_map_meta,
+                   COALESCE(va.upcoming_events, 0) as upcoming_events,
+                   {score} AS relevance{window}
+            FROM Venues v
+            LEFT JOIN VenueAggregates va ON va.venue_id = v.id
+            {page_where}
+            {order_clause(sort_col, "v.id", order)}
+            LIMIT :limit OFFSET :offset
+        """)
+        fetched = conn.execute(query, page_params).fetchall()
+        total = resolve_total(conn, count_mode, f"FROM Venues v {where_clause}", params, fetched, bool(window), page_params["offset"])
+        rows, next_cursor = split_page(fetched, limit, sort_by, order, sort_index, 0)
+
+        import re
+        S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME", "livelens-images")
+        AWS_REGION = os.getenv("AWS_REGION", "us-east-2")
+        venues = []
+        for row in rows:
+            slug = re.sub(r'[^a-z0-9]+', '_', row[1].lower()).strip('_')
+            base_url = f"https://{S3_BUCKET_NAME}.s3.{AWS_REGION}.amazonaws.com/venues/{slug}"
+
+            # Default to just the facade
+            image_urls = [f"{base_url}/facade.png"]
+
+            # If it's scotiabank_arena, provide multiple demo images (assuming these exist)
+            # The frontend will use these for a slideshow
+            if slug == "scotiabank_arena":
+                image_urls = [
+                    f"{base_url}/facade.png",
+                    f"{base_url}/interior.jpg",
+                    f"{base_url}/stage.jpg"
+                ]
+
+            venues.append({
+                "id": row[0],
+                "name": row[1],
+                "city": row[2],
+                "capacity": row[3],
+                "tags": row[4],
+                "rating": row[5],
+                "review_count": row[6],
+                "seat_map_2d_url": row[7],
+                "seat_map_meta": row[8],
+                "upcoming_events": row[9] if len(row) > 9 else 0,
+                "relevance": round(row[10], 3) if row[10] is not None else None,
+                "image_url": f"{base_url}/facade.png",
+                "image_urls": image_urls
+            })
+
+        return {
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": next_cursor,
+            "results": venues,
+        }
+
     try:
-        with engine.connect() as conn:
-            conditions = []
-            params = {"limit": limit, "offset": offset}
-
-            if q:
-                conditions.append("(LOWER(v.name) LIKE :q OR LOWER(v.city) LIKE :q)")
-                params["q"] = f"%{q.lower()}%"
-
-            if city:
-                conditions.append("LOWER(v.city) = :city")
-                params["city"] = city.lower()
-
-            if min_capacity is not None:
-                conditions.append("v.capacity >= :min_capacity")
-                params["min_capacity"] = min_capacity
-
-            where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
-
-            count_query = text(f"SELECT COUNT(*) FROM Venues v {where_clause}")
-            total = conn.execute(count_query, params).scalar()
-
-            query = text(f"""
-                SELECT v.id, v.name, v.city, v.capacity, v.tags,
-                       ROUND(AVG(r.overall_rating), 1) as avg_rating,
-                       COUNT(r.id) as review_count,
-                       v.seat_map_2d_url, v.seat_map_meta,
-                       (SELECT COUNT(*) FROM Events e2
-                        WHERE e2.venue_id = v.id
-                          AND e2.event_date >= DATE('now')) as upcoming_events
-                FROM Venues v
-                LEFT JOIN Seats s ON s.venue_id = v.id
-                LEFT JOIN Reviews r ON r.seat_id = s.id
-                {where_clause}
-                GROUP BY v.id, v.name, v.city, v.capacity, v.tags, v.seat_map_2d_url, v.seat_map_meta
-                ORDER BY {"avg_rating" if sort_by == "rating" else f"v.{sort_by}"} {order}
-                LIMIT :limit OFFSET :offset
-            """)
-            result = conn.execute(query, params)
-
-            import re
-            S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME", "livelens-images")
-            AWS_REGION = os.getenv("AWS_REGION", "us-east-2")
-            venues = []
-            for row in result:
-                slug = re.sub(r'[^a-z0-9]+', '_', row[1].lower()).strip('_')
-                base_url = f"https://{S3_BUCKET_NAME}.s3.{AWS_REGION}.amazonaws.com/venues/{slug}"
-                
-                # Default to just the facade
-                image_urls = [f"{base_url}/facade.png"]
-                
-                # If it's scotiabank_arena, provide multiple demo images (assuming these exist)
-                # The frontend will use these for a slideshow
-                if slug == "scotiabank_arena":
-                    image_urls = [
-                        f"{base_url}/facade.png",
-                        f"{base_url}/interior.jpg",
-                        f"{base_url}/stage.jpg"
-                    ]
-                    
-                venues.append({
-                    "id": row[0],
-                    "name": row[1],
-                    "city": row[2],
-                    "capacity": row[3],
-                    "tags": row[4],
-                    "rating": row[5],
-                    "review_count": row[6],
-                    "seat_map_2d_url": row[7],
-                    "seat_map_meta": row[8],
-                    "upcoming_events": row[9] if len(row) > 9 else 0,
-                    "image_url": f"{base_url}/facade.png",
-                    "image_urls": image_urls
-                })
-
-            return {
-                "total": total,
-                "limit": limit,
-                "offset": offset,
-                "results": venues,
-            }
+        return await run_read(_search)
     except HTTPException:
         raise
     except Exception as e:
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+from fastapi import APIRouter, HTTPException, Request, Response
+from sqlalchemy import text
+from ..database import engine, run_read
+from ..utils.seatmap_client import IMAGE_HEIGHT, IMAGE_WIDTH, get_seatmap
+
+router = APIRouter()
+
+# Browsers and CDNs may reuse the coordinates this long without asking; after
+# that a conditional request costs a 304. Seatmaps change only when
+# Ticketmaster's does (SEATMAP_TTL_S, 7 days by default).
+SEATMAP_COORDS_MAX_AGE_S = int(os.getenv("SEATMAP_COORDS_MAX_AGE_S", str(24 * 3600)))
+
+# Encoded payload per venue id: (seatmap fetched_at, body, etag)
+_payloads = {}
+
+
+def _venue_name(conn, venue_id: str):
+    row = conn.execute(text("SELECT name FROM Venues WHERE id = :venue_id"), {"venue_id": venue_id}).fetchone()
+    return row[0] if row else None
+
+
+def encode_section_coords(venue_id: str, seatmap: dict) -> bytes:
+    """
+    The venue's section geometry as parallel flat arrays, sections sorted:
+        sections  ["101", "102", ...]
+        centroids [x0, y0, x1, y1, ...]                     pin position of sections[i] at 2i
+        bboxes    [min_x0, min_y0, max_x0, max_y0, ...]     at 4i; a text label's box is its point
+    All values are PNG pixels on the image_url image.
+    """
+    sections = sorted(seatmap["section_coords"])
+    centroids, bboxes = [], []
+    for section in sections:
+        geometry = seatmap["section_coords"][section]
+        x, y = geometry[0], geometry[1]
+        centroids += [x, y]
+        bboxes += geometry[2:6] if len(geometry) >= 6 else [x, y, x, y]
+    payload = {
+        "venue_id": venue_id,
+        "image_url": seatmap["png_url"],
+        "width": IMAGE_WIDTH,
+        "height": IMAGE_HEIGHT,
+        "sections": sections,
+        "centroids": centroids,
+        "bboxes": bboxes,
+    }
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses the weak comparison: W/"x" matches "x" (RFC 9110 13.1.2)."""
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+@router.get("/{venue_id}/coords")
+async def get_section_coords(venue_id: str, request: Request):
+    """
+    Centroids and bounding boxes of every section of a venue's seatmap, so
+    the client can place any number of pins on the image from one request.
+
+    The body is served with a strong ETag (a hash of its bytes) and a long
+    Cache-Control max-age; If-None-Match requests get a bodiless 304.
+
+    Response (see encode_section_coords for the layout):
+    {
+        "venue_id": "...", "image_url": "https://...", "width": 1024, "height": 768,
+        "sections": ["101", "102"],
+        "centroids": [512, 300, 540, 310],
+        "bboxes": [490, 280, 530, 320, 520, 290, 560, 330]
+    }
+    """
+    if not engine:
+        raise HTTPException(status_code=500, detail="Database not configured")
+    try:
+        venue_name = await run_read(_venue_name, venue_id)
+        if not venue_name:
+            raise HTTPException(status_code=404, detail="Venue not found")
+        seatmap = await get_seatmap(venue_name)
+        if seatmap is None:
+            raise HTTPException(status_code=502, detail="Seatmap service unavailable.")
+        if not seatmap["png_url"]:
+            raise HTTPException(status_code=404, detail="Seatmap not available for this venue.")
+
+        cached = _payloads.get(venue_id)
+        if cached is None or cached[0] != seatmap["fetched_at"]:
+            body = encode_section_coords(venue_id, seatmap)
+            cached = (seatmap["fetched_at"], body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+            _payloads[venue_id] = cached
+        _, body, etag = cached
+
+        headers = {"ETag": etag, "Cache-Control": f"public, max-age={SEATMAP_COORDS_MAX_AGE_S}"}
+        if _etag_matches(request.headers.get("if-none-match", ""), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,398 @@
+"""
+Materialized rollups maintained alongside review and event writes.
+
+SeatAggregates holds one row per reviewed seat with integer rating sums,
+the price paid summed in cents, and counts. The avg_* columns are always
+re-derived from those sums (never updated incrementally), so repeated
+writes cannot accumulate floating point drift.
+
+VenueAggregates holds one row per venue (rating sum, review count, rounded
+average rating and upcoming event count) so venue listings are a plain
+indexed read instead of a Venues→Seats→Reviews GROUP BY per request.
+
+PlatformStats holds a single counters row (id = 1) with the landing page
+totals, so /search/venues/stats is O(1) regardless of review volume.
+
+Public API:
+    apply_review_to_seat(conn, seat_id, review)
+    seat_apply_sql(seat_filter=SEAT_BY_ID) -> str
+    seat_params(review) -> dict
+    remove_review_from_seat(conn, seat_id, review)
+    touch_seat_aggregate(conn, seat_id)
+    recompute_seat_aggregates(conn, venue_id=None, seat_ids=None) -> int
+    apply_review_to_venue(conn, venue_id, overall_rating)       (VENUE_APPLY_SQL)
+    remove_review_from_venue(conn, venue_id, overall_rating)
+    rebuild_venue_aggregates(conn, venue_ids=None) -> int
+    apply_review_to_platform(conn, overall_rating)              (PLATFORM_APPLY_SQL)
+    apply_reviews_to_platform(conn, review_count, rating_sum)
+    remove_review_from_platform(conn, overall_rating)
+    reconcile_platform_stats(conn) -> dict
+    read_platform_stats(conn) -> dict | None
+
+Every function takes an open connection so the rollup update commits or
+rolls back together with the write that caused it. The *_SQL constants and
+seat_apply_sql() expose the same single-statement updates so a write path
+can run them alongside its own statements.
+"""
+
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import bindparam, text
+
+
+# ---------------------------------------------------------------------------
+# SeatAggregates – per-seat sums and counts
+# ---------------------------------------------------------------------------
+
+_SEAT_AVERAGES = """
+    avg_visual = CASE WHEN review_count > 0 THEN visual_sum * 1.0 / review_count END,
+    avg_sound = CASE WHEN review_count > 0 THEN sound_sum * 1.0 / review_count END,
+    avg_value = CASE WHEN review_count > 0 THEN value_sum * 1.0 / review_count END,
+    avg_overall = CASE WHEN review_count > 0 THEN overall_sum * 1.0 / review_count END,
+    avg_price_paid = CASE WHEN price_count > 0 THEN price_cents_sum / 100.0 / price_count END
+"""
+
+
+# Seat lookups for the rollup upsert: by id, or by position when the seat
+# row is created earlier in the same statement batch
+SEAT_BY_ID = "s.id = :seat_id"
+SEAT_BY_POSITION = (
+    "s.venue_id = :venue_id AND s.section = :section"
+    " AND s.row = :row AND s.seat_number = :seat_number"
+)
+
+
+def seat_params(review: dict) -> dict:
+    """Bind params for the seat rollup statements from a review's ratings and price."""
+    price = review.get("price_paid")
+    return {
+        "visual": review["rating_visual"] or 0,
+        "sound": review["rating_sound"] or 0,
+        "value": review["rating_value"] or 0,
+        "overall": review["overall_rating"] or 0,
+        "price_cents": int(round(price * 100)) if price is not None else 0,
+        "priced": 1 if price is not None else 0,
+        "now": datetime.utcnow(),
+    }
+
+
+def _seat_params(seat_id: str, review: dict) -> dict:
+    return {"seat_id": seat_id, **seat_params(review)}
+
+
+def seat_apply_sql(seat_filter: str = SEAT_BY_ID) -> str:
+    """
+    One upsert adding a review to its seat's sums. The averages are derived
+    from the new sums in the same statement, so no follow-up UPDATE is needed.
+    The seat is the Seats row `s` matching `seat_filter`.
+    """
+    def average(column: str) -> str:
+        return (
+            f"(SeatAggregates.{column}_sum + EXCLUDED.{column}_sum) * 1.0"
+            f" / (SeatAggregates.review_count + 1)"
+        )
+
+    return f"""
+        INSERT INTO SeatAggregates (
+            seat_id, visual_sum, sound_sum, value_sum, overall_sum,
+            price_cents_sum, price_count, review_count,
+            avg_visual, avg_sound, avg_value, avg_overall, avg_price_paid, last_updated
+        )
+        SELECT s.id, :visual, :sound, :value, :overall, :price_cents, :priced, 1,
+               :visual * 1.0, :sound * 1.0, :value * 1.0, :overall * 1.0,
+               CASE WHEN :priced > 0 THEN :price_cents / 100.0 END, :now
+        FROM Seats s
+        WHERE {seat_filter}
+        ON CONFLICT (seat_id) DO UPDATE SET
+            visual_sum = SeatAggregates.visual_sum + EXCLUDED.visual_sum,
+            sound_sum = SeatAggregates.sound_sum + EXCLUDED.sound_sum,
+            value_sum = SeatAggregates.value_sum + EXCLUDED.value_sum,
+            overall_sum = SeatAggregates.overall_sum + EXCLUDED.overall_sum,
+            price_cents_sum = SeatAggregates.price_cents_sum + EXCLUDED.price_cents_sum,
+            price_count = SeatAggregates.price_count + EXCLUDED.price_count,
+            review_count = SeatAggregates.review_count + 1,
+            avg_visual = {average("visual")},
+            avg_sound = {average("sound")},
+            avg_value = {average("value")},
+            avg_overall = {average("overall")},
+            avg_price_paid = CASE WHEN SeatAggregates.price_count + EXCLUDED.price_count > 0
+                                  THEN (SeatAggregates.price_cents_sum + EXCLUDED.price_cents_sum) / 100.0
+                                       / (SeatAggregates.price_count + EXCLUDED.price_count)
+                             END,
+            last_updated = EXCLUDED.last_updated
+    """
+
+
+def apply_review_to_seat(conn, seat_id: str, review: dict) -> None:
+    """
+    Add a newly inserted review to its seat's sums. `review` carries
+    rating_visual, rating_sound, rating_value, overall_rating and price_paid.
+    """
+    conn.execute(text(seat_apply_sql(SEAT_BY_ID)), _seat_params(seat_id, review))
+
+
+def remove_review_from_seat(conn, seat_id: str, review: dict) -> None:
+    """Subtract a deleted review from its seat's sums; drops the row at zero reviews."""
+    params = _seat_params(seat_id, review)
+    conn.execute(text("""
+        UPDATE SeatAggregates SET
+            visual_sum = visual_sum - :visual,
+            sound_sum = sound_sum - :sound,
+            value_sum = value_sum - :value,
+            overall_sum = overall_sum - :overall,
+            price_cents_sum = price_cents_sum - :price_cents,
+            price_count = price_count - :priced,
+            review_count = review_count - 1,
+            last_updated = :now
+        WHERE seat_id = :seat_id AND review_count > 0
+    """), params)
+    conn.execute(text("DELETE FROM SeatAggregates WHERE seat_id = :seat_id AND review_count <= 0"), params)
+    conn.execute(text(f"UPDATE SeatAggregates SET {_SEAT_AVERAGES} WHERE seat_id = :seat_id"), params)
+
+
+def touch_seat_aggregate(conn, seat_id: str) -> None:
+    """
+    Record that a review's images or text changed. Sums are unaffected, but
+    last_updated tells readers the seat's review content is newer.
+    """
+    conn.execute(
+        text("UPDATE SeatAggregates SET last_updated = :now WHERE seat_id = :seat_id"),
+        {"seat_id": seat_id, "now": datetime.utcnow()},
+    )
+
+
+def recompute_seat_aggregates(
+    conn, venue_id: Optional[str] = None, seat_ids: Optional[Iterable[str]] = None
+) -> int:
+    """
+    Rebuild SeatAggregates from Reviews in one set-based pass, for every
+    seat, only those of `venue_id`, or only `seat_ids`. Returns the number of
+    seat rows written.
+    """
+    params = {"now": datetime.utcnow()}
+    delete_filter = select_filter = ""
+    if venue_id is not None:
+        params["venue_id"] = str(venue_id)
+        delete_filter = "WHERE seat_id IN (SELECT id FROM Seats WHERE venue_id = :venue_id)"
+        select_filter = "AND r.seat_id IN (SELECT id FROM Seats WHERE venue_id = :venue_id)"
+    elif seat_ids is not None:
+        params["seat_ids"] = [str(s) for s in seat_ids]
+        if not params["seat_ids"]:
+            return 0
+        delete_filter = "WHERE seat_id IN :seat_ids"
+        select_filter = "AND r.seat_id IN :seat_ids"
+
+    delete_stmt = text(f"DELETE FROM SeatAggregates {delete_filter}")
+    insert_stmt = text(f"""
+        INSERT INTO SeatAggregates (
+            seat_id, visual_sum, sound_sum, value_sum, overall_sum,
+            price_cents_sum, price_count, review_count, last_updated
+        )
+        SELECT r.seat_id,
+               COALESCE(SUM(r.rating_visual), 0),
+               COALESCE(SUM(r.rating_sound), 0),
+               COALESCE(SUM(r.rating_value), 0),
+               COALESCE(SUM(r.overall_rating), 0),
+               COALESCE(SUM(CAST(ROUND(r.price_paid * 100) AS INTEGER)), 0),
+               COUNT(r.price_paid),
+               COUNT(*),
+               :now
+        FROM Reviews r
+        WHERE r.seat_id IS NOT NULL {select_filter}
+        GROUP BY r.seat_id
+    """)
+    averages_stmt = text(f"UPDATE SeatAggregates SET {_SEAT_AVERAGES} {delete_filter}")
+    if "seat_ids" in params:
+        delete_stmt, insert_stmt, averages_stmt = (
+            stmt.bindparams(bindparam("seat_ids", expanding=True))
+            for stmt in (delete_stmt, insert_stmt, averages_stmt)
+        )
+
+    conn.execute(delete_stmt, params)
+    written = conn.execute(insert_stmt, params).rowcount
+    conn.execute(averages_stmt, params)
+    return written
+
+
+# ---------------------------------------------------------------------------
+# VenueAggregates – per-venue rating and event counts
+# ---------------------------------------------------------------------------
+
+VENUE_APPLY_SQL = """
+    INSERT INTO VenueAggregates (
+        venue_id, rating_sum, review_count, avg_rating, upcoming_events, last_updated
+    ) VALUES (
+        :venue_id, :rating, 1, :rating,
+        (SELECT COUNT(*) FROM Events
+         WHERE venue_id = :venue_id AND event_date >= CURRENT_DATE),
+        :now
+    )
+    ON CONFLICT (venue_id) DO UPDATE SET
+        rating_sum = VenueAggregates.rating_sum + EXCLUDED.rating_sum,
+        review_count = VenueAggregates.review_count + 1,
+        avg_rating = ROUND((VenueAggregates.rating_sum + EXCLUDED.rating_sum) * 1.0
+                           / (VenueAggregates.review_count + 1), 1),
+        last_updated = EXCLUDED.last_updated
+"""
+
+
+def apply_review_to_venue(conn, venue_id: str, overall_rating: int) -> None:
+    """Fold a newly inserted review into its venue's rollup row."""
+    conn.execute(text(VENUE_APPLY_SQL), {"venue_id": venue_id, "rating": overall_rating, "now": datetime.utcnow()})
+
+
+def remove_review_from_venue(conn, venue_id: str, overall_rating: int) -> None:
+    """Subtract a deleted review from its venue's rollup row."""
+    conn.execute(text("""
+        UPDATE VenueAggregates SET
+            rating_sum = rating_sum - :rating,
+            review_count = review_count - 1,
+            avg_rating = CASE WHEN review_count > 1
+                              THEN ROUND((rating_sum - :rating) * 1.0 / (review_count - 1), 1)
+                         END,
+            last_updated = :now
+        WHERE venue_id = :venue_id AND review_count > 0
+    """), {"venue_id": venue_id, "rating": overall_rating or 0, "now": datetime.utcnow()})
+
+
+def rebuild_venue_aggregates(conn, venue_ids: Optional[Iterable[str]] = None) -> int:
+    """
+    Recompute VenueAggregates from scratch in one set-based pass, either for
+    every venue or only for `venue_ids`. Used for recovery, after bulk
+    seeding, and periodically to roll past events out of upcoming_events.
+    Returns the number of venue rows written.
+    """
+    params = {"now": datetime.utcnow()}
+    delete_filter = select_filter = ""
+    if venue_ids is not None:
+        params["venue_ids"] = [str(v) for v in venue_ids]
+        if not params["venue_ids"]:
+            return 0
+        delete_filter = "WHERE venue_id IN :venue_ids"
+        select_filter = "WHERE v.id IN :venue_ids"
+
+    delete_stmt = text(f"DELETE FROM VenueAggregates {delete_filter}")
+    insert_stmt = text(f"""
+        INSERT INTO VenueAggregates (
+            venue_id, rating_sum, review_count, avg_rating, upcoming_events, last_updated
+        )
+        SELECT v.id,
+               COALESCE(rv.rating_sum, 0),
+               COALESCE(rv.review_count, 0),
+               rv.avg_rating,
+               COALESCE(ev.upcoming_events, 0),
+               :now
+        FROM Venues v
+        LEFT JOIN (
+            SELECT s.venue_id,
+                   SUM(r.overall_rating) AS rating_sum,
+                   COUNT(r.id) AS review_count,
+                   ROUND(AVG(r.overall_rating), 1) AS avg_rating
+            FROM Reviews r
+            JOIN Seats s ON r.seat_id = s.id
+            GROUP BY s.venue_id
+        ) rv ON rv.venue_id = v.id
+        LEFT JOIN (
+            SELECT venue_id, COUNT(*) AS upcoming_events
+            FROM Events
+            WHERE event_date >= CURRENT_DATE
+            GROUP BY venue_id
+        ) ev ON ev.venue_id = v.id
+        {select_filter}
+    """)
+    if venue_ids is not None:
+        delete_stmt = delete_stmt.bindparams(bindparam("venue_ids", expanding=True))
+        insert_stmt = insert_stmt.bindparams(bindparam("venue_ids", expanding=True))
+
+    conn.execute(delete_stmt, params)
+    return conn.execute(insert_stmt, params).rowcount
+
+
+# ---------------------------------------------------------------------------
+# PlatformStats – single counters row for the landing page
+# ---------------------------------------------------------------------------
+
+# A missing counters row is left alone here; read_platform_stats() callers
+# seed it from the live tables on first read
+PLATFORM_APPLY_SQL = """
+    UPDATE PlatformStats SET
+        total_reviews = total_reviews + 1,
+        rating_sum = rating_sum + :rating,
+        last_updated = :now
+    WHERE id = 1
+"""
+
+
+def apply_review_to_platform(conn, overall_rating: int) -> None:
+    """Count a newly inserted review in the platform totals."""
+    updated = conn.execute(
+        text(PLATFORM_APPLY_SQL), {"rating": overall_rating or 0, "now": datetime.utcnow()}
+    ).rowcount
+    if not updated:
+        # First write since deploy: seed the row from the live tables
+        reconcile_platform_stats(conn)
+
+
+def apply_reviews_to_platform(conn, review_count: int, rating_sum: int) -> None:
+    """Count a batch of newly inserted reviews in the platform totals."""
+    updated = conn.execute(text("""
+        UPDATE PlatformStats SET
+            total_reviews = total_reviews + :count,
+            rating_sum = rating_sum + :rating_sum,
+            last_updated = :now
+        WHERE id = 1
+    """), {"count": review_count, "rating_sum": rating_sum, "now": datetime.utcnow()}).rowcount
+    if not updated:
+        reconcile_platform_stats(conn)
+
+
+def remove_review_from_platform(conn, overall_rating: int) -> None:
+    """Drop a deleted review from the platform totals."""
+    updated = conn.execute(text("""
+        UPDATE PlatformStats SET
+            total_reviews = total_reviews - 1,
+            rating_sum = rating_sum - :rating,
+            last_updated = :now
+        WHERE id = 1 AND total_reviews > 0
+    """), {"rating": overall_rating or 0, "now": datetime.utcnow()}).rowcount
+    if not updated:
+        reconcile_platform_stats(conn)
+
+
+def reconcile_platform_stats(conn) -> dict:
+    """
+    Recompute the counters row from Venues/Seats/Reviews and overwrite it.
+    Run periodically (and after bulk seeding) to correct any drift.
+    """
+    now = datetime.utcnow()
+    total_venues, total_reviews, rating_sum = conn.execute(text("""
+        SELECT (SELECT COUNT(*) FROM Venues),
+               COUNT(r.id),
+               COALESCE(SUM(r.overall_rating), 0)
+        FROM Reviews r
+        JOIN Seats s ON r.seat_id = s.id
+        JOIN Venues v ON s.venue_id = v.id
+    """)).fetchone()
+    # An upsert, so concurrent first readers seeding the row don't collide on its key
+    conn.execute(text("""
+        INSERT INTO PlatformStats (id, total_venues, total_reviews, rating_sum, last_updated, last_reconciled)
+        VALUES (1, :venues, :reviews, :rating_sum, :now, :now)
+        ON CONFLICT (id) DO UPDATE SET
+            total_venues = EXCLUDED.total_venues,
+            total_reviews = EXCLUDED.total_reviews,
+            rating_sum = EXCLUDED.rating_sum,
+            last_updated = EXCLUDED.last_updated,
+            last_reconciled = EXCLUDED.last_reconciled
+    """), {"venues": total_venues, "reviews": total_reviews, "rating_sum": rating_sum, "now": now})
+    return {"total_venues": total_venues, "total_reviews": total_reviews, "rating_sum": rating_sum}
+
+
+def read_platform_stats(conn) -> Optional[dict]:
+    """Return the counters row, or None if it has never been populated."""
+    row = conn.execute(text(
+        "SELECT total_venues, total_reviews, rating_sum FROM PlatformStats WHERE id = 1"
+    )).fetchone()
+    if not row:
+        return None
+    return {"total_venues": row[0], "total_reviews": row[1], "rating_sum": row[2]}
@@ -0,0 +1,190 @@
+"""
+In-process caches for the AI assistant, invalidated by review writes.
+
+Entries are tied to the venues whose data they were computed from. Review
+writes call invalidate_venue_data(venue_ids); an entry computed before a
+write to one of its venues is never served again. An entry that depends on
+every venue (a "top venues" answer) is tied to ALL_VENUES and goes stale on
+any write. Staleness is checked against a write clock rather than by scanning
+the cache, and an entry records the clock from *before* its data was read, so
+a write landing while an answer is being computed also makes it stale.
+
+Settings come from the environment (defaults in parentheses):
+    AI_CACHE_SIZE             analyze answers kept, least recently used evicted first (1000)
+    AI_CACHE_TTL              seconds an answer is served at most (3600)
+    AI_TOOL_CACHE_SIZE        tool results kept (5000)
+    AI_TOOL_CACHE_MAX_BYTES   total size of the cached tool results (16 MiB)
+    AI_TOOL_CACHE_TTL         seconds a tool result is served at most (900)
+
+Public API:
+    normalize_question(text) -> str
+    VenueDataCache                      - LRU + TTL cache with per-venue invalidation
+    response_cache                      - the shared cache of /ai/analyze answers
+    response_cache_key(messages) -> str
+    tool_cache                          - the shared cache of tool results, keyed (function, args)
+    tool_cache_key(function_name, args) -> tuple
+    data_version() -> int               - write clock to pass to VenueDataCache.put()
+    invalidate_venue_data(venue_ids=None) - after a write; None means everything
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Hashable, Iterable, Optional
+
+AI_CACHE_SIZE = int(os.getenv("AI_CACHE_SIZE", "1000"))
+AI_CACHE_TTL = float(os.getenv("AI_CACHE_TTL", "3600"))
+AI_TOOL_CACHE_SIZE = int(os.getenv("AI_TOOL_CACHE_SIZE", "5000"))
+AI_TOOL_CACHE_MAX_BYTES = int(os.getenv("AI_TOOL_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+AI_TOOL_CACHE_TTL = float(os.getenv("AI_TOOL_CACHE_TTL", "900"))
+
+# Dependency of entries computed from every venue's data
+ALL_VENUES = "*"
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_question(value: str) -> str:
+    """Case, punctuation and spacing folded, so trivially different phrasings match."""
+    value = _PUNCT_RE.sub(" ", unicodedata.normalize("NFKC", value).casefold())
+    return _SPACE_RE.sub(" ", value).strip()
+
+
+# ---------------------------------------------------------------------------
+# Write clock
+# ---------------------------------------------------------------------------
+
+_clock_lock = threading.Lock()
+_clock = 0
+_reset_at = 0
+_venue_writes = {}
+
+
+def data_version() -> int:
+    """The write clock now; take it before reading the data an entry is built from."""
+    return _clock
+
+
+def invalidate_venue_data(venue_ids: Optional[Iterable] = None) -> None:
+    """
+    Record a write to the reviews of `venue_ids` (every venue if None), making
+    the cache entries built from them stale.
+    """
+    global _clock, _reset_at
+    with _clock_lock:
+        _clock += 1
+        _venue_writes[ALL_VENUES] = _clock
+        if venue_ids is None:
+            _reset_at = _clock
+            return
+        for venue_id in venue_ids:
+            _venue_writes[str(venue_id)] = _clock
+
+
+def _is_fresh(version: int, venue_ids: frozenset) -> bool:
+    if _reset_at > version:
+        return False
+    return all(_venue_writes.get(venue_id, 0) <= version for venue_id in venue_ids)
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+class VenueDataCache:
+    """
+    LRU cache with a TTL whose entries carry the venue ids they depend on.
+    get() only returns entries that are unexpired and that no write to their
+    venues has made stale. With max_bytes, string values are also bounded by
+    their total length.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, max_bytes: Optional[int] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable):
+        """The cached value for `key`, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, version, venue_ids, size = entry
+                if expires_at > time.monotonic() and _is_fresh(version, venue_ids):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self._bytes -= size
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value, version: int, venue_ids: Iterable[str]) -> None:
+        """
+        Cache `value`, computed from the data of `venue_ids` as of write clock
+        `version` (data_version() taken before the data was read).
+        """
+        size = len(value) if isinstance(value, str) else 0
+        if self.maxsize <= 0 or (self.max_bytes is not None and size > self.max_bytes):
+            return
+        entry = (value, time.monotonic() + self.ttl, version, frozenset(str(v) for v in venue_ids), size)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[4]
+            self._entries[key] = entry
+            self._bytes += size
+            while len(self._entries) > self.maxsize or (self.max_bytes is not None and self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[4]
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_s": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions,
+            }
+
+
+response_cache = VenueDataCache(AI_CACHE_SIZE, AI_CACHE_TTL)
+
+
+def response_cache_key(messages: list) -> str:
+    """Cache key of an analyze request: its normalized system and user prompts."""
+    parts = [normalize_question(m["content"]) for m in messages if m["role"] in ("system", "user")]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+tool_cache = VenueDataCache(AI_TOOL_CACHE_SIZE, AI_TOOL_CACHE_TTL, max_bytes=AI_TOOL_CACHE_MAX_BYTES)
+
+
+def tool_cache_key(function_name: str, args: dict) -> tuple:
+    """Cache key of a tool call: the function and its arguments, order-insensitive."""
+    return function_name, json.dumps(args, sort_keys=True, default=str)
@@ -0,0 +1,82 @@
+"""
+Bounded executor for the AI assistant's blocking work.
+
+The Zhipu SDK is synchronous and the assistant's database tools use the sync
+engine, so /ai/analyze runs both on small dedicated thread pools instead of
+the event loop (where one slow LLM call would stall every other request on
+the worker) or Starlette's shared threadpool (where chat traffic could take
+the threads the sync routes need). Model calls and tool queries get separate
+pools: a model call holds its thread for up to a minute, and tools queued
+behind those would hit their deadline before starting.
+
+Settings come from the environment (defaults in parentheses):
+    AI_MAX_CONCURRENCY      LLM calls running at once (8)
+    AI_TOOL_WORKERS         tool queries running at once (DB_POOL_SIZE)
+    AI_MAX_QUEUED           analyze requests allowed to wait for a slot (32)
+    AI_REQUEST_DEADLINE_S   seconds one analyze request may take end to end (90)
+    AI_TOOL_DEADLINE_S      seconds the database tools of one request may take (15)
+
+Public API:
+    acquire_ai_slot() -> bool             - admit one analyze request, False when saturated
+    release_ai_slot()
+    ai_saturated() -> bool                - True when acquire_ai_slot() would refuse
+    run_blocking(fn, *args, **kwargs)     - await fn(*args, **kwargs) on the LLM executor
+    run_tool(fn, *args, **kwargs)         - await fn(*args, **kwargs) on the tool executor
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .db_pool import pool_settings
+
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "8"))
+AI_MAX_QUEUED = int(os.getenv("AI_MAX_QUEUED", "32"))
+AI_REQUEST_DEADLINE_S = float(os.getenv("AI_REQUEST_DEADLINE_S", "90"))
+AI_TOOL_DEADLINE_S = float(os.getenv("AI_TOOL_DEADLINE_S", "15"))
+# Each tool query holds a database connection: no more than the pool keeps open
+AI_TOOL_WORKERS = int(os.getenv("AI_TOOL_WORKERS", str(pool_settings()["pool_size"])))
+
+_executor = ThreadPoolExecutor(max_workers=AI_MAX_CONCURRENCY, thread_name_prefix="ai-worker")
+_tool_executor = ThreadPoolExecutor(max_workers=AI_TOOL_WORKERS, thread_name_prefix="ai-tool")
+_lock = threading.Lock()
+_active_requests = 0
+
+
+def acquire_ai_slot() -> bool:
+    """
+    Admit one analyze request. Returns False when AI_MAX_CONCURRENCY +
+    AI_MAX_QUEUED requests are already in progress, so the caller can turn the
+    request away rather than queue it behind minutes of LLM calls.
+    """
+    global _active_requests
+    with _lock:
+        if _active_requests >= AI_MAX_CONCURRENCY + AI_MAX_QUEUED:
+            return False
+        _active_requests += 1
+        return True
+
+
+def release_ai_slot() -> None:
+    global _active_requests
+    with _lock:
+        _active_requests -= 1
+
+
+def ai_saturated() -> bool:
+    with _lock:
+        return _active_requests >= AI_MAX_CONCURRENCY + AI_MAX_QUEUED
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run a blocking model call on the LLM executor without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+
+
+async def run_tool(fn, *args, **kwargs):
+    """Run a blocking database tool on the tool executor, apart from the LLM calls."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_tool_executor, functools.partial(fn, *args, **kwargs))
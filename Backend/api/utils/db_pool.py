@@ -0,0 +1,280 @@
+"""
+Connection pool settings and pool utilisation metrics for the SQLAlchemy engine.
+
+Settings come from the environment (defaults in parentheses):
+    DB_POOL_SIZE              connections kept open (5)
+    DB_MAX_OVERFLOW           extra connections allowed under burst load (10)
+    DB_POOL_TIMEOUT           seconds to wait for a free connection (30)
+    DB_POOL_RECYCLE           seconds before a connection is replaced (1800)
+    DB_POOL_PRE_PING          test connections on checkout, true/false (true)
+    DB_STATEMENT_TIMEOUT_MS   PostgreSQL statement_timeout, 0 = off (0)
+    DB_CONNECT_TIMEOUT        seconds to establish a psycopg connection (10)
+
+Public API:
+    pool_settings(env=os.environ) -> dict
+    engine_options(database_url, env=os.environ) -> dict   (kwargs for create_engine)
+    install_statement_timeout(engine, env=os.environ)
+    disable_statement_timeout(conn)   - for batch and migration scripts
+    install_statement_deadline(engine)
+    statement_deadline(deadline)   - context manager: cancel this thread's statements at `deadline`
+    InstrumentedQueuePool        - QueuePool that records checkout waits and timeouts
+    InstrumentedAsyncQueuePool   - the same for the async engine
+    pool_status(engine) -> dict
+"""
+
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Mapping, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+# Checkout waits kept for the percentiles reported by pool_status()
+WAIT_SAMPLES = 1000
+# SQLite virtual machine instructions between statement deadline checks
+SQLITE_DEADLINE_CHECK_OPS = 10_000
+
+_TRUE = ("1", "true", "yes", "on")
+
+
+def pool_settings(env: Mapping[str, str] = os.environ) -> dict:
+    """Pool settings read from `env`, with the defaults above."""
+    return {
+        "pool_size": int(env.get("DB_POOL_SIZE", "5")),
+        "max_overflow": int(env.get("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(env.get("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(env.get("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": env.get("DB_POOL_PRE_PING", "true").strip().lower() in _TRUE,
+        "statement_timeout_ms": int(env.get("DB_STATEMENT_TIMEOUT_MS", "0")),
+        "connect_timeout": int(env.get("DB_CONNECT_TIMEOUT", "10")),
+    }
+
+
+def engine_options(database_url: str, env: Mapping[str, str] = os.environ, use_async: bool = False) -> dict:
+    """
+    create_engine() (or, with use_async, create_async_engine()) keyword
+    arguments for `database_url`. In-memory SQLite keeps SQLAlchemy's default
+    single-connection pool; async SQLite does not pool.
+    """
+    poolclass = InstrumentedAsyncQueuePool if use_async else InstrumentedQueuePool
+    if database_url.startswith("sqlite"):
+        options = {"connect_args": {"check_same_thread": False}}
+        if use_async:
+            # Each aiosqlite connection owns a worker thread; don't keep them
+            # pooled (opening a SQLite file is cheap, and idle pooled threads
+            # would keep the process alive at exit)
+            options["poolclass"] = NullPool
+        elif ":memory:" not in database_url and database_url.rstrip("/") != "sqlite:":
+            settings = pool_settings(env)
+            options.update(
+                poolclass=poolclass,
+                pool_size=settings["pool_size"],
+                max_overflow=settings["max_overflow"],
+                pool_timeout=settings["pool_timeout"],
+            )
+        return options
+
+    settings = pool_settings(env)
+    connect_args = {}
+    if database_url.startswith(("postgresql://", "postgresql+psycopg2://", "postgresql+psycopg://")):
+        connect_args["connect_timeout"] = settings["connect_timeout"]
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings["pool_size"],
+        "max_overflow": settings["max_overflow"],
+        "pool_timeout": settings["pool_timeout"],
+        "pool_recycle": settings["pool_recycle"],
+        "pool_pre_ping": settings["pool_pre_ping"],
+        "connect_args": connect_args,
+    }
+
+
+def install_statement_timeout(engine, env: Mapping[str, str] = os.environ) -> None:
+    """
+    Set statement_timeout on every new PostgreSQL connection. Done with a
+    "connect" listener rather than connect_args so it works for both
+    psycopg2 and pg8000.
+    """
+    timeout_ms = pool_settings(env)["statement_timeout_ms"]
+    if engine.dialect.name != "postgresql" or timeout_ms <= 0:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_statement_timeout(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"SET statement_timeout = {int(timeout_ms)}")
+        cursor.close()
+        # pg8000 opens a transaction implicitly; don't leave it pending
+        dbapi_connection.commit()
+
+
+def disable_statement_timeout(conn) -> None:
+    """
+    Lift DB_STATEMENT_TIMEOUT_MS for the rest of this PostgreSQL session.
+    Batch and migration scripts call it on their connection: an index build
+    or a full-table recompute may legitimately run for minutes.
+    """
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SET statement_timeout = 0"))
+
+
+_deadline = threading.local()
+
+
+@contextmanager
+def statement_deadline(deadline: float):
+    """
+    Within the block, statements this thread runs on an engine with
+    install_statement_deadline() are cancelled by the database once
+    time.monotonic() passes `deadline`, so the thread and its connection are
+    freed instead of running the query to completion. Nested blocks keep the
+    earlier deadline.
+    """
+    previous = getattr(_deadline, "at", None)
+    _deadline.at = deadline if previous is None else min(previous, deadline)
+    try:
+        yield
+    finally:
+        _deadline.at = previous
+
+
+def _remaining() -> Optional[float]:
+    deadline = getattr(_deadline, "at", None)
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def _sqlite_past_deadline() -> int:
+    remaining = _remaining()
+    # Non-zero aborts the running statement with "interrupted"
+    return 1 if remaining is not None and remaining <= 0 else 0
+
+
+def install_statement_deadline(engine) -> None:
+    """
+    Enforce statement_deadline() on `engine`: PostgreSQL statements get a
+    SET LOCAL statement_timeout of the time left; SQLite checks the deadline
+    from a progress handler every SQLITE_DEADLINE_CHECK_OPS instructions.
+    Threads outside a statement_deadline() block are not affected.
+    """
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine, "connect")
+        def _set_progress_handler(dbapi_connection, connection_record):
+            dbapi_connection.set_progress_handler(_sqlite_past_deadline, SQLITE_DEADLINE_CHECK_OPS)
+    elif engine.dialect.name == "postgresql":
+        @event.listens_for(engine, "before_cursor_execute")
+        def _set_local_timeout(conn, cursor, statement, parameters, context, executemany):
+            remaining = _remaining()
+            if remaining is None:
+                return
+            if remaining <= 0:
+                raise TimeoutError("Statement deadline passed")
+            # Transaction-scoped: the pool's rollback on return clears it
+            cursor.execute(f"SET LOCAL statement_timeout = {max(1, int(remaining * 1000))}")
+
+
+class _PoolMetrics:
+    """
+    Pool mixin that times every checkout (the wait for a free connection,
+    including opening a new one) and counts checkout timeouts, connections
+    opened and connections invalidated.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connections_opened = 0
+        self.invalidations = 0
+        event.listen(self, "connect", self._on_connect)
+        event.listen(self, "invalidate", self._on_invalidate)
+
+    def recreate(self):
+        # dispose() builds a fresh pool; carry the counters over
+        new_pool = super().recreate()
+        with self._metrics_lock:
+            new_pool._waits.extend(self._waits)
+            new_pool.checkouts = self.checkouts
+            new_pool.timeouts = self.timeouts
+            new_pool.connections_opened = self.connections_opened
+            new_pool.invalidations = self.invalidations
+        return new_pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            with self._metrics_lock:
+                self.timeouts += 1
+                self._waits.append(time.perf_counter() - started)
+            raise
+        with self._metrics_lock:
+            self.checkouts += 1
+            self._waits.append(time.perf_counter() - started)
+        return connection
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._metrics_lock:
+            self.connections_opened += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._metrics_lock:
+            self.invalidations += 1
+
+    def wait_stats(self) -> dict:
+        """Checkout wait percentiles (ms) over the last WAIT_SAMPLES checkouts."""
+        with self._metrics_lock:
+            waits = sorted(self._waits)
+        if not waits:
+            return {"samples": 0, "mean_ms": None, "p50_ms": None, "p99_ms": None, "max_ms": None}
+
+        def pct(p: float) -> float:
+            return round(waits[min(len(waits) - 1, int(p * (len(waits) - 1)))] * 1000, 3)
+
+        return {
+            "samples": len(waits),
+            "mean_ms": round(statistics.mean(waits) * 1000, 3),
+            "p50_ms": pct(0.50),
+            "p99_ms": pct(0.99),
+            "max_ms": round(waits[-1] * 1000, 3),
+        }
+
+
+class InstrumentedQueuePool(_PoolMetrics, QueuePool):
+    """QueuePool with checkout metrics, for the sync engine."""
+
+
+class InstrumentedAsyncQueuePool(_PoolMetrics, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool with checkout metrics, for the async engine."""
+
+
+def pool_status(engine) -> dict:
+    """Current pool utilisation and, for an instrumented pool, wait metrics."""
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            # overflow() counts from -pool_size; only positive values are extra connections
+            "overflow": max(0, pool.overflow()),
+            "max_overflow": pool._max_overflow,
+            "timeout_s": pool.timeout(),
+        })
+    if isinstance(pool, _PoolMetrics):
+        status.update({
+            "checkouts": pool.checkouts,
+            "timeouts": pool.timeouts,
+            "connections_opened": pool.connections_opened,
+            "invalidations": pool.invalidations,
+            "wait": pool.wait_stats(),
+        })
+    return status
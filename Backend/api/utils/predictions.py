@@ -0,0 +1,197 @@
+"""
+Offline rating and price predictions for seats nobody has reviewed yet,
+stored in AI_Predictions.
+
+One small model per venue, fitted on the venue's reviewed seats
+(SeatAggregates) and scored on the rest in a single pass:
+    features  - distance_to_stage, its square, x, y (standardized; missing
+                values take the venue mean) and a one-hot of the section
+    targets   - avg_visual, avg_sound, avg_value, avg_overall, avg_price_paid
+    fit       - ridge regression, solved in closed form with NumPy for all
+                rating targets at once; seats are weighted by review count,
+                the intercept is not penalized
+Ratings are clipped to 1..5 and prices to >= 0. A venue with fewer than
+PREDICTION_MIN_SEATS reviewed seats gets its review-weighted mean for every
+seat instead of a fitted model. A venue with no reviews gets no predictions,
+and a rebuild drops the ones it had.
+
+confidence is per venue: support x fit, where support = n / (n + 10) for n
+reviewed seats and fit = 1 - (training RMSE of overall) / 2, clipped to 0..1.
+
+Requests never fit or score models: search_seats reads AI_Predictions as a
+fallback through a primary-key join.
+
+Settings come from the environment (defaults in parentheses):
+    PREDICTION_RIDGE_ALPHA    ridge penalty on the standardized features (1.0)
+    PREDICTION_MIN_SEATS      reviewed seats needed to fit a model (5)
+
+Public API:
+    fit_ridge(features, targets, weights, alpha) -> (coefficients, intercepts)
+    predict_venue(seats) -> {seat_id: prediction}
+    rebuild_predictions(conn, venue_id=None) -> int
+"""
+
+import os
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text
+
+PREDICTION_RIDGE_ALPHA = float(os.getenv("PREDICTION_RIDGE_ALPHA", "1.0"))
+PREDICTION_MIN_SEATS = int(os.getenv("PREDICTION_MIN_SEATS", "5"))
+
+RATING_TARGETS = ("visual", "sound", "value", "overall")
+
+_SEATS_SQL = """
+    SELECT s.id, s.venue_id, s.section, s.distance_to_stage, s.x, s.y,
+           sa.avg_visual, sa.avg_sound, sa.avg_value, sa.avg_overall, sa.avg_price_paid,
+           COALESCE(sa.review_count, 0)
+    FROM Seats s
+    LEFT JOIN SeatAggregates sa ON sa.seat_id = s.id
+"""
+
+
+def fit_ridge(
+    features: np.ndarray, targets: np.ndarray, weights: np.ndarray, alpha: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Weighted ridge regression of every column of `targets` (n x t) on
+    `features` (n x f) at once. Returns (coefficients f x t, intercepts t).
+    """
+    w = weights / weights.sum()
+    x_mean = w @ features
+    y_mean = w @ targets
+    xc = (features - x_mean) * np.sqrt(w)[:, None]
+    yc = (targets - y_mean) * np.sqrt(w)[:, None]
+    # alpha is relative to one seat's share of the total weight
+    gram = xc.T @ xc + (alpha / len(weights)) * np.eye(features.shape[1])
+    coefficients = np.linalg.solve(gram, xc.T @ yc)
+    return coefficients, y_mean - x_mean @ coefficients
+
+
+def _design(seats: Sequence[Sequence]) -> np.ndarray:
+    """Feature matrix: standardized numeric geometry plus a section one-hot."""
+    numeric = np.array(
+        [[np.nan if v is None else float(v) for v in (seat[2], seat[3], seat[4])] for seat in seats], dtype=float,
+    ).reshape(len(seats), 3)
+    present = ~np.isnan(numeric)
+    means = np.nansum(numeric, axis=0) / np.maximum(present.sum(axis=0), 1)
+    numeric = np.where(present, numeric, means)
+    numeric = np.column_stack([numeric[:, 0], numeric[:, 0] ** 2, numeric[:, 1], numeric[:, 2]])
+    spread = numeric.std(axis=0)
+    numeric = (numeric - numeric.mean(axis=0)) / np.where(spread > 0, spread, 1.0)
+
+    sections = sorted({str(seat[1]) for seat in seats})
+    column = {section: i for i, section in enumerate(sections)}
+    one_hot = np.zeros((len(seats), len(sections)))
+    one_hot[np.arange(len(seats)), [column[str(seat[1])] for seat in seats]] = 1.0
+    return np.hstack([numeric, one_hot])
+
+
+def predict_venue(seats: Sequence[Sequence]) -> Dict[str, dict]:
+    """
+    Predictions for the unreviewed seats of one venue. `seats` rows are
+    (seat_id, section, distance_to_stage, x, y, avg_visual, avg_sound,
+    avg_value, avg_overall, avg_price_paid, review_count).
+    """
+    if not seats:
+        return {}
+    features = _design(seats)
+    ratings = np.array([[np.nan if v is None else float(v) for v in seat[5:9]] for seat in seats], dtype=float)
+    prices = np.array([np.nan if seat[9] is None else float(seat[9]) for seat in seats])
+    counts = np.array([float(seat[10]) for seat in seats])
+
+    trained = (counts > 0) & ~np.isnan(ratings).any(axis=1)
+    scored = np.isnan(ratings[:, 3])
+    n = int(trained.sum())
+    if n == 0 or not scored.any():
+        return {}
+
+    if n >= PREDICTION_MIN_SEATS:
+        coefficients, intercepts = fit_ridge(features[trained], ratings[trained], counts[trained], PREDICTION_RIDGE_ALPHA)
+        predicted = features[scored] @ coefficients + intercepts
+        residual = ratings[trained, 3] - (features[trained] @ coefficients[:, 3] + intercepts[3])
+        rmse = float(np.sqrt(np.average(residual ** 2, weights=counts[trained])))
+        method = f"ridge model over {n} reviewed seats (section, distance and position)"
+    else:
+        predicted = np.tile(np.average(ratings[trained], axis=0, weights=counts[trained]), (int(scored.sum()), 1))
+        rmse = float(np.sqrt(np.average((ratings[trained, 3] - predicted[0, 3]) ** 2, weights=counts[trained])))
+        method = f"venue average of {n} reviewed seat{'s' if n != 1 else ''}"
+    predicted = np.clip(predicted, 1.0, 5.0)
+
+    priced = trained & ~np.isnan(prices)
+    if priced.sum() >= PREDICTION_MIN_SEATS:
+        coefficients, intercepts = fit_ridge(
+            features[priced], prices[priced, None], counts[priced], PREDICTION_RIDGE_ALPHA,
+        )
+        predicted_price = np.clip((features[scored] @ coefficients + intercepts)[:, 0], 0.0, None)
+    elif priced.any():
+        predicted_price = np.full(int(scored.sum()), np.average(prices[priced], weights=counts[priced]))
+    else:
+        predicted_price = np.full(int(scored.sum()), np.nan)
+
+    confidence = round((n / (n + 10.0)) * min(1.0, max(0.0, 1.0 - rmse / 2.0)), 3)
+    seat_ids = [str(seat[0]) for seat, is_scored in zip(seats, scored) if is_scored]
+    return {
+        seat_id: {
+            **{f"predicted_{name}": round(float(value), 2) for name, value in zip(RATING_TARGETS, row)},
+            "predicted_price": None if np.isnan(price) else round(float(price), 2),
+            "confidence": confidence,
+            "explanation": f"Predicted from the {method}.",
+        }
+        for seat_id, row, price in zip(seat_ids, predicted.tolist(), predicted_price.tolist())
+    }
+
+
+def rebuild_predictions(conn, venue_id: Optional[str] = None) -> int:
+    """
+    Refit and rescore every venue, or only `venue_id`, and upsert the
+    predictions of its unreviewed seats. Predictions of seats that have
+    since been reviewed, and of venues left with no reviewed seats, are
+    removed. Returns the number of seats scored.
+    """
+    params = {}
+    select_filter = venue_filter = ""
+    if venue_id is not None:
+        params["venue_id"] = str(venue_id)
+        select_filter = "WHERE s.venue_id = :venue_id"
+        venue_filter = "AND seat_id IN (SELECT id FROM Seats WHERE venue_id = :venue_id)"
+
+    by_venue: Dict[str, List[tuple]] = defaultdict(list)
+    for row in conn.execute(text(f"{_SEATS_SQL} {select_filter}"), params).fetchall():
+        by_venue[row[1]].append((row[0], row[2], *row[3:]))
+
+    conn.execute(text(f"""
+        DELETE FROM AI_Predictions
+        WHERE seat_id IN (SELECT seat_id FROM SeatAggregates WHERE avg_overall IS NOT NULL) {venue_filter}
+    """), params)
+    upsert = text("""
+        INSERT INTO AI_Predictions (
+            seat_id, predicted_visual, predicted_sound, predicted_value, predicted_overall,
+            predicted_price, confidence, explanation
+        )
+        VALUES (
+            :seat_id, :predicted_visual, :predicted_sound, :predicted_value, :predicted_overall,
+            :predicted_price, :confidence, :explanation
+        )
+        ON CONFLICT (seat_id) DO UPDATE SET
+            predicted_visual = excluded.predicted_visual,
+            predicted_sound = excluded.predicted_sound,
+            predicted_value = excluded.predicted_value,
+            predicted_overall = excluded.predicted_overall,
+            predicted_price = excluded.predicted_price,
+            confidence = excluded.confidence,
+            explanation = excluded.explanation
+    """)
+    clear_venue = text("DELETE FROM AI_Predictions WHERE seat_id IN (SELECT id FROM Seats WHERE venue_id = :venue_id)")
+    written = 0
+    for venue, seats in by_venue.items():
+        predictions = predict_venue(seats)
+        if predictions:
+            conn.execute(upsert, [{"seat_id": seat_id, **values} for seat_id, values in predictions.items()])
+            written += len(predictions)
+        else:
+            # Nothing left to train on (or to score): older predictions would outlive their data
+            conn.execute(clear_venue, {"venue_id": venue})
+    return written
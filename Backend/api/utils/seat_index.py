@@ -0,0 +1,210 @@
+"""
+In-memory spatial index of seat positions, one per venue.
+
+Seats carry venue-space coordinates (Seats.x / Seats.y), but SQL can only
+answer "near this point" by computing a distance for every seat of the
+venue. The index buckets a venue's seats into a uniform grid sized for
+about SEAT_INDEX_CELL_SEATS seats per cell, so a query only looks at the
+cells its answer can come from:
+    nearest(x, y, k)   - grows square rings of cells around the point until
+                         no unvisited cell can beat the k-th best seat
+    within(x, y, r)    - visits the cells overlapping the circle's bounding box
+
+Indexes are built on first use from one query per venue, kept in an LRU and
+rebuilt after SEAT_INDEX_TTL_S. Seats without coordinates are not indexed,
+so seats created with a review (no position) do not touch the index. The
+mock seeding route, the only route that writes Seats.x / Seats.y, calls
+invalidate_seat_index(). Positions written elsewhere (scripts, SQL, another
+worker process) are served stale for up to SEAT_INDEX_TTL_S.
+
+Settings come from the environment (defaults in parentheses):
+    SEAT_INDEX_TTL_S        seconds a venue's index is reused (600)
+    SEAT_INDEX_VENUES       venue indexes kept in memory (64)
+    SEAT_INDEX_CELL_SEATS   target seats per grid cell (8)
+
+Public API:
+    SeatIndex(seats)                       - seats: iterable of (seat_id, section, x, y)
+        .nearest(x, y, k, max_distance=None) -> [(seat_id, distance)], nearest first
+        .within(x, y, radius) -> [(seat_id, distance)], nearest first
+        .section_centroid(section) -> (x, y) | None
+    get_seat_index(conn, venue_id) -> SeatIndex
+    cached_seat_index(venue_id) -> SeatIndex | None
+    invalidate_seat_index(venue_id=None)
+"""
+
+import heapq
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+
+SEAT_INDEX_TTL_S = float(os.getenv("SEAT_INDEX_TTL_S", "600"))
+SEAT_INDEX_VENUES = int(os.getenv("SEAT_INDEX_VENUES", "64"))
+SEAT_INDEX_CELL_SEATS = int(os.getenv("SEAT_INDEX_CELL_SEATS", "8"))
+
+Match = Tuple[str, float]
+
+
+class SeatIndex:
+    """Uniform grid over one venue's seat coordinates."""
+
+    def __init__(self, seats: Iterable[Tuple[str, Optional[str], float, float]]):
+        self.ids: List[str] = []
+        self.xs: List[float] = []
+        self.ys: List[float] = []
+        sums: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0.0, 0])
+        for seat_id, section, x, y in seats:
+            if x is None or y is None:
+                continue
+            self.ids.append(str(seat_id))
+            self.xs.append(float(x))
+            self.ys.append(float(y))
+            if section is not None:
+                total = sums[str(section).lower()]
+                total[0] += x
+                total[1] += y
+                total[2] += 1
+        self._centroids = {section: (sx / n, sy / n) for section, (sx, sy, n) in sums.items()}
+
+        self._cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        if not self.ids:
+            self.min_x = self.min_y = 0.0
+            self.cell = 1.0
+            self.columns = self.rows = 0
+            return
+        self.min_x, self.min_y = min(self.xs), min(self.ys)
+        width, height = max(self.xs) - self.min_x, max(self.ys) - self.min_y
+        cells_wanted = max(1.0, len(self.ids) / max(1, SEAT_INDEX_CELL_SEATS))
+        if width > 0 and height > 0:
+            self.cell = math.sqrt(width * height / cells_wanted)
+        else:
+            # All seats on one line (or one point)
+            self.cell = max(width, height) / cells_wanted or 1.0
+        self.columns = int(width // self.cell) + 1
+        self.rows = int(height // self.cell) + 1
+        for i, (x, y) in enumerate(zip(self.xs, self.ys)):
+            self._cells[self._cell_of(x, y)].append(i)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _cell_of(self, x: float, y: float) -> Tuple[int, int]:
+        return int((x - self.min_x) // self.cell), int((y - self.min_y) // self.cell)
+
+    def _scan(self, cell: Tuple[int, int], x: float, y: float, out: List[Tuple[float, int]]) -> None:
+        xs, ys = self.xs, self.ys
+        for i in self._cells.get(cell, ()):
+            out.append(((xs[i] - x) ** 2 + (ys[i] - y) ** 2, i))
+
+    def _ring(self, cx: int, cy: int, ring: int) -> Iterable[Tuple[int, int]]:
+        """Grid cells at Chebyshev distance `ring` from (cx, cy)."""
+        if ring == 0:
+            yield cx, cy
+            return
+        low_x, high_x = max(cx - ring, 0), min(cx + ring, self.columns - 1)
+        for y in (cy - ring, cy + ring):
+            if 0 <= y < self.rows:
+                for x in range(low_x, high_x + 1):
+                    yield x, y
+        low_y, high_y = max(cy - ring + 1, 0), min(cy + ring - 1, self.rows - 1)
+        for x in (cx - ring, cx + ring):
+            if 0 <= x < self.columns:
+                for y in range(low_y, high_y + 1):
+                    yield x, y
+
+    def nearest(self, x: float, y: float, k: int, max_distance: Optional[float] = None) -> List[Match]:
+        """The k seats closest to (x, y), optionally no farther than max_distance."""
+        if k <= 0 or not self.ids:
+            return []
+        cx, cy = self._cell_of(x, y)
+        # Only rings that cross the grid hold seats: start at the first, stop after the last
+        first_ring = max(0, -cx, cx - self.columns + 1, -cy, cy - self.rows + 1)
+        last_ring = max(abs(cx), abs(cx - self.columns + 1), abs(cy), abs(cy - self.rows + 1))
+        candidates: List[Tuple[float, int]] = []
+        ring = first_ring
+        while ring <= last_ring:
+            for cell in self._ring(cx, cy, ring):
+                self._scan(cell, x, y, candidates)
+            # Anything in ring + 1 is at least ring * cell away
+            reach = ring * self.cell
+            if max_distance is not None and reach > max_distance:
+                break
+            if len(candidates) >= k and heapq.nsmallest(k, candidates)[-1][0] <= reach * reach:
+                break
+            ring += 1
+        best = heapq.nsmallest(k, candidates)
+        if max_distance is not None:
+            best = [(d, i) for d, i in best if d <= max_distance * max_distance]
+        return [(self.ids[i], math.sqrt(d)) for d, i in best]
+
+    def within(self, x: float, y: float, radius: float) -> List[Match]:
+        """Every seat within `radius` of (x, y)."""
+        if radius < 0 or not self.ids:
+            return []
+        x0, y0 = self._cell_of(x - radius, y - radius)
+        x1, y1 = self._cell_of(x + radius, y + radius)
+        candidates: List[Tuple[float, int]] = []
+        for cx in range(max(x0, 0), min(x1, self.columns - 1) + 1):
+            for cy in range(max(y0, 0), min(y1, self.rows - 1) + 1):
+                self._scan((cx, cy), x, y, candidates)
+        limit = radius * radius
+        return [(self.ids[i], math.sqrt(d)) for d, i in sorted(c for c in candidates if c[0] <= limit)]
+
+    def section_centroid(self, section: str) -> Optional[Tuple[float, float]]:
+        """Mean position of the section's seats (case-insensitive name)."""
+        return self._centroids.get(section.lower())
+
+
+# ---------------------------------------------------------------------------
+# Per-venue indexes
+# ---------------------------------------------------------------------------
+
+_indexes: "OrderedDict[str, Tuple[float, SeatIndex]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _load(conn, venue_id: str) -> SeatIndex:
+    rows = conn.execute(
+        text("SELECT id, section, x, y FROM Seats WHERE venue_id = :venue_id AND x IS NOT NULL AND y IS NOT NULL"),
+        {"venue_id": venue_id},
+    ).fetchall()
+    return SeatIndex(rows)
+
+
+def cached_seat_index(venue_id: str) -> Optional[SeatIndex]:
+    """The venue's index if one is cached and younger than SEAT_INDEX_TTL_S, without building it."""
+    venue_id = str(venue_id)
+    with _lock:
+        entry = _indexes.get(venue_id)
+        if entry is not None and time.monotonic() - entry[0] < SEAT_INDEX_TTL_S:
+            _indexes.move_to_end(venue_id)
+            return entry[1]
+    return None
+
+
+def get_seat_index(conn, venue_id: str) -> SeatIndex:
+    """The venue's index, built on `conn` if it is missing or older than SEAT_INDEX_TTL_S."""
+    venue_id = str(venue_id)
+    index = cached_seat_index(venue_id)
+    if index is not None:
+        return index
+    index = _load(conn, venue_id)
+    with _lock:
+        _indexes[venue_id] = (time.monotonic(), index)
+        _indexes.move_to_end(venue_id)
+        while len(_indexes) > SEAT_INDEX_VENUES:
+            _indexes.popitem(last=False)
+    return index
+
+
+def invalidate_seat_index(venue_id: Optional[str] = None) -> None:
+    """Drop one venue's index, or all of them, after seats were added or moved."""
+    with _lock:
+        if venue_id is None:
+            _indexes.clear()
+        else:
+            _indexes.pop(str(venue_id), None)
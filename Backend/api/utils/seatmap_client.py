@@ -1,18 +1,59 @@
 """
-Ticketmaster seatmap utilities.
+The seatmap service: every Ticketmaster seatmap lookup goes through here.
+
+A venue's seatmap (PNG URL + parsed section geometry) is cached at two
+levels: an in-process LRU in front of the SeatmapCache table, so hot venues
+are served without a database round trip or JSON decode. Venues Ticketmaster
+has no seatmap for are cached too ("negative" entries), for a shorter time.
+An entry past its TTL is still served for SEATMAP_STALE_S more seconds while
+a background task refreshes it; after that the request waits for the refresh.
+
+Ticketmaster is called through one shared httpx.AsyncClient, so the
+venues / events / SVG requests of a cache miss reuse pooled connections and
+never block the event loop. Misses are single-flight per venue: concurrent
+requests for a venue that is not cached yet all wait on one fetch. Sync
+callers (the pin renderer in seatmap_pins.py, scripts) use the same
+hierarchy through get_seatmap_sync(), and download PNGs through one shared,
+pooled httpx.Client.
+
+Cache and upstream counters for both paths are kept in one place, see
+seatmap_stats().
+
+Settings come from the environment (defaults in parentheses):
+    TM_HTTP_MAX_CONNECTIONS   connections to Ticketmaster open at once (20)
+    SEATMAP_MEMORY_SIZE       venues kept in the in-process LRU (256)
+    SEATMAP_TTL_S             seconds a seatmap is fresh (7 days)
+    SEATMAP_NEGATIVE_TTL_S    seconds a "no seatmap" result is fresh (1 hour)
+    SEATMAP_STALE_S           seconds an expired entry may still be served
+                              while it is refreshed (1 day)
 
 Public API:
-    get_seatmap_data(venue_name, section) -> SeatmapData | None
+    get_seatmap_data(venue_name, section) -> SeatmapData | None   (async)
+    get_seatmap(venue_name) -> Seatmap | None                      (async)
+    get_seatmap_sync(venue_name) -> Seatmap | None
+    download_png(url) -> bytes
+    normalize_venue_key(venue_name) -> str
+    record_event(name, count=1) / seatmap_stats() -> dict
+    close_http_client()                                            (async, app shutdown)
+    clear_memory_cache()
 """
 
+import asyncio
 import json
 import logging
 import os
 import re
-from typing import Optional
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Optional
 
 import httpx
 from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from .svg_sections import SectionGeometryParser
 
 logger = logging.getLogger(__name__)
 
@@ -20,15 +61,21 @@ logger = logging.getLogger(__name__)
 IMAGE_WIDTH = 1024
 IMAGE_HEIGHT = 768
 SVG_SCALE = 10
+SVG_FEED_BYTES = 256 * 1024
 
 _TM_HEADERS = {"User-Agent": "LiveLens/1.0"}
+TM_HTTP_MAX_CONNECTIONS = int(os.getenv("TM_HTTP_MAX_CONNECTIONS", "20"))
+SEATMAP_MEMORY_SIZE = int(os.getenv("SEATMAP_MEMORY_SIZE", "256"))
+SEATMAP_TTL_S = float(os.getenv("SEATMAP_TTL_S", str(7 * 24 * 3600)))
+SEATMAP_NEGATIVE_TTL_S = float(os.getenv("SEATMAP_NEGATIVE_TTL_S", "3600"))
+SEATMAP_STALE_S = float(os.getenv("SEATMAP_STALE_S", str(24 * 3600)))
 
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
-def _normalize(venue_name: str) -> str:
+def normalize_venue_key(venue_name: str) -> str:
     """'Madison Square Garden' -> 'madison_square_garden'"""
     return re.sub(r"[^a-z0-9]+", "_", venue_name.lower()).strip("_")
 
@@ -38,29 +85,108 @@ def _get_engine():
     return engine
 
 
+def _epoch(value) -> float:
+    """A SeatmapCache.created_at (naive UTC; a string on SQLite) as a Unix time."""
+    if not value:
+        return 0.0
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _freshness(seatmap: dict) -> str:
+    """Whether an entry is "fresh", "stale" (serve, but refresh) or "expired" (refresh first)."""
+    ttl = SEATMAP_TTL_S if seatmap["png_url"] else SEATMAP_NEGATIVE_TTL_S
+    age = time.time() - seatmap["fetched_at"]
+    if age < ttl:
+        return "fresh"
+    if age < ttl + SEATMAP_STALE_S:
+        return "stale"
+    return "expired"
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+_metrics: Counter = Counter()
+_metrics_lock = threading.Lock()
+
+
+def record_event(name: str, count: int = 1) -> None:
+    """Count a seatmap event (cache hit, upstream fetch, pin rendered, ...)."""
+    with _metrics_lock:
+        _metrics[name] += count
+
+
+def seatmap_stats() -> dict:
+    """Event counters since start-up, plus the size of the in-process LRU."""
+    with _metrics_lock:
+        counters = dict(_metrics)
+    with _memory_lock:
+        entries = len(_memory)
+    return {"memory_entries": entries, "memory_size": SEATMAP_MEMORY_SIZE, **counters}
+
+
+# ---------------------------------------------------------------------------
+# In-process LRU of parsed seatmaps
+# ---------------------------------------------------------------------------
+
+_memory: "OrderedDict[str, dict]" = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def _memory_get(venue_key: str) -> Optional[dict]:
+    with _memory_lock:
+        seatmap = _memory.get(venue_key)
+        if seatmap is not None:
+            _memory.move_to_end(venue_key)
+        return seatmap
+
+
+def _memory_set(venue_key: str, seatmap: dict) -> None:
+    with _memory_lock:
+        _memory[venue_key] = seatmap
+        _memory.move_to_end(venue_key)
+        while len(_memory) > SEATMAP_MEMORY_SIZE:
+            _memory.popitem(last=False)
+
+
+def clear_memory_cache() -> None:
+    with _memory_lock:
+        _memory.clear()
+    with _metrics_lock:
+        _metrics.clear()
+
+
 # ---------------------------------------------------------------------------
 # DB cache – SeatmapCache (per-venue: png_url + section coords)
 # ---------------------------------------------------------------------------
 
 def _cache_get(venue_key: str) -> Optional[dict]:
+    """The SeatmapCache row for a venue, including negative rows (png_url None)."""
     engine = _get_engine()
     if not engine:
         return None
     try:
         with engine.connect() as conn:
             row = conn.execute(
-                text("SELECT png_url, section_coords FROM SeatmapCache WHERE id = :key"),
+                text("SELECT png_url, section_coords, created_at FROM SeatmapCache WHERE id = :key"),
                 {"key": venue_key},
             ).fetchone()
-        if row and row[0]:
-            coords = json.loads(row[1]) if row[1] else {}
-            return {"png_url": row[0], "section_coords": coords}
+        if row:
+            coords = json.loads(row[1]) if row[0] and row[1] else {}
+            return {"png_url": row[0], "section_coords": coords, "fetched_at": _epoch(row[2])}
     except Exception as e:
         logger.warning("SeatmapCache read error: %s", e)
     return None
 
 
-def _cache_set(venue_key: str, tm_venue_id: Optional[str], png_url: Optional[str], section_coords: dict) -> None:
+def _cache_set(
+    venue_key: str, tm_venue_id: Optional[str], png_url: Optional[str], section_coords: dict, fetched_at: float,
+) -> None:
     engine = _get_engine()
     if not engine:
         return
@@ -68,18 +194,20 @@ def _cache_set(venue_key: str, tm_venue_id: Optional[str], png_url: Optional[str
         with engine.begin() as conn:
             conn.execute(
                 text(
-                    "INSERT INTO SeatmapCache (id, tm_venue_id, png_url, section_coords) "
-                    "VALUES (:id, :tm_venue_id, :png_url, :section_coords) "
+                    "INSERT INTO SeatmapCache (id, tm_venue_id, png_url, section_coords, created_at) "
+                    "VALUES (:id, :tm_venue_id, :png_url, :section_coords, :created_at) "
                     "ON CONFLICT (id) DO UPDATE SET "
                     "tm_venue_id = EXCLUDED.tm_venue_id, "
                     "png_url = EXCLUDED.png_url, "
-                    "section_coords = EXCLUDED.section_coords"
+                    "section_coords = EXCLUDED.section_coords, "
+                    "created_at = EXCLUDED.created_at"
                 ),
                 {
                     "id": venue_key,
                     "tm_venue_id": tm_venue_id,
                     "png_url": png_url,
                     "section_coords": json.dumps(section_coords),
+                    "created_at": datetime.fromtimestamp(fetched_at, timezone.utc).replace(tzinfo=None),
                 },
             )
         logger.info("SeatmapCache stored: %s (%d sections)", venue_key, len(section_coords))
@@ -91,31 +219,96 @@ def _cache_set(venue_key: str, tm_venue_id: Optional[str], png_url: Optional[str
 # Ticketmaster Discovery API
 # ---------------------------------------------------------------------------
 
-def _fetch_tm_urls(venue_name: str):
-    """Return (venue_id, png_url, svg_url) from TM, or (None, None, None) on failure."""
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_loop = None
+
+
+def _new_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        headers=_TM_HEADERS,
+        timeout=10,
+        limits=httpx.Limits(max_connections=TM_HTTP_MAX_CONNECTIONS, max_keepalive_connections=TM_HTTP_MAX_CONNECTIONS),
+    )
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """
+    The shared client, created on first use. Pooled connections belong to the
+    event loop that opened them, so a different loop (TestClient runs each
+    request on its own) gets a new client.
+    """
+    global _http_client, _http_client_loop
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _http_client, _http_client_loop = _new_http_client(), loop
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client, _sync_http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+    with _sync_http_client_lock:
+        if _sync_http_client is not None:
+            _sync_http_client.close()
+            _sync_http_client = None
+
+
+_sync_http_client: Optional[httpx.Client] = None
+_sync_http_client_lock = threading.Lock()
+
+
+def _get_sync_http_client() -> httpx.Client:
+    """The shared blocking client, for threads and scripts with no event loop."""
+    global _sync_http_client
+    with _sync_http_client_lock:
+        if _sync_http_client is None:
+            _sync_http_client = httpx.Client(
+                headers=_TM_HEADERS,
+                timeout=15,
+                limits=httpx.Limits(
+                    max_connections=TM_HTTP_MAX_CONNECTIONS, max_keepalive_connections=TM_HTTP_MAX_CONNECTIONS,
+                ),
+            )
+        return _sync_http_client
+
+
+def download_png(url: str) -> bytes:
+    """The bytes of a seatmap PNG (blocking; raises on HTTP errors)."""
+    response = _get_sync_http_client().get(url)
+    response.raise_for_status()
+    record_event("png_downloads")
+    return response.content
+
+
+async def _fetch_tm_urls(client: httpx.AsyncClient, venue_name: str):
+    """
+    Return (venue_id, png_url, svg_url) from TM; venue_id and the URLs are None
+    where TM has no venue, event or seatmap. Returns None if TM could not be
+    asked or failed (network error, HTTP error status, bad JSON).
+    """
     api_key = os.environ.get("TICKETMASTER_API_KEY")
     if not api_key:
         logger.error("TICKETMASTER_API_KEY not set")
-        return None, None, None
+        return None
 
     try:
-        r = httpx.get(
+        r = await client.get(
             "https://app.ticketmaster.com/discovery/v2/venues.json",
             params={"keyword": venue_name, "apikey": api_key, "size": 1},
-            headers=_TM_HEADERS,
-            timeout=10,
         )
+        r.raise_for_status()
         venues = r.json().get("_embedded", {}).get("venues", [])
         if not venues:
             return None, None, None
         venue_id = venues[0]["id"]
 
-        r2 = httpx.get(
+        r2 = await client.get(
             "https://app.ticketmaster.com/discovery/v2/events.json",
             params={"venueId": venue_id, "apikey": api_key, "size": 1},
-            headers=_TM_HEADERS,
-            timeout=10,
         )
+        r2.raise_for_status()
         events = r2.json().get("_embedded", {}).get("events", [])
         if not events:
             return venue_id, None, None
@@ -129,86 +322,153 @@ def _fetch_tm_urls(venue_name: str):
 
     except Exception as e:
         logger.error("TM API error: %s", e)
-        return None, None, None
+        return None
 
 
 # ---------------------------------------------------------------------------
-# SVG section coordinate extraction
+# Seatmap fetch + cache
 # ---------------------------------------------------------------------------
 
-def _extract_section_coords(svg_content: str) -> dict:
+async def _fetch_and_cache(venue_name: str, client: Optional[httpx.AsyncClient] = None) -> Optional[dict]:
     """
-    Parse a TM seatmap SVG and return every section's center pixel on the
-    1024×768 PNG (SVG coords divided by SVG_SCALE=10).
-
-    Returns: {"101": [x, y], "Floor": [x, y], ...}
+    Fetch a venue's seatmap from Ticketmaster and store it. Returns a negative
+    entry (png_url None) if Ticketmaster has no seatmap, None on error; errors
+    store nothing, so a cached seatmap survives Ticketmaster failing.
+    Uses the shared client unless `client` is given.
     """
-    results = {}
+    venue_key = normalize_venue_key(venue_name)
+    client = client or _get_http_client()
+    fetched_at = time.time()
+    record_event("upstream_fetches")
+    urls = await _fetch_tm_urls(client, venue_name)
+    if urls is None:
+        record_event("upstream_errors")
+        return None
+    venue_id, png_url, svg_url = urls
 
-    def _centroid(d_value: str):
-        nums = [float(n) for n in re.findall(r"[-+]?\d+\.?\d*", d_value)]
-        pts = [(nums[i], nums[i + 1]) for i in range(0, len(nums) - 1, 2)]
-        if not pts:
-            return None
-        cx = int(sum(p[0] for p in pts) / len(pts) / SVG_SCALE)
-        cy = int(sum(p[1] for p in pts) / len(pts) / SVG_SCALE)
-        return [cx, cy]
+    if not png_url or not svg_url:
+        record_event("negative_results")
+        await run_in_threadpool(_cache_set, venue_key, venue_id, None, {}, fetched_at)
+        return {"png_url": None, "section_coords": {}, "fetched_at": fetched_at}
 
-    # <path id="..." d="..."> (both attribute orderings)
-    for m in re.finditer(r'<path\s[^>]*?id="([^"]+)"[^>]*?d="([^"]+)"[^>]*/>', svg_content):
-        c = _centroid(m.group(2))
-        if c:
-            results[m.group(1)] = c
+    try:
+        # The SVG is parsed as it downloads, off the event loop, in blocks of
+        # SVG_FEED_BYTES so a map costs a few threadpool hops, not one per read
+        parser = SectionGeometryParser(SVG_SCALE)
+        async with client.stream("GET", svg_url, timeout=15) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(SVG_FEED_BYTES):
+                await run_in_threadpool(parser.feed, chunk)
+        coords = parser.close()
+        logger.info("Extracted %d section coords from SVG", len(coords))
+        await run_in_threadpool(_cache_set, venue_key, venue_id, png_url, coords, fetched_at)
+        return {"png_url": png_url, "section_coords": coords, "fetched_at": fetched_at}
+    except Exception as e:
+        logger.error("Failed to fetch/cache seatmap for %s: %s", venue_name, e)
+        record_event("upstream_errors")
+        return None
 
-    for m in re.finditer(r'<path\s[^>]*?d="([^"]+)"[^>]*?id="([^"]+)"[^>]*/>', svg_content):
-        if m.group(2) not in results:
-            c = _centroid(m.group(1))
-            if c:
-                results[m.group(2)] = c
 
-    # <text x="..." y="...">label</text>
-    for m in re.finditer(r'<text[^>]*x="([^"]+)"[^>]*y="([^"]+)"[^>]*>\s*([^<]+?)\s*</text>', svg_content):
-        label = m.group(3).strip()
-        if label and label not in results:
-            try:
-                results[label] = [
-                    int(float(m.group(1)) / SVG_SCALE),
-                    int(float(m.group(2)) / SVG_SCALE),
-                ]
-            except ValueError:
-                pass
+async def _load_seatmap(
+    venue_name: str, refresh: bool, client: Optional[httpx.AsyncClient] = None,
+) -> Optional[dict]:
+    """
+    The venue's SeatmapCache row, fetched again from Ticketmaster if it is
+    missing or expired (or stale, when refreshing), and kept in the LRU.
+    """
+    venue_key = normalize_venue_key(venue_name)
+    seatmap = await run_in_threadpool(_cache_get, venue_key)
+    freshness = _freshness(seatmap) if seatmap else "expired"
+    if freshness == "fresh":
+        record_event("db_hits")
+    if freshness == "expired" or (refresh and freshness == "stale"):
+        # The old row beats nothing while Ticketmaster is failing
+        seatmap = await _fetch_and_cache(venue_name, client) or seatmap
+    if seatmap is not None:
+        _memory_set(venue_key, seatmap)
+    return seatmap
 
-    logger.info("Extracted %d section coords from SVG", len(results))
-    return results
 
+# Lookups in progress, by venue key
+_inflight: Dict[str, asyncio.Task] = {}
 
-# ---------------------------------------------------------------------------
-# Seatmap fetch + cache
-# ---------------------------------------------------------------------------
 
-def _fetch_and_cache(venue_name: str) -> Optional[dict]:
-    venue_key = _normalize(venue_name)
-    venue_id, png_url, svg_url = _fetch_tm_urls(venue_name)
+def _load_in_flight(venue_name: str, refresh: bool = False) -> asyncio.Task:
+    """
+    The venue's _load_seatmap() task, started unless one is already running,
+    so concurrent callers share one lookup. The task is independent of its
+    callers: one disconnecting does not cancel it for the others.
+    """
+    venue_key = normalize_venue_key(venue_name)
+    task = _inflight.get(venue_key)
+    if task is None or task.get_loop() is not asyncio.get_running_loop():
+        task = asyncio.ensure_future(_load_seatmap(venue_name, refresh))
+        _inflight[venue_key] = task
 
-    if not png_url or not svg_url:
-        _cache_set(venue_key, venue_id, None, {})
-        return None
+        def _forget(done: asyncio.Task) -> None:
+            if _inflight.get(venue_key) is done:
+                del _inflight[venue_key]
 
-    try:
-        svg = httpx.get(svg_url, timeout=15, headers=_TM_HEADERS).text
-        coords = _extract_section_coords(svg)
-        _cache_set(venue_key, venue_id, png_url, coords)
-        return {"png_url": png_url, "section_coords": coords}
-    except Exception as e:
-        logger.error("Failed to fetch/cache seatmap for %s: %s", venue_name, e)
-        return None
+        task.add_done_callback(_forget)
+    else:
+        record_event("coalesced")
+    return task
 
 
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
 
-def get_seatmap_data(venue_name: str, section: str) -> Optional[dict]:
+async def get_seatmap(venue_name: str) -> Optional[dict]:
+    """
+    The venue's cached seatmap, from memory, else SeatmapCache, else Ticketmaster:
+        {"png_url": str | None, "section_coords": {section: geometry}, "fetched_at": float}
+    png_url is None if Ticketmaster has no seatmap for the venue. Returns None
+    only if nothing is cached and Ticketmaster could not be reached.
+    """
+    seatmap = _memory_get(normalize_venue_key(venue_name))
+    if seatmap is not None and _freshness(seatmap) != "expired":
+        record_event("memory_hits")
+    else:
+        seatmap = await asyncio.shield(_load_in_flight(venue_name))
+    if seatmap is not None and _freshness(seatmap) == "stale":
+        # Served as is; later requests get the refreshed copy
+        record_event("stale_served")
+        _load_in_flight(venue_name, refresh=True)
+    return seatmap
+
+
+def get_seatmap_sync(venue_name: str) -> Optional[dict]:
+    """
+    get_seatmap() for code without an event loop (worker threads, scripts);
+    not to be called from the event loop's own thread. A stale entry is
+    refreshed before returning.
+
+    While the app's event loop is running, the lookup is handed to it, so it
+    joins any in-flight fetch for the venue and uses the shared client.
+    Otherwise it runs on a private loop with its own client, and the shared
+    client is left alone.
+    """
+    seatmap = _memory_get(normalize_venue_key(venue_name))
+    if seatmap is not None and _freshness(seatmap) == "fresh":
+        record_event("memory_hits")
+        return seatmap
+
+    loop = _http_client_loop
+    if loop is not None and loop.is_running() and not loop.is_closed():
+        async def load_shared() -> Optional[dict]:
+            return await asyncio.shield(_load_in_flight(venue_name, refresh=True))
+
+        return asyncio.run_coroutine_threadsafe(load_shared(), loop).result()
+
+    async def load_private() -> Optional[dict]:
+        async with _new_http_client() as client:
+            return await _load_seatmap(venue_name, refresh=True, client=client)
+
+    return asyncio.run(load_private())
+
+
+async def get_seatmap_data(venue_name: str, section: str) -> Optional[dict]:
     """
     Return seatmap metadata for the given venue + section.
 
@@ -221,13 +481,8 @@ def get_seatmap_data(venue_name: str, section: str) -> Optional[dict]:
 
     Returns None if no seatmap is available for this venue.
     """
-    venue_key = _normalize(venue_name)
-
-    seatmap = _cache_get(venue_key)
-    if seatmap is None:
-        seatmap = _fetch_and_cache(venue_name)
-
-    if not seatmap:
+    seatmap = await get_seatmap(venue_name)
+    if not seatmap or not seatmap["png_url"]:
         return None
 
     coord = seatmap["section_coords"].get(section)
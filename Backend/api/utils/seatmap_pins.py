@@ -0,0 +1,356 @@
+"""
+Seatmap images with the seat's section pinned, stored on S3.
+
+Venue data (PNG URL, section geometry) comes from the seatmap service in
+seatmap_client.py, so a venue is fetched from Ticketmaster and parsed once
+whichever path asks first. This module only adds the pinned images:
+    SeatmapPinCache          - pin key -> S3 URL of the rendered image
+    generate_seat_view_image - one section, rendered on a cache miss
+    prerender_venue_pins     - every section of a venue, in batch
+
+Settings come from the environment (defaults in parentheses):
+    S3_BUCKET_NAME            bucket for pinned images (livelens-images)
+    AWS_REGION                bucket region (us-east-2)
+    S3_UPLOAD_CONCURRENCY     concurrent S3 uploads per venue when pre-rendering (8)
+
+Public API:
+    generate_seat_view_image(venue_name, section, row, seat_number) -> str | None
+    prerender_venue_pins(venue_name, workers=None, force=False) -> {count: n}
+"""
+
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+from sqlalchemy import text
+
+from .seatmap_client import download_png, get_seatmap_sync, normalize_venue_key, record_event
+
+try:
+    from PIL import Image, ImageDraw
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Concurrent S3 uploads per venue when pre-rendering pins
+S3_UPLOAD_CONCURRENCY = int(os.environ.get("S3_UPLOAD_CONCURRENCY", "8"))
+
+
+def _get_engine():
+    """Lazy import to avoid circular dependency with database module."""
+    from ..database import engine
+    return engine
+
+
+# ── Tier 1: Per-section pinned-image cache ───────────────────────────────────
+
+def _lookup_pin_cache(pin_key: str) -> Optional[str]:
+    """Check SeatmapPinCache for an already-rendered S3 URL."""
+    engine = _get_engine()
+    if not engine:
+        return None
+    try:
+        with engine.connect() as conn:
+            row = conn.execute(
+                text("SELECT s3_url FROM SeatmapPinCache WHERE id = :key"),
+                {"key": pin_key},
+            ).fetchone()
+            if row:
+                logger.info(f"Pin cache HIT: {pin_key}")
+                return row[0]
+    except Exception as e:
+        logger.warning(f"Pin cache lookup failed: {e}")
+    return None
+
+
+def _store_pin_cache(pin_key: str, venue_key: str, section: str, s3_url: str) -> None:
+    """Store a rendered pinned-image URL in SeatmapPinCache."""
+    engine = _get_engine()
+    if not engine:
+        return
+    try:
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "INSERT INTO SeatmapPinCache (id, venue_key, section, s3_url) "
+                    "VALUES (:id, :venue_key, :section, :s3_url) "
+                    "ON CONFLICT (id) DO UPDATE SET s3_url = :s3_url"
+                ),
+                {"id": pin_key, "venue_key": venue_key, "section": section, "s3_url": s3_url},
+            )
+        logger.info(f"Pin cache STORED: {pin_key}")
+    except Exception as e:
+        logger.warning(f"Pin cache store failed: {e}")
+
+
+def _store_pin_cache_many(venue_key: str, urls: Dict[str, str]) -> None:
+    """Store many rendered pinned-image URLs ({section: s3_url}) for one venue in one transaction."""
+    engine = _get_engine()
+    if not engine or not urls:
+        return
+    try:
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "INSERT INTO SeatmapPinCache (id, venue_key, section, s3_url) "
+                    "VALUES (:id, :venue_key, :section, :s3_url) "
+                    "ON CONFLICT (id) DO UPDATE SET s3_url = excluded.s3_url"
+                ),
+                [
+                    {"id": f"{venue_key}_sec{section}", "venue_key": venue_key, "section": section, "s3_url": url}
+                    for section, url in urls.items()
+                ],
+            )
+        logger.info(f"Pin cache STORED: {len(urls)} sections for {venue_key}")
+    except Exception as e:
+        logger.warning(f"Pin cache batch store failed: {e}")
+
+
+def _cached_pin_sections(venue_key: str) -> set:
+    """Sections of a venue that already have a pinned image in SeatmapPinCache."""
+    engine = _get_engine()
+    if not engine:
+        return set()
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text("SELECT section FROM SeatmapPinCache WHERE venue_key = :venue_key"),
+                {"venue_key": venue_key},
+            ).fetchall()
+        return {row[0] for row in rows}
+    except Exception as e:
+        logger.warning(f"Pin cache listing failed: {e}")
+        return set()
+
+
+# ── S3 upload ────────────────────────────────────────────────────────────────
+
+_s3_client = None
+_s3_client_lock = threading.Lock()
+
+
+def _get_s3_client():
+    """One S3 client per process: boto3 clients are thread-safe and keep a connection pool."""
+    global _s3_client
+    with _s3_client_lock:
+        if _s3_client is None:
+            _s3_client = boto3.client(
+                "s3",
+                region_name=os.environ.get("AWS_REGION", "us-east-2"),
+                aws_access_key_id=os.environ.get("AWS_ACCESS_KEY_ID"),
+                aws_secret_access_key=os.environ.get("AWS_SECRET_ACCESS_KEY"),
+                aws_session_token=os.environ.get("AWS_SESSION_TOKEN"),
+                config=Config(
+                    s3={"addressing_style": "virtual"},
+                    signature_version="s3v4",
+                    max_pool_connections=max(10, S3_UPLOAD_CONCURRENCY),
+                ),
+            )
+        return _s3_client
+
+
+def _upload_to_s3(img_bytes: bytes, s3_key: str) -> Optional[str]:
+    """Upload PNG bytes to S3 and return public URL."""
+    bucket = os.environ.get("S3_BUCKET_NAME", "livelens-images")
+    region = os.environ.get("AWS_REGION", "us-east-2")
+    try:
+        s3 = _get_s3_client()
+        s3.put_object(
+            Bucket=bucket,
+            Key=s3_key,
+            Body=img_bytes,
+            ContentType="image/png",
+        )
+        return f"https://{bucket}.s3.{region}.amazonaws.com/{s3_key}"
+    except Exception as e:
+        logger.error(f"S3 upload failed: {e}")
+        record_event("pin_upload_failures")
+        return None
+
+
+# ── PIL pin rendering ────────────────────────────────────────────────────────
+
+def _render_pin_on_seatmap(png_url: str, x: int, y: int) -> Optional[bytes]:
+    """Download PNG seatmap and draw a pin marker at (x, y). Returns PNG bytes."""
+    if Image is None:
+        return None
+    try:
+        png_bytes = download_png(png_url)
+        img = Image.open(io.BytesIO(png_bytes)).convert("RGBA")
+        record_event("pins_rendered")
+        return _draw_pin(img, x, y)
+    except Exception as e:
+        logger.error(f"PIL pin rendering failed: {e}")
+        return None
+
+
+def _draw_pin(img, x: int, y: int) -> bytes:
+    """Draw the pin marker at (x, y) on an RGBA image and encode it as PNG."""
+    draw = ImageDraw.Draw(img)
+    # Outer glow
+    draw.ellipse([x - 22, y - 22, x + 22, y + 22], fill=(220, 38, 38, 80))
+    # Red circle
+    draw.ellipse([x - 16, y - 16, x + 16, y + 16], fill=(220, 38, 38, 230))
+    # White center dot
+    draw.ellipse([x - 6, y - 6, x + 6, y + 6], fill=(255, 255, 255, 255))
+
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+# ── Batch pre-rendering of every section of a venue ──────────────────────────
+
+# The decoded base seatmap, set once per pool worker by _init_pin_worker
+_worker_seatmap = None
+
+
+def _init_pin_worker(png_bytes: bytes) -> None:
+    """Pool initializer: decode the venue's base PNG once per worker process."""
+    global _worker_seatmap
+    _worker_seatmap = Image.open(io.BytesIO(png_bytes)).convert("RGBA")
+
+
+def _stamp_pin(job: Tuple[str, int, int]) -> Tuple[str, Optional[bytes]]:
+    """Pool task: (section, x, y) -> (section, pinned PNG bytes or None)."""
+    section, x, y = job
+    try:
+        return section, _draw_pin(_worker_seatmap.copy(), x, y)
+    except Exception as e:
+        logger.error(f"PIL pin rendering failed for section {section}: {e}")
+        return section, None
+
+
+def _render_pins(png_bytes: bytes, jobs: List[Tuple[str, int, int]], workers: int) -> Iterable[Tuple[str, Optional[bytes]]]:
+    """Pinned images for every job, in order; encoded in a process pool when workers > 1."""
+    if workers <= 1:
+        _init_pin_worker(png_bytes)
+        yield from map(_stamp_pin, jobs)
+        return
+    # The base PNG is sent to each worker once, not with every task
+    with ProcessPoolExecutor(workers, initializer=_init_pin_worker, initargs=(png_bytes,)) as pool:
+        yield from pool.map(_stamp_pin, jobs, chunksize=max(1, len(jobs) // (workers * 4)))
+
+
+def prerender_venue_pins(venue_name: str, workers: Optional[int] = None, force: bool = False) -> Dict[str, int]:
+    """
+    Render and upload the pinned seatmap of every section of a venue, so that
+    generate_seat_view_image() is always a Tier 1 hit.
+
+    The base PNG is downloaded once and decoded once per worker process. Pins
+    are encoded in a process pool while a thread pool uploads the finished
+    images to S3, and SeatmapPinCache is written in one transaction at the end.
+    Sections already in SeatmapPinCache are skipped unless force=True.
+
+    Returns counts: sections, skipped, rendered, uploaded, failed.
+    """
+    venue_key = normalize_venue_key(venue_name)
+    counts = {"sections": 0, "skipped": 0, "rendered": 0, "uploaded": 0, "failed": 0}
+    if Image is None:
+        return counts
+
+    seatmap = get_seatmap_sync(venue_name)
+    if not seatmap or not seatmap.get("png_url"):
+        return counts
+
+    coords = seatmap.get("section_coords", {})
+    counts["sections"] = len(coords)
+    done = set() if force else _cached_pin_sections(venue_key)
+    jobs = [(section, int(c[0]), int(c[1])) for section, c in coords.items() if section not in done]
+    counts["skipped"] = len(coords) - len(jobs)
+    if not jobs:
+        return counts
+
+    try:
+        png_bytes = download_png(seatmap["png_url"])
+    except Exception as e:
+        logger.error(f"Seatmap download failed for {venue_name}: {e}")
+        counts["failed"] = len(jobs)
+        return counts
+
+    workers = workers or min(os.cpu_count() or 1, len(jobs))
+    urls: Dict[str, str] = {}
+
+    def upload(section: str, img_bytes: bytes) -> Tuple[str, Optional[str]]:
+        return section, _upload_to_s3(img_bytes, f"seatmaps/{venue_key}_sec{section}.png")
+
+    with ThreadPoolExecutor(S3_UPLOAD_CONCURRENCY) as uploads:
+        pending = []
+        for section, img_bytes in _render_pins(png_bytes, jobs, workers):
+            if img_bytes is None:
+                counts["failed"] += 1
+                continue
+            counts["rendered"] += 1
+            pending.append(uploads.submit(upload, section, img_bytes))
+        for future in pending:
+            section, s3_url = future.result()
+            if s3_url:
+                urls[section] = s3_url
+            else:
+                counts["failed"] += 1
+    counts["uploaded"] = len(urls)
+    record_event("pins_rendered", counts["rendered"])
+
+    _store_pin_cache_many(venue_key, urls)
+    logger.info(f"Pre-rendered pins for {venue_name}: {counts}")
+    return counts
+
+
+# ── Main entry point (two-tier cached) ───────────────────────────────────────
+
+def generate_seat_view_image(
+    venue_name: str,
+    section: str,
+    row: str,
+    seat_number: str,
+) -> Optional[str]:
+    """
+    Generate a seatmap image with a pin on the given section.
+
+    Uses a two-tier cache strategy:
+      Tier 1 — SeatmapPinCache: check if the final pinned image already exists on S3.
+      Tier 2 — the seatmap service (memory, SeatmapCache, then Ticketmaster) for
+               the venue's section coordinates; download the PNG, draw the pin,
+               upload, and cache the result.
+
+    Returns a public image URL on success, or None if the venue/section is not available.
+    """
+    venue_key = normalize_venue_key(venue_name)
+    pin_key = f"{venue_key}_sec{section}"
+
+    # ── Tier 1: Do we already have the final pinned image? ──
+    cached_url = _lookup_pin_cache(pin_key)
+    if cached_url:
+        record_event("pin_cache_hits")
+        return cached_url
+
+    # ── Tier 2: The venue's seatmap, from the seatmap service ──
+    seatmap = get_seatmap_sync(venue_name)
+
+    if seatmap and seatmap.get("png_url"):
+        coords = seatmap.get("section_coords", {})
+        coord = coords.get(section)
+        if coord:
+            x, y = coord[0], coord[1]
+            img_bytes = _render_pin_on_seatmap(seatmap["png_url"], x, y)
+            if img_bytes:
+                s3_key = f"seatmaps/{venue_key}_sec{section}.png"
+                s3_url = _upload_to_s3(img_bytes, s3_key)
+                if s3_url:
+                    _store_pin_cache(pin_key, venue_key, section, s3_url)
+                    logger.info(f"Pinned seatmap uploaded and cached: {s3_url}")
+                    return s3_url
+
+    # Fallback: return the base seatmap PNG without a pin
+    if seatmap and seatmap.get("png_url"):
+        logger.info(f"Returning base seatmap (no pin) for {venue_name} section {section}")
+        return seatmap["png_url"]
+
+    logger.info(f"Seatmap not available for {venue_name} section {section}")
+    return None
@@ -0,0 +1,138 @@
+"""
+Seat-to-seat similarity, precomputed into SimilarSeats.
+
+Every seat of a venue is described by one feature vector:
+    ratings   - SeatAggregates avg_visual, avg_sound, avg_value, avg_overall
+    price     - log(1 + avg_price_paid), so a $40 gap matters more at $50 than at $500
+    geometry  - Seats.distance_to_stage, x, y
+Missing values (unreviewed seats, seats without a position) take the venue's
+mean for that feature. Each feature is standardized within the venue, and
+each group is weighted by FEATURE_WEIGHTS, so the three columns of geometry
+do not outvote the price.
+
+Neighbours are the k seats with the smallest Euclidean distance in that
+space, found with NumPy matrix products over blocks of rows. A block costs
+one (block x n) distance matrix, sized to about SIMILAR_BLOCK_CELLS cells,
+instead of a Python loop per seat pair. The score stored is
+1 / (1 + distance): 1.0 for identical seats, falling towards 0.
+
+Settings come from the environment (defaults in parentheses):
+    SIMILAR_SEATS_K         neighbours kept per seat (10)
+    SIMILAR_BLOCK_CELLS     distance-matrix cells computed at once (4,000,000)
+
+Public API:
+    seat_features(rows) -> (seat_ids, matrix)
+    top_k_neighbours(matrix, k) -> (indices, distances)   both (n, k), nearest first
+    rebuild_similar_seats(conn, venue_id=None, k=SIMILAR_SEATS_K) -> int
+"""
+
+import os
+from collections import defaultdict
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text
+
+SIMILAR_SEATS_K = int(os.getenv("SIMILAR_SEATS_K", "10"))
+SIMILAR_BLOCK_CELLS = int(os.getenv("SIMILAR_BLOCK_CELLS", str(4_000_000)))
+
+# Columns of the feature query after seat_id, and the weight of their group
+FEATURE_COLUMNS = ("avg_visual", "avg_sound", "avg_value", "avg_overall", "avg_price_paid", "distance_to_stage", "x", "y")
+FEATURE_WEIGHTS = {"ratings": 1.0, "price": 1.0, "geometry": 1.0}
+_GROUPS = ("ratings",) * 4 + ("price",) + ("geometry",) * 3
+
+_FEATURES_SQL = """
+    SELECT s.id, s.venue_id, sa.avg_visual, sa.avg_sound, sa.avg_value, sa.avg_overall, sa.avg_price_paid,
+           s.distance_to_stage, s.x, s.y
+    FROM Seats s
+    LEFT JOIN SeatAggregates sa ON sa.seat_id = s.id
+"""
+
+
+def seat_features(rows: Sequence[Sequence]) -> Tuple[List[str], np.ndarray]:
+    """
+    Weighted, standardized feature matrix (one row per seat) of one venue.
+    `rows` are (seat_id, *FEATURE_COLUMNS) with None for missing values.
+    """
+    seat_ids = [str(row[0]) for row in rows]
+    raw = np.array([[np.nan if v is None else float(v) for v in row[1:]] for row in rows], dtype=float)
+    raw = raw.reshape(len(rows), len(FEATURE_COLUMNS))
+    price = FEATURE_COLUMNS.index("avg_price_paid")
+    raw[:, price] = np.log1p(np.clip(raw[:, price], 0, None))
+
+    # Missing -> venue mean (0 when nobody has the feature); then z-scores
+    present = ~np.isnan(raw)
+    means = np.nansum(raw, axis=0) / np.maximum(present.sum(axis=0), 1)
+    filled = np.where(np.isnan(raw), means, raw)
+    spread = filled.std(axis=0)
+    scaled = (filled - means) / np.where(spread > 0, spread, 1.0)
+
+    # Each group counts once, however many columns it has
+    sizes = {group: _GROUPS.count(group) for group in FEATURE_WEIGHTS}
+    weights = np.array([FEATURE_WEIGHTS[group] / np.sqrt(sizes[group]) for group in _GROUPS])
+    return seat_ids, scaled * weights
+
+
+def top_k_neighbours(matrix: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Indices and Euclidean distances of each row's k nearest other rows,
+    nearest first. k is capped at n - 1.
+    """
+    n = matrix.shape[0]
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.empty((n, 0), dtype=int), np.empty((n, 0))
+    squared = np.einsum("ij,ij->i", matrix, matrix)
+    block = max(1, SIMILAR_BLOCK_CELLS // n)
+    indices = np.empty((n, k), dtype=int)
+    distances = np.empty((n, k))
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        # |a - b|^2 = |a|^2 + |b|^2 - 2 a.b for the whole block at once
+        d2 = squared[start:stop, None] + squared[None, :] - 2.0 * (matrix[start:stop] @ matrix.T)
+        np.maximum(d2, 0.0, out=d2)
+        rows = np.arange(stop - start)
+        d2[rows, rows + start] = np.inf  # a seat is not its own neighbour
+        nearest = np.argpartition(d2, k - 1, axis=1)[:, :k]
+        nearest_d2 = np.take_along_axis(d2, nearest, axis=1)
+        order = np.lexsort((nearest, nearest_d2), axis=1)
+        indices[start:stop] = np.take_along_axis(nearest, order, axis=1)
+        distances[start:stop] = np.sqrt(np.take_along_axis(nearest_d2, order, axis=1))
+    return indices, distances
+
+
+def rebuild_similar_seats(conn, venue_id: Optional[str] = None, k: int = SIMILAR_SEATS_K) -> int:
+    """
+    Recompute SimilarSeats for every venue, or only `venue_id`. Seats are
+    only compared within their venue. Returns the number of rows written.
+    """
+    params = {}
+    select_filter = delete_filter = ""
+    if venue_id is not None:
+        params["venue_id"] = str(venue_id)
+        select_filter = "WHERE s.venue_id = :venue_id"
+        delete_filter = "WHERE seat_id IN (SELECT id FROM Seats WHERE venue_id = :venue_id)"
+
+    by_venue = defaultdict(list)
+    for row in conn.execute(text(f"{_FEATURES_SQL} {select_filter}"), params).fetchall():
+        by_venue[row[1]].append((row[0], *row[2:]))
+
+    conn.execute(text(f"DELETE FROM SimilarSeats {delete_filter}"), params)
+    insert = text(
+        "INSERT INTO SimilarSeats (seat_id, similar_seat_id, similarity_score) "
+        "VALUES (:seat_id, :similar_seat_id, :similarity_score)"
+    )
+    written = 0
+    for rows in by_venue.values():
+        seat_ids, matrix = seat_features(rows)
+        indices, distances = top_k_neighbours(matrix, k)
+        scores = 1.0 / (1.0 + distances)
+        batch = [
+            {"seat_id": seat_ids[i], "similar_seat_id": seat_ids[j], "similarity_score": round(float(score), 6)}
+            for i in range(len(seat_ids))
+            for j, score in zip(indices[i].tolist(), scores[i].tolist())
+        ]
+        if batch:
+            conn.execute(insert, batch)
+            written += len(batch)
+    return written
@@ -0,0 +1,318 @@
+"""
+In-process prefix index for search-box autocomplete.
+
+Venue names, event names and artists are loaded once into a trie whose
+nodes each cache the top suggestions of their subtree (ranked by review
+count), so a lookup is a walk of len(prefix) dict hops with no database
+round trip and no subtree scan.
+
+Every word start of a name is indexed, so "arena" suggests
+"Scotiabank Arena". Identical event names (one tour at many venues) are
+collapsed into one suggestion.
+
+Public API:
+    SuggestionIndex             - the trie itself
+    get_suggestions(q, limit, kind=None) - top matches from the shared index
+    invalidate_suggestions()    - mark the shared index stale after a write
+    record_review_counts(counts) - re-rank after reviews were added or deleted
+    refresh_suggestions()       - rebuild the shared index now
+    warm_suggestions()          - build it in the background (app startup)
+
+The old index keeps serving while a background thread rebuilds it after a
+write; it is also rebuilt once it is older than SUGGEST_INDEX_TTL seconds so
+changes made outside the API are picked up. Review writes only change
+weights, so they re-rank the affected venue, event and artist in place
+instead; only a deletion whose outcome depends on suggestions outside a
+node's top list falls back to a rebuild.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+MAX_SUGGESTIONS = 10
+SUGGESTION_TYPES = ("venue", "event", "artist")
+# Longer prefixes stop at this depth and are filtered against the full text
+MAX_PREFIX_DEPTH = 24
+SUGGEST_INDEX_TTL = int(os.getenv("SUGGEST_INDEX_TTL", "600"))
+
+_WORD_START_RE = re.compile(r"(?:^|\s)(?=\S)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize(value: str) -> str:
+    return _SPACE_RE.sub(" ", value.casefold()).strip()
+
+
+def _rank(suggestion: dict):
+    return -suggestion["weight"], suggestion["text"]
+
+
+class _Node:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.top: List[dict] = []
+
+
+class SuggestionIndex:
+    """
+    Trie of normalized keys -> suggestion dicts. Each suggestion must carry
+    a numeric "weight"; heavier suggestions are returned first.
+    """
+
+    def __init__(self, suggestions: Iterable[dict] = ()):
+        self._root = _Node()
+        self.size = 0
+        # Inserting in descending weight order means each node's top list is
+        # final as soon as it fills up; no re-sorting is ever needed.
+        for suggestion in sorted(suggestions, key=_rank):
+            self._insert(suggestion)
+
+    def _insert(self, suggestion: dict) -> None:
+        if not normalize(suggestion["text"]):
+            return
+        self.size += 1
+        for key in self._keys(suggestion):
+            node = self._root
+            for ch in key:
+                node = node.children.setdefault(ch, _Node())
+                # The same suggestion reaches a node at most once per key,
+                # and all of its keys are inserted back to back
+                if len(node.top) < MAX_SUGGESTIONS and (not node.top or node.top[-1] is not suggestion):
+                    node.top.append(suggestion)
+
+    def _keys(self, suggestion: dict) -> Iterable[str]:
+        name = normalize(suggestion["text"])
+        for start in (m.start() for m in _WORD_START_RE.finditer(name)):
+            yield name[start:].lstrip()[:MAX_PREFIX_DEPTH]
+
+    def reweigh(self, suggestion: dict) -> bool:
+        """
+        Re-rank an indexed suggestion after its "weight" changed. Returns
+        False when a node's top list can no longer be known without the rest
+        of its subtree (the suggestion dropped to the last place of a full
+        list), in which case the index must be rebuilt.
+        """
+        exact = True
+        for key in self._keys(suggestion):
+            node = self._root
+            for ch in key:
+                node = node.children.get(ch)
+                if node is None:
+                    break
+                if any(s is suggestion for s in node.top):
+                    top = sorted(node.top, key=_rank)
+                    if len(top) == MAX_SUGGESTIONS and top[-1] is suggestion:
+                        exact = False
+                elif len(node.top) == MAX_SUGGESTIONS and _rank(suggestion) < _rank(node.top[-1]):
+                    top = sorted(node.top[:-1] + [suggestion], key=_rank)
+                else:
+                    continue
+                # Readers may be walking the old list; swap in a new one
+                node.top = top
+        return exact
+
+    def lookup(self, prefix: str, limit: int = MAX_SUGGESTIONS) -> List[dict]:
+        """Top `limit` suggestions having a word that starts with `prefix`."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        node = self._root
+        for ch in prefix[:MAX_PREFIX_DEPTH]:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        matches = node.top
+        if len(prefix) > MAX_PREFIX_DEPTH:
+            matches = [m for m in matches if f" {prefix}" in f" {normalize(m['text'])}"]
+        return matches[:limit]
+
+
+# ---------------------------------------------------------------------------
+# Loading from the database
+# ---------------------------------------------------------------------------
+
+def load_suggestions(conn) -> List[dict]:
+    """Read venues, events and artists with their review counts as suggestions."""
+    return _load(conn)[0]
+
+
+def _load(conn) -> Tuple[List[dict], Dict[str, List[dict]]]:
+    """Suggestions, plus the event and artist suggestions each event id counts towards."""
+    suggestions = []
+    by_event: Dict[str, List[dict]] = defaultdict(list)
+
+    venue_rows = conn.execute(text("""
+        SELECT v.id, v.name, v.city, COALESCE(va.review_count, 0)
+        FROM Venues v
+        LEFT JOIN VenueAggregates va ON va.venue_id = v.id
+    """)).fetchall()
+    for venue_id, name, city, review_count in venue_rows:
+        if name:
+            suggestions.append({
+                "type": "venue", "id": str(venue_id), "text": name, "subtitle": city,
+                "weight": int(review_count or 0),
+            })
+
+    event_rows = conn.execute(text("""
+        SELECT e.id, e.name, e.artist, COUNT(r.id)
+        FROM Events e
+        LEFT JOIN Reviews r ON r.event_id = e.id
+        GROUP BY e.id, e.name, e.artist
+    """)).fetchall()
+
+    # Collapse repeated event names and artists, keeping the most reviewed event's id
+    events: Dict[str, dict] = {}
+    artists: Dict[str, dict] = {}
+    artist_events: Dict[str, int] = defaultdict(int)
+    for event_id, name, artist, review_count in event_rows:
+        review_count = int(review_count or 0)
+        if name:
+            entry = events.setdefault(normalize(name), {
+                "type": "event", "id": str(event_id), "text": name, "subtitle": artist,
+                "weight": 0, "best": -1,
+            })
+            entry["weight"] += review_count
+            if review_count > entry["best"]:
+                entry.update(id=str(event_id), best=review_count)
+            by_event[str(event_id)].append(entry)
+        if artist:
+            key = normalize(artist)
+            entry = artists.setdefault(key, {"type": "artist", "id": None, "text": artist, "weight": 0})
+            entry["weight"] += review_count
+            artist_events[key] += 1
+            by_event[str(event_id)].append(entry)
+
+    for entry in events.values():
+        entry.pop("best")
+        suggestions.append(entry)
+    for key, entry in artists.items():
+        count = artist_events[key]
+        entry["subtitle"] = f"{count} event{'s' if count != 1 else ''}"
+        suggestions.append(entry)
+    return suggestions, dict(by_event)
+
+
+# ---------------------------------------------------------------------------
+# Shared index
+# ---------------------------------------------------------------------------
+
+# One trie over every suggestion plus one per type, keyed "all" / type
+_indexes: Optional[Dict[str, SuggestionIndex]] = None
+_built_at = 0.0
+_stale = False
+_rebuilding = False
+_lock = threading.Lock()
+# The suggestions a review at a venue / of an event adds weight to
+_by_venue: Dict[str, dict] = {}
+_by_event: Dict[str, List[dict]] = {}
+
+
+def refresh_suggestions() -> Dict[str, SuggestionIndex]:
+    """Rebuild the shared indexes from the database and swap them in."""
+    global _indexes, _built_at, _stale, _by_venue, _by_event
+    from ..database import engine
+
+    with _lock:
+        _stale = False
+    with engine.connect() as conn:
+        suggestions, by_event = _load(conn)
+    indexes = {"all": SuggestionIndex(suggestions)}
+    for kind in SUGGESTION_TYPES:
+        indexes[kind] = SuggestionIndex(s for s in suggestions if s["type"] == kind)
+    with _lock:
+        _indexes, _built_at = indexes, time.monotonic()
+        _by_venue = {s["id"]: s for s in suggestions if s["type"] == "venue"}
+        _by_event = by_event
+    logger.info("Suggestion index rebuilt: %d entries", indexes["all"].size)
+    return indexes
+
+
+def _rebuild_in_background() -> None:
+    global _rebuilding
+    try:
+        # Writes that land during a rebuild mark the index stale again
+        while True:
+            refresh_suggestions()
+            with _lock:
+                if not _stale:
+                    break
+    except Exception as e:
+        logger.error("Suggestion index rebuild failed: %s", e)
+    finally:
+        with _lock:
+            _rebuilding = False
+
+
+def _start_rebuild_locked() -> None:
+    global _rebuilding
+    _rebuilding = True
+    threading.Thread(target=_rebuild_in_background, daemon=True).start()
+
+
+def warm_suggestions() -> None:
+    """Build the shared index in the background (called at startup)."""
+    with _lock:
+        if not _rebuilding:
+            _start_rebuild_locked()
+
+
+def invalidate_suggestions() -> None:
+    """Mark the shared index stale after a write and rebuild it in the background."""
+    global _stale
+    with _lock:
+        _stale = True
+        if _indexes is not None and not _rebuilding:
+            _start_rebuild_locked()
+
+
+def record_review_counts(counts: Dict[Tuple[Optional[str], Optional[str]], int]) -> None:
+    """
+    Re-rank after reviews were written: `counts` maps (venue_id, event_id)
+    to the number of reviews added (negative when deleted). Only the
+    affected venue, event and artist suggestions are touched; the index is
+    rebuilt in the background only when a re-rank cannot be done in place.
+    An event name shared by several events keeps the id it was built with
+    until the next rebuild.
+    """
+    global _stale
+    with _lock:
+        if _indexes is None:
+            return
+        exact = True
+        for (venue_id, event_id), delta in counts.items():
+            touched = [_by_venue.get(str(venue_id))] + _by_event.get(str(event_id), [])
+            for suggestion in touched:
+                if suggestion is None or not delta:
+                    continue
+                suggestion["weight"] += delta
+                for index in (_indexes["all"], _indexes[suggestion["type"]]):
+                    exact = index.reweigh(suggestion) and exact
+        # A rebuild already running may have read the counts before this write
+        if not exact or _rebuilding:
+            _stale = True
+            if not _rebuilding:
+                _start_rebuild_locked()
+
+
+def get_suggestions(q: str, limit: int = MAX_SUGGESTIONS, kind: Optional[str] = None) -> List[dict]:
+    """
+    Top suggestions for prefix `q`, optionally only of one type; builds the
+    index synchronously on first use.
+    """
+    indexes = _indexes or refresh_suggestions()
+    with _lock:
+        expired = time.monotonic() - _built_at > SUGGEST_INDEX_TTL
+        if (_stale or expired) and not _rebuilding:
+            _start_rebuild_locked()
+    return indexes[kind or "all"].lookup(q, limit)
@@ -0,0 +1,279 @@
+"""
+One-pass extraction of section geometry from Ticketmaster seatmap SVGs.
+
+The SVG is read with expat, an incremental XML parser that can be fed in
+chunks and builds no tree. A multi-megabyte arena map is scanned once and is
+never held as a DOM. Sections come from:
+    <path id="..." d="...">    - centroid and bounding box of the outline
+    <text x=".." y="..">label  - the label position, if no path has that id
+
+Path data is walked command by command. That covers absolute and relative
+M/L/H/V/C/S/Q/T/A/Z and implicit repeats. Curves are flattened into
+CURVE_STEPS segments, and arcs are reduced to their end points. The centroid
+is the area (shoelace) centroid of the flattened outline. A plain average
+of the path's numbers would be pulled toward whichever edge has the most
+points, and would mix control points and relative offsets in with real
+coordinates.
+
+Geometry is in PNG pixels (SVG units divided by `scale`), as a list of ints:
+    [cx, cy]                              - text labels
+    [cx, cy, min_x, min_y, max_x, max_y]  - paths
+The first two items are always the pin position.
+
+Public API:
+    SectionGeometryParser(scale=1)         - feed(chunk) ... close() -> {section: geometry}
+    extract_section_geometry(svg, scale=1) -> {section: geometry}
+    path_geometry(d) -> ((cx, cy), (min_x, min_y, max_x, max_y)) | None
+"""
+
+import logging
+import math
+import re
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from xml.parsers import expat
+
+logger = logging.getLogger(__name__)
+
+CURVE_STEPS = 4
+
+_COMMAND_RE = re.compile(r"([MmZzLlHhVvCcSsQqTtAa])")
+_NUMBER_RE = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_ARITY = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6, "S": 4, "Q": 4, "T": 2, "A": 7, "Z": 0}
+_ARITY.update({command.lower(): arity for command, arity in list(_ARITY.items())})
+
+Point = Tuple[float, float]
+
+
+# ---------------------------------------------------------------------------
+# Path data
+# ---------------------------------------------------------------------------
+
+def _numbers(params: str) -> List[float]:
+    """The numbers of one command's parameters."""
+    try:
+        # Separated numbers, by far the common case: no regex needed
+        return [float(n) for n in params.replace(",", " ").split()]
+    except ValueError:
+        # Compact forms such as "10-5" or "1.5.5"
+        return [float(n) for n in _NUMBER_RE.findall(params)]
+
+
+def _path_commands(d: str) -> Iterable[Tuple[str, List[float]]]:
+    """(command, args) pairs of a path's data, with implicit repeats split out."""
+    parts = _COMMAND_RE.split(d)
+    for i in range(1, len(parts), 2):
+        command = parts[i]
+        arity = _ARITY[command]
+        if arity == 0:
+            yield command, []
+            continue
+        numbers = _numbers(parts[i + 1])
+        if len(numbers) == arity:
+            yield command, numbers
+            continue
+        for j in range(0, len(numbers) - arity + 1, arity):
+            yield command, numbers[j:j + arity]
+            # Extra coordinate pairs after a moveto are linetos
+            if command in "Mm":
+                command = "L" if command == "M" else "l"
+
+
+# Bernstein weights of the control points at t = 1/CURVE_STEPS ... 1
+_QUADRATIC_WEIGHTS = [
+    ((1 - t) ** 2, 2 * (1 - t) * t, t * t)
+    for t in (step / CURVE_STEPS for step in range(1, CURVE_STEPS + 1))
+]
+_CUBIC_WEIGHTS = [
+    ((1 - t) ** 3, 3 * (1 - t) ** 2 * t, 3 * (1 - t) * t * t, t ** 3)
+    for t in (step / CURVE_STEPS for step in range(1, CURVE_STEPS + 1))
+]
+
+
+class _Outline:
+    """
+    Running area, moments and bounding box of a path's flattened subpaths.
+    Points are kept as two flat lists, one subpath at a time.
+    """
+
+    def __init__(self):
+        self.area = self.moment_x = self.moment_y = 0.0
+        self.bbox = [math.inf, math.inf, -math.inf, -math.inf]
+        self.count = 0
+        self.sum_x = self.sum_y = 0.0
+        self.xs: List[float] = []
+        self.ys: List[float] = []
+
+    def close_subpath(self, x: float, y: float) -> None:
+        """Add the current subpath (if it has an edge) and start a new one at (x, y)."""
+        xs, ys = self.xs, self.ys
+        if len(xs) > 1:
+            area = moment_x = moment_y = 0.0
+            x0, y0 = xs[-1], ys[-1]
+            for x1, y1 in zip(xs, ys):
+                cross = x0 * y1 - x1 * y0
+                area += cross
+                moment_x += (x0 + x1) * cross
+                moment_y += (y0 + y1) * cross
+                x0, y0 = x1, y1
+            self.area += area
+            self.moment_x += moment_x
+            self.moment_y += moment_y
+            bbox = self.bbox
+            bbox[0], bbox[1] = min(bbox[0], min(xs)), min(bbox[1], min(ys))
+            bbox[2], bbox[3] = max(bbox[2], max(xs)), max(bbox[3], max(ys))
+            self.count += len(xs)
+            self.sum_x += sum(xs)
+            self.sum_y += sum(ys)
+        self.xs, self.ys = [x], [y]
+
+
+def path_geometry(d: str) -> Optional[Tuple[Point, Tuple[float, float, float, float]]]:
+    """Area centroid and bounding box of a path outline, in SVG units; None if it has no points."""
+    outline = _Outline()
+    x = y = 0.0
+    start = (0.0, 0.0)
+    control: Optional[Point] = None  # last curve control point, for S / T
+    previous = ""
+    for command, args in _path_commands(d):
+        upper = command.upper()
+        dx, dy = (x, y) if command != upper else (0.0, 0.0)
+        if upper == "L":
+            x, y = args[0] + dx, args[1] + dy
+            outline.xs.append(x)
+            outline.ys.append(y)
+        elif upper == "M":
+            x, y = args[0] + dx, args[1] + dy
+            start = (x, y)
+            outline.close_subpath(x, y)
+        elif upper == "Z":
+            x, y = start
+            outline.close_subpath(x, y)
+        elif upper in "HVA":
+            if upper == "H":
+                x = args[0] + dx
+            elif upper == "V":
+                y = args[0] + dy
+            else:
+                # End point only: an arc's own geometry barely moves a section centroid
+                x, y = args[5] + dx, args[6] + dy
+            outline.xs.append(x)
+            outline.ys.append(y)
+        else:
+            if upper == "C":
+                x1, y1, x2, y2 = args[0] + dx, args[1] + dy, args[2] + dx, args[3] + dy
+                end = (args[4] + dx, args[5] + dy)
+                control = (x2, y2)
+            elif upper == "S":
+                x1, y1 = (2 * x - control[0], 2 * y - control[1]) if control and previous in "CcSs" else (x, y)
+                x2, y2 = args[0] + dx, args[1] + dy
+                end = (args[2] + dx, args[3] + dy)
+                control = (x2, y2)
+            elif upper == "Q":
+                x1, y1 = args[0] + dx, args[1] + dy
+                end = (args[2] + dx, args[3] + dy)
+                control = (x1, y1)
+            else:  # T
+                x1, y1 = (2 * x - control[0], 2 * y - control[1]) if control and previous in "QqTt" else (x, y)
+                end = (args[0] + dx, args[1] + dy)
+                control = (x1, y1)
+            x3, y3 = end
+            if upper in "CS":
+                outline.xs.extend(a * x + b * x1 + c * x2 + e * x3 for a, b, c, e in _CUBIC_WEIGHTS)
+                outline.ys.extend(a * y + b * y1 + c * y2 + e * y3 for a, b, c, e in _CUBIC_WEIGHTS)
+            else:
+                outline.xs.extend(a * x + b * x1 + c * x3 for a, b, c in _QUADRATIC_WEIGHTS)
+                outline.ys.extend(a * y + b * y1 + c * y3 for a, b, c in _QUADRATIC_WEIGHTS)
+            x, y = end
+        previous = command
+    outline.close_subpath(x, y)
+
+    if not outline.count:
+        return None
+    if abs(outline.area) > 1e-9:
+        centroid = (outline.moment_x / (3 * outline.area), outline.moment_y / (3 * outline.area))
+    else:
+        # A line or a point: no area to weigh by
+        centroid = (outline.sum_x / outline.count, outline.sum_y / outline.count)
+    return centroid, tuple(outline.bbox)
+
+
+# ---------------------------------------------------------------------------
+# SVG document
+# ---------------------------------------------------------------------------
+
+def _first_number(value: Optional[str]) -> Optional[float]:
+    """x="12" or a per-glyph list x="12 19 26" -> 12.0"""
+    match = _NUMBER_RE.search(value or "")
+    return float(match.group()) if match else None
+
+
+class SectionGeometryParser:
+    """Incremental parser: feed() the SVG in chunks, then close() for the sections."""
+
+    def __init__(self, scale: float = 1):
+        self.scale = scale
+        # expat calls back per element and builds no tree
+        self._parser = expat.ParserCreate(namespace_separator=" ")
+        self._parser.buffer_text = True
+        # End and character callbacks are only installed inside a <text>
+        self._parser.StartElementHandler = self._start
+        self._paths: Dict[str, List[int]] = {}
+        self._labels: Dict[str, List[int]] = {}
+        self._text: Optional[Tuple[float, float, List[str]]] = None  # the open <text>
+        self._broken = False
+
+    def _pixels(self, *values: float) -> List[int]:
+        return [int(round(value / self.scale)) for value in values]
+
+    def _start(self, tag: str, attrs: Dict[str, str]) -> None:
+        tag = tag.rpartition(" ")[2]
+        if tag == "path":
+            section, d = attrs.get("id"), attrs.get("d")
+            if section and d and section not in self._paths:
+                geometry = path_geometry(d)
+                if geometry:
+                    (cx, cy), bbox = geometry
+                    self._paths[section] = self._pixels(cx, cy, *bbox)
+        elif tag == "text":
+            x, y = _first_number(attrs.get("x")), _first_number(attrs.get("y"))
+            if x is not None and y is not None:
+                self._text = (x, y, [])
+                self._parser.CharacterDataHandler = self._text[2].append
+                self._parser.EndElementHandler = self._end
+
+    def _end(self, tag: str) -> None:
+        if tag.rpartition(" ")[2] == "text":
+            x, y, parts = self._text
+            self._text = None
+            self._parser.CharacterDataHandler = None
+            self._parser.EndElementHandler = None
+            label = "".join(parts).strip()
+            if label and label not in self._labels:
+                self._labels[label] = self._pixels(x, y)
+
+    def _parse(self, data: Union[str, bytes], final: bool) -> None:
+        if self._broken:
+            return
+        try:
+            self._parser.Parse(data, final)
+        except expat.ExpatError as e:
+            # Keep what was read before the error
+            logger.warning("Seatmap SVG is not well-formed after %d sections: %s", len(self._paths) + len(self._labels), e)
+            self._broken = True
+
+    def feed(self, chunk: Union[str, bytes]) -> None:
+        self._parse(chunk, False)
+
+    def close(self) -> Dict[str, List[int]]:
+        self._parse(b"", True)
+        sections = {label: xy for label, xy in self._labels.items() if label not in self._paths}
+        sections.update(self._paths)
+        return sections
+
+
+def extract_section_geometry(svg: Union[str, bytes, Iterable], scale: float = 1) -> Dict[str, List[int]]:
+    """Section geometry of a whole SVG document, or of an iterable of its chunks."""
+    parser = SectionGeometryParser(scale)
+    for chunk in ([svg] if isinstance(svg, (str, bytes)) else svg):
+        parser.feed(chunk)
+    return parser.close()
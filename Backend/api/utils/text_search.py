@@ -0,0 +1,259 @@
+"""
+Ranked, typo-tolerant text search for venues and events.
+
+One interface over two index backends:
+    PostgreSQL - pg_trgm GIN indexes (word similarity, substring LIKE) plus a
+                 'simple' tsvector GIN index for whole-word matches
+    SQLite     - FTS5 trigram tables kept in sync by triggers; candidates are
+                 rows sharing enough trigrams with the query, then filtered
+                 by the same similarity measure, registered as a Python
+                 SQL function
+
+Searchable documents:
+    Events - event name + artist (+ the venue's document, via venue_id)
+    Venues - venue name + city
+
+Public API:
+    event_match(conn, q, params, table="Events") -> (condition, score)
+    venue_match(conn, q, params, alias="v") -> (condition, score)
+    ensure_search_indexes(conn)
+    ensure_venue_id_indexes(conn, concurrently=False)
+    rebuild_search_index(conn)
+    register_sqlite_functions(dbapi_conn, connection_record=None)
+
+The match helpers return a WHERE condition and a relevance expression in
+[0, 1]; their bind params are added to `params`.
+"""
+
+import math
+import re
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from sqlalchemy import text
+
+# Same default as pg_trgm.word_similarity_threshold, so both backends agree
+SIMILARITY_THRESHOLD = 0.6
+
+# The search joins and the AI tools filter these tables by venue id. Postgres
+# Seats has no UNIQUE(venue_id, ...) index to lean on, so every dialect gets
+# an explicit one.
+VENUE_ID_INDEXES = (
+    ("idx_events_venue_id", "Events"),
+    ("idx_seats_venue_id", "Seats"),
+    ("idx_reviews_venue_id", "Reviews"),
+)
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def event_document(prefix: str = "") -> str:
+    return f"LOWER(COALESCE({prefix}name, '') || ' ' || COALESCE({prefix}artist, ''))"
+
+
+def venue_document(prefix: str = "") -> str:
+    return f"LOWER(COALESCE({prefix}name, '') || ' ' || COALESCE({prefix}city, ''))"
+
+
+# ---------------------------------------------------------------------------
+# Trigram similarity (pg_trgm semantics, used as a SQL function on SQLite)
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=1024)
+def _trigrams(value: str) -> FrozenSet[str]:
+    """pg_trgm-style trigrams: each word is padded with two leading and one trailing space."""
+    grams = set()
+    for word in _WORD_RE.findall(value.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def word_similarity(query: Optional[str], document: Optional[str]) -> float:
+    """Share of the query's trigrams found in the document (0..1)."""
+    if not query or not document:
+        return 0.0
+    wanted = _trigrams(query)
+    if not wanted:
+        return 0.0
+    # Joining the words with double spaces makes every padded trigram of the
+    # document a substring, so membership is a cheap `in` test per trigram
+    # (this runs once per candidate row on SQLite).
+    padded = "  " + "  ".join(_WORD_RE.findall(document.lower())) + " "
+    return sum(1 for gram in wanted if gram in padded) / len(wanted)
+
+
+def register_sqlite_functions(dbapi_conn, connection_record=None) -> None:
+    """SQLAlchemy "connect" listener exposing word_similarity() to SQLite."""
+    dbapi_conn.create_function("word_similarity", 2, word_similarity, deterministic=True)
+
+
+def _fts_terms(q: str) -> Tuple[List[str], int]:
+    """
+    The query's unpadded trigrams (the terms the FTS5 trigram tokenizer
+    indexes) and how many of them a row must share to possibly reach
+    SIMILARITY_THRESHOLD. Lets the FTS index discard hopeless rows before
+    word_similarity() runs.
+    """
+    terms = []
+    for word in _WORD_RE.findall(q.lower()):
+        terms.extend(word[i:i + 3] for i in range(len(word) - 2))
+    terms = list(dict.fromkeys(terms))
+    padded_count = len(_trigrams(q))
+    allowed_missing = padded_count - math.ceil(SIMILARITY_THRESHOLD * padded_count)
+    return terms, max(1, len(terms) - allowed_missing)
+
+
+# ---------------------------------------------------------------------------
+# Query building
+# ---------------------------------------------------------------------------
+
+def _bind(conn, q: str, params: Dict[str, Any]) -> List[str]:
+    params["search_q"] = q.lower()
+    params["search_like"] = f"%{q.lower()}%"
+    if conn.dialect.name == "postgresql":
+        return []
+    terms, min_terms = _fts_terms(q)
+    for i, term in enumerate(terms):
+        params[f"search_term_{i}"] = term
+    params["search_min_terms"] = min_terms
+    return [f":search_term_{i}" for i in range(len(terms))]
+
+
+def _document_match(conn, document: str, fts_table: str, rowid_col: str, terms: List[str]) -> str:
+    if conn.dialect.name == "postgresql":
+        return (
+            f"(:search_q <% {document}"
+            f" OR {document} LIKE :search_like"
+            f" OR to_tsvector('simple', {document}) @@ plainto_tsquery('simple', :search_q))"
+        )
+    if not terms:
+        # Too short for trigrams: plain substring match
+        return f"({document} LIKE :search_like)"
+    return (
+        f"({rowid_col} IN (SELECT doc FROM {fts_table}Terms WHERE term IN ({', '.join(terms)})"
+        f" GROUP BY doc HAVING COUNT(DISTINCT term) >= :search_min_terms)"
+        f" AND (word_similarity(:search_q, {document}) >= {SIMILARITY_THRESHOLD}"
+        f" OR {document} LIKE :search_like))"
+    )
+
+
+def venue_match(conn, q: str, params: Dict[str, Any], alias: str = "v") -> Tuple[str, str]:
+    """Condition and relevance expression for venues whose name or city matches q."""
+    terms = _bind(conn, q, params)
+    document = venue_document(f"{alias}.")
+    condition = _document_match(conn, document, "VenuesFTS", f"{alias}.rowid", terms)
+    return condition, f"word_similarity(:search_q, {document})"
+
+
+def event_match(conn, q: str, params: Dict[str, Any], table: str = "Events") -> Tuple[str, str]:
+    """
+    Condition and relevance expression for events whose name or artist
+    matches q, or which take place at a venue whose name or city does.
+    """
+    terms = _bind(conn, q, params)
+    document = event_document(f"{table}.")
+    venue_doc = venue_document("sv.")
+    condition = (
+        f"({_document_match(conn, document, 'EventsFTS', f'{table}.rowid', terms)}"
+        f" OR {table}.venue_id IN (SELECT sv.id FROM Venues sv"
+        f" WHERE {_document_match(conn, venue_doc, 'VenuesFTS', 'sv.rowid', terms)}))"
+    )
+    greatest = "GREATEST" if conn.dialect.name == "postgresql" else "MAX"
+    score = (
+        f"{greatest}(word_similarity(:search_q, {document}),"
+        f" COALESCE((SELECT word_similarity(:search_q, {venue_doc}) FROM Venues sv"
+        f" WHERE sv.id = {table}.venue_id), 0))"
+    )
+    return condition, score
+
+
+# ---------------------------------------------------------------------------
+# Index maintenance
+# ---------------------------------------------------------------------------
+
+def ensure_venue_id_indexes(conn, concurrently: bool = False) -> None:
+    """
+    Create the venue_id indexes if missing. `concurrently` builds them
+    without blocking writes on Postgres (needs an autocommit connection),
+    first dropping any left INVALID by an interrupted concurrent build, which
+    IF NOT EXISTS would otherwise keep forever.
+    """
+    mode = "CONCURRENTLY " if concurrently and conn.dialect.name == "postgresql" else ""
+    if mode:
+        invalid = conn.execute(text("""
+            SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE NOT i.indisvalid AND c.relname = ANY(:names)
+        """), {"names": [name for name, _ in VENUE_ID_INDEXES]}).scalars().all()
+        for name in invalid:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    for name, table in VENUE_ID_INDEXES:
+        conn.execute(text(f"CREATE INDEX {mode}IF NOT EXISTS {name} ON {table} (venue_id)"))
+
+
+def ensure_search_indexes(conn) -> None:
+    """Create the search indexes (and on SQLite, backfill the FTS tables if stale)."""
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        for table, document in (("Events", event_document()), ("Venues", venue_document())):
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS idx_{table.lower()}_search_trgm "
+                f"ON {table} USING GIN ({document} gin_trgm_ops)"
+            ))
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS idx_{table.lower()}_search_tsv "
+                f"ON {table} USING GIN (to_tsvector('simple', {document}))"
+            ))
+        ensure_venue_id_indexes(conn)
+        return
+
+    ensure_venue_id_indexes(conn)
+
+    for table, fts_table, document in (
+        ("Events", "EventsFTS", event_document),
+        ("Venues", "VenuesFTS", venue_document),
+    ):
+        columns = "name, artist" if table == "Events" else "name, city"
+        prefix = table.lower()
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(document, tokenize='trigram')"
+        ))
+        # Per-row term listing, used to count shared trigrams per candidate
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table}Terms USING fts5vocab({fts_table}, instance)"
+        ))
+        conn.execute(text(f"""
+            CREATE TRIGGER IF NOT EXISTS {prefix}_fts_insert AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts_table} (rowid, document) VALUES (NEW.rowid, {document('NEW.')});
+            END;
+        """))
+        conn.execute(text(f"""
+            CREATE TRIGGER IF NOT EXISTS {prefix}_fts_delete AFTER DELETE ON {table} BEGIN
+                DELETE FROM {fts_table} WHERE rowid = OLD.rowid;
+            END;
+        """))
+        conn.execute(text(f"""
+            CREATE TRIGGER IF NOT EXISTS {prefix}_fts_update AFTER UPDATE OF {columns} ON {table} BEGIN
+                DELETE FROM {fts_table} WHERE rowid = OLD.rowid;
+                INSERT INTO {fts_table} (rowid, document) VALUES (NEW.rowid, {document('NEW.')});
+            END;
+        """))
+        indexed = conn.execute(text(f"SELECT COUNT(*) FROM {fts_table}")).scalar()
+        if indexed != conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar():
+            _rebuild_fts(conn, table, fts_table, document())
+
+
+def _rebuild_fts(conn, table: str, fts_table: str, document: str) -> None:
+    conn.execute(text(f"DELETE FROM {fts_table}"))
+    conn.execute(text(f"INSERT INTO {fts_table} (rowid, document) SELECT rowid, {document} FROM {table}"))
+
+
+def rebuild_search_index(conn) -> None:
+    """
+    Recreate the search indexes from scratch. On SQLite this repopulates the
+    FTS tables, which is needed after a VACUUM (it may renumber rowids).
+    """
+    ensure_search_indexes(conn)
+    if conn.dialect.name != "postgresql":
+        _rebuild_fts(conn, "Events", "EventsFTS", event_document())
+        _rebuild_fts(conn, "Venues", "VenuesFTS", venue_document())
@@ -0,0 +1,177 @@
+"""
+In-process resolver from free-text venue names to venue ids.
+
+The AI assistant's tools receive venue names as the model wrote them ("the
+scotiabank arena", "MSG", "Rogers Center"). Rather than filtering each tool
+query with `v.name ILIKE '%name%'` (a scan of Venues per call), names are
+resolved against an in-memory index of every venue and the tools query by
+venue id.
+
+A name is normalized (case, accents, punctuation, "&" / "and", a leading
+"the", British / American spellings of centre and theatre) and resolved by,
+in order:
+    1. alias        - the normalized venue name, "<name> <city>", or the
+                      initials of a name of three or more words ("msg")
+    2. substring    - of a normalized name, what ILIKE '%name%' matched
+    3. fuzzy        - trigram word similarity, both ways, between the query
+                      and "<name> <city>" of at least
+                      text_search.SIMILARITY_THRESHOLD, for typos
+Several matches are ranked by match quality, then by review count.
+
+Settings come from the environment (defaults in parentheses):
+    VENUE_RESOLVER_TTL   seconds before the index is rebuilt to pick up venues
+                         written outside the API (600)
+
+Public API:
+    normalize_venue_name(value) -> str
+    VenueResolver                           - the index itself
+    resolve_venue(name) -> Optional[str]    - id of the best match
+    resolve_venues(name, limit=5) -> list   - ids of the matches, best first
+    invalidate_venue_names()                - rebuild after venues are written
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from .text_search import SIMILARITY_THRESHOLD, word_similarity
+
+logger = logging.getLogger(__name__)
+
+VENUE_RESOLVER_TTL = int(os.getenv("VENUE_RESOLVER_TTL", "600"))
+
+_WORD_RE = re.compile(r"[^\W_]+")
+_SPELLINGS = {"centre": "center", "theatre": "theater"}
+# Left out of initials: "Madison Square Garden" -> "msg", "Hall of Fame Arena" -> "hfa"
+_MINOR_WORDS = {"of", "and", "at", "on", "in"}
+
+
+def normalize_venue_name(value: Optional[str]) -> str:
+    """Accent-, case- and punctuation-folded words, without a leading "the"."""
+    if not value:
+        return ""
+    value = unicodedata.normalize("NFKD", value.replace("&", " and "))
+    value = "".join(ch for ch in value if not unicodedata.combining(ch)).casefold()
+    words = [_SPELLINGS.get(word, word) for word in _WORD_RE.findall(value)]
+    if len(words) > 1 and words[0] == "the":
+        words = words[1:]
+    return " ".join(words)
+
+
+class VenueResolver:
+    """
+    Index of venues for name resolution. `venues` are (id, name, city,
+    review_count) tuples.
+    """
+
+    def __init__(self, venues: Iterable[Tuple] = ()):
+        # (id, normalized name, normalized "name city", review count)
+        self._venues: List[Tuple[str, str, str, int]] = []
+        self._aliases: Dict[str, List[int]] = {}
+        for venue_id, name, city, review_count in venues:
+            key = normalize_venue_name(name)
+            if not key:
+                continue
+            document = f"{key} {normalize_venue_name(city)}".strip()
+            position = len(self._venues)
+            self._venues.append((str(venue_id), key, document, int(review_count or 0)))
+            words = [word for word in key.split() if word not in _MINOR_WORDS]
+            aliases = {key, document}
+            if len(words) >= 3:
+                aliases.add("".join(word[0] for word in words))
+            for alias in aliases:
+                self._aliases.setdefault(alias, []).append(position)
+        self.size = len(self._venues)
+
+    def _ranked(self, positions: Iterable[int], limit: int) -> List[str]:
+        ordered = sorted(positions, key=lambda p: (-self._venues[p][3], self._venues[p][1]))
+        return [self._venues[p][0] for p in ordered[:limit]]
+
+    def resolve(self, name: Optional[str], limit: int = 5) -> List[str]:
+        """Ids of the venues `name` refers to, best match first; [] if none."""
+        key = normalize_venue_name(name)
+        if not key or limit <= 0:
+            return []
+        if key in self._aliases:
+            return self._ranked(self._aliases[key], limit)
+
+        # Names starting with the query beat names merely containing it
+        prefixed, contained = [], []
+        for position, (_, venue_name, _, _) in enumerate(self._venues):
+            if venue_name.startswith(key):
+                prefixed.append(position)
+            elif key in venue_name:
+                contained.append(position)
+        if prefixed or contained:
+            return (self._ranked(prefixed, limit) + self._ranked(contained, limit))[:limit]
+
+        scored = []
+        for position, (venue_id, venue_name, document, review_count) in enumerate(self._venues):
+            # Both ways, so an unknown word in the query ("Scotiabank Annex")
+            # does not resolve to whichever venue shares the rest
+            score = min(word_similarity(key, document), word_similarity(venue_name, key))
+            if score >= SIMILARITY_THRESHOLD:
+                scored.append((-score, -review_count, venue_name, venue_id))
+        return [venue_id for *_, venue_id in sorted(scored)[:limit]]
+
+
+# ---------------------------------------------------------------------------
+# Shared resolver
+# ---------------------------------------------------------------------------
+
+_resolver: Optional[VenueResolver] = None
+_built_at = 0.0
+_stale = False
+_lock = threading.Lock()
+
+
+def load_venue_names(conn) -> List[Tuple]:
+    """Every venue's id, name, city and review count."""
+    return conn.execute(text("""
+        SELECT v.id, v.name, v.city, COALESCE(va.review_count, 0)
+        FROM Venues v
+        LEFT JOIN VenueAggregates va ON va.venue_id = v.id
+    """)).fetchall()
+
+
+def get_venue_resolver() -> VenueResolver:
+    """
+    The shared resolver, rebuilt first if venues were written or it is older
+    than VENUE_RESOLVER_TTL. Concurrent callers wait for one rebuild.
+    """
+    global _resolver, _built_at, _stale
+    from ..database import engine
+
+    with _lock:
+        if _resolver is not None and not _stale and time.monotonic() - _built_at <= VENUE_RESOLVER_TTL:
+            return _resolver
+        if not engine:
+            return VenueResolver()
+        _stale = False
+        with engine.connect() as conn:
+            resolver = VenueResolver(load_venue_names(conn))
+        _resolver, _built_at = resolver, time.monotonic()
+    logger.info("Venue name index rebuilt: %d venues", resolver.size)
+    return resolver
+
+
+def invalidate_venue_names() -> None:
+    """Rebuild the shared resolver on next use, after venues are added or renamed."""
+    global _stale
+    with _lock:
+        _stale = True
+
+
+def resolve_venues(name: Optional[str], limit: int = 5) -> List[str]:
+    return get_venue_resolver().resolve(name, limit)
+
+
+def resolve_venue(name: Optional[str]) -> Optional[str]:
+    venue_ids = resolve_venues(name, limit=1)
+    return venue_ids[0] if venue_ids else None
@@ -0,0 +1,162 @@
+"""
+Benchmark the indexed text search against the old LIKE '%q%' event search.
+
+Seeds a scratch database with synthetic venues and events (100k by default),
+then times both query shapes on the same filters and prints the median
+latency and number of matches for each query.
+    cd Backend
+    python -m scripts.benchmark_search                        # temporary SQLite file
+    python -m scripts.benchmark_search --events 250000
+    python -m scripts.benchmark_search --database-url postgresql://.../scratch
+
+Only point --database-url at a scratch database: the synthetic rows are
+inserted there (and deleted again unless --keep is given).
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import bindparam, create_engine, event, text
+
+from api.utils.text_search import ensure_search_indexes, event_match, register_sqlite_functions
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--events", type=int, default=100_000, help="Number of synthetic events")
+parser.add_argument("--venues", type=int, default=2_000, help="Number of synthetic venues")
+parser.add_argument("--runs", type=int, default=15, help="Timed runs per query")
+parser.add_argument("--database-url", help="Scratch database to use instead of a temporary SQLite file")
+parser.add_argument("--keep", action="store_true", help="Keep the synthetic rows afterwards")
+args = parser.parse_args()
+
+WORDS = [
+    "midnight", "electric", "symphony", "revival", "summer", "festival", "acoustic", "night",
+    "golden", "thunder", "velvet", "harbor", "neon", "echo", "wild", "river", "crystal", "orchestra",
+    "jazz", "soul", "tour", "live", "session", "dreams", "stadium", "legends", "northern", "lights",
+]
+FIRST_NAMES = [
+    "Olivia", "Liam", "Maya", "Noah", "Ava", "Ethan", "Zoe", "Lucas", "Chloe", "Mateo",
+    "Isla", "Felix", "Nora", "Hugo", "Leah", "Omar", "Ruby", "Theo", "Ivy", "Jonah",
+]
+LAST_NAMES = [
+    "Carter", "Nguyen", "Rossi", "Okafor", "Lindqvist", "Moreau", "Tanaka", "Silva", "Kowalski", "Byrne",
+    "Haddad", "Fischer", "Park", "Dubois", "Reyes", "Novak", "Ahmed", "Walsh", "Costa", "Berg",
+]
+# A realistic catalogue has thousands of performers, so most queries are selective
+ARTISTS = [f"{first} {last}" for first in FIRST_NAMES for last in LAST_NAMES] + [
+    f"The {adjective.title()} {noun.title()}s" for adjective in WORDS[:14] for noun in WORDS[14:]
+] + ["Coldplay", "Taylor Swift", "The Weeknd", "Arctic Monkeys", "Kendrick Lamar", "Radiohead"]
+CITIES = [
+    "Toronto", "Montreal", "Vancouver", "Calgary", "Ottawa", "New York", "Chicago", "Boston",
+    "Seattle", "Austin", "Denver", "Nashville", "Atlanta", "Miami", "Los Angeles", "San Francisco",
+    "London", "Manchester", "Dublin", "Paris", "Berlin", "Amsterdam", "Madrid", "Lisbon",
+    "Stockholm", "Oslo", "Copenhagen", "Vienna", "Prague", "Warsaw", "Sydney", "Melbourne",
+]
+# Marks the synthetic events so they can be removed from a scratch database
+BENCH_GENRE = "benchmark-search"
+
+# (label, query) - the typo queries are what LIKE can never find
+QUERIES = [
+    ("artist", "coldplay"),
+    ("artist typo", "coldply"),
+    ("artist full name", "maya lindqvist"),
+    ("artist name typo", "maya lindquist"),
+    ("venue city", "montreal"),
+    ("broad event words", "electric symphony"),
+    ("no match", "zzqxv"),
+]
+
+if args.database_url:
+    engine = create_engine(args.database_url)
+    tmp_path = None
+else:
+    tmp_path = os.path.join(tempfile.mkdtemp(), "benchmark_search.db")
+    engine = create_engine(f"sqlite:///{tmp_path}")
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", register_sqlite_functions)
+
+random.seed(7)
+venue_rows = [
+    {"id": str(uuid.uuid4()), "name": f"{random.choice(WORDS).title()} {random.choice(['Arena', 'Hall', 'Theatre', 'Centre'])} {i}",
+     "city": random.choice(CITIES)}
+    for i in range(args.venues)
+]
+event_rows = [
+    {"id": str(uuid.uuid4()), "venue_id": random.choice(venue_rows)["id"],
+     "name": " ".join(random.sample(WORDS, 3)).title(), "artist": random.choice(ARTISTS), "genre": BENCH_GENRE,
+     "event_date": f"2026-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}"}
+    for _ in range(args.events)
+]
+
+print(f"Seeding {len(venue_rows)} venues and {len(event_rows)} events ({engine.dialect.name})...")
+with engine.begin() as conn:
+    if engine.dialect.name == "sqlite":
+        conn.execute(text("CREATE TABLE IF NOT EXISTS Venues (id TEXT PRIMARY KEY, name TEXT NOT NULL, city TEXT)"))
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS Events (id TEXT PRIMARY KEY, venue_id TEXT REFERENCES Venues(id), "
+            "name TEXT, artist TEXT, genre TEXT, event_date DATE)"
+        ))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_events_venue_id ON Events (venue_id)"))
+    ensure_search_indexes(conn)
+    conn.execute(text("INSERT INTO Venues (id, name, city) VALUES (:id, :name, :city)"), venue_rows)
+    conn.execute(
+        text("INSERT INTO Events (id, venue_id, name, artist, genre, event_date) "
+             "VALUES (:id, :venue_id, :name, :artist, :genre, :event_date)"),
+        event_rows,
+    )
+    if engine.dialect.name == "postgresql":
+        conn.execute(text("ANALYZE Venues"))
+        conn.execute(text("ANALYZE Events"))
+
+
+def legacy_query(q):
+    """The pre-index event search: substring LIKE on name/artist only."""
+    return (
+        "SELECT id, name, artist, COUNT(*) OVER() FROM Events "
+        "WHERE (LOWER(name) LIKE :q OR LOWER(artist) LIKE :q) "
+        "ORDER BY event_date ASC LIMIT 20",
+        {"q": f"%{q.lower()}%"},
+    )
+
+
+def indexed_query(conn, q):
+    params = {}
+    condition, score = event_match(conn, q, params)
+    return (
+        f"SELECT id, name, artist, {score} AS relevance, COUNT(*) OVER() FROM Events "
+        f"WHERE {condition} ORDER BY relevance DESC, id DESC LIMIT 20",
+        params,
+    )
+
+
+def time_query(conn, sql, params):
+    timings, rows = [], []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        rows = conn.execute(text(sql), params).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), (rows[0][-1] if rows else 0)
+
+
+try:
+    with engine.connect() as conn:
+        print(f"\n{'query':<40} {'LIKE ms':>9} {'hits':>7}   {'indexed ms':>10} {'hits':>7}  speedup")
+        for label, q in QUERIES:
+            like_ms, like_hits = time_query(conn, *legacy_query(q))
+            idx_ms, idx_hits = time_query(conn, *indexed_query(conn, q))
+            speedup = like_ms / idx_ms if idx_ms else float("inf")
+            print(f"{label + ' (' + q + ')':<40} {like_ms:>9.1f} {like_hits:>7}   {idx_ms:>10.1f} {idx_hits:>7}  {speedup:>6.1f}x")
+finally:
+    if tmp_path:
+        engine.dispose()
+        os.remove(tmp_path)
+    elif not args.keep:
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM Events WHERE genre = :genre"), {"genre": BENCH_GENRE})
+            conn.execute(
+                text("DELETE FROM Venues WHERE id IN :ids").bindparams(bindparam("ids", expanding=True)),
+                {"ids": [v["id"] for v in venue_rows]},
+            )
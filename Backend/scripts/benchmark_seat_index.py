@@ -0,0 +1,115 @@
+"""
+Benchmark the in-memory seat index (api/utils/seat_index.py) against
+answering the same spatial queries in SQL.
+
+Seeds a temporary SQLite database with one synthetic arena bowl (25k seats
+by default: sections fanned around the stage, rows stepping outwards), then
+times for random query points:
+    nearest  - k nearest seats: index vs ORDER BY squared distance LIMIT k
+    radius   - seats within r of a section centroid: index vs WHERE distance <= r
+and prints the index build time, the median latency of each, and whether
+the answers agree.
+    cd Backend
+    python -m scripts.benchmark_seat_index                    # 25k seats
+    python -m scripts.benchmark_seat_index --seats 60000 --k 50
+"""
+import argparse
+import math
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+
+from api.utils.seat_index import SeatIndex
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--seats", type=int, default=25_000, help="Seats in the synthetic venue")
+parser.add_argument("--k", type=int, default=20, help="Seats returned by nearest queries")
+parser.add_argument("--radius", type=float, default=6.0, help="Radius of the section-centroid queries")
+parser.add_argument("--queries", type=int, default=200, help="Query points per benchmark")
+args = parser.parse_args()
+
+SECTIONS = 40
+rng = random.Random(42)
+
+
+def arena(seats: int):
+    """(id, section, x, y) of a bowl of `seats` seats around a stage at (0, 0)."""
+    per_section = math.ceil(seats / SECTIONS)
+    seats_per_row = 25
+    rows = []
+    for i in range(seats):
+        section, position = divmod(i, per_section)
+        row, seat = divmod(position, seats_per_row)
+        angle = math.radians(section * 360 / SECTIONS + (seat - seats_per_row / 2) * 0.35)
+        radius = 20 + row * 0.9
+        rows.append((f"seat-{i}", str(100 + section), radius * math.cos(angle), radius * math.sin(angle)))
+    return rows
+
+
+def median_ms(fn, points):
+    samples = []
+    for point in points:
+        started = time.perf_counter()
+        fn(*point)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+seats = arena(args.seats)
+directory = tempfile.mkdtemp()
+engine = create_engine(f"sqlite:///{os.path.join(directory, 'seats.db')}")
+with engine.begin() as conn:
+    conn.execute(text("CREATE TABLE Seats (id TEXT PRIMARY KEY, venue_id TEXT, section TEXT, x FLOAT, y FLOAT)"))
+    conn.execute(text("CREATE INDEX idx_seats_venue_id ON Seats (venue_id)"))
+    conn.execute(
+        text("INSERT INTO Seats (id, venue_id, section, x, y) VALUES (:id, 'bench', :section, :x, :y)"),
+        [{"id": s[0], "section": s[1], "x": s[2], "y": s[3]} for s in seats],
+    )
+
+started = time.perf_counter()
+with engine.connect() as conn:
+    rows = conn.execute(text("SELECT id, section, x, y FROM Seats WHERE venue_id = 'bench'")).fetchall()
+index = SeatIndex(rows)
+build_ms = (time.perf_counter() - started) * 1000
+
+extent = 20 + math.ceil(args.seats / SECTIONS / 25) * 0.9
+points = [(rng.uniform(-extent, extent), rng.uniform(-extent, extent)) for _ in range(args.queries)]
+centroids = [index.section_centroid(str(100 + rng.randrange(SECTIONS))) for _ in range(args.queries)]
+
+DISTANCE = "((x - :x) * (x - :x) + (y - :y) * (y - :y))"
+with engine.connect() as conn:
+    def sql_nearest(x, y):
+        return conn.execute(
+            text(f"SELECT id FROM Seats WHERE venue_id = 'bench' ORDER BY {DISTANCE}, id LIMIT :k"),
+            {"x": x, "y": y, "k": args.k},
+        ).fetchall()
+
+    def sql_within(x, y):
+        return conn.execute(
+            text(f"SELECT id FROM Seats WHERE venue_id = 'bench' AND {DISTANCE} <= :r2"),
+            {"x": x, "y": y, "r2": args.radius ** 2},
+        ).fetchall()
+
+    results = [
+        ("nearest", "SQL ORDER BY", median_ms(sql_nearest, points)),
+        ("nearest", "seat index", median_ms(lambda x, y: index.nearest(x, y, args.k), points)),
+        ("radius", "SQL WHERE", median_ms(sql_within, centroids)),
+        ("radius", "seat index", median_ms(lambda x, y: index.within(x, y, args.radius), centroids)),
+    ]
+    agree = all(
+        {row[0] for row in sql_within(x, y)} == {seat for seat, _ in index.within(x, y, args.radius)}
+        for x, y in centroids[:20]
+    ) and all(
+        len(sql_nearest(x, y)) == len(index.nearest(x, y, args.k)) for x, y in points[:20]
+    )
+
+print(f"Synthetic venue: {len(index)} seats in {SECTIONS} sections; index built in {build_ms:.0f} ms "
+      f"({index.columns} x {index.rows} cells)")
+print(f"{'query':<10}{'method':<16}{'median ms':>12}")
+for query, method, ms in results:
+    print(f"{query:<10}{method:<16}{ms:>12.3f}")
+print(f"Answers agree: {'yes' if agree else 'NO'}")
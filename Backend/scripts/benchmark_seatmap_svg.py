@@ -0,0 +1,141 @@
+"""
+Benchmark section extraction from seatmap SVGs: the streaming path parser
+(api/utils/svg_sections.py) against the old regex scans.
+
+Generates a synthetic arena map shaped like Ticketmaster's: ring sections
+with curved outlines in relative path commands, plus a label and many row
+paths per section. It then times both extractors and prints the median run
+time, the number of sections found, and how far the old extractor's pins
+land from the true section centroids.
+    cd Backend
+    python -m scripts.benchmark_seatmap_svg                    # ~200 sections
+    python -m scripts.benchmark_seatmap_svg --sections 600 --rows 40
+"""
+import argparse
+import math
+import re
+import statistics
+import time
+
+from api.utils.svg_sections import extract_section_geometry
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--sections", type=int, default=200, help="Sections in the synthetic map")
+parser.add_argument("--rows", type=int, default=25, help="Row paths (no id) drawn inside each section")
+parser.add_argument("--runs", type=int, default=7, help="Timed runs per extractor")
+args = parser.parse_args()
+
+SCALE = 10
+CENTER_X, CENTER_Y = 5120, 3840
+
+
+def ring_section(index: int, count: int, inner: float, outer: float):
+    """Relative-command outline of one ring section with curved edges, and its true centroid."""
+    start, end = 2 * math.pi * index / count, 2 * math.pi * (index + 1) / count
+    points = [(CENTER_X + inner * math.cos(start), CENTER_Y + inner * math.sin(start))]
+    points.append((CENTER_X + outer * math.cos(start), CENTER_Y + outer * math.sin(start)))
+    # Outer edge as cubic curves, one per quarter of the section
+    commands = [f"M{points[0][0]:.1f} {points[0][1]:.1f}", f"l{points[1][0] - points[0][0]:.1f} {points[1][1] - points[0][1]:.1f}"]
+    x, y = points[1]
+    steps = 4
+    for step in range(1, steps + 1):
+        a0 = start + (end - start) * (step - 1) / steps
+        a1 = start + (end - start) * step / steps
+        k = 4 / 3 * math.tan((a1 - a0) / 4) * outer
+        c1 = (CENTER_X + outer * math.cos(a0) - k * math.sin(a0), CENTER_Y + outer * math.sin(a0) + k * math.cos(a0))
+        c2 = (CENTER_X + outer * math.cos(a1) + k * math.sin(a1), CENTER_Y + outer * math.sin(a1) - k * math.cos(a1))
+        e = (CENTER_X + outer * math.cos(a1), CENTER_Y + outer * math.sin(a1))
+        commands.append(f"c{c1[0] - x:.1f} {c1[1] - y:.1f} {c2[0] - x:.1f} {c2[1] - y:.1f} {e[0] - x:.1f} {e[1] - y:.1f}")
+        x, y = e
+    inner_end = (CENTER_X + inner * math.cos(end), CENTER_Y + inner * math.sin(end))
+    commands.append(f"L{inner_end[0]:.1f} {inner_end[1]:.1f}")
+    # Inner edge as many short straight segments, like TM's traced outlines
+    for step in range(15, 0, -1):
+        angle = start + (end - start) * step / 16
+        commands.append(f"L{CENTER_X + inner * math.cos(angle):.1f} {CENTER_Y + inner * math.sin(angle):.1f}")
+    commands.append("z")
+
+    # Centroid of an annular sector
+    half = (end - start) / 2
+    radius = 2 * math.sin(half) * (outer ** 3 - inner ** 3) / (3 * half * (outer ** 2 - inner ** 2))
+    middle = start + half
+    return " ".join(commands), (CENTER_X + radius * math.cos(middle), CENTER_Y + radius * math.sin(middle)), middle
+
+
+def build_svg(sections: int, rows: int) -> str:
+    parts = ['<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 10240 7680">', '<g id="sections">']
+    truth = {}
+    per_ring = max(1, sections // 3)
+    for index in range(sections):
+        ring, position = divmod(index, per_ring)
+        inner = 1200 + ring * 900
+        d, centroid, middle = ring_section(position, per_ring, inner, inner + 800)
+        name = f"{ring + 1}{position + 1:02d}"
+        truth[name] = centroid
+        parts.append(f'<path id="{name}" class="section" d="{d}"/>')
+        parts.append(f'<text x="{centroid[0]:.0f}" y="{centroid[1]:.0f}" class="label">{name}</text>')
+        for row in range(rows):
+            r = inner + 30 + row * (740 / max(rows, 1))
+            a0, a1 = middle - 0.03, middle + 0.03
+            parts.append(
+                f'<path class="row" d="M{CENTER_X + r * math.cos(a0):.1f} {CENTER_Y + r * math.sin(a0):.1f} '
+                f'L{CENTER_X + r * math.cos(a1):.1f} {CENTER_Y + r * math.sin(a1):.1f}"/>'
+            )
+    parts.append("</g></svg>")
+    return "".join(parts), truth
+
+
+def legacy_extract(svg_content: str) -> dict:
+    """The regex extractor the streaming parser replaced (three whole-document scans)."""
+    results = {}
+
+    def _centroid(d_value):
+        nums = [float(n) for n in re.findall(r"[-+]?\d+\.?\d*", d_value)]
+        pts = [(nums[i], nums[i + 1]) for i in range(0, len(nums) - 1, 2)]
+        if not pts:
+            return None
+        return [int(sum(p[0] for p in pts) / len(pts) / SCALE), int(sum(p[1] for p in pts) / len(pts) / SCALE)]
+
+    for m in re.finditer(r'<path\s[^>]*?id="([^"]+)"[^>]*?d="([^"]+)"[^>]*/>', svg_content):
+        c = _centroid(m.group(2))
+        if c:
+            results[m.group(1)] = c
+    for m in re.finditer(r'<path\s[^>]*?d="([^"]+)"[^>]*?id="([^"]+)"[^>]*/>', svg_content):
+        if m.group(2) not in results:
+            c = _centroid(m.group(1))
+            if c:
+                results[m.group(2)] = c
+    for m in re.finditer(r'<text[^>]*x="([^"]+)"[^>]*y="([^"]+)"[^>]*>\s*([^<]+?)\s*</text>', svg_content):
+        label = m.group(3).strip()
+        if label and label not in results:
+            results[label] = [int(float(m.group(1)) / SCALE), int(float(m.group(2)) / SCALE)]
+    return results
+
+
+def pin_error(coords: dict, truth: dict) -> float:
+    """Median distance in PNG pixels between each section's pin and its true centroid."""
+    return statistics.median(
+        math.hypot(coords[name][0] - x / SCALE, coords[name][1] - y / SCALE)
+        for name, (x, y) in truth.items() if name in coords
+    )
+
+
+def timed(fn, svg):
+    samples = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        result = fn(svg)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+
+svg, truth = build_svg(args.sections, args.rows)
+print(f"Synthetic map: {len(truth)} sections, {len(svg) / 1e6:.1f} MB")
+print(f"{'extractor':<22}{'median ms':>12}{'sections':>10}{'median pin error px':>22}")
+for label, fn in (
+    ("regex (old)", legacy_extract),
+    ("streaming parser", lambda content: extract_section_geometry(content, SCALE)),
+):
+    ms, coords = timed(fn, svg)
+    sections = sum(1 for name in coords if name in truth)
+    print(f"{label:<22}{ms:>12.1f}{sections:>10}{pin_error(coords, truth):>22.1f}")
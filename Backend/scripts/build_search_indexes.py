@@ -0,0 +1,22 @@
+"""
+Create the venue/event text search indexes.
+
+PostgreSQL: enables pg_trgm and builds the trigram and tsvector GIN indexes.
+SQLite: creates the FTS5 trigram tables and their sync triggers, then
+repopulates them (run after a VACUUM, which may renumber rowids).
+    cd Backend
+    python -m scripts.build_search_indexes
+"""
+from api.database import engine
+from api.utils.db_pool import disable_statement_timeout
+from api.utils.text_search import rebuild_search_index
+
+if not engine:
+    print("ERROR: DATABASE_URL not set")
+    exit(1)
+
+with engine.begin() as conn:
+    disable_statement_timeout(conn)
+    rebuild_search_index(conn)
+
+print(f"Search indexes ready ({engine.dialect.name}).")
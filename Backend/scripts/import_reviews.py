@@ -0,0 +1,74 @@
+"""
+Import reviews from an NDJSON file through POST /reviews/bulk.
+
+Each line is one review in the POST /reviews/ body format. The file is sent
+in batches of --batch-size lines; every batch is one transaction on the
+server. Invalid lines are reported with their line number in the file.
+    cd Backend
+    python -m scripts.import_reviews partner_reviews.ndjson --user-id <importer user id>
+    python -m scripts.import_reviews reviews.ndjson --token <JWT> --base-url https://api.example.com
+    python -m scripts.import_reviews reviews.ndjson --user-id <id> --atomic
+
+With --user-id the token is minted locally with the API's SECRET_KEY; the
+reviews are attributed to that user. With --atomic a batch containing any
+invalid line is rejected as a whole.
+"""
+import argparse
+import sys
+from datetime import timedelta
+
+import requests
+
+from api.auth_utils import create_access_token
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("path", help="NDJSON file, one review per line ('-' for stdin)")
+parser.add_argument("--base-url", default="http://localhost:8000", help="API to import into")
+parser.add_argument("--token", help="JWT of the importing account")
+parser.add_argument("--user-id", help="Importing account; mints a token instead of --token")
+parser.add_argument("--batch-size", type=int, default=5000, help="Lines per request (server max: BULK_MAX_REVIEWS)")
+parser.add_argument("--atomic", action="store_true", help="Reject a batch entirely if any line is invalid")
+args = parser.parse_args()
+
+if not args.token and not args.user_id:
+    print("ERROR: pass --token or --user-id")
+    exit(1)
+token = args.token or create_access_token({"sub": args.user_id}, expires_delta=timedelta(hours=1))
+session = requests.Session()
+session.headers.update({"Authorization": f"Bearer {token}", "Content-Type": "application/x-ndjson"})
+
+
+def batches(lines):
+    """Yield (first line number, batch text) in chunks of --batch-size lines."""
+    batch, first = [], 1
+    for line_no, line in enumerate(lines, start=1):
+        if not batch:
+            first = line_no
+        batch.append(line.rstrip("\n"))
+        if len(batch) == args.batch_size:
+            yield first, "\n".join(batch)
+            batch = []
+    if batch:
+        yield first, "\n".join(batch)
+
+
+source = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8")
+inserted = failed = 0
+with source:
+    for first, body in batches(source):
+        resp = session.post(f"{args.base_url}/reviews/bulk", params={"atomic": args.atomic}, data=body.encode("utf-8"))
+        detail = resp.json()
+        if resp.status_code == 200:
+            errors = detail["errors"]
+            inserted += detail["inserted"]
+        elif resp.status_code == 400 and isinstance(detail.get("detail"), dict):
+            errors = detail["detail"]["errors"]
+        else:
+            print(f"Batch starting at line {first} failed ({resp.status_code}): {detail.get('detail')}")
+            exit(1)
+        failed += len(errors)
+        for error in errors:
+            print(f"  line {first + error['line'] - 1}: {error['detail']}")
+        print(f"Batch starting at line {first}: {detail.get('inserted', 0)} imported, {len(errors)} rejected")
+
+print(f"Done: {inserted} reviews imported, {failed} lines rejected")
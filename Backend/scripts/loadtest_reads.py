@@ -0,0 +1,93 @@
+"""
+Load test the hot read routes with many concurrent clients and report
+requests/sec and latency percentiles.
+
+Keeps --concurrency requests in flight (500 by default) for --duration
+seconds, cycling through the search, review detail and profile routes.
+    cd Backend
+    python -m scripts.loadtest_reads --base-url http://localhost:8000
+    python -m scripts.loadtest_reads --concurrency 500 --duration 30 --user-id <id>
+
+To compare the async engine against the threadpool path, run it twice
+against the same database: once with the server started normally (the
+threadpool) and once with DB_ASYNC=true in the server's environment.
+
+With --user-id (token minted locally with the API's SECRET_KEY) the
+profile route is included; with --review-id the review detail route is.
+"""
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+from datetime import timedelta
+
+import httpx
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--base-url", default="http://localhost:8000", help="API under test")
+parser.add_argument("--concurrency", type=int, default=500, help="Concurrent clients")
+parser.add_argument("--duration", type=float, default=20, help="Seconds to run")
+parser.add_argument("--user-id", help="Include GET /auth/me as this user")
+parser.add_argument("--review-id", help="Include GET /reviews/{review_id}")
+args = parser.parse_args()
+
+ROUTES = [
+    ("/search/venues", {"limit": 20}),
+    ("/search/venues", {"q": "arena", "limit": 20}),
+    ("/search/events", {"limit": 20, "count_mode": "none"}),
+    ("/search/events", {"q": "tour", "limit": 20}),
+    ("/search/venues/stats", {}),
+]
+if args.review_id:
+    ROUTES.append((f"/reviews/{args.review_id}", {}))
+
+headers = {}
+if args.user_id:
+    from api.auth_utils import create_access_token
+    token = create_access_token({"sub": args.user_id}, expires_delta=timedelta(hours=1))
+    headers["Authorization"] = f"Bearer {token}"
+    ROUTES.append(("/auth/me", {}))
+
+
+async def client_loop(client, routes, deadline, latencies, errors):
+    while time.perf_counter() < deadline:
+        path, params = next(routes)
+        started = time.perf_counter()
+        try:
+            resp = await client.get(path, params=params)
+            if resp.status_code == 200:
+                latencies.append((time.perf_counter() - started) * 1000)
+            else:
+                errors.append(resp.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+
+
+async def main():
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    latencies, errors = [], []
+    routes = itertools.cycle(ROUTES)
+    async with httpx.AsyncClient(base_url=args.base_url, headers=headers, limits=limits, timeout=60) as client:
+        print(f"{args.concurrency} clients for {args.duration:.0f}s against {args.base_url}...")
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(
+            client_loop(client, routes, deadline, latencies, errors) for _ in range(args.concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    if not latencies:
+        print(f"  every request failed: {sorted(set(map(str, errors)))}")
+        return
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p / 100 * (len(latencies) - 1)))]
+    print(f"  requests:   {len(latencies)}   errors: {len(errors)} {sorted(set(map(str, errors))) if errors else ''}")
+    print(f"  req/s:      {len(latencies) / elapsed:8.1f}")
+    print(f"  p50:        {pct(50):8.1f} ms")
+    print(f"  p95:        {pct(95):8.1f} ms")
+    print(f"  p99:        {pct(99):8.1f} ms")
+    print(f"  mean:       {statistics.mean(latencies):8.1f} ms")
+
+
+asyncio.run(main())
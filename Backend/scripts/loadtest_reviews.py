@@ -0,0 +1,120 @@
+"""
+Load test review submission (POST /reviews/) and report p50/p95/p99 latency.
+
+Fires concurrent submissions at a running API and times each request end to
+end. Seats are drawn from a small pool so the run exercises both the
+seat-create and the seat-reuse paths. The reviews are deleted again through
+DELETE /reviews/{id} afterwards (so the rollups are restored) unless --keep
+is given.
+    cd Backend
+    python -m scripts.loadtest_reviews --base-url http://localhost:8000
+    python -m scripts.loadtest_reviews --requests 2000 --concurrency 32
+
+The user, venue and event default to ones read from DATABASE_URL (which must
+be the database the API under test uses); the token is minted locally with
+the API's SECRET_KEY. Run it against the previous and the current build on
+the same database to compare submission latency.
+"""
+import argparse
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import requests
+from sqlalchemy import text
+
+from api.auth_utils import create_access_token
+from api.database import engine
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--base-url", default="http://localhost:8000", help="API under test")
+parser.add_argument("--requests", type=int, default=500, help="Number of submissions")
+parser.add_argument("--concurrency", type=int, default=8, help="Submissions in flight at once")
+parser.add_argument("--seats", type=int, default=50, help="Size of the seat pool to review")
+parser.add_argument("--user-id", help="Reviewer (default: any existing user)")
+parser.add_argument("--event-id", help="Event to review (default: any existing event)")
+parser.add_argument("--keep", action="store_true", help="Keep the submitted reviews afterwards")
+args = parser.parse_args()
+
+if not engine:
+    print("ERROR: DATABASE_URL not set")
+    exit(1)
+
+with engine.connect() as conn:
+    user_id = args.user_id or conn.execute(text("SELECT id FROM Users LIMIT 1")).scalar()
+    event_filter = "id = :id" if args.event_id else "venue_id IS NOT NULL"
+    event_row = conn.execute(
+        text(f"SELECT id, venue_id FROM Events WHERE {event_filter} LIMIT 1"), {"id": args.event_id}
+    ).fetchone()
+if not user_id or not event_row:
+    print("ERROR: need at least one user and one event with a venue")
+    exit(1)
+
+event_id, venue_id = str(event_row[0]), str(event_row[1])
+token = create_access_token({"sub": str(user_id)}, expires_delta=timedelta(hours=1))
+headers = {"Authorization": f"Bearer {token}"}
+session = requests.Session()
+session.headers.update(headers)
+
+
+def submit(i: int):
+    seat = random.randrange(args.seats)
+    body = {
+        "event_id": event_id,
+        "venue_id": venue_id,
+        "section": f"LoadTest {seat // 10}",
+        "row": str(seat % 10),
+        "seat_number": str(seat),
+        "rating_visual": random.randint(1, 5),
+        "rating_sound": random.randint(1, 5),
+        "rating_value": random.randint(1, 5),
+        "price_paid": round(random.uniform(20, 300), 2),
+        "text": f"Load test review {i}",
+    }
+    started = time.perf_counter()
+    resp = session.post(f"{args.base_url}/reviews/", json=body)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    review_id = resp.json().get("review_id") if resp.status_code == 200 else None
+    return elapsed_ms, resp.status_code, review_id
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+print(f"Submitting {args.requests} reviews to {args.base_url} with concurrency {args.concurrency}...")
+wall_started = time.perf_counter()
+with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+    results = list(pool.map(submit, range(args.requests)))
+wall_s = time.perf_counter() - wall_started
+
+latencies = [ms for ms, status, _ in results if status == 200]
+errors = [status for _, status, _ in results if status != 200]
+review_ids = [review_id for _, _, review_id in results if review_id]
+
+if latencies:
+    print(f"  ok:         {len(latencies)}   errors: {len(errors)} {sorted(set(errors)) if errors else ''}")
+    print(f"  p50:        {percentile(latencies, 50):8.1f} ms")
+    print(f"  p95:        {percentile(latencies, 95):8.1f} ms")
+    print(f"  p99:        {percentile(latencies, 99):8.1f} ms")
+    print(f"  max:        {max(latencies):8.1f} ms")
+    print(f"  mean:       {statistics.mean(latencies):8.1f} ms")
+    print(f"  throughput: {len(latencies) / wall_s:8.1f} reviews/s")
+else:
+    print(f"  every submission failed: {sorted(set(errors))}")
+
+if review_ids and not args.keep:
+    print(f"Deleting {len(review_ids)} load test reviews...")
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(lambda review_id: session.delete(f"{args.base_url}/reviews/{review_id}"), review_ids))
+    with engine.begin() as conn:
+        conn.execute(
+            text("""
+                DELETE FROM Seats WHERE venue_id = :venue_id AND section LIKE 'LoadTest %'
+                AND id NOT IN (SELECT seat_id FROM Reviews WHERE seat_id IS NOT NULL)
+            """),
+            {"venue_id": venue_id},
+        )
@@ -0,0 +1,24 @@
+"""
+One-time migration: create the venue_id indexes on Events, Seats and Reviews
+in production PostgreSQL, without blocking writes (CREATE INDEX CONCURRENTLY).
+An index left INVALID by an interrupted earlier run is dropped and rebuilt.
+Fresh databases get the indexes from init_db.py.
+Run once:
+    cd Backend
+    python -m scripts.migrate_venue_id_indexes
+"""
+from api.database import engine
+from api.utils.db_pool import disable_statement_timeout
+from api.utils.text_search import VENUE_ID_INDEXES, ensure_venue_id_indexes
+
+if not engine:
+    print("ERROR: DATABASE_URL not set")
+    exit(1)
+
+with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+    disable_statement_timeout(conn)
+    ensure_venue_id_indexes(conn, concurrently=True)
+
+for name, table in VENUE_ID_INDEXES:
+    print(f"{name} ({table}): OK")
+print("Migration complete.")
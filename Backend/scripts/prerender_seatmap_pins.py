@@ -0,0 +1,41 @@
+"""
+Pre-render the pinned seatmap image of every section of a venue and fill
+SeatmapPinCache, so /ai/seat-view-image never waits on PIL or S3.
+
+Each venue's base PNG is downloaded once; pins are encoded in a process pool
+and uploaded to S3 concurrently. Sections that already have a pinned image
+are skipped unless --force is given.
+    cd Backend
+    python -m scripts.prerender_seatmap_pins                         # every venue
+    python -m scripts.prerender_seatmap_pins --venue "Madison Square Garden" --workers 4
+"""
+import argparse
+
+from sqlalchemy import text
+
+from api.database import engine
+from api.utils.seatmap_pins import prerender_venue_pins
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--venue", action="append", help="Venue name (repeatable); defaults to every venue")
+parser.add_argument("--workers", type=int, help="Encoding processes (default: CPU count)")
+parser.add_argument("--force", action="store_true", help="Re-render sections that are already cached")
+args = parser.parse_args()
+
+venues = args.venue
+if not venues:
+    if not engine:
+        print("ERROR: DATABASE_URL not set")
+        exit(1)
+    with engine.connect() as conn:
+        venues = [row[0] for row in conn.execute(text("SELECT name FROM Venues ORDER BY name")).fetchall()]
+
+totals = {}
+for venue in venues:
+    counts = prerender_venue_pins(venue, workers=args.workers, force=args.force)
+    print(f"{venue}: {counts['uploaded']} uploaded, {counts['skipped']} already cached, "
+          f"{counts['failed']} failed of {counts['sections']} sections")
+    for key, value in counts.items():
+        totals[key] = totals.get(key, 0) + value
+
+print(f"Pre-rendered {totals.get('uploaded', 0)} pinned seatmap(s) across {len(venues)} venue(s).")
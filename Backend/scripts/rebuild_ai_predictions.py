@@ -0,0 +1,29 @@
+"""
+Refit the per-venue seat models and rewrite AI_Predictions for every seat
+without reviews (see api/utils/predictions.py). Run after review imports or
+aggregate rebuilds; /search/seats falls back to whatever was last written.
+    cd Backend
+    python -m scripts.rebuild_ai_predictions                  # every venue
+    python -m scripts.rebuild_ai_predictions --venue-id <id>
+"""
+import argparse
+import time
+
+from api.database import engine
+from api.utils.db_pool import disable_statement_timeout
+from api.utils.predictions import rebuild_predictions
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--venue-id", help="Only rebuild the predictions of this venue")
+args = parser.parse_args()
+
+if not engine:
+    print("ERROR: DATABASE_URL not set")
+    exit(1)
+
+started = time.perf_counter()
+with engine.begin() as conn:
+    disable_statement_timeout(conn)
+    written = rebuild_predictions(conn, args.venue_id)
+
+print(f"AI_Predictions rebuilt: {written} seat(s) scored in {time.perf_counter() - started:.1f}s.")
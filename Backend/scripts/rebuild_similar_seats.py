@@ -0,0 +1,31 @@
+"""
+Recompute SimilarSeats: the top-k most similar seats of every seat, from
+SeatAggregates ratings and price plus seat geometry (see
+api/utils/similar_seats.py). Run after review imports or aggregate rebuilds;
+/search/seats/{seat_id}/similar serves whatever was last written.
+    cd Backend
+    python -m scripts.rebuild_similar_seats                  # every venue
+    python -m scripts.rebuild_similar_seats --venue-id <id> --k 20
+"""
+import argparse
+import time
+
+from api.database import engine
+from api.utils.db_pool import disable_statement_timeout
+from api.utils.similar_seats import SIMILAR_SEATS_K, rebuild_similar_seats
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--venue-id", help="Only rebuild the seats of this venue")
+parser.add_argument("--k", type=int, default=SIMILAR_SEATS_K, help="Similar seats kept per seat")
+args = parser.parse_args()
+
+if not engine:
+    print("ERROR: DATABASE_URL not set")
+    exit(1)
+
+started = time.perf_counter()
+with engine.begin() as conn:
+    disable_statement_timeout(conn)
+    written = rebuild_similar_seats(conn, args.venue_id, args.k)
+
+print(f"SimilarSeats rebuilt: {written} row(s) in {time.perf_counter() - started:.1f}s.")
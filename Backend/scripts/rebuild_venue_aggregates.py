@@ -0,0 +1,46 @@
+"""
+Create (if missing) and rebuild the VenueAggregates rollup table.
+
+Use it once after deploying, for recovery if the rollup ever drifts, and on a
+daily schedule so events that have passed drop out of upcoming_events.
+    cd Backend
+    python -m scripts.rebuild_venue_aggregates                 # every venue
+    python -m scripts.rebuild_venue_aggregates --venue-id <id> # one venue
+"""
+import argparse
+
+from sqlalchemy import text
+
+from api.database import engine
+from api.utils.db_pool import disable_statement_timeout
+from api.utils.aggregates import rebuild_venue_aggregates
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--venue-id", action="append", help="Only rebuild this venue (repeatable)")
+args = parser.parse_args()
+
+if not engine:
+    print("ERROR: DATABASE_URL not set")
+    exit(1)
+
+# Venues.id is UUID in production PostgreSQL and TEXT in local SQLite
+id_type = "UUID" if engine.dialect.name == "postgresql" else "TEXT"
+
+with engine.begin() as conn:
+    disable_statement_timeout(conn)
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS VenueAggregates (
+            venue_id          {id_type} PRIMARY KEY REFERENCES Venues(id),
+            rating_sum        INTEGER DEFAULT 0,
+            review_count      INTEGER DEFAULT 0,
+            avg_rating        FLOAT,
+            upcoming_events   INTEGER DEFAULT 0,
+            last_updated      TIMESTAMP
+        );
+    """))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS idx_venueaggregates_avg_rating ON VenueAggregates (avg_rating);"
+    ))
+    written = rebuild_venue_aggregates(conn, args.venue_id)
+
+print(f"VenueAggregates rebuilt: {written} venue row(s).")
@@ -0,0 +1,39 @@
+"""
+Add the integer-sum columns to SeatAggregates (if missing) and rebuild the
+table from Reviews in one set-based pass.
+
+Run once after deploying the sum columns, and for recovery if the rollup
+ever drifts (e.g. after direct SQL edits to Reviews).
+    cd Backend
+    python -m scripts.recompute_seat_aggregates                 # every seat
+    python -m scripts.recompute_seat_aggregates --venue-id <id> # one venue
+"""
+import argparse
+
+from sqlalchemy import text
+
+from api.database import engine
+from api.utils.db_pool import disable_statement_timeout
+from api.utils.aggregates import recompute_seat_aggregates
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--venue-id", help="Only recompute the seats of this venue")
+args = parser.parse_args()
+
+if not engine:
+    print("ERROR: DATABASE_URL not set")
+    exit(1)
+
+SUM_COLUMNS = {
+    "visual_sum": "INTEGER", "sound_sum": "INTEGER", "value_sum": "INTEGER", "overall_sum": "INTEGER",
+    "price_cents_sum": "BIGINT", "price_count": "INTEGER",
+}
+
+with engine.begin() as conn:
+    disable_statement_timeout(conn)
+    if engine.dialect.name == "postgresql":
+        for column, column_type in SUM_COLUMNS.items():
+            conn.execute(text(f"ALTER TABLE SeatAggregates ADD COLUMN IF NOT EXISTS {column} {column_type} DEFAULT 0;"))
+    written = recompute_seat_aggregates(conn, args.venue_id)
+
+print(f"SeatAggregates recomputed: {written} seat row(s).")
@@ -0,0 +1,33 @@
+"""
+Create (if missing) and reconcile the PlatformStats counters row.
+
+Review writes keep the counters current incrementally; schedule this job
+(e.g. hourly) to correct any drift from direct SQL edits or bulk imports.
+    cd Backend
+    python -m scripts.reconcile_platform_stats
+"""
+from sqlalchemy import text
+
+from api.database import engine
+from api.utils.db_pool import disable_statement_timeout
+from api.utils.aggregates import reconcile_platform_stats
+
+if not engine:
+    print("ERROR: DATABASE_URL not set")
+    exit(1)
+
+with engine.begin() as conn:
+    disable_statement_timeout(conn)
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS PlatformStats (
+            id                INTEGER PRIMARY KEY,
+            total_venues      INTEGER DEFAULT 0,
+            total_reviews     INTEGER DEFAULT 0,
+            rating_sum        INTEGER DEFAULT 0,
+            last_updated      TIMESTAMP,
+            last_reconciled   TIMESTAMP
+        );
+    """))
+    stats = reconcile_platform_stats(conn)
+
+print(f"PlatformStats reconciled: {stats}")
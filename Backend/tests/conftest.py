@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import text
+
+# api.database is imported inside the fixtures: some test modules set
+# DATABASE_URL before their first import of the app.
+
+
+def _delete_venue(conn, venue_id):
+    """Remove a seeded venue, its seats and every row derived from them."""
+    seats = "(SELECT id FROM Seats WHERE venue_id = :id)"
+    params = {"id": venue_id}
+    conn.execute(text(f"DELETE FROM SimilarSeats WHERE seat_id IN {seats} OR similar_seat_id IN {seats}"), params)
+    conn.execute(text(f"DELETE FROM AI_Predictions WHERE seat_id IN {seats}"), params)
+    conn.execute(text(f"DELETE FROM SeatAggregates WHERE seat_id IN {seats}"), params)
+    conn.execute(text("DELETE FROM Seats WHERE venue_id = :id"), params)
+    conn.execute(text("DELETE FROM Venues WHERE id = :id"), params)
+
+
+@pytest.fixture
+def seed_venue():
+    """
+    Factory: seed_venue(venue_id, name, seats, city="Toronto", review_count=3)
+    inserts a venue and its seats, given as
+        (seat_id, section, distance_to_stage, x, y, rating, price)
+    Seats with a rating get SeatAggregates with that rating in every column.
+    Everything is deleted again after the test, including SimilarSeats and
+    AI_Predictions rows of those seats.
+    """
+    from api.database import engine
+    seeded = []
+
+    def seed(venue_id, name, seats, city="Toronto", review_count=3):
+        with engine.begin() as conn:
+            _delete_venue(conn, venue_id)
+            conn.execute(
+                text("INSERT INTO Venues (id, name, city) VALUES (:id, :name, :city)"),
+                {"id": venue_id, "name": name, "city": city},
+            )
+            conn.execute(
+                text("INSERT INTO Seats (id, venue_id, section, row, seat_number, distance_to_stage, x, y) "
+                     "VALUES (:id, :venue_id, :section, 'A', :id, :distance, :x, :y)"),
+                [{"id": s[0], "venue_id": venue_id, "section": s[1], "distance": s[2], "x": s[3], "y": s[4]}
+                 for s in seats],
+            )
+            rated = [{"id": s[0], "r": s[5], "price": s[6], "count": review_count} for s in seats if s[5] is not None]
+            if rated:
+                conn.execute(
+                    text("INSERT INTO SeatAggregates (seat_id, avg_visual, avg_sound, avg_value, avg_overall, "
+                         "avg_price_paid, review_count) VALUES (:id, :r, :r, :r, :r, :price, :count)"),
+                    rated,
+                )
+        seeded.append(venue_id)
+        return venue_id
+
+    yield seed
+    with engine.begin() as conn:
+        for venue_id in seeded:
+            _delete_venue(conn, venue_id)
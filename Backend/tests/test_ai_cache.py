@@ -0,0 +1,291 @@
+import json
+import time
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from api.auth_utils import create_access_token, get_password_hash
+from api.database import engine
+from api.main import app
+from api.utils.ai_cache import (
+    ALL_VENUES, VenueDataCache, data_version, invalidate_venue_data, normalize_question,
+    response_cache, response_cache_key, tool_cache,
+)
+from api.utils.venue_resolver import invalidate_venue_names
+
+client = TestClient(app)
+
+USER_ID = "00000000-0000-0000-0000-00000000ca01"
+VENUE_ID = "00000000-0000-0000-0000-00000000ca02"
+EVENT_ID = "00000000-0000-0000-0000-00000000ca03"
+
+
+@pytest.fixture(autouse=True)
+def empty_answer_cache():
+    response_cache.clear()
+    tool_cache.clear()
+    yield
+    response_cache.clear()
+    tool_cache.clear()
+
+
+@pytest.fixture
+def venue():
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM Users WHERE id = :id"), {"id": USER_ID})
+        conn.execute(text("DELETE FROM Events WHERE id = :id"), {"id": EVENT_ID})
+        conn.execute(text("DELETE FROM Venues WHERE id = :id"), {"id": VENUE_ID})
+        conn.execute(
+            text("INSERT INTO Users (id, email, password_hash) VALUES (:id, :e, :p)"),
+            {"id": USER_ID, "e": "aicache@test.com", "p": get_password_hash("password")},
+        )
+        conn.execute(text("INSERT INTO Venues (id, name, city) VALUES (:id, 'CacheTest Arena', 'Toronto')"), {"id": VENUE_ID})
+        conn.execute(text("INSERT INTO Events (id, venue_id, name) VALUES (:id, :v, 'CacheTest Show')"), {"id": EVENT_ID, "v": VENUE_ID})
+    invalidate_venue_names()
+    token = create_access_token({"sub": USER_ID}, expires_delta=timedelta(hours=1))
+    yield {"venue_id": VENUE_ID, "event_id": EVENT_ID, "token": token}
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM SeatAggregates WHERE seat_id IN (SELECT id FROM Seats WHERE venue_id = :id)"), {"id": VENUE_ID})
+        conn.execute(text("DELETE FROM Reviews WHERE venue_id = :id"), {"id": VENUE_ID})
+        conn.execute(text("DELETE FROM Seats WHERE venue_id = :id"), {"id": VENUE_ID})
+        conn.execute(text("DELETE FROM Events WHERE id = :id"), {"id": EVENT_ID})
+        conn.execute(text("DELETE FROM Venues WHERE id = :id"), {"id": VENUE_ID})
+        conn.execute(text("DELETE FROM Users WHERE id = :id"), {"id": USER_ID})
+    invalidate_venue_names()
+
+
+def test_normalize_question():
+    assert normalize_question("  Best seats at  Scotiabank Arena? ") == "best seats at scotiabank arena"
+    assert normalize_question("BEST SEATS at Scotiabank Arena!!") == "best seats at scotiabank arena"
+    messages = lambda q: [{"role": "system", "content": "Be brief."}, {"role": "user", "content": q}]
+    assert response_cache_key(messages("Which section has the best sound?")) == \
+        response_cache_key(messages("which section has the best  sound"))
+    assert response_cache_key(messages("best sound")) != response_cache_key(messages("best view"))
+
+
+def test_lru_eviction_and_ttl():
+    cache = VenueDataCache(maxsize=2, ttl=60)
+    version = data_version()
+    cache.put("a", 1, version, [])
+    cache.put("b", 2, version, [])
+    assert cache.get("a") == 1          # "a" is now most recently used
+    cache.put("c", 3, version, [])      # evicts "b"
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (2, 1)
+
+    short = VenueDataCache(maxsize=2, ttl=0.05)
+    short.put("a", 1, version, [])
+    time.sleep(0.06)
+    assert short.get("a") is None
+
+
+def test_invalidation_is_per_venue():
+    cache = VenueDataCache(maxsize=10, ttl=60)
+    version = data_version()
+    cache.put("venue-a", "A", version, ["venue-a-id"])
+    cache.put("venue-b", "B", version, ["venue-b-id"])
+    cache.put("everything", "*", version, [ALL_VENUES])
+    cache.put("general", "G", version, [])
+
+    invalidate_venue_data(["venue-a-id"])
+
+    assert cache.get("venue-a") is None
+    assert cache.get("venue-b") == "B"
+    assert cache.get("everything") is None
+    assert cache.get("general") == "G"
+
+    # An answer computed from data read before a write is stale once stored
+    before_write = data_version()
+    invalidate_venue_data(["venue-b-id"])
+    cache.put("venue-b", "B, stale", before_write, ["venue-b-id"])
+    assert cache.get("venue-b") is None
+
+    invalidate_venue_data()
+    assert cache.get("general") is None
+
+
+def _completion(content, tool_calls=None):
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = content
+    response.choices[0].message.tool_calls = tool_calls
+    return response
+
+
+def _tool_call(name, arguments):
+    tool_call = MagicMock()
+    tool_call.id = f"call_{name}"
+    tool_call.type = "function"
+    tool_call.function.name = name
+    tool_call.function.arguments = json.dumps(arguments)
+    return tool_call
+
+
+@patch("api.routes.ai.ZhipuAI")
+@patch("api.routes.ai.os.getenv")
+def test_repeated_question_is_served_from_cache_until_a_review_is_written(mock_getenv, mock_zhipuai_class, venue):
+    mock_getenv.return_value = "fake_zhipu_api_key"
+    create = mock_zhipuai_class.return_value.chat.completions.create
+    create.side_effect = lambda **kwargs: (
+        _completion("Section 101 is best.") if any(m["role"] == "tool" for m in kwargs["messages"])
+        else _completion("", [_tool_call("get_best_seats", {"venue_name": "CacheTest Arena"})])
+    )
+    tools = {"get_best_seats": lambda **kwargs: '[{"section": "101"}]'}
+    question = {"input_data": "Best seats at CacheTest Arena?"}
+
+    with patch.dict("api.routes.ai.TOOL_FUNCTIONS", tools):
+        first = client.post("/ai/analyze", json=question)
+        assert create.call_count == 2
+        # Different case and punctuation, same question: no model calls
+        second = client.post("/ai/analyze", json={"input_data": "best seats at cachetest arena"})
+        assert create.call_count == 2
+        assert second.json()["analysis"] == first.json()["analysis"] == "Section 101 is best."
+        assert second.json()["metadata"]["cache"] == "hit"
+        assert "cache" not in first.json()["metadata"]
+
+        # A review at another venue leaves the answer cached
+        invalidate_venue_data(["some-other-venue"])
+        client.post("/ai/analyze", json=question)
+        assert create.call_count == 2
+
+        # A review at this venue invalidates it
+        review = client.post("/reviews/", json={
+            "event_id": venue["event_id"], "venue_id": venue["venue_id"],
+            "section": "101", "row": "A", "seat_number": "1",
+            "rating_visual": 5, "rating_sound": 5, "rating_value": 5,
+            "price_paid": 80, "text": "Great view",
+        }, headers={"Authorization": f"Bearer {venue['token']}"})
+        assert review.status_code == 200
+        third = client.post("/ai/analyze", json=question)
+        assert create.call_count == 4
+        assert "cache" not in third.json()["metadata"]
+
+    stats = client.get("/ai/cache/stats").json()["responses"]
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+    assert stats["entries"] == 1
+
+
+@patch("api.routes.ai.ZhipuAI")
+@patch("api.routes.ai.os.getenv")
+def test_failed_tools_are_not_cached(mock_getenv, mock_zhipuai_class):
+    mock_getenv.return_value = "fake_zhipu_api_key"
+    create = mock_zhipuai_class.return_value.chat.completions.create
+    create.side_effect = lambda **kwargs: (
+        _completion("I could not fetch that.") if any(m["role"] == "tool" for m in kwargs["messages"])
+        else _completion("", [_tool_call("get_venue_stats", {"venue_name": "Nowhere"})])
+    )
+
+    def broken(**kwargs):
+        raise RuntimeError("database unavailable")
+
+    with patch.dict("api.routes.ai.TOOL_FUNCTIONS", {"get_venue_stats": broken}):
+        client.post("/ai/analyze", json={"input_data": "Stats for Nowhere?"})
+        client.post("/ai/analyze", json={"input_data": "Stats for Nowhere?"})
+    assert create.call_count == 4
+    assert response_cache.stats()["entries"] == 0
+
+
+@patch("api.routes.ai.ZhipuAI")
+@patch("api.routes.ai.os.getenv")
+def test_stream_serves_and_fills_the_same_cache(mock_getenv, mock_zhipuai_class):
+    from types import SimpleNamespace
+    mock_getenv.return_value = "fake_zhipu_api_key"
+    create = mock_zhipuai_class.return_value.chat.completions.create
+    create.return_value = _completion("Hello from the model.")
+
+    first = client.post("/ai/analyze", json={"input_data": "Hello?"})
+    assert first.status_code == 200
+
+    # The stream endpoint answers the same question from the cache
+    streamed = client.post("/ai/analyze/stream", json={"input_data": "hello"})
+    assert create.call_count == 1
+    assert 'event: token\ndata: {"text": "Hello from the model."}' in streamed.text
+    assert '"cache": "hit"' in streamed.text
+
+    # And a streamed answer is cached for /analyze
+    chunk = SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="Streamed.", tool_calls=None))])
+    create.return_value = iter([chunk])
+    client.post("/ai/analyze/stream", json={"input_data": "Something new"})
+    cached = client.post("/ai/analyze", json={"input_data": "something new"})
+    assert create.call_count == 2
+    assert cached.json()["analysis"] == "Streamed."
+
+
+def test_memory_bound_evicts_least_recently_used():
+    cache = VenueDataCache(maxsize=100, ttl=60, max_bytes=10)
+    version = data_version()
+    cache.put("a", "aaaa", version, [])
+    cache.put("b", "bbbb", version, [])
+    cache.get("a")
+    cache.put("c", "cccc", version, [])  # 12 bytes > 10: evicts "b"
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa"
+    assert cache.stats()["bytes"] == 8
+    cache.put("huge", "x" * 11, version, [])  # larger than the whole cache: not kept
+    assert cache.get("huge") is None
+    assert cache.stats()["bytes"] == 8
+
+
+def _ask(question, tool_name, arguments, answer="Done."):
+    """One /ai/analyze round trip in which the model calls one tool."""
+    with patch("api.routes.ai.ZhipuAI") as mock_zhipuai_class:
+        mock_zhipuai_class.return_value.chat.completions.create.side_effect = [
+            _completion("", [_tool_call(tool_name, arguments)]), _completion(answer),
+        ]
+        response = client.post("/ai/analyze", json={"input_data": question})
+    assert response.status_code == 200
+    return response.json()["metadata"]["tools"][0]
+
+
+@patch("api.routes.ai.os.getenv", return_value="fake_zhipu_api_key")
+def test_tool_results_are_cached_per_venue(mock_getenv, venue):
+    calls = []
+
+    def best_seats(venue_name, limit=10):
+        calls.append((venue_name, limit))
+        return json.dumps([{"section": "101", "limit": limit}])
+
+    with patch.dict("api.routes.ai.TOOL_FUNCTIONS", {"get_best_seats": best_seats}):
+        first = _ask("Best seats at CacheTest Arena?", "get_best_seats", {"venue_name": "CacheTest Arena", "limit": 3})
+        # A different question needing the same data: the tool is not run again
+        second = _ask("Where should I sit at CacheTest Arena?", "get_best_seats", {"limit": 3, "venue_name": "CacheTest Arena"})
+        assert calls == [("CacheTest Arena", 3)]
+        assert (first["cached"], second["cached"]) == (False, True)
+        # Different arguments are a different entry
+        _ask("Top 5 seats at CacheTest Arena?", "get_best_seats", {"venue_name": "CacheTest Arena", "limit": 5})
+        assert len(calls) == 2
+
+        # A review at this venue invalidates its tool results
+        review = client.post("/reviews/", json={
+            "event_id": venue["event_id"], "venue_id": venue["venue_id"],
+            "section": "101", "row": "A", "seat_number": "1",
+            "rating_visual": 4, "rating_sound": 4, "rating_value": 4,
+            "price_paid": 80, "text": "Good",
+        }, headers={"Authorization": f"Bearer {venue['token']}"})
+        assert review.status_code == 200
+        third = _ask("Any good seats at CacheTest Arena?", "get_best_seats", {"venue_name": "CacheTest Arena", "limit": 3})
+        assert third["cached"] is False
+        assert len(calls) == 3
+
+    assert client.get("/ai/cache/stats").json()["tools"]["hits"] == 1
+
+
+@patch("api.routes.ai.os.getenv", return_value="fake_zhipu_api_key")
+def test_tool_errors_are_not_cached(mock_getenv):
+    calls = []
+
+    def venue_stats(venue_name):
+        calls.append(venue_name)
+        return json.dumps({"error": f"No venue found matching '{venue_name}'."})
+
+    with patch.dict("api.routes.ai.TOOL_FUNCTIONS", {"get_venue_stats": venue_stats}):
+        _ask("Stats for Atlantis?", "get_venue_stats", {"venue_name": "Atlantis"})
+        _ask("Tell me about Atlantis", "get_venue_stats", {"venue_name": "Atlantis"})
+    assert len(calls) == 2
+    assert tool_cache.stats()["entries"] == 0
@@ -1,3 +1,4 @@
+import json
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
@@ -5,6 +6,17 @@ from api.main import app
 
 client = TestClient(app)
 
+
+@pytest.fixture(autouse=True)
+def empty_answer_cache():
+    """Tests reuse prompts and tools with different mocks; don't serve cached results."""
+    from api.utils.ai_cache import response_cache, tool_cache
+    response_cache.clear()
+    tool_cache.clear()
+    yield
+    response_cache.clear()
+    tool_cache.clear()
+
 @patch("api.routes.ai.ZhipuAI")
 @patch("api.routes.ai.os.getenv")
 def test_analyze_data_success(mock_getenv, mock_zhipuai_class):
@@ -179,13 +191,450 @@ def test_analyze_data_with_tool_call(mock_getenv, mock_zhipuai_class):
     
     # Assertions
     assert response.status_code == 200
-    assert response.json() == {
-        "status": "success",
-        "analysis": "The top venue is Madison Square Garden."
-    }
+    data = response.json()
+    assert data["status"] == "success"
+    assert data["analysis"] == "The top venue is Madison Square Garden."
+    assert set(data) == {"status", "analysis", "metadata"}
+    assert [(t["name"], t["tool_call_id"], t["status"]) for t in data["metadata"]["tools"]] == [
+        ("get_top_venues", "call_123", "ok")
+    ]
     
     # Verify create was called twice
     assert mock_client_instance.chat.completions.create.call_count == 2
     
     # Verify tool function was executed
     mock_tool_func.assert_called_once_with(limit=1)
+
+
+def _mock_completion(content):
+    response = MagicMock()
+    choice = MagicMock()
+    choice.message.content = content
+    choice.message.tool_calls = None
+    response.choices = [choice]
+    return response
+
+
+@patch("api.routes.ai.ZhipuAI")
+@patch("api.routes.ai.os.getenv")
+def test_analyze_runs_model_and_tools_off_event_loop(mock_getenv, mock_zhipuai_class):
+    import threading
+    mock_getenv.return_value = "fake_zhipu_api_key"
+    threads = []
+
+    tool_call = MagicMock()
+    tool_call.id = "call_1"
+    tool_call.type = "function"
+    tool_call.function.name = "get_top_venues"
+    tool_call.function.arguments = '{"limit": 1}'
+    first_response = _mock_completion("")
+    first_response.choices[0].message.tool_calls = [tool_call]
+    responses = [first_response, _mock_completion("Done.")]
+
+    def create(**kwargs):
+        threads.append(threading.current_thread().name)
+        return responses.pop(0)
+
+    def top_venues(limit):
+        threads.append(threading.current_thread().name)
+        return '{"ok": true}'
+
+    mock_zhipuai_class.return_value.chat.completions.create.side_effect = create
+
+    with patch.dict("api.routes.ai.TOOL_FUNCTIONS", {"get_top_venues": top_venues}):
+        response = client.post("/ai/analyze", json={"input_data": "Top venue?"})
+
+    assert response.status_code == 200
+    assert response.json()["analysis"] == "Done."
+    # The model calls ran on the LLM executor, the tool on the tool executor
+    assert len(threads) == 3
+    assert threads[0].startswith("ai-worker") and threads[2].startswith("ai-worker")
+    assert threads[1].startswith("ai-tool")
+
+
+@patch("api.routes.ai.ZhipuAI")
+@patch("api.routes.ai.os.getenv")
+def test_slow_model_call_does_not_block_other_requests(mock_getenv, mock_zhipuai_class):
+    import asyncio
+    import threading
+    import httpx
+    mock_getenv.return_value = "fake_zhipu_api_key"
+    release = threading.Event()
+
+    def slow_create(**kwargs):
+        release.wait(10)
+        return _mock_completion("Slow answer.")
+
+    mock_zhipuai_class.return_value.chat.completions.create.side_effect = slow_create
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            chat = asyncio.create_task(http.post("/ai/analyze", json={"input_data": "Slow question"}))
+            await asyncio.sleep(0.05)
+            # The event loop keeps serving while the model call is in flight
+            health = await asyncio.wait_for(http.get("/health"), timeout=2)
+            assert not chat.done()
+            release.set()
+            return health, await chat
+
+    try:
+        health, chat = asyncio.run(scenario())
+    finally:
+        release.set()
+    assert health.status_code == 200
+    assert chat.status_code == 200
+    assert chat.json()["analysis"] == "Slow answer."
+
+
+@patch("api.routes.ai.ZhipuAI")
+@patch("api.routes.ai.os.getenv")
+def test_analyze_rejects_when_assistant_saturated(mock_getenv, mock_zhipuai_class, monkeypatch):
+    from api.utils import ai_executor
+    mock_getenv.return_value = "fake_zhipu_api_key"
+    monkeypatch.setattr(ai_executor, "AI_MAX_CONCURRENCY", 0)
+    monkeypatch.setattr(ai_executor, "AI_MAX_QUEUED", 0)
+
+    response = client.post("/ai/analyze", json={"input_data": "Anyone there?"})
+
+    assert response.status_code == 503
+    mock_zhipuai_class.return_value.chat.completions.create.assert_not_called()
+    # The slot count is back to zero afterwards
+    assert ai_executor._active_requests == 0
+
+
+def _tool_call(call_id, name, arguments):
+    tool_call = MagicMock()
+    tool_call.id = call_id
+    tool_call.type = "function"
+    tool_call.function.name = name
+    tool_call.function.arguments = arguments
+    return tool_call
+
+
+def _tool_round_trip(mock_zhipuai_class, tool_calls, answer):
+    """The model asks for `tool_calls`, then answers; returns the create mock."""
+    first_response = _mock_completion("")
+    first_response.choices[0].message.tool_calls = tool_calls
+    create = mock_zhipuai_class.return_value.chat.completions.create
+    create.side_effect = [first_response, _mock_completion(answer)]
+    return create
+
+
+@patch("api.routes.ai.ZhipuAI")
+@patch("api.routes.ai.os.getenv")
+def test_tool_calls_run_concurrently(mock_getenv, mock_zhipuai_class):
+    import time
+    mock_getenv.return_value = "fake_zhipu_api_key"
+    create = _tool_round_trip(mock_zhipuai_class, [
+        _tool_call("call_1", "get_venue_stats", '{"venue_name": "Arena"}'),
+        _tool_call("call_2", "get_best_seats", '{"venue_name": "Arena"}'),
+        _tool_call("call_3", "get_section_stats", '{"venue_name": "Arena"}'),
+    ], "Here is what I found.")
+
+    def slow_tool(name):
+        def run(**kwargs):
+            time.sleep(0.3)
+            return json.dumps({"tool": name})
+        return run
+
+    slow_tools = {name: slow_tool(name) for name in ("get_venue_stats", "get_best_seats", "get_section_stats")}
+    with patch.dict("api.routes.ai.TOOL_FUNCTIONS", slow_tools):
+        response = client.post("/ai/analyze", json={"input_data": "Tell me about Arena"})
+
+    assert response.status_code == 200
+    metadata = response.json()["metadata"]
+    assert [t["tool_call_id"] for t in metadata["tools"]] == ["call_1", "call_2", "call_3"]
+    assert all(t["status"] == "ok" and t["ms"] >= 300 for t in metadata["tools"])
+    # As long as the slowest call, not the sum of all three
+    assert metadata["tools_ms"] < 800
+    # Tool results go back to the model in the order it asked for them
+    tool_messages = [m for m in create.call_args_list[1][1]["messages"] if m["role"] == "tool"]
+    assert [m["tool_call_id"] for m in tool_messages] == ["call_1", "call_2", "call_3"]
+    assert json.loads(tool_messages[1]["content"]) == {"tool": "get_best_seats"}
+
+
+@patch("api.routes.ai.ZhipuAI")
+@patch("api.routes.ai.os.getenv")
+def test_tool_calls_past_deadline_are_reported_as_timed_out(mock_getenv, mock_zhipuai_class, monkeypatch):
+    import threading
+    mock_getenv.return_value = "fake_zhipu_api_key"
+    monkeypatch.setattr("api.routes.ai.AI_TOOL_DEADLINE_S", 0.3)
+    create = _tool_round_trip(mock_zhipuai_class, [
+        _tool_call("call_fast", "get_venue_stats", '{"venue_name": "Arena"}'),
+        _tool_call("call_stuck", "get_past_events", '{"venue_name": "Arena"}'),
+        _tool_call("call_bad", "get_nonexistent", '{}'),
+    ], "Partial answer.")
+    stuck = threading.Event()
+    tools = {
+        "get_venue_stats": lambda **kwargs: '{"ok": true}',
+        "get_past_events": lambda **kwargs: stuck.wait(5) and '[]',
+    }
+    try:
+        with patch.dict("api.routes.ai.TOOL_FUNCTIONS", tools):
+            response = client.post("/ai/analyze", json={"input_data": "Arena?"})
+    finally:
+        stuck.set()
+
+    assert response.status_code == 200
+    assert response.json()["analysis"] == "Partial answer."
+    statuses = {t["tool_call_id"]: t["status"] for t in response.json()["metadata"]["tools"]}
+    assert statuses == {"call_fast": "ok", "call_stuck": "timeout", "call_bad": "error"}
+    tool_messages = {m["tool_call_id"]: m["content"] for m in create.call_args_list[1][1]["messages"] if m["role"] == "tool"}
+    assert "Timed out" in tool_messages["call_stuck"]
+
+
+@patch("api.routes.ai.ZhipuAI")
+@patch("api.routes.ai.os.getenv")
+def test_timed_out_tools_free_their_workers(mock_getenv, mock_zhipuai_class, monkeypatch):
+    """Slow tool queries are cancelled at the tool deadline, so they do not keep the tool executor busy."""
+    import time
+    from sqlalchemy import text
+    from api.database import engine
+    from api.utils import ai_executor
+    mock_getenv.return_value = "fake_zhipu_api_key"
+    monkeypatch.setattr("api.routes.ai.AI_TOOL_DEADLINE_S", 0.3)
+    workers = ai_executor._tool_executor._max_workers
+    _tool_round_trip(mock_zhipuai_class, [
+        _tool_call(f"call_{i}", "get_past_events", json.dumps({"venue_name": f"Arena {i}"})) for i in range(workers)
+    ], "Nothing came back in time.")
+    finished = []
+
+    def slow_query(**kwargs):
+        try:
+            with engine.connect() as conn:
+                # Counts to a billion: minutes, unless it is cancelled
+                return str(conn.execute(text(
+                    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 1000000000) "
+                    "SELECT COUNT(*) FROM c"
+                )).scalar())
+        finally:
+            finished.append(time.monotonic())
+
+    with patch.dict("api.routes.ai.TOOL_FUNCTIONS", {"get_past_events": slow_query}):
+        response = client.post("/ai/analyze", json={"input_data": "Every arena?"})
+    assert response.status_code == 200
+    assert {t["status"] for t in response.json()["metadata"]["tools"]} == {"timeout"}
+
+    # Every query has stopped, so every worker is free again for new jobs
+    deadline = time.monotonic() + 2
+    while len(finished) < workers and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(finished) == workers
+    jobs = [ai_executor._tool_executor.submit(time.sleep, 0.2) for _ in range(workers)]
+    started = time.monotonic()
+    for job in jobs:
+        job.result(timeout=5)
+    assert time.monotonic() - started < 0.6
+
+
+def test_tools_do_not_queue_behind_model_calls():
+    """Tool queries have their own pool: model calls filling the LLM executor don't starve them."""
+    import asyncio
+    import threading
+    import time
+    from api.routes.ai import _run_tool_call
+    from api.utils import ai_executor
+    release = threading.Event()
+    busy = [ai_executor._executor.submit(release.wait, 5) for _ in range(ai_executor._executor._max_workers)]
+    try:
+        with patch.dict("api.routes.ai.TOOL_FUNCTIONS", {"get_top_venues": lambda **kwargs: "[]"}):
+            result = asyncio.run(_run_tool_call(
+                _tool_call("call_1", "get_top_venues", json.dumps({"limit": 3})), time.monotonic() + 0.5,
+            ))
+        assert result["status"] == "ok" and result["ms"] < 500
+    finally:
+        release.set()
+        for job in busy:
+            job.result(timeout=5)
+
+
+@patch("api.routes.ai.ZhipuAI")
+@patch("api.routes.ai.os.getenv")
+def test_model_call_past_deadline_returns_504(mock_getenv, mock_zhipuai_class, monkeypatch):
+    import threading
+    mock_getenv.return_value = "fake_zhipu_api_key"
+    monkeypatch.setattr("api.routes.ai.AI_REQUEST_DEADLINE_S", 0.2)
+    release = threading.Event()
+    mock_zhipuai_class.return_value.chat.completions.create.side_effect = lambda **kwargs: release.wait(5)
+    try:
+        response = client.post("/ai/analyze", json={"input_data": "Slow"})
+    finally:
+        release.set()
+    assert response.status_code == 504
+
+
+def _chunk(content=None, tool_calls=None):
+    from types import SimpleNamespace
+    delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+def _tool_call_delta(index, call_id, name, arguments):
+    from types import SimpleNamespace
+    return SimpleNamespace(
+        index=index, id=call_id, type="function",
+        function=SimpleNamespace(name=name, arguments=arguments),
+    )
+
+
+def _sse_events(body):
+    """(event, data) pairs of an SSE body, skipping comments."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n") if not line.startswith(":"))
+        if fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@patch("api.routes.ai.ZhipuAI")
+@patch("api.routes.ai.os.getenv")
+def test_analyze_stream_tool_progress_then_tokens(mock_getenv, mock_zhipuai_class):
+    mock_getenv.return_value = "fake_zhipu_api_key"
+    streams = [
+        # The model asks for two tools; the arguments arrive in pieces
+        [
+            _chunk(tool_calls=[_tool_call_delta(0, "call_1", "get_venue_stats", '{"venue_name": ')]),
+            _chunk(tool_calls=[_tool_call_delta(0, None, None, '"Arena"}')]),
+            _chunk(tool_calls=[_tool_call_delta(1, "call_2", "get_best_seats", '{"venue_name": "Arena"}')]),
+        ],
+        [_chunk("Arena "), _chunk("is "), _chunk("great.")],
+    ]
+    create = mock_zhipuai_class.return_value.chat.completions.create
+    create.side_effect = lambda **kwargs: iter(streams.pop(0))
+    tools = {
+        "get_venue_stats": lambda venue_name: json.dumps({"name": venue_name}),
+        "get_best_seats": lambda venue_name: "[]",
+    }
+
+    with patch.dict("api.routes.ai.TOOL_FUNCTIONS", tools):
+        response = client.post("/ai/analyze/stream", json={"input_data": {"question": "How is it?", "venue_name": "Arena"}})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _sse_events(response.text)
+    kinds = [kind for kind, _ in events]
+    assert kinds[:2] == ["tool_start", "tool_start"]
+    assert sorted(kinds[2:4]) == ["tool_done", "tool_done"]
+    assert kinds[4:] == ["token", "token", "token", "done"]
+    assert events[0][1] == {"name": "get_venue_stats", "tool_call_id": "call_1", "arguments": '{"venue_name": "Arena"}'}
+    assert {data["tool_call_id"]: data["status"] for kind, data in events if kind == "tool_done"} == {
+        "call_1": "ok", "call_2": "ok",
+    }
+    assert "".join(data["text"] for kind, data in events if kind == "token") == "Arena is great."
+    assert [t["name"] for t in events[-1][1]["metadata"]["tools"]] == ["get_venue_stats", "get_best_seats"]
+
+    # Both calls streamed; the second got the tool results in the model's order
+    assert all(call[1]["stream"] is True for call in create.call_args_list)
+    messages = create.call_args_list[1][1]["messages"]
+    assert [m["role"] for m in messages] == ["system", "user", "assistant", "tool", "tool"]
+    assert messages[3] == {"role": "tool", "content": '{"name": "Arena"}', "tool_call_id": "call_1"}
+
+
+@patch("api.routes.ai.ZhipuAI")
+@patch("api.routes.ai.os.getenv")
+def test_analyze_stream_caches_the_same_analysis_as_analyze(mock_getenv, mock_zhipuai_class):
+    """Text the model writes before its tool calls is not part of the cached answer."""
+    from api.utils.ai_cache import response_cache
+    mock_getenv.return_value = "fake_zhipu_api_key"
+    question = {"input_data": "How is Arena?"}
+    tools = {"get_venue_stats": lambda venue_name: json.dumps({"name": venue_name})}
+    create = mock_zhipuai_class.return_value.chat.completions.create
+
+    # Non-streaming: the same preamble, then the answer
+    first_response = _mock_completion("Let me check. ")
+    first_response.choices[0].message.tool_calls = [_tool_call("call_1", "get_venue_stats", '{"venue_name": "Arena"}')]
+    create.side_effect = [first_response, _mock_completion("Arena is great.")]
+    with patch.dict("api.routes.ai.TOOL_FUNCTIONS", tools):
+        expected = client.post("/ai/analyze", json=question).json()["analysis"]
+    assert expected == "Arena is great."
+
+    response_cache.clear()
+    streams = [
+        [
+            _chunk("Let me "), _chunk("check. "),
+            _chunk(tool_calls=[_tool_call_delta(0, "call_1", "get_venue_stats", '{"venue_name": "Arena"}')]),
+        ],
+        [_chunk("Arena "), _chunk("is "), _chunk("great.")],
+    ]
+    create.side_effect = lambda **kwargs: iter(streams.pop(0))
+    with patch.dict("api.routes.ai.TOOL_FUNCTIONS", tools):
+        events = _sse_events(client.post("/ai/analyze/stream", json=question).text)
+    kinds = [kind for kind, _ in events]
+    assert kinds[:3] == ["token", "token", "preamble"]
+    assert events[2][1] == {"text": "Let me check. "}
+    after = kinds.index("preamble")
+    assert "".join(data["text"] for kind, data in events[after:] if kind == "token") == expected
+
+    # Served from the cache the stream filled, /analyze gives the same text
+    create.side_effect = AssertionError("should be cached")
+    cached = client.post("/ai/analyze", json=question).json()
+    assert cached["analysis"] == expected
+
+
+@patch("api.routes.ai.ZhipuAI")
+@patch("api.routes.ai.os.getenv")
+def test_analyze_stream_answer_without_tools(mock_getenv, mock_zhipuai_class):
+    mock_getenv.return_value = "fake_zhipu_api_key"
+    mock_zhipuai_class.return_value.chat.completions.create.return_value = iter([_chunk("Hello"), _chunk(" there.")])
+
+    response = client.post("/ai/analyze/stream", json={"input_data": "Hi"})
+
+    assert _sse_events(response.text) == [
+        ("token", {"text": "Hello"}), ("token", {"text": " there."}), ("done", {}),
+    ]
+
+
+@patch("api.routes.ai.ZhipuAI")
+@patch("api.routes.ai.os.getenv")
+def test_analyze_stream_reports_model_failure_as_event(mock_getenv, mock_zhipuai_class):
+    from api.utils import ai_executor
+    mock_getenv.return_value = "fake_zhipu_api_key"
+    mock_zhipuai_class.return_value.chat.completions.create.side_effect = Exception("API limit exceeded")
+
+    response = client.post("/ai/analyze/stream", json={"input_data": "Hi"})
+
+    assert response.status_code == 200
+    assert _sse_events(response.text) == [
+        ("error", {"status_code": 500, "detail": "Failed to analyze data with ZhipuAI: API limit exceeded"}),
+    ]
+    assert ai_executor._active_requests == 0
+
+
+@patch("api.routes.ai.ZhipuAI")
+@patch("api.routes.ai.os.getenv")
+def test_analyze_stream_rejects_when_assistant_saturated(mock_getenv, mock_zhipuai_class, monkeypatch):
+    from api.utils import ai_executor
+    mock_getenv.return_value = "fake_zhipu_api_key"
+    monkeypatch.setattr(ai_executor, "AI_MAX_CONCURRENCY", 0)
+    monkeypatch.setattr(ai_executor, "AI_MAX_QUEUED", 0)
+
+    response = client.post("/ai/analyze/stream", json={"input_data": "Hi"})
+
+    assert response.status_code == 503
+    mock_zhipuai_class.return_value.chat.completions.create.assert_not_called()
+
+
+def test_analyze_stream_starts_before_the_model_answers():
+    import asyncio
+    import threading
+    from api.routes.ai import _analysis_events
+    release = threading.Event()
+    model = MagicMock()
+    model.chat.completions.create.side_effect = lambda **kwargs: release.wait(5) and iter([_chunk("Late.")])
+
+    async def scenario():
+        events = _analysis_events(model, [{"role": "user", "content": "Hi"}])
+        try:
+            # The first bytes go out while the model call is still in flight
+            first = await asyncio.wait_for(events.__anext__(), timeout=1)
+            release.set()
+            rest = [event async for event in events]
+        finally:
+            release.set()
+        return first, rest
+
+    first, rest = asyncio.run(scenario())
+    assert first.startswith(":")
+    assert _sse_events("".join(rest)) == [("token", {"text": "Late."}), ("done", {})]
@@ -0,0 +1,164 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from datetime import timedelta
+from api.main import app
+from api.auth_utils import get_password_hash, create_access_token
+from api.database import engine
+from api.routes import reviews as reviews_module
+
+client = TestClient(app)
+
+U_ID = "00000000-0000-0000-0000-0000000000b1"
+V_ID = "00000000-0000-0000-0000-0000000000b2"
+E_ID = "00000000-0000-0000-0000-0000000000b3"
+OTHER_V_ID = "00000000-0000-0000-0000-0000000000b4"
+OTHER_E_ID = "00000000-0000-0000-0000-0000000000b5"
+
+
+def _cleanup(conn):
+    for venue_id in (V_ID, OTHER_V_ID):
+        conn.execute(text("DELETE FROM VenueAggregates WHERE venue_id = :id"), {"id": venue_id})
+        conn.execute(text("DELETE FROM SeatAggregates WHERE seat_id IN (SELECT id FROM Seats WHERE venue_id = :id)"), {"id": venue_id})
+        conn.execute(text("DELETE FROM Reviews WHERE venue_id = :id"), {"id": venue_id})
+        conn.execute(text("DELETE FROM Seats WHERE venue_id = :id"), {"id": venue_id})
+        conn.execute(text("DELETE FROM Events WHERE venue_id = :id"), {"id": venue_id})
+        conn.execute(text("DELETE FROM Venues WHERE id = :id"), {"id": venue_id})
+    conn.execute(text("DELETE FROM Users WHERE id = :id"), {"id": U_ID})
+
+
+@pytest.fixture
+def catalog():
+    with engine.begin() as conn:
+        _cleanup(conn)
+        conn.execute(
+            text("INSERT INTO Users (id, email, password_hash) VALUES (:id, :e, :p)"),
+            {"id": U_ID, "e": "bulktest@test.com", "p": get_password_hash("password")},
+        )
+        conn.execute(
+            text("INSERT INTO Venues (id, name, city) VALUES (:id, :n, 'TestCity')"),
+            [{"id": V_ID, "n": "BulkTestVenue"}, {"id": OTHER_V_ID, "n": "BulkOtherVenue"}],
+        )
+        conn.execute(
+            text("INSERT INTO Events (id, venue_id, name) VALUES (:id, :v, :n)"),
+            [{"id": E_ID, "v": V_ID, "n": "BulkTestEvent"}, {"id": OTHER_E_ID, "v": OTHER_V_ID, "n": "BulkOtherEvent"}],
+        )
+    token = create_access_token({"sub": U_ID}, expires_delta=timedelta(hours=1))
+    yield {"Authorization": f"Bearer {token}", "Content-Type": "application/x-ndjson"}
+    with engine.begin() as conn:
+        _cleanup(conn)
+
+
+def _line(seat_number="1", visual=4, sound=4, value=4, price=50.0, **overrides):
+    review = {
+        "event_id": E_ID, "venue_id": V_ID,
+        "section": "BulkSec", "row": "A", "seat_number": seat_number,
+        "rating_visual": visual, "rating_sound": sound, "rating_value": value,
+        "price_paid": price, "text": "Imported review",
+    }
+    review.update(overrides)
+    return json.dumps(review)
+
+
+def _seat_aggregates():
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT s.seat_number, sa.review_count, sa.visual_sum, sa.avg_visual, sa.avg_price_paid
+            FROM SeatAggregates sa JOIN Seats s ON s.id = sa.seat_id
+            WHERE s.venue_id = :v ORDER BY s.seat_number
+        """), {"v": V_ID}).fetchall()
+    return {row.seat_number: row for row in rows}
+
+
+def test_bulk_import_reports_invalid_lines(catalog):
+    body = "\n".join([
+        _line("1", visual=5, price=40.0),
+        "{not json",
+        _line("1", visual=3, price=60.0),
+        _line("2"),
+        "",
+        _line("3", event_id="no-such-event"),
+        _line("3", event_id=OTHER_E_ID),
+        _line("3", rating_visual="loud"),
+    ])
+    resp = client.post("/reviews/bulk", content=body, headers=catalog)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["inserted"] == 3
+    assert [r["line"] for r in data["reviews"]] == [1, 3, 4]
+    assert [e["line"] for e in data["errors"]] == [2, 6, 7, 8]
+    assert data["errors"][1]["detail"] == "Invalid event_id: Event does not exist."
+    assert data["errors"][2]["detail"].startswith("Mismatch:")
+
+    seats = _seat_aggregates()
+    assert set(seats) == {"1", "2"}
+    assert seats["1"].review_count == 2
+    assert seats["1"].visual_sum == 8
+    assert float(seats["1"].avg_visual) == 4.0
+    assert float(seats["1"].avg_price_paid) == 50.0
+
+    with engine.connect() as conn:
+        venue = conn.execute(text("SELECT review_count FROM VenueAggregates WHERE venue_id = :v"), {"v": V_ID}).scalar()
+    assert venue == 3
+
+    # Imported reviews are ordinary reviews: the single-row path adds to the same seat
+    resp = client.post(
+        "/reviews/", json=json.loads(_line("1", visual=1, price=50.0)),
+        headers={"Authorization": catalog["Authorization"]},
+    )
+    assert resp.status_code == 200
+    assert _seat_aggregates()["1"].review_count == 3
+
+
+def test_bulk_import_atomic_rejects_everything(catalog):
+    body = "\n".join([_line("1"), _line("2", venue_id="no-such-venue")])
+    resp = client.post("/reviews/bulk", params={"atomic": True}, content=body, headers=catalog)
+    assert resp.status_code == 400
+    assert resp.json()["detail"]["errors"] == [{"line": 2, "detail": "Invalid venue_id: Venue does not exist."}]
+    assert _seat_aggregates() == {}
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM Reviews WHERE venue_id = :v"), {"v": V_ID}).scalar() == 0
+
+
+def test_bulk_import_statement_count_is_per_batch(catalog):
+    """Statements issued do not grow with the number of reviews or seats."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    body = "\n".join(_line(str(i % 40), visual=1 + i % 5) for i in range(200))
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        resp = client.post("/reviews/bulk", content=body, headers=catalog)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert resp.status_code == 200
+    assert resp.json()["inserted"] == 200
+    assert len(statements) < 20
+
+    seats = _seat_aggregates()
+    assert len(seats) == 40
+    assert sum(row.review_count for row in seats.values()) == 200
+
+
+def test_bulk_import_line_limit(catalog, monkeypatch):
+    monkeypatch.setattr(reviews_module, "BULK_MAX_REVIEWS", 2)
+    body = "\n".join(_line(str(i)) for i in range(3))
+    resp = client.post("/reviews/bulk", content=body, headers=catalog)
+    assert resp.status_code == 413
+
+
+def test_bulk_import_normalizes_ids_and_seat_position(catalog):
+    """Padded ids and seat fields resolve to the stored venue, event and seat."""
+    assert client.post("/reviews/bulk", content=_line("7"), headers=catalog).json()["inserted"] == 1
+    padded = _line(" 7 ", venue_id=f" {V_ID} ", event_id=f"{E_ID}\t", section=" BulkSec", row="A ")
+    resp = client.post("/reviews/bulk", content=padded, headers=catalog)
+    assert resp.status_code == 200
+    assert resp.json()["inserted"] == 1
+
+    assert _seat_aggregates()["7"].review_count == 2
+    with engine.connect() as conn:
+        stored = conn.execute(text("SELECT DISTINCT venue_id, event_id FROM Reviews WHERE venue_id LIKE '%0b2%'")).fetchall()
+    assert [tuple(row) for row in stored] == [(V_ID, E_ID)]
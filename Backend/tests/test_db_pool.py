@@ -0,0 +1,113 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from api.main import app
+from api.utils.db_pool import InstrumentedQueuePool, engine_options, pool_settings, pool_status
+
+client = TestClient(app)
+
+
+def test_pool_settings_from_env():
+    settings = pool_settings({
+        "DB_POOL_SIZE": "20", "DB_MAX_OVERFLOW": "0", "DB_POOL_PRE_PING": "false",
+        "DB_STATEMENT_TIMEOUT_MS": "5000",
+    })
+    assert settings["statement_timeout_ms"] == 5000
+    assert settings["pool_size"] == 20
+    assert settings["max_overflow"] == 0
+    assert settings["pool_pre_ping"] is False
+    assert settings["pool_recycle"] == 1800
+    # No statement timeout unless the app opts in
+    assert pool_settings({})["statement_timeout_ms"] == 0
+
+    options = engine_options("postgresql+pg8000://u:p@host/db", {"DB_POOL_SIZE": "12"})
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["pool_size"] == 12
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == {}
+    assert engine_options("postgresql://u:p@host/db")["connect_args"] == {"connect_timeout": 10}
+
+    # In-memory SQLite keeps its default single-connection pool
+    assert "poolclass" not in engine_options("sqlite://")
+
+
+def test_instrumented_pool_counts_checkouts_and_timeouts(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        **engine_options(f"sqlite:///{tmp_path / 'pool.db'}", {
+            "DB_POOL_SIZE": "1", "DB_MAX_OVERFLOW": "0", "DB_POOL_TIMEOUT": "0.05",
+        }),
+    )
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            status = pool_status(engine)
+            assert status["checked_out"] == 1
+            assert status["idle"] == 0
+            # The only connection is taken, so a second checkout times out
+            with pytest.raises(PoolTimeoutError):
+                engine.connect()
+        status = pool_status(engine)
+        assert status["checked_out"] == 0
+        assert status["idle"] == 1
+        assert status["checkouts"] == 1
+        assert status["timeouts"] == 1
+        assert status["connections_opened"] == 1
+        assert status["wait"]["samples"] == 2
+        assert status["wait"]["max_ms"] >= 50
+    finally:
+        engine.dispose()
+
+
+def test_health_db_endpoint():
+    response = client.get("/health/db")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "healthy"
+    assert data["pool"]["pool_class"] == "InstrumentedQueuePool"
+    for key in ("checked_out", "idle", "overflow", "timeouts", "wait"):
+        assert key in data["pool"]
+    assert data["pool"]["checkouts"] >= 1
+    assert data["settings"]["pool_size"] >= 1
+
+
+def test_async_database_url():
+    from api.database import async_database_url
+    assert async_database_url("sqlite:///./dev.db") == "sqlite+aiosqlite:///./dev.db"
+    assert async_database_url("postgresql+pg8000://u:p@h:5432/db") == "postgresql+psycopg://u:p@h:5432/db"
+
+
+@pytest.fixture
+def async_reads(monkeypatch):
+    """Route reads through an aiosqlite engine, as DB_ASYNC=true does."""
+    import asyncio
+    from api import database
+    pytest.importorskip("aiosqlite")
+    async_engine = database.create_async_read_engine(database.async_database_url(database.DATABASE_URL))
+    monkeypatch.setattr(database, "async_engine", async_engine)
+    yield async_engine
+    asyncio.run(async_engine.dispose())
+
+
+def test_run_read_uses_async_engine(async_reads):
+    import asyncio
+    from api import database
+    engine_used = asyncio.run(database.run_read(lambda conn: conn.engine))
+    assert engine_used is async_reads.sync_engine
+    assert client.get("/health/db").json()["async_pool"] is not None
+    # Same query code, including the SQLite text search functions
+    response = client.get("/search/venues", params={"q": "arena", "limit": 1})
+    assert response.status_code == 200
+    assert client.get("/search/venues/stats").status_code == 200
+
+
+def test_read_routes_fall_back_to_threadpool(monkeypatch):
+    """Without an async driver the async routes run the same code on the sync engine."""
+    import asyncio
+    from api import database
+    monkeypatch.setattr(database, "async_engine", None)
+    assert asyncio.run(database.run_read(lambda conn: conn.engine)) is database.engine
+    response = client.get("/search/venues", params={"limit": 1})
+    assert response.status_code == 200
+    assert client.get("/health/db").json()["async_pool"] is None
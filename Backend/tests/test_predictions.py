@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from api.database import engine
+from api.main import app
+from api.utils.predictions import fit_ridge, predict_venue, rebuild_predictions
+
+client = TestClient(app)
+
+VENUE_ID = "prediction-test-venue"
+
+
+@pytest.fixture
+def venue(seed_venue):
+    """Floor seats rated 5 at $200, upper seats rated 2 at $40, and one unreviewed seat in each."""
+    seats = [(f"pred-floor-{i}", "Floor", 5.0 + i, 0.0, float(i), 5, 200.0) for i in range(6)]
+    seats += [(f"pred-upper-{i}", "Upper", 60.0 + i, 50.0, float(i), 2, 40.0) for i in range(6)]
+    seats += [("pred-floor-new", "Floor", 7.5, 0.0, 9.0, None, None)]
+    seats += [("pred-upper-new", "Upper", 62.5, 50.0, 9.0, None, None)]
+    seed_venue(VENUE_ID, "Prediction Test Hall", seats)
+
+
+def test_fit_ridge_recovers_a_linear_model():
+    rng = np.random.default_rng(5)
+    features = rng.normal(size=(200, 3))
+    targets = np.column_stack([features @ [1.0, -2.0, 0.5] + 3.0, features @ [0.0, 1.0, 1.0] - 1.0])
+    coefficients, intercepts = fit_ridge(features, targets, np.ones(200), alpha=1e-9)
+    assert np.allclose(coefficients, [[1.0, 0.0], [-2.0, 1.0], [0.5, 1.0]])
+    assert np.allclose(intercepts, [3.0, -1.0])
+
+
+def test_few_reviewed_seats_fall_back_to_the_venue_average():
+    seats = [
+        ("a", "101", 10.0, 0.0, 0.0, 4, 4, 4, 4, 100.0, 1),
+        ("b", "101", 20.0, 1.0, 0.0, 2, 2, 2, 2, 50.0, 3),
+        ("c", "102", 30.0, None, None, None, None, None, None, None, 0),
+    ]
+    predictions = predict_venue(seats)
+    assert list(predictions) == ["c"]
+    assert predictions["c"]["predicted_overall"] == 2.5  # review-weighted
+    assert predictions["c"]["predicted_price"] == 62.5
+    assert 0 <= predictions["c"]["confidence"] < 0.2
+    assert "venue average of 2 reviewed seats" in predictions["c"]["explanation"]
+
+    # No reviews at all: nothing to predict from
+    assert predict_venue([seats[2]]) == {}
+
+
+def test_rebuild_and_search_fall_back_to_predictions(venue):
+    with engine.begin() as conn:
+        assert rebuild_predictions(conn, VENUE_ID) == 2
+        rows = dict(conn.execute(text(
+            "SELECT seat_id, predicted_overall FROM AI_Predictions WHERE seat_id LIKE 'pred-%'"
+        )).fetchall())
+    assert rows["pred-floor-new"] > 4.5 and rows["pred-upper-new"] < 2.5
+
+    response = client.get("/search/seats", params={"venue_id": VENUE_ID, "min_rating": 4, "sort_by": "avg_overall"})
+    assert response.status_code == 200
+    results = {s["id"]: s for s in response.json()["results"]}
+    assert set(results) == {f"pred-floor-{i}" for i in range(6)} | {"pred-floor-new"}
+    assert results["pred-floor-new"]["predicted"] is True
+    assert 0 < results["pred-floor-new"]["confidence"] <= 1
+    assert results["pred-floor-new"]["avg_price_paid"] > 150
+    assert results["pred-floor-0"]["predicted"] is False and results["pred-floor-0"]["confidence"] is None
+
+    # Once the seat has reviews of its own, those win and the prediction is dropped on the next rebuild
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO SeatAggregates (seat_id, avg_visual, avg_sound, avg_value, avg_overall, avg_price_paid, review_count) "
+            "VALUES ('pred-floor-new', 3, 3, 3, 3, 90, 1)"
+        ))
+    seat = next(s for s in client.get("/search/seats", params={"venue_id": VENUE_ID, "limit": 50}).json()["results"]
+                if s["id"] == "pred-floor-new")
+    assert seat["avg_overall"] == 3 and seat["predicted"] is False
+    with engine.begin() as conn:
+        assert rebuild_predictions(conn, VENUE_ID) == 1
+        assert conn.execute(text("SELECT COUNT(*) FROM AI_Predictions WHERE seat_id = 'pred-floor-new'")).scalar() == 0
+
+    # A venue whose reviews are all gone keeps no predictions
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM SeatAggregates WHERE seat_id LIKE 'pred-%'"))
+        assert rebuild_predictions(conn, VENUE_ID) == 0
+        assert conn.execute(text("SELECT COUNT(*) FROM AI_Predictions WHERE seat_id LIKE 'pred-%'")).scalar() == 0
@@ -556,3 +556,299 @@ def test_filter_reviews_by_section(seed_reviews):
     data = response.json()
     assert data["total"] >= 1
     assert all(r["section"] == "Floor" for r in data["results"])
+
+
+# ---------------------------------------------------------------------------
+# Keyset (cursor) pagination
+# ---------------------------------------------------------------------------
+
+def _walk_cursor(path, params):
+    """Follow next_cursor until exhausted and return every visited row."""
+    seen = []
+    resp = client.get(path, params=params).json()
+    seen.extend(resp["results"])
+    while resp["next_cursor"]:
+        resp = client.get(path, params={**params, "cursor": resp["next_cursor"]}).json()
+        seen.extend(resp["results"])
+    return seen
+
+
+def test_venues_cursor_matches_offset():
+    """Walking venues by cursor should visit the same rows as one big page."""
+    params = {"q": "TestVenue", "sort_by": "capacity", "order": "desc"}
+    all_venues = client.get("/search/venues", params=params).json()["results"]
+    walked = _walk_cursor("/search/venues", {**params, "limit": 1})
+    assert [v["id"] for v in walked] == [v["id"] for v in all_venues]
+
+
+def test_venues_cursor_by_rating(seed_reviews):
+    """Cursor pagination over the aggregate rating sort should not skip or repeat venues."""
+    params = {"q": "TestVenue", "sort_by": "rating", "order": "desc"}
+    all_venues = client.get("/search/venues", params=params).json()["results"]
+    walked = _walk_cursor("/search/venues", {**params, "limit": 1})
+    assert [v["id"] for v in walked] == [v["id"] for v in all_venues]
+
+
+def test_events_cursor_matches_offset(seed_events):
+    """Walking events by cursor should visit the same rows as one big page."""
+    params = {"q": "TestEvent", "sort_by": "event_date", "order": "asc"}
+    all_events = client.get("/search/events", params=params).json()["results"]
+    walked = _walk_cursor("/search/events", {**params, "limit": 3})
+    assert [e["id"] for e in walked] == [e["id"] for e in all_events]
+
+
+def test_seats_cursor_with_null_aggregates(seed_seats):
+    """Seats without aggregates (NULL sort values) should still be reached by the cursor."""
+    params = {"venue_id": "tv-1", "sort_by": "avg_overall", "order": "desc"}
+    all_seats = client.get("/search/seats", params=params).json()["results"]
+    walked = _walk_cursor("/search/seats", {**params, "limit": 1})
+    assert [s["id"] for s in walked] == [s["id"] for s in all_seats]
+
+
+def test_reviews_cursor_with_ties(seed_reviews):
+    """Duplicate sort values are broken by id, so no review is skipped or repeated."""
+    params = {"seat_id": "ts-1", "sort_by": "created_at", "order": "desc"}
+    all_reviews = client.get("/search/reviews", params=params).json()["results"]
+    walked = _walk_cursor("/search/reviews", {**params, "limit": 1})
+    assert [r["id"] for r in walked] == [r["id"] for r in all_reviews]
+    assert len({r["id"] for r in walked}) == len(walked)
+
+
+def test_last_page_has_no_next_cursor(seed_reviews):
+    """A page that reaches the end of the result set should return next_cursor = null."""
+    response = client.get("/search/reviews", params={"seat_id": "ts-1", "limit": 100})
+    assert response.status_code == 200
+    assert response.json()["next_cursor"] is None
+
+
+def test_invalid_cursor():
+    """A malformed cursor should return 400."""
+    response = client.get("/search/venues", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_cursor_sort_mismatch(seed_events):
+    """A cursor issued for one sort order cannot be replayed against another."""
+    first = client.get("/search/events", params={"q": "TestEvent", "sort_by": "name", "limit": 1}).json()
+    response = client.get("/search/events", params={"q": "TestEvent", "sort_by": "artist", "cursor": first["next_cursor"]})
+    assert response.status_code == 400
+
+
+# ---------------------------------------------------------------------------
+# count_mode
+# ---------------------------------------------------------------------------
+
+def test_count_mode_exact_matches_full_listing(seed_reviews):
+    """The window-function total should equal the number of matching rows."""
+    full = client.get("/search/reviews", params={"seat_id": "ts-1", "limit": 100}).json()
+    paged = client.get("/search/reviews", params={"seat_id": "ts-1", "limit": 1}).json()
+    assert paged["total"] == len(full["results"]) == full["total"]
+
+
+def test_count_mode_exact_past_last_page():
+    """An offset past the end still reports the true total."""
+    total = client.get("/search/venues", params={"q": "TestVenue"}).json()["total"]
+    response = client.get("/search/venues", params={"q": "TestVenue", "offset": 1000})
+    assert response.status_code == 200
+    assert response.json()["results"] == []
+    assert response.json()["total"] == total
+
+
+def test_count_mode_exact_with_cursor(seed_events):
+    """Pages fetched by cursor still report the total for the whole filter."""
+    first = client.get("/search/events", params={"q": "TestEvent", "limit": 1}).json()
+    second = client.get("/search/events", params={"q": "TestEvent", "limit": 1, "cursor": first["next_cursor"]}).json()
+    assert second["total"] == first["total"]
+
+
+def test_count_mode_none(seed_seats):
+    """count_mode=none skips counting entirely."""
+    response = client.get("/search/seats", params={"venue_id": "tv-1", "count_mode": "none"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] is None
+    assert len(data["results"]) >= 3
+
+
+def test_count_mode_estimated(seed_events):
+    """count_mode=estimated returns a numeric total (exact on SQLite)."""
+    response = client.get("/search/events", params={"venue_id": "tv-1", "count_mode": "estimated"})
+    assert response.status_code == 200
+    assert response.json()["total"] >= 2
+
+
+def test_count_mode_invalid():
+    """Unknown count_mode should return 400."""
+    response = client.get("/search/venues", params={"count_mode": "approximate"})
+    assert response.status_code == 400
+
+
+# ---------------------------------------------------------------------------
+# Ranked text search
+# ---------------------------------------------------------------------------
+
+def test_search_venues_tolerates_typos():
+    """A misspelled query still finds the venue via trigram similarity."""
+    response = client.get("/search/venues", params={"q": "TestVenu Alpah"})
+    assert response.status_code == 200
+    names = [v["name"] for v in response.json()["results"]]
+    assert "TestVenue Alpha" in names
+
+
+def test_search_events_matches_venue_city(seed_events):
+    """Event search also matches the venue's name and city."""
+    response = client.get("/search/events", params={"q": "toronto"})
+    assert response.status_code == 200
+    ids = {e["id"] for e in response.json()["results"]}
+    assert {"te-1", "te-2", "te-4"} <= ids
+    assert "te-3" not in ids
+
+
+def test_search_events_sort_by_relevance(seed_events):
+    """sort_by=relevance ranks the closest match first and returns scores."""
+    response = client.get("/search/events", params={"q": "artist two", "sort_by": "relevance", "order": "desc"})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["id"] == "te-2"
+    scores = [e["relevance"] for e in results]
+    assert scores == sorted(scores, reverse=True)
+    assert all(0 < s <= 1 for s in scores)
+
+
+def test_search_relevance_is_null_without_q(seed_events):
+    response = client.get("/search/events", params={"venue_id": "tv-1"})
+    assert all(e["relevance"] is None for e in response.json()["results"])
+
+
+def test_sort_by_relevance_requires_q():
+    response = client.get("/search/venues", params={"sort_by": "relevance"})
+    assert response.status_code == 400
+
+
+def test_relevance_cursor_matches_offset(seed_events):
+    """Keyset pagination works on the relevance score too."""
+    params = {"q": "testevent", "sort_by": "relevance", "order": "desc"}
+    all_events = client.get("/search/events", params=params).json()["results"]
+    walked = _walk_cursor("/search/events", {**params, "limit": 1})
+    assert [e["id"] for e in walked] == [e["id"] for e in all_events]
+
+
+def test_search_index_follows_updates(seed_venues):
+    """Renaming a venue is reflected in search immediately (index triggers)."""
+    from api.database import engine
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE Venues SET name = 'TestVenue Epsilon' WHERE id = 'tv-3'"))
+    try:
+        names = [v["name"] for v in client.get("/search/venues", params={"q": "epsilon"}).json()["results"]]
+        assert "TestVenue Epsilon" in names
+        names = [v["name"] for v in client.get("/search/venues", params={"q": "gamma"}).json()["results"]]
+        assert "TestVenue Gamma" not in names
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE Venues SET name = 'TestVenue Gamma' WHERE id = 'tv-3'"))
+
+
+def test_venue_id_indexes_exist():
+    """Every table filtered by venue id has its index, Seats included."""
+    from api.database import engine
+    from api.utils.text_search import VENUE_ID_INDEXES
+    with engine.connect() as conn:
+        names = {row[0] for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'"))}
+    assert {name for name, _ in VENUE_ID_INDEXES} <= names
+
+
+# ---------------------------------------------------------------------------
+# /search/seats spatial parameters
+# ---------------------------------------------------------------------------
+
+@pytest.fixture(scope="module")
+def seed_positioned_seats(seed_venues):
+    """A 10 x 10 grid of seats at integer positions in tv-3: section L for x < 5, R otherwise."""
+    from api.database import engine
+    from api.utils.seat_index import invalidate_seat_index
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM Seats WHERE id LIKE 'tg-%'"))
+        conn.execute(
+            text("INSERT INTO Seats (id, venue_id, section, row, seat_number, distance_to_stage, x, y) "
+                 "VALUES (:id, 'tv-3', :section, :row, :seat_number, :distance, :x, :y)"),
+            [{"id": f"tg-{x}-{y}", "section": "L" if x < 5 else "R", "row": str(y), "seat_number": str(x),
+              "distance": float(y), "x": x, "y": y} for x in range(10) for y in range(10)],
+        )
+    invalidate_seat_index("tv-3")
+
+    yield
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM Seats WHERE id LIKE 'tg-%'"))
+    invalidate_seat_index("tv-3")
+
+
+def test_seats_nearest_to_point(seed_positioned_seats):
+    response = client.get("/search/seats", params={
+        "venue_id": "tv-3", "near_x": 2.1, "near_y": 3.2, "nearest": 3, "sort_by": "distance",
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 3
+    assert [s["id"] for s in data["results"]] == ["tg-2-3", "tg-2-4", "tg-3-3"]
+    assert data["results"][0]["distance"] == pytest.approx(0.224, abs=1e-3)
+
+
+def test_seats_within_radius_of_section_centroid(seed_positioned_seats, monkeypatch):
+    # Section L's seats are centred on (2, 4.5)
+    params = {"venue_id": "tv-3", "around_section": "l", "radius": 1.2, "sort_by": "distance"}
+    data = client.get("/search/seats", params=params).json()
+    assert {s["id"] for s in data["results"]} == {"tg-2-4", "tg-2-5", "tg-1-4", "tg-1-5", "tg-3-4", "tg-3-5"}
+    assert all(s["distance"] <= 1.2 for s in data["results"])
+
+    # Other filters and keyset pages still apply to the spatial matches
+    first = client.get("/search/seats", params={**params, "limit": 4}).json()
+    second = client.get("/search/seats", params={**params, "limit": 4, "cursor": first["next_cursor"]}).json()
+    assert [s["id"] for s in first["results"] + second["results"]] == [s["id"] for s in data["results"]]
+    assert client.get("/search/seats", params={**params, "max_distance": 4}).json()["total"] == 3
+
+    # Large matches are filtered in SQL instead of by id: same answer
+    from api.routes.search import seats
+    monkeypatch.setattr(seats, "SPATIAL_MAX_IDS", 0)
+    assert client.get("/search/seats", params=params).json()["results"] == data["results"]
+
+
+def test_seats_spatial_parameter_errors(seed_positioned_seats):
+    bad = [
+        {"near_x": 1, "nearest": 3},                              # near_y missing
+        {"near_x": 1, "near_y": 1},                               # neither nearest nor radius
+        {"nearest": 3},                                           # no query point
+        {"sort_by": "distance"},
+        {"near_x": 1, "near_y": 1, "around_section": "L", "radius": 1},
+        {"near_x": "inf", "near_y": 1, "nearest": 3},             # not finite
+        {"near_x": 1, "near_y": "nan", "nearest": 3},
+        {"near_x": 1, "near_y": 1, "radius": "inf"},
+    ]
+    for params in bad:
+        assert client.get("/search/seats", params={"venue_id": "tv-3", **params}).status_code == 400, params
+    response = client.get("/search/seats", params={"venue_id": "tv-3", "around_section": "Z", "radius": 1})
+    assert response.status_code == 404
+
+
+def test_seat_index_is_built_off_the_event_loop(seed_positioned_seats, monkeypatch):
+    import asyncio
+    from api.routes.search import seats as seats_route
+    from api.utils.seat_index import invalidate_seat_index
+    on_loop = []
+    build = seats_route._build_seat_index
+
+    def recording_build(venue_id):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return build(venue_id)
+
+    monkeypatch.setattr(seats_route, "_build_seat_index", recording_build)
+    invalidate_seat_index("tv-3")
+    params = {"venue_id": "tv-3", "near_x": 0, "near_y": 0, "nearest": 1}
+    assert client.get("/search/seats", params=params).json()["results"][0]["id"] == "tg-0-0"
+    assert client.get("/search/seats", params=params).status_code == 200
+    # Built once, on a thread with no event loop; the second request uses the cached index
+    assert on_loop == [False]
@@ -1,10 +1,11 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import text
+from sqlalchemy import event, text
 from datetime import timedelta
 from api.main import app
 from api.auth_utils import get_password_hash, create_access_token
 from api.database import engine
+from api.utils.aggregates import recompute_seat_aggregates
 
 client = TestClient(app)
 
@@ -121,3 +122,156 @@ def test_seat_aggregates_update(test_user, test_venue_event):
         assert float(row.avg_overall) == 2.5
         # (100 + 50) / 2 = 75.0
         assert float(row.avg_price_paid) == 75.0
+
+
+def _post_review(user, venue_event, visual, sound, value, price):
+    resp = client.post(
+        "/reviews/",
+        json={
+            "event_id": venue_event["event_id"],
+            "venue_id": venue_event["venue_id"],
+            "section": "AggSec",
+            "row": "2",
+            "seat_number": "7",
+            "rating_visual": visual,
+            "rating_sound": sound,
+            "rating_value": value,
+            "price_paid": price,
+            "text": "Sum review",
+        },
+        headers={"Authorization": f"Bearer {user['token']}"},
+    )
+    assert resp.status_code == 200
+    return resp.json()["review_id"]
+
+
+def _seat_row(venue_id):
+    with engine.connect() as conn:
+        return conn.execute(text("""
+            SELECT sa.seat_id, sa.visual_sum, sa.price_cents_sum, sa.price_count, sa.review_count,
+                   sa.avg_visual, sa.avg_price_paid
+            FROM SeatAggregates sa
+            JOIN Seats s ON s.id = sa.seat_id
+            WHERE s.venue_id = :v_id AND s.section = 'AggSec' AND s.row = '2' AND s.seat_number = '7'
+        """), {"v_id": venue_id}).fetchone()
+
+
+def test_seat_aggregates_exact_after_many_writes(test_user, test_venue_event):
+    """Sums stay exact, so averages do not drift and deletes are subtracted."""
+    ids = [_post_review(test_user, test_venue_event, 1 + i % 5, 3, 3, 10.1) for i in range(30)]
+    row = _seat_row(test_venue_event["venue_id"])
+    assert row.review_count == 30
+    assert row.visual_sum == 90
+    assert row.price_cents_sum == 30300
+    assert float(row.avg_visual) == 3.0
+    assert float(row.avg_price_paid) == 10.1
+
+    for review_id in ids[:29]:
+        resp = client.delete(f"/reviews/{review_id}", headers={"Authorization": f"Bearer {test_user['token']}"})
+        assert resp.status_code == 200
+    row = _seat_row(test_venue_event["venue_id"])
+    assert row.review_count == 1
+    # Only ids[29] remains: visual = 1 + 29 % 5 = 5
+    assert float(row.avg_visual) == 5.0
+
+    client.delete(f"/reviews/{ids[29]}", headers={"Authorization": f"Bearer {test_user['token']}"})
+    assert _seat_row(test_venue_event["venue_id"]) is None
+
+
+def test_seat_aggregates_touched_by_image_edit(test_user, test_venue_event):
+    review_id = _post_review(test_user, test_venue_event, 4, 4, 4, 20.0)
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE SeatAggregates SET last_updated = '2000-01-01 00:00:00'"
+                          " WHERE seat_id = (SELECT seat_id FROM Reviews WHERE id = :id)"), {"id": review_id})
+    resp = client.patch(
+        "/reviews/img-database",
+        params={"review_id": review_id},
+        json={"images": ["https://example.com/a.jpg"]},
+        headers={"Authorization": f"Bearer {test_user['token']}"},
+    )
+    assert resp.status_code == 200
+    with engine.connect() as conn:
+        last_updated = conn.execute(text(
+            "SELECT last_updated FROM SeatAggregates WHERE seat_id = (SELECT seat_id FROM Reviews WHERE id = :id)"
+        ), {"id": review_id}).scalar()
+    assert not str(last_updated).startswith("2000")
+
+
+def test_recompute_seat_aggregates(test_user, test_venue_event):
+    """The set-based rebuild restores drifted rows from Reviews."""
+    _post_review(test_user, test_venue_event, 5, 5, 5, 30.0)
+    unpriced = _post_review(test_user, test_venue_event, 2, 2, 2, 0.0)
+    seat_id = _seat_row(test_venue_event["venue_id"]).seat_id
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE Reviews SET price_paid = NULL WHERE id = :id"), {"id": unpriced})
+        conn.execute(text("UPDATE SeatAggregates SET visual_sum = 999, review_count = 9, avg_visual = 0.1 WHERE seat_id = :id"),
+                     {"id": seat_id})
+        assert recompute_seat_aggregates(conn, test_venue_event["venue_id"]) == 1
+    row = _seat_row(test_venue_event["venue_id"])
+    assert row.review_count == 2
+    assert row.visual_sum == 7
+    assert float(row.avg_visual) == 3.5
+    # Only one review stated a price
+    assert row.price_count == 1
+    assert float(row.avg_price_paid) == 30.0
+
+
+def test_review_submission_round_trips(test_user, test_venue_event):
+    """One validation query, then the seat/review/rollup batch; the seat row is reused."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        _post_review(test_user, test_venue_event, 3, 3, 3, 10.0)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    # validation + seat insert + review insert + seat/venue/platform rollups
+    assert len(statements) == 6
+
+    _post_review(test_user, test_venue_event, 5, 5, 5, 20.0)
+    with engine.connect() as conn:
+        seats = conn.execute(text(
+            "SELECT COUNT(*) FROM Seats WHERE venue_id = :v AND section = 'AggSec' AND row = '2' AND seat_number = '7'"
+        ), {"v": test_venue_event["venue_id"]}).scalar()
+    assert seats == 1
+    row = _seat_row(test_venue_event["venue_id"])
+    assert row.review_count == 2
+    assert float(row.avg_visual) == 4.0
+    assert float(row.avg_price_paid) == 15.0
+
+
+def test_review_submission_validation(test_user, test_venue_event):
+    body = {
+        "event_id": test_venue_event["event_id"],
+        "venue_id": test_venue_event["venue_id"],
+        "section": "AggSec", "row": "2", "seat_number": "7",
+        "rating_visual": 3, "rating_sound": 3, "rating_value": 3,
+        "price_paid": 10.0, "text": "Invalid",
+    }
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+
+    resp = client.post("/reviews/", json={**body, "event_id": "no-such-event"}, headers=headers)
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Invalid event_id: Event does not exist."
+
+    resp = client.post("/reviews/", json={**body, "venue_id": "no-such-venue"}, headers=headers)
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Invalid venue_id: Venue does not exist."
+
+    # Nothing was written by the rejected submissions
+    assert _seat_row(test_venue_event["venue_id"]) is None
+
+
+def test_review_write_is_plain_statements_on_every_backend():
+    """The seat upsert, review insert and rollups are separate statements, with no data-modifying CTEs."""
+    from api.routes.reviews import _REVIEW_WRITE_STATEMENTS
+
+    assert len(_REVIEW_WRITE_STATEMENTS) == 5
+    for statement, table in zip(
+        _REVIEW_WRITE_STATEMENTS, ("Seats", "Reviews", "SeatAggregates", "VenueAggregates", "PlatformStats"),
+    ):
+        assert table in statement
+        assert not statement.lstrip().upper().startswith("WITH")
@@ -0,0 +1,38 @@
+import math
+import random
+
+from api.utils.seat_index import SeatIndex
+
+
+def _brute_force(seats, x, y):
+    return sorted((math.hypot(sx - x, sy - y), seat_id) for seat_id, _, sx, sy in seats)
+
+
+def test_queries_match_brute_force():
+    rng = random.Random(7)
+    seats = [(f"s{i}", f"{i % 5}", rng.uniform(-60, 60), rng.uniform(0, 25)) for i in range(2000)]
+    index = SeatIndex(seats)
+    for _ in range(100):
+        # Points inside and well outside the seating area
+        x, y, k = rng.uniform(-150, 150), rng.uniform(-50, 80), rng.randint(1, 25)
+        expected = _brute_force(seats, x, y)
+        assert [round(d, 9) for _, d in index.nearest(x, y, k)] == [round(d, 9) for d, _ in expected[:k]]
+
+        radius = rng.uniform(0, 30)
+        assert sorted(s for s, _ in index.within(x, y, radius)) == sorted(s for d, s in expected if d <= radius)
+        assert all(d <= radius for _, d in index.nearest(x, y, k, max_distance=radius))
+
+
+def test_section_centroids_and_edge_cases():
+    index = SeatIndex([("a", "Floor", 0, 0), ("b", "Floor", 4, 2), ("c", None, 9, 9), ("d", "Floor", None, 3)])
+    assert len(index) == 3  # seats without a position are skipped
+    assert index.section_centroid("floor") == (2, 1)
+    assert index.section_centroid("Balcony") is None
+    assert index.nearest(9, 8.5, 1) == [("c", 0.5)]
+
+    assert SeatIndex([]).nearest(0, 0, 3) == []
+    # All seats on one line, and all on one point
+    row = SeatIndex([(f"r{i}", "A", float(i), 5.0) for i in range(50)])
+    assert [seat for seat, _ in row.nearest(10.2, 5, 2)] == ["r10", "r11"]
+    same = SeatIndex([(f"p{i}", "A", 1.0, 1.0) for i in range(5)])
+    assert len(same.within(1, 1, 0)) == 5
@@ -1,14 +1,13 @@
 """
-Tests for the optimized seatmap pinning cache in zhipu_client.py.
+Tests for the seatmap pinning cache in seatmap_pins.py.
 
 Covers:
- - _normalize() helper
- - _extract_all_section_coords() with sample SVG data
+ - normalize_venue_key() helper (shared with the seatmap service)
+ - Section coordinates extracted from sample SVG data
  - Two-tier cache flow (pin cache hit, seatmap cache hit, full miss)
+ - Batch pre-rendering of every section of a venue
 """
 
-import json
-import pytest
 from unittest.mock import patch, MagicMock
 
 # We need to be able to import the module under test.
@@ -21,27 +20,28 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 
 class TestNormalize:
-    """Tests for the _normalize() venue name helper."""
+    """Tests for the normalize_venue_key() venue name helper."""
 
     def test_basic_lowercase(self):
-        from api.utils.zhipu_client import _normalize
+        from api.utils.seatmap_client import normalize_venue_key as _normalize
         assert _normalize("Madison Square Garden") == "madison_square_garden"
 
     def test_special_characters(self):
-        from api.utils.zhipu_client import _normalize
-        assert _normalize("Scotiabank Arena (Toronto)") == "scotiabank_arena__toronto"
+        from api.utils.seatmap_client import normalize_venue_key as _normalize
+        # Runs of separators collapse, as in SeatmapCache keys written by the seat-view endpoint
+        assert _normalize("Scotiabank Arena (Toronto)") == "scotiabank_arena_toronto"
 
     def test_already_clean(self):
-        from api.utils.zhipu_client import _normalize
+        from api.utils.seatmap_client import normalize_venue_key as _normalize
         assert _normalize("msg") == "msg"
 
     def test_numbers(self):
-        from api.utils.zhipu_client import _normalize
+        from api.utils.seatmap_client import normalize_venue_key as _normalize
         assert _normalize("Arena 305") == "arena_305"
 
 
 class TestExtractAllSectionCoords:
-    """Tests for _extract_all_section_coords() with synthetic SVG content."""
+    """Tests for the section coordinates the seatmap service extracts from synthetic SVG content."""
 
     SAMPLE_SVG_PATHS = """
     <svg viewBox="0 0 10240 7680">
@@ -65,53 +65,54 @@ class TestExtractAllSectionCoords:
     """
 
     def test_extracts_from_paths(self):
-        from api.utils.zhipu_client import _extract_all_section_coords
-        coords = _extract_all_section_coords(self.SAMPLE_SVG_PATHS)
+        from api.utils.svg_sections import extract_section_geometry
+        coords = extract_section_geometry(self.SAMPLE_SVG_PATHS, scale=10)
         assert "101" in coords
         assert "202" in coords
-        # Section 101: avg of (5120,3840), (5632,3840), (5632,4352), (5120,4352)
-        # = (5376, 4096) / 10 = (537, 409)
-        assert coords["101"] == (537, 409)
-        # Section 202: avg of (2560,1920), (3072,1920), (3072,2432), (2560,2432)
-        # = (2816, 2176) / 10 = (281, 217)
-        assert coords["202"] == (281, 217)
+        # Section 101: centre of the square (5120,3840)-(5632,4352)
+        # = (5376, 4096) / 10 = (538, 410), then its bounding box
+        assert coords["101"] == [538, 410, 512, 384, 563, 435]
+        # Section 202: centre of the square (2560,1920)-(3072,2432)
+        # = (2816, 2176) / 10 = (282, 218)
+        assert coords["202"][:2] == [282, 218]
 
     def test_extracts_from_text_elements(self):
-        from api.utils.zhipu_client import _extract_all_section_coords
-        coords = _extract_all_section_coords(self.SAMPLE_SVG_TEXT)
+        from api.utils.svg_sections import extract_section_geometry
+        coords = extract_section_geometry(self.SAMPLE_SVG_TEXT, scale=10)
         assert "FLOOR" in coords
-        assert coords["FLOOR"] == (512, 384)
+        assert coords["FLOOR"] == [512, 384]
         assert "BALCONY" in coords
-        assert coords["BALCONY"] == (256, 192)
+        assert coords["BALCONY"] == [256, 192]
 
     def test_mixed_path_and_text(self):
-        from api.utils.zhipu_client import _extract_all_section_coords
-        coords = _extract_all_section_coords(self.SAMPLE_SVG_MIXED)
+        from api.utils.svg_sections import extract_section_geometry
+        coords = extract_section_geometry(self.SAMPLE_SVG_MIXED, scale=10)
         assert "101" in coords
         assert "BALCONY" in coords
 
     def test_empty_svg(self):
-        from api.utils.zhipu_client import _extract_all_section_coords
-        coords = _extract_all_section_coords("<svg></svg>")
+        from api.utils.svg_sections import extract_section_geometry
+        coords = extract_section_geometry("<svg></svg>", scale=10)
         assert coords == {}
 
     def test_returns_dict(self):
-        from api.utils.zhipu_client import _extract_all_section_coords
-        coords = _extract_all_section_coords(self.SAMPLE_SVG_PATHS)
+        from api.utils.svg_sections import extract_section_geometry
+        coords = extract_section_geometry(self.SAMPLE_SVG_PATHS, scale=10)
         assert isinstance(coords, dict)
         for key, val in coords.items():
             assert isinstance(key, str)
-            assert isinstance(val, tuple)
-            assert len(val) == 2
+            assert isinstance(val, list)
+            assert len(val) in (2, 6)
+            assert all(isinstance(v, int) for v in val)
 
 
 class TestTwoTierCacheFlow:
     """Integration tests for the generate_seat_view_image two-tier cache."""
 
-    @patch("api.utils.zhipu_client._lookup_pin_cache")
+    @patch("api.utils.seatmap_pins._lookup_pin_cache")
     def test_tier1_cache_hit_returns_immediately(self, mock_pin_cache):
         """When SeatmapPinCache has the URL, no other work should be done."""
-        from api.utils.zhipu_client import generate_seat_view_image
+        from api.utils.seatmap_pins import generate_seat_view_image
         mock_pin_cache.return_value = "https://s3.example.com/cached.png"
 
         result = generate_seat_view_image("MSG", "101", "A", "1")
@@ -119,16 +120,16 @@ class TestTwoTierCacheFlow:
         assert result == "https://s3.example.com/cached.png"
         mock_pin_cache.assert_called_once()
 
-    @patch("api.utils.zhipu_client._store_pin_cache")
-    @patch("api.utils.zhipu_client._upload_to_s3")
-    @patch("api.utils.zhipu_client._render_pin_on_seatmap")
-    @patch("api.utils.zhipu_client._lookup_seatmap_cache")
-    @patch("api.utils.zhipu_client._lookup_pin_cache")
+    @patch("api.utils.seatmap_pins._store_pin_cache")
+    @patch("api.utils.seatmap_pins._upload_to_s3")
+    @patch("api.utils.seatmap_pins._render_pin_on_seatmap")
+    @patch("api.utils.seatmap_pins.get_seatmap_sync")
+    @patch("api.utils.seatmap_pins._lookup_pin_cache")
     def test_tier2_cache_hit_renders_and_caches(
         self, mock_pin_cache, mock_seatmap_cache, mock_render, mock_s3, mock_store_pin
     ):
         """When SeatmapPinCache misses but SeatmapCache has coords, render + cache."""
-        from api.utils.zhipu_client import generate_seat_view_image
+        from api.utils.seatmap_pins import generate_seat_view_image
 
         mock_pin_cache.return_value = None  # Tier 1 miss
         mock_seatmap_cache.return_value = {
@@ -146,30 +147,29 @@ class TestTwoTierCacheFlow:
         mock_s3.assert_called_once()
         mock_store_pin.assert_called_once()
 
-    @patch("api.utils.zhipu_client._fetch_and_cache_seatmap")
-    @patch("api.utils.zhipu_client._lookup_seatmap_cache")
-    @patch("api.utils.zhipu_client._lookup_pin_cache")
+    @patch("api.utils.seatmap_pins.get_seatmap_sync")
+    @patch("api.utils.seatmap_pins._lookup_pin_cache")
     def test_full_miss_returns_none(
-        self, mock_pin_cache, mock_seatmap_cache, mock_fetch
+        self, mock_pin_cache, mock_seatmap_cache
     ):
         """When both caches miss and TM has no data, return None (no AI fallback)."""
-        from api.utils.zhipu_client import generate_seat_view_image
+        from api.utils.seatmap_pins import generate_seat_view_image
 
         mock_pin_cache.return_value = None
-        mock_seatmap_cache.return_value = None
-        mock_fetch.return_value = {"tm_venue_id": None, "png_url": None, "section_coords": {}}
+        # The seatmap service's negative entry: TM has no seatmap for the venue
+        mock_seatmap_cache.return_value = {"png_url": None, "section_coords": {}, "fetched_at": 0}
 
         result = generate_seat_view_image("Unknown Venue", "X", "1", "1")
 
         assert result is None
 
-    @patch("api.utils.zhipu_client._lookup_seatmap_cache")
-    @patch("api.utils.zhipu_client._lookup_pin_cache")
+    @patch("api.utils.seatmap_pins.get_seatmap_sync")
+    @patch("api.utils.seatmap_pins._lookup_pin_cache")
     def test_section_not_in_coords_returns_none(
         self, mock_pin_cache, mock_seatmap_cache
     ):
         """When the venue coords exist but this specific section isn't found, return None."""
-        from api.utils.zhipu_client import generate_seat_view_image
+        from api.utils.seatmap_pins import generate_seat_view_image
 
         mock_pin_cache.return_value = None
         mock_seatmap_cache.return_value = {
@@ -181,3 +181,85 @@ class TestTwoTierCacheFlow:
         result = generate_seat_view_image("MSG", "999", "A", "1")
 
         assert result is None
+
+
+class TestPrerenderVenuePins:
+    """prerender_venue_pins(): one download, one pinned image per section, one cache write."""
+
+    SEATMAP = {
+        "tm_venue_id": "KovZ12345",
+        "png_url": "https://example.com/map.png",
+        "section_coords": {"101": [20, 20], "102": [40, 30, 30, 20, 50, 40], "103": [60, 40]},
+    }
+
+    @staticmethod
+    def _png():
+        import io
+        from PIL import Image
+        buf = io.BytesIO()
+        Image.new("RGB", (80, 60), "white").save(buf, format="PNG")
+        return buf.getvalue()
+
+    def _run(self, cached_sections=(), upload_result=lambda img, key: f"https://s3.example.com/{key}", **kwargs):
+        from api.utils.seatmap_pins import prerender_venue_pins
+        download = MagicMock(return_value=self._png())
+        with patch("api.utils.seatmap_pins.get_seatmap_sync", return_value=self.SEATMAP), \
+             patch("api.utils.seatmap_pins._cached_pin_sections", return_value=set(cached_sections)), \
+             patch("api.utils.seatmap_pins.download_png", download), \
+             patch("api.utils.seatmap_pins._upload_to_s3", side_effect=upload_result) as upload, \
+             patch("api.utils.seatmap_pins._store_pin_cache_many") as store:
+            counts = prerender_venue_pins("MSG", **kwargs)
+        return counts, download, upload, store
+
+    def test_renders_every_section_from_one_download(self):
+        from io import BytesIO
+        from PIL import Image
+        counts, download, upload, store = self._run(workers=1)
+
+        assert counts == {"sections": 3, "skipped": 0, "rendered": 3, "uploaded": 3, "failed": 0}
+        download.assert_called_once()
+        keys = sorted(call.args[1] for call in upload.call_args_list)
+        assert keys == ["seatmaps/msg_sec101.png", "seatmaps/msg_sec102.png", "seatmaps/msg_sec103.png"]
+        store.assert_called_once_with("msg", {
+            "101": "https://s3.example.com/seatmaps/msg_sec101.png",
+            "102": "https://s3.example.com/seatmaps/msg_sec102.png",
+            "103": "https://s3.example.com/seatmaps/msg_sec103.png",
+        })
+        # The pin is drawn at the section's coordinates, the rest of the map is untouched
+        pinned = {call.args[1]: Image.open(BytesIO(call.args[0])) for call in upload.call_args_list}
+        image = pinned["seatmaps/msg_sec102.png"]
+        assert image.getpixel((40, 30)) == (255, 255, 255, 255)   # white centre dot
+        assert image.getpixel((40, 30 + 10))[:3] != (255, 255, 255)  # red circle
+        assert image.getpixel((5, 55)) == (255, 255, 255, 255)
+
+    def test_process_pool_matches_single_process(self):
+        single = self._run(workers=1)[2].call_args_list
+        pooled = self._run(workers=2)[2].call_args_list
+        assert sorted((c.args[1], c.args[0]) for c in pooled) == sorted((c.args[1], c.args[0]) for c in single)
+
+    def test_cached_sections_are_skipped_unless_forced(self):
+        counts, _, upload, _ = self._run(cached_sections={"101", "103"}, workers=1)
+        assert counts["skipped"] == 2 and counts["uploaded"] == 1
+        assert [call.args[1] for call in upload.call_args_list] == ["seatmaps/msg_sec102.png"]
+
+        counts, download, _, _ = self._run(cached_sections={"101", "102", "103"}, workers=1)
+        assert counts["uploaded"] == 0
+        download.assert_not_called()
+
+        counts, _, _, _ = self._run(cached_sections={"101", "102", "103"}, workers=1, force=True)
+        assert counts["uploaded"] == 3
+
+    def test_failed_uploads_are_not_cached(self):
+        counts, _, _, store = self._run(
+            upload_result=lambda img, key: None if key.endswith("102.png") else f"https://s3.example.com/{key}",
+            workers=1,
+        )
+        assert counts["failed"] == 1 and counts["uploaded"] == 2
+        assert set(store.call_args.args[1]) == {"101", "103"}
+
+    def test_pin_cache_batch_write_round_trip(self):
+        from api.utils.seatmap_pins import _cached_pin_sections, _lookup_pin_cache, _store_pin_cache_many
+        _store_pin_cache_many("prerender_hall", {"1": "https://s3.example.com/a.png", "2": "https://s3.example.com/b.png"})
+        _store_pin_cache_many("prerender_hall", {"2": "https://s3.example.com/c.png"})
+        assert _cached_pin_sections("prerender_hall") == {"1", "2"}
+        assert _lookup_pin_cache("prerender_hall_sec2") == "https://s3.example.com/c.png"
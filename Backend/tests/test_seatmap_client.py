@@ -0,0 +1,289 @@
+"""
+Tests for the async Ticketmaster fetch in seatmap_client.py.
+
+Ticketmaster is replaced by an httpx.MockTransport and the SeatmapCache table
+by a dict, so the tests count exactly how many upstream requests and cache
+reads are made.
+"""
+
+import asyncio
+import json
+import time
+from collections import Counter
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from sqlalchemy import text
+
+from api.database import engine
+from api.main import app
+from api.routes.seatmap import encode_section_coords
+from api.utils import seatmap_client
+
+client = TestClient(app)
+
+# Section 101's centroid is (1666.7, 1333.3) in SVG units: pin (167, 133) on the PNG
+SVG = '<svg><path id="101" d="M 1000 1000 L 2000 1000 L 2000 2000 Z"/></svg>'
+
+
+@pytest.fixture
+def ticketmaster(monkeypatch):
+    """A fake Ticketmaster that takes 50ms per request; returns the request counts."""
+    requests = Counter()
+    cache = {}
+    seatmap_client.clear_memory_cache()
+
+    async def handler(request):
+        requests[request.url.path] += 1
+        await asyncio.sleep(0.05)
+        if request.url.path.endswith("/venues.json"):
+            if request.url.params["keyword"] == "Nowhere Hall":
+                return httpx.Response(200, json={})
+            return httpx.Response(200, json={"_embedded": {"venues": [{"id": "KovZ1"}]}})
+        if request.url.path.endswith("/events.json"):
+            return httpx.Response(200, json={"_embedded": {"events": [
+                {"seatmap": {"staticUrl": "https://maps.example.com/map?type=png"}},
+            ]}})
+        return httpx.Response(200, text=SVG)
+
+    monkeypatch.setenv("TICKETMASTER_API_KEY", "fake")
+    monkeypatch.setattr(seatmap_client, "_new_http_client",
+                        lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+    def cache_get(venue_key):
+        requests["cache_get"] += 1
+        return cache.get(venue_key)
+
+    def cache_set(venue_key, tm_venue_id, png_url, section_coords, fetched_at):
+        cache[venue_key] = {"png_url": png_url, "section_coords": section_coords, "fetched_at": fetched_at}
+
+    monkeypatch.setattr(seatmap_client, "_cache_get", cache_get)
+    monkeypatch.setattr(seatmap_client, "_cache_set", cache_set)
+    yield requests
+    seatmap_client.clear_memory_cache()
+
+
+def _upstream(requests):
+    return {path: n for path, n in requests.items() if path != "cache_get"}
+
+
+def test_concurrent_misses_share_one_fetch(ticketmaster):
+    async def open_seatmap_many_times():
+        return await asyncio.gather(*(
+            seatmap_client.get_seatmap_data("Fetch Arena", section) for section in ["101", "102"] * 10
+        ))
+
+    results = asyncio.run(open_seatmap_many_times())
+
+    assert _upstream(ticketmaster) == {"/discovery/v2/venues.json": 1, "/discovery/v2/events.json": 1, "/map": 1}
+    assert ticketmaster["cache_get"] == 1
+    assert results[0] == {"image_url": "https://maps.example.com/map?type=png", "pin_x": 167, "pin_y": 133}
+    assert results[1]["pin_x"] is None
+    assert seatmap_client._inflight == {}
+
+    # Later requests are served from memory: no database read either
+    asyncio.run(seatmap_client.get_seatmap_data("Fetch Arena", "101"))
+    assert sum(_upstream(ticketmaster).values()) == 3
+    assert ticketmaster["cache_get"] == 1
+
+    # Another worker process: memory is empty, the database row is used
+    seatmap_client.clear_memory_cache()
+    assert asyncio.run(seatmap_client.get_seatmap_data("Fetch Arena", "101"))["pin_y"] == 133
+    assert sum(_upstream(ticketmaster).values()) == 3
+    assert ticketmaster["cache_get"] == 2
+
+
+def test_venues_without_a_seatmap_are_fetched_once_per_burst(ticketmaster):
+    async def open_missing_seatmap():
+        return await asyncio.gather(*(seatmap_client.get_seatmap_data("Nowhere Hall", "1") for _ in range(5)))
+
+    assert asyncio.run(open_missing_seatmap()) == [None] * 5
+    assert _upstream(ticketmaster) == {"/discovery/v2/venues.json": 1}
+
+
+def test_negative_entries_expire(ticketmaster, monkeypatch):
+    asyncio.run(seatmap_client.get_seatmap_data("Nowhere Hall", "1"))
+    asyncio.run(seatmap_client.get_seatmap_data("Nowhere Hall", "1"))
+    assert ticketmaster["/discovery/v2/venues.json"] == 1
+
+    # Past the negative TTL (and its stale window) Ticketmaster is asked again
+    monkeypatch.setattr(seatmap_client, "SEATMAP_NEGATIVE_TTL_S", 0)
+    monkeypatch.setattr(seatmap_client, "SEATMAP_STALE_S", 0)
+    asyncio.run(seatmap_client.get_seatmap_data("Nowhere Hall", "1"))
+    assert ticketmaster["/discovery/v2/venues.json"] == 2
+    # Positive entries are unaffected
+    asyncio.run(seatmap_client.get_seatmap_data("Fetch Arena", "101"))
+    asyncio.run(seatmap_client.get_seatmap_data("Fetch Arena", "101"))
+    assert ticketmaster["/map"] == 1
+
+
+def test_stale_entries_are_served_while_refreshing(ticketmaster, monkeypatch):
+    asyncio.run(seatmap_client.get_seatmap_data("Fetch Arena", "101"))
+    first_fetch = seatmap_client._memory_get("fetch_arena")["fetched_at"]
+    monkeypatch.setattr(seatmap_client, "SEATMAP_TTL_S", 0)
+
+    async def open_stale_seatmap():
+        started = time.perf_counter()
+        result = await seatmap_client.get_seatmap_data("Fetch Arena", "101")
+        elapsed = time.perf_counter() - started
+        await seatmap_client._inflight["fetch_arena"]
+        return result, elapsed
+
+    result, elapsed = asyncio.run(open_stale_seatmap())
+    assert result["pin_x"] == 167
+    assert elapsed < 0.05  # did not wait for Ticketmaster
+    assert ticketmaster["/map"] == 2
+    assert seatmap_client._memory_get("fetch_arena")["fetched_at"] > first_fetch
+
+
+@pytest.mark.parametrize("path, failure", [
+    ("/discovery/v2/venues.json", httpx.Response(429, json={"fault": "Rate limit quota violation"})),
+    ("/discovery/v2/events.json", httpx.Response(503)),
+    ("/discovery/v2/venues.json", httpx.Response(200, text="<html>not json</html>")),
+    ("/map", httpx.Response(500)),
+])
+def test_upstream_failures_keep_the_cached_seatmap(ticketmaster, monkeypatch, path, failure):
+    asyncio.run(seatmap_client.get_seatmap_data("Fetch Arena", "101"))
+    good = seatmap_client._cache_get("fetch_arena")
+
+    async def failing(request):
+        if request.url.path == path:
+            return failure
+        if request.url.path.endswith("/venues.json"):
+            return httpx.Response(200, json={"_embedded": {"venues": [{"id": "KovZ1"}]}})
+        if request.url.path.endswith("/events.json"):
+            return httpx.Response(200, json={"_embedded": {"events": [
+                {"seatmap": {"staticUrl": "https://maps.example.com/map?type=png"}},
+            ]}})
+        return httpx.Response(200, text=SVG)
+
+    monkeypatch.setattr(seatmap_client, "_new_http_client",
+                        lambda: httpx.AsyncClient(transport=httpx.MockTransport(failing)))
+    monkeypatch.setattr(seatmap_client, "SEATMAP_TTL_S", 0)
+
+    async def refresh_stale_seatmap():
+        result = await seatmap_client.get_seatmap_data("Fetch Arena", "101")
+        await seatmap_client._inflight["fetch_arena"]
+        return result
+
+    assert asyncio.run(refresh_stale_seatmap())["pin_x"] == 167
+    # Neither the database row nor the in-process copy became a negative entry
+    assert seatmap_client._cache_get("fetch_arena") == good
+    assert seatmap_client._memory_get("fetch_arena") == good
+    assert seatmap_client.seatmap_stats()["upstream_errors"] == 1
+    assert "negative_results" not in seatmap_client.seatmap_stats()
+
+
+def test_database_rows_keep_negative_results_and_fetch_time():
+    from api.utils.seatmap_client import _cache_get, _cache_set
+    fetched_at = time.time() - 60
+    _cache_set("client_test_hall", None, None, {}, fetched_at)
+    row = _cache_get("client_test_hall")
+    assert row["png_url"] is None
+    assert abs(row["fetched_at"] - fetched_at) < 1
+
+    _cache_set("client_test_hall", "KovZ2", "https://maps.example.com/2.png", {"101": [1, 2]}, fetched_at + 30)
+    row = _cache_get("client_test_hall")
+    assert row["section_coords"] == {"101": [1, 2]}
+    assert abs(row["fetched_at"] - (fetched_at + 30)) < 1
+
+
+def test_pin_generator_shares_the_endpoint_cache(ticketmaster):
+    # Sync callers (the pin renderer) fetch through the same hierarchy...
+    seatmap = seatmap_client.get_seatmap_sync("Fetch Arena")
+    assert seatmap["section_coords"]["101"][:2] == [167, 133]
+    assert ticketmaster["/map"] == 1
+
+    # ...so the endpoint finds the venue in memory, and vice versa
+    assert asyncio.run(seatmap_client.get_seatmap_data("Fetch Arena", "101"))["pin_x"] == 167
+    assert seatmap_client.get_seatmap_sync("fetch arena") is seatmap
+    assert ticketmaster["/map"] == 1
+    assert ticketmaster["cache_get"] == 1
+
+    stats = client.get("/ai/cache/stats").json()["seatmaps"]
+    assert stats["upstream_fetches"] == 1
+    assert stats["memory_hits"] == 2
+    assert stats["memory_entries"] == 1
+
+
+def test_sync_callers_leave_the_shared_client_alone(ticketmaster):
+    async def fetch_from_loop_and_thread():
+        shared = seatmap_client._get_http_client()
+        first = asyncio.ensure_future(seatmap_client.get_seatmap("Fetch Arena"))
+        await asyncio.sleep(0.01)
+        # A worker thread joins the fetch already running on the loop
+        from_thread = await asyncio.to_thread(seatmap_client.get_seatmap_sync, "Fetch Arena")
+        assert from_thread is await first
+        assert seatmap_client._get_http_client() is shared
+        assert not shared.is_closed
+
+    asyncio.run(fetch_from_loop_and_thread())
+    assert ticketmaster["/map"] == 1
+
+    # With no loop running, a private client is used and the shared one is untouched
+    shared = seatmap_client._http_client
+    assert seatmap_client.get_seatmap_sync("Other Arena")["section_coords"]["101"][:2] == [167, 133]
+    assert seatmap_client._http_client is shared
+    assert ticketmaster["/map"] == 2
+
+
+def test_seat_view_image_endpoint(ticketmaster):
+    response = client.get("/ai/seat-view-image", params={
+        "venue_name": "Fetch Arena", "section": "101", "row": "A", "seat_number": "1",
+    })
+    assert response.status_code == 200
+    assert response.json()["pin_x"] == 167
+
+    response = client.get("/ai/seat-view-image", params={
+        "venue_name": "Nowhere Hall", "section": "101", "row": "A", "seat_number": "1",
+    })
+    assert response.status_code == 502
+
+
+@pytest.fixture
+def venue():
+    """A Venues row named like the fake Ticketmaster's venue."""
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM Venues WHERE id = 'seatmap-coords-venue'"))
+        conn.execute(text("INSERT INTO Venues (id, name, city) VALUES ('seatmap-coords-venue', 'Fetch Arena', 'Toronto')"))
+    yield "seatmap-coords-venue"
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM Venues WHERE id = 'seatmap-coords-venue'"))
+
+
+def test_section_coords_endpoint_is_cacheable(ticketmaster, venue):
+    response = client.get(f"/seatmap/{venue}/coords")
+    assert response.status_code == 200
+    assert response.json() == {
+        "venue_id": venue, "image_url": "https://maps.example.com/map?type=png", "width": 1024, "height": 768,
+        "sections": ["101"], "centroids": [167, 133], "bboxes": [100, 100, 200, 200],
+    }
+    etag = response.headers["etag"]
+    assert etag.startswith('"') and not etag.startswith("W/")
+    assert "max-age=" in response.headers["cache-control"]
+
+    # Revalidation: same ETag, no body, no new Ticketmaster request
+    revalidated = client.get(f"/seatmap/{venue}/coords", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    assert client.get(f"/seatmap/{venue}/coords", headers={"If-None-Match": '"other"'}).status_code == 200
+    # Proxies may weaken the tag; If-None-Match compares weakly
+    assert client.get(f"/seatmap/{venue}/coords", headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+    assert client.get(f"/seatmap/{venue}/coords", headers={"If-None-Match": "*"}).status_code == 304
+    assert ticketmaster["/map"] == 1
+
+    assert client.get("/seatmap/no-such-venue/coords").status_code == 404
+
+
+def test_section_coords_encoding():
+    seatmap = {"png_url": "https://maps.example.com/map.png", "section_coords": {
+        "B": [30, 40, 20, 30, 40, 50],
+        "A": [5, 6],  # a text label: its box is its point
+    }}
+    payload = json.loads(encode_section_coords("v1", seatmap))
+    assert payload["sections"] == ["A", "B"]
+    assert payload["centroids"] == [5, 6, 30, 40]
+    assert payload["bboxes"] == [5, 6, 5, 6, 20, 30, 40, 50]
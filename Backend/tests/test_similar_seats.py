@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from api.database import engine
+from api.main import app
+from api.utils.similar_seats import rebuild_similar_seats, seat_features, top_k_neighbours
+
+client = TestClient(app)
+
+VENUE_ID = "similar-test-venue"
+
+
+@pytest.fixture
+def venue(seed_venue):
+    """Two blocks of seats: front rows rated 5 at $200, back rows rated 2 at $40, one unreviewed seat."""
+    seats = [(f"sim-front-{i}", "Floor", 5.0 + i, 0.0, float(i), 5, 200.0) for i in range(4)]
+    seats += [(f"sim-back-{i}", "Upper", 60.0 + i, 50.0, float(i), 2, 40.0) for i in range(4)]
+    seats += [("sim-unrated", "Upper", 62.0, 50.0, 9.0, None, None)]
+    seed_venue(VENUE_ID, "Similar Test Hall", seats)
+
+
+def test_top_k_matches_brute_force_across_blocks(monkeypatch):
+    from api.utils import similar_seats
+    monkeypatch.setattr(similar_seats, "SIMILAR_BLOCK_CELLS", 500)  # many small blocks
+    matrix = np.random.default_rng(3).normal(size=(300, 6))
+    indices, distances = top_k_neighbours(matrix, 7)
+
+    full = np.sqrt(((matrix[:, None, :] - matrix[None, :, :]) ** 2).sum(axis=-1))
+    np.fill_diagonal(full, np.inf)
+    expected = np.argsort(full, axis=1, kind="stable")[:, :7]
+    assert (indices == expected).all()
+    assert np.allclose(distances, np.take_along_axis(full, expected, axis=1))
+
+    assert top_k_neighbours(matrix[:1], 5)[0].shape == (1, 0)
+    assert top_k_neighbours(matrix[:3], 5)[0].shape == (3, 2)
+
+
+def test_seat_features_fill_missing_values():
+    seat_ids, matrix = seat_features([
+        ("a", 5, 5, 5, 5, 100.0, 10.0, 0.0, None),
+        ("b", 1, 1, 1, 1, 20.0, 50.0, 5.0, 5.0),
+        ("c", None, None, None, None, None, 30.0, None, None),
+    ])
+    assert seat_ids == ["a", "b", "c"]
+    assert not np.isnan(matrix).any()
+    # The unreviewed seat sits at the venue mean of every rating column
+    assert np.allclose(matrix[2, :5], 0)
+
+
+def test_rebuild_and_serve_similar_seats(venue):
+    with engine.begin() as conn:
+        written = rebuild_similar_seats(conn, VENUE_ID, k=3)
+    assert written == 9 * 3
+
+    response = client.get("/search/seats/sim-front-0/similar", params={"limit": 3})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert {s["id"] for s in results} == {"sim-front-1", "sim-front-2", "sim-front-3"}
+    scores = [s["similarity"] for s in results]
+    assert scores == sorted(scores, reverse=True) and all(0 < score <= 1 for score in scores)
+    assert results[0]["id"] == "sim-front-1"  # the closest one
+
+    # The unreviewed seat is matched by position with its neighbours in the back block
+    unrated = client.get("/search/seats/sim-unrated/similar").json()["results"]
+    assert all(s["id"].startswith("sim-back-") for s in unrated)
+
+    # Rebuilding replaces rather than adds
+    with engine.begin() as conn:
+        assert rebuild_similar_seats(conn, VENUE_ID, k=2) == 9 * 2
+    assert len(client.get("/search/seats/sim-front-0/similar").json()["results"]) == 2
+
+    assert client.get("/search/seats/no-such-seat/similar").status_code == 404
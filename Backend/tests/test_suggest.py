@@ -0,0 +1,151 @@
+import time
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from api.main import app
+from api.database import engine
+from api.utils.suggestions import (
+    MAX_SUGGESTIONS, SuggestionIndex, get_suggestions, invalidate_suggestions, record_review_counts,
+    refresh_suggestions,
+)
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def seed_catalog():
+    """Venues and events with review counts that should drive the ranking."""
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM Reviews WHERE id LIKE 'sg-r%'"))
+        conn.execute(text("DELETE FROM Events WHERE id LIKE 'sg-e%'"))
+        conn.execute(text("DELETE FROM VenueAggregates WHERE venue_id LIKE 'sg-v%'"))
+        conn.execute(text("DELETE FROM Venues WHERE id LIKE 'sg-v%'"))
+        conn.execute(
+            text("INSERT INTO Venues (id, name, city) VALUES (:id, :name, :city)"),
+            [
+                {"id": "sg-v1", "name": "Suggestia Arena", "city": "Toronto"},
+                {"id": "sg-v2", "name": "Suggestia Hall", "city": "Montreal"},
+            ],
+        )
+        conn.execute(
+            text("INSERT INTO VenueAggregates (venue_id, rating_sum, review_count, avg_rating) VALUES (:v, :s, :c, 4.0)"),
+            [{"v": "sg-v1", "s": 8, "c": 2}, {"v": "sg-v2", "s": 40, "c": 10}],
+        )
+        conn.execute(
+            text("INSERT INTO Events (id, venue_id, name, artist, event_date) VALUES (:id, :v, :n, :a, '2030-01-01')"),
+            [
+                {"id": "sg-e1", "v": "sg-v1", "n": "Suggestotron World Tour", "a": "Suggestotron"},
+                {"id": "sg-e2", "v": "sg-v2", "n": "Suggestotron World Tour", "a": "Suggestotron"},
+            ],
+        )
+    refresh_suggestions()
+
+    yield
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM Reviews WHERE id LIKE 'sg-r%'"))
+        conn.execute(text("DELETE FROM Events WHERE id LIKE 'sg-e%'"))
+        conn.execute(text("DELETE FROM VenueAggregates WHERE venue_id LIKE 'sg-v%'"))
+        conn.execute(text("DELETE FROM Venues WHERE id LIKE 'sg-v%'"))
+
+
+def test_suggest_ranks_by_review_count():
+    """The more reviewed venue comes first for a shared prefix."""
+    response = client.get("/search/suggest", params={"q": "sugges", "type": "venue"})
+    assert response.status_code == 200
+    names = [s["text"] for s in response.json()["results"]]
+    assert names == ["Suggestia Hall", "Suggestia Arena"]
+
+
+def test_suggest_matches_word_starts():
+    """Any word of the name can be the prefix, case-insensitively."""
+    results = client.get("/search/suggest", params={"q": "ARE"}).json()["results"]
+    assert any(s["id"] == "sg-v1" for s in results)
+    # Mid-word text does not match
+    results = client.get("/search/suggest", params={"q": "gestia"}).json()["results"]
+    assert results == []
+
+
+def test_suggest_collapses_repeated_event_names():
+    """A tour at several venues is one event suggestion, plus one artist suggestion."""
+    results = client.get("/search/suggest", params={"q": "suggesto"}).json()["results"]
+    kinds = sorted(s["type"] for s in results)
+    assert kinds == ["artist", "event"]
+    artist = next(s for s in results if s["type"] == "artist")
+    assert artist["subtitle"] == "2 events"
+
+
+def test_suggest_refreshes_after_change():
+    """Invalidation rebuilds the index in the background."""
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE Venues SET name = 'Suggestia Dome' WHERE id = 'sg-v1'"))
+    try:
+        invalidate_suggestions()
+        deadline = time.time() + 5
+        while time.time() < deadline:
+            if any(s["text"] == "Suggestia Dome" for s in get_suggestions("dome")):
+                break
+            time.sleep(0.05)
+        assert any(s["text"] == "Suggestia Dome" for s in get_suggestions("dome"))
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE Venues SET name = 'Suggestia Arena' WHERE id = 'sg-v1'"))
+        refresh_suggestions()
+
+
+def test_reweigh_reranks_in_place():
+    """A weight change re-ranks the suggestion's prefixes without a rebuild."""
+    items = [{"type": "venue", "id": str(i), "text": f"Hall {i:02d}", "weight": 100 - i} for i in range(MAX_SUGGESTIONS + 2)]
+    index = SuggestionIndex(items)
+    outsider = items[-1]
+    assert outsider not in index.lookup("hall")
+
+    outsider["weight"] = 1000
+    assert index.reweigh(outsider)
+    assert index.lookup("hall")[0] is outsider
+    assert index.lookup("hall 11") == [outsider]
+    assert len(index.lookup("hall")) == MAX_SUGGESTIONS
+
+    # Falling to the last place of a full list needs the rest of the subtree
+    outsider["weight"] = 0
+    assert not index.reweigh(outsider)
+
+
+def test_review_counts_rerank_without_rebuild():
+    """Review writes re-rank the venue in the shared index; no reload is started."""
+    from api.utils import suggestions
+    refresh_suggestions()
+    built_at = suggestions._built_at
+    try:
+        record_review_counts({("sg-v1", "sg-e1"): 20})
+        names = [s["text"] for s in get_suggestions("sugges", kind="venue")]
+        assert names == ["Suggestia Arena", "Suggestia Hall"]
+        assert suggestions._built_at == built_at and not suggestions._stale
+    finally:
+        refresh_suggestions()
+
+
+def test_suggest_invalid_type():
+    response = client.get("/search/suggest", params={"q": "a", "type": "seat"})
+    assert response.status_code == 400
+
+
+def test_suggest_requires_q():
+    response = client.get("/search/suggest")
+    assert response.status_code == 422
+
+
+def test_index_lookup_is_sub_millisecond():
+    """Lookups walk the trie and read a cached top list; no subtree scan."""
+    suggestions = [
+        {"type": "event", "id": str(i), "text": f"Event {i} Night {i % 97}", "subtitle": None, "weight": i % 50}
+        for i in range(20000)
+    ]
+    index = SuggestionIndex(suggestions)
+    assert [s["weight"] for s in index.lookup("event", 5)] == [49] * 5
+
+    started = time.perf_counter()
+    for prefix in ("e", "ev", "event 1", "night 4", "nig") * 200:
+        index.lookup(prefix, 10)
+    per_lookup_ms = (time.perf_counter() - started) * 1000 / 1000
+    assert per_lookup_ms < 1
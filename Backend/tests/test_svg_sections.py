@@ -0,0 +1,67 @@
+import pytest
+from api.utils.svg_sections import SectionGeometryParser, extract_section_geometry, path_geometry
+
+SQUARE = "M 100 100 L 200 100 L 200 200 L 100 200 Z"
+
+
+def test_path_geometry_absolute_and_relative():
+    assert path_geometry(SQUARE) == ((150, 150), (100, 100, 200, 200))
+    assert path_geometry("m100 100 h100 v100 h-100 z") == ((150, 150), (100, 100, 200, 200))
+    # Implicit linetos after a moveto, comma separated, no spaces
+    assert path_geometry("M100,100 200,100 200,200 100,200z") == ((150, 150), (100, 100, 200, 200))
+    assert path_geometry("M100 100l100 0 0 100-100 0z") == ((150, 150), (100, 100, 200, 200))
+    assert path_geometry("") is None
+    assert path_geometry("M 5 5") is None
+
+
+def test_centroid_is_not_pulled_toward_detailed_edges():
+    # A square whose bottom edge is drawn with many points: their average sits
+    # near the bottom, the area centroid stays in the middle
+    bottom_edge = " ".join(f"L {x} 200" for x in range(190, 100, -10))
+    (cx, cy), _ = path_geometry(f"M 100 100 L 200 100 L 200 200 {bottom_edge} L 100 200 Z")
+    assert (cx, cy) == pytest.approx((150, 150))
+
+
+def test_curves_are_flattened():
+    # Half-disc bulging above y=0: the centroid is inside the curve, not at
+    # the average of its control points
+    (cx, cy), (min_x, min_y, max_x, max_y) = path_geometry("M 0 0 C 0 -133.3 200 -133.3 200 0 Z")
+    assert cx == pytest.approx(100)
+    assert -50 < cy < -30
+    assert min_y == pytest.approx(-100, abs=1)
+    assert (min_x, max_x, max_y) == (0, 200, 0)
+
+    # S mirrors the previous control point; q/t are relative quadratics
+    assert path_geometry("M0 0 C0 -10 10 -10 10 0 S20 10 20 0")[1][3] == pytest.approx(7.5)
+    (_, (_, min_y, _, _)) = path_geometry("M0 0 q10 -20 20 0 t20 0 z")
+    assert min_y == pytest.approx(-10)
+
+
+def test_extract_section_geometry():
+    svg = f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 10240 7680">
+      <g id="sections"><path d="{SQUARE}" id="101"/><path d="M0 0 L10 10"/></g>
+      <text x="2560 2570" y="1920"><tspan>BALCONY</tspan></text>
+      <text x="10" y="10">101</text>
+    </svg>"""
+    assert extract_section_geometry(svg, scale=10) == {
+        "101": [15, 15, 10, 10, 20, 20],   # the path wins over the text label
+        "BALCONY": [256, 192],
+    }
+    assert extract_section_geometry("<svg></svg>") == {}
+
+
+def test_incremental_parsing_matches_whole_document():
+    sections = "".join(
+        f'<path id="S{i}" d="M {i * 100} 0 l 80 0 0 80 -80 0 z"/>' for i in range(200)
+    )
+    svg = f"<svg>{sections}</svg>".encode()
+    chunks = [svg[i:i + 97] for i in range(0, len(svg), 97)]
+    assert extract_section_geometry(chunks) == extract_section_geometry(svg)
+    assert extract_section_geometry(svg)["S3"] == [340, 40, 300, 0, 380, 80]
+
+
+def test_malformed_svg_keeps_sections_read_so_far():
+    parser = SectionGeometryParser()
+    parser.feed(f'<svg><path id="ok" d="{SQUARE}"/><path id="broken" d="M0 0')
+    parser.feed("<<<")
+    assert parser.close() == {"ok": [150, 150, 100, 100, 200, 200]}
@@ -0,0 +1,188 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from datetime import timedelta, date
+from api.main import app
+from api.auth_utils import get_password_hash, create_access_token
+from api.database import engine
+from api.utils.aggregates import rebuild_venue_aggregates, reconcile_platform_stats
+
+client = TestClient(app)
+
+V_ID = "00000000-0000-0000-0000-0000000000a2"
+E_ID = "00000000-0000-0000-0000-0000000000a3"
+PAST_E_ID = "00000000-0000-0000-0000-0000000000a4"
+
+
+@pytest.fixture
+def test_user():
+    user_id = "00000000-0000-0000-0000-0000000000a1"
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM Users WHERE id = :id"), {"id": user_id})
+        conn.execute(
+            text("INSERT INTO Users (id, email, password_hash) VALUES (:id, :e, :p)"),
+            {"id": user_id, "e": "venueaggtest@test.com", "p": get_password_hash("password")},
+        )
+    token = create_access_token({"sub": user_id}, expires_delta=timedelta(hours=1))
+    yield {"user_id": user_id, "token": token}
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM Users WHERE id = :id"), {"id": user_id})
+
+
+@pytest.fixture
+def test_venue_event():
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM VenueAggregates WHERE venue_id = :id"), {"id": V_ID})
+        conn.execute(text("DELETE FROM Events WHERE venue_id = :id"), {"id": V_ID})
+        conn.execute(text("DELETE FROM Venues WHERE id = :id"), {"id": V_ID})
+        conn.execute(
+            text("INSERT INTO Venues (id, name, city) VALUES (:id, :n, :c)"),
+            {"id": V_ID, "n": "VenueAggTestVenue", "c": "TestCity"},
+        )
+        conn.execute(
+            text("INSERT INTO Events (id, venue_id, name, event_date) VALUES (:id, :v, :n, :d)"),
+            {"id": E_ID, "v": V_ID, "n": "VenueAggTestEvent", "d": (date.today() + timedelta(days=30)).isoformat()},
+        )
+        conn.execute(
+            text("INSERT INTO Events (id, venue_id, name, event_date) VALUES (:id, :v, :n, :d)"),
+            {"id": PAST_E_ID, "v": V_ID, "n": "VenueAggPastEvent", "d": "2000-01-01"},
+        )
+    yield {"venue_id": V_ID, "event_id": E_ID}
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM VenueAggregates WHERE venue_id = :id"), {"id": V_ID})
+        conn.execute(text("DELETE FROM SeatAggregates WHERE seat_id IN (SELECT id FROM Seats WHERE venue_id = :id)"), {"id": V_ID})
+        conn.execute(text("DELETE FROM Reviews WHERE venue_id = :id"), {"id": V_ID})
+        conn.execute(text("DELETE FROM Seats WHERE venue_id = :id"), {"id": V_ID})
+        conn.execute(text("DELETE FROM Events WHERE venue_id = :id"), {"id": V_ID})
+        conn.execute(text("DELETE FROM Venues WHERE id = :id"), {"id": V_ID})
+
+
+def _post_review(user, venue_event, visual, sound, value):
+    resp = client.post(
+        "/reviews/",
+        json={
+            "event_id": venue_event["event_id"],
+            "venue_id": venue_event["venue_id"],
+            "section": "VSec",
+            "row": "1",
+            "seat_number": "1",
+            "rating_visual": visual,
+            "rating_sound": sound,
+            "rating_value": value,
+            "price_paid": 50.0,
+            "text": "Venue rollup review",
+        },
+        headers={"Authorization": f"Bearer {user['token']}"},
+    )
+    assert resp.status_code == 200
+    return resp.json()["review_id"]
+
+
+def _aggregate_row():
+    with engine.connect() as conn:
+        return conn.execute(
+            text("SELECT rating_sum, review_count, avg_rating, upcoming_events FROM VenueAggregates WHERE venue_id = :id"),
+            {"id": V_ID},
+        ).fetchone()
+
+
+def test_venue_aggregates_follow_review_writes(test_user, test_venue_event):
+    # overall = round((5+5+4)/3) = 5
+    first = _post_review(test_user, test_venue_event, 5, 5, 4)
+    row = _aggregate_row()
+    assert row.review_count == 1
+    assert row.rating_sum == 5
+    assert float(row.avg_rating) == 5.0
+    # Only the future event counts as upcoming
+    assert row.upcoming_events == 1
+
+    # overall = round((2+2+2)/3) = 2 -> (5 + 2) / 2 = 3.5
+    _post_review(test_user, test_venue_event, 2, 2, 2)
+    row = _aggregate_row()
+    assert row.review_count == 2
+    assert float(row.avg_rating) == 3.5
+
+    resp = client.delete(f"/reviews/{first}", headers={"Authorization": f"Bearer {test_user['token']}"})
+    assert resp.status_code == 200
+    row = _aggregate_row()
+    assert row.review_count == 1
+    assert row.rating_sum == 2
+    assert float(row.avg_rating) == 2.0
+
+
+def test_search_venues_reads_rollup(test_user, test_venue_event):
+    _post_review(test_user, test_venue_event, 4, 4, 4)
+    resp = client.get("/search/venues", params={"q": "VenueAggTestVenue"})
+    assert resp.status_code == 200
+    venue = resp.json()["results"][0]
+    assert venue["rating"] == 4.0
+    assert venue["review_count"] == 1
+    assert venue["upcoming_events"] == 1
+
+
+def test_rebuild_recovers_from_drift(test_user, test_venue_event):
+    _post_review(test_user, test_venue_event, 3, 3, 3)
+    with engine.begin() as conn:
+        conn.execute(
+            text("UPDATE VenueAggregates SET rating_sum = 99, review_count = 7, avg_rating = 1.0 WHERE venue_id = :id"),
+            {"id": V_ID},
+        )
+        assert rebuild_venue_aggregates(conn, [V_ID]) == 1
+    row = _aggregate_row()
+    assert row.review_count == 1
+    assert row.rating_sum == 3
+    assert float(row.avg_rating) == 3.0
+    assert row.upcoming_events == 1
+
+
+def _live_stats():
+    with engine.begin() as conn:
+        return reconcile_platform_stats(conn)
+
+
+def test_platform_stats_follow_review_writes(test_user, test_venue_event):
+    baseline = _live_stats()
+
+    # overall = round((4+4+4)/3) = 4
+    review_id = _post_review(test_user, test_venue_event, 4, 4, 4)
+    stats = client.get("/search/venues/stats").json()
+    assert stats["total_reviews"] == baseline["total_reviews"] + 1
+    assert stats["total_venues"] == baseline["total_venues"]
+
+    resp = client.delete(f"/reviews/{review_id}", headers={"Authorization": f"Bearer {test_user['token']}"})
+    assert resp.status_code == 200
+    stats = client.get("/search/venues/stats").json()
+    assert stats["total_reviews"] == baseline["total_reviews"]
+
+
+def test_platform_stats_seed_and_reconcile(test_user, test_venue_event):
+    _post_review(test_user, test_venue_event, 5, 5, 5)
+    expected = _live_stats()
+
+    # A missing counters row is seeded from the live tables on first read
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM PlatformStats"))
+    stats = client.get("/search/venues/stats").json()
+    assert stats["total_reviews"] == expected["total_reviews"]
+    assert stats["total_venues"] == expected["total_venues"]
+
+    # Drift is corrected by reconciliation
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE PlatformStats SET total_reviews = 12345, rating_sum = 0"))
+    assert client.get("/search/venues/stats").json()["total_reviews"] == 12345
+    _live_stats()
+    stats = client.get("/search/venues/stats").json()
+    assert stats["total_reviews"] == expected["total_reviews"]
+    assert stats["avg_rating"] == round(expected["rating_sum"] / expected["total_reviews"], 1)
+
+
+def test_reconcile_updates_the_counters_row_in_place():
+    first = _live_stats()
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE PlatformStats SET total_venues = -1, last_reconciled = NULL"))
+        # Seeding an existing row (two first readers racing) overwrites it
+        assert reconcile_platform_stats(conn) == first
+        assert reconcile_platform_stats(conn) == first
+        rows = conn.execute(text("SELECT total_venues, last_reconciled FROM PlatformStats")).fetchall()
+    assert len(rows) == 1
+    assert rows[0][0] == first["total_venues"] and rows[0][1] is not None
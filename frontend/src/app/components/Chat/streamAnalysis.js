@@ -0,0 +1,55 @@
+const API_BASE = import.meta.env.VITE_API_BASE_URL ?? "http://localhost:8000";
+
+/**
+ * POST a question to /ai/analyze/stream and follow its Server-Sent Events.
+ * onTool(event, data) is called for tool_start / tool_done, onToken(text)
+ * with the answer so far after every token. A preamble event means the
+ * tokens so far were the model's lead-in to its tool calls, so the answer
+ * starts over. Resolves with the full answer; rejects on an HTTP or stream
+ * error.
+ */
+export async function streamAnalysis(body, { onTool, onToken } = {}) {
+  const response = await fetch(`${API_BASE}/ai/analyze/stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(body),
+  });
+  if (!response.ok || !response.body) throw new Error("API Error");
+
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+  let answer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) return answer;
+    buffer += value;
+
+    let boundary;
+    while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let event = "message";
+      let data = "";
+      for (const line of block.split("\n")) {
+        if (line.startsWith("event: ")) event = line.slice(7);
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      }
+      if (!data) continue; // comment / keep-alive
+
+      const payload = JSON.parse(data);
+      if (event === "token") {
+        answer += payload.text;
+        onToken?.(answer);
+      } else if (event === "preamble") {
+        answer = "";
+        onToken?.(answer);
+      } else if (event === "tool_start" || event === "tool_done") {
+        onTool?.(event, payload);
+      } else if (event === "error") {
+        throw new Error(payload.detail);
+      } else if (event === "done") {
+        return answer;
+      }
+    }
+  }
+}
@@ -1,12 +1,12 @@
 import { useState, useRef, useEffect } from "react";
 import { X, Send, Sparkles } from "lucide-react";
-
-const API_BASE = import.meta.env.VITE_API_BASE_URL ?? "http://localhost:8000";
+import { streamAnalysis } from "./Chat/streamAnalysis";
 
 export function GlobalChatPanel({ isOpen, onClose }) {
   const [input, setInput] = useState("");
   const [messages, setMessages] = useState([]);
   const [isLoading, setIsLoading] = useState(false);
+  const [pendingText, setPendingText] = useState(null);
   const messagesContainerRef = useRef(null);
   const inputRef = useRef(null);
 
@@ -20,7 +20,7 @@ export function GlobalChatPanel({ isOpen, onClose }) {
     if (messagesContainerRef.current) {
       messagesContainerRef.current.scrollTop = messagesContainerRef.current.scrollHeight;
     }
-  }, [messages]);
+  }, [messages, pendingText]);
 
   async function handleSend() {
     if (!input.trim() || isLoading) return;
@@ -29,21 +29,27 @@ export function GlobalChatPanel({ isOpen, onClose }) {
     setInput("");
     setMessages((prev) => [...prev, { sender: "user", text: userText }]);
     setIsLoading(true);
+    setPendingText("...");
 
+    // The answer streams in: the first token adds the bot message, later ones update it
+    let answerStarted = false;
     try {
-      const response = await fetch(`${API_BASE}/ai/analyze`, {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({
+      await streamAnalysis(
+        {
           input_data: userText,
           instructions:
             "You are a helpful assistant for LiveLens, a venue review platform. Answer general questions about venues, events, seating, and concert experiences. If the user asks about a specific venue, use the available DB functions to fetch real data. Never use markdown formatting — plain text only.",
-        }),
-      });
-
-      if (!response.ok) throw new Error("API Error");
-      const data = await response.json();
-      setMessages((prev) => [...prev, { sender: "bot", text: data.analysis }]);
+        },
+        {
+          onTool: (event) => event === "tool_start" && setPendingText("Looking up venue data..."),
+          onToken: (text) => {
+            const replace = answerStarted;
+            answerStarted = true;
+            setPendingText(null);
+            setMessages((prev) => [...(replace ? prev.slice(0, -1) : prev), { sender: "bot", text }]);
+          },
+        },
+      );
     } catch {
       setMessages((prev) => [
         ...prev,
@@ -51,6 +57,7 @@ export function GlobalChatPanel({ isOpen, onClose }) {
       ]);
     } finally {
       setIsLoading(false);
+      setPendingText(null);
     }
   }
 
@@ -128,10 +135,10 @@ export function GlobalChatPanel({ isOpen, onClose }) {
             </div>
           ))}
 
-          {isLoading && (
+          {pendingText && (
             <div className="flex justify-start">
               <div className="bg-gray-800 px-3 py-2 rounded-xl text-sm text-gray-400">
-                <span className="animate-pulse">...</span>
+                <span className="animate-pulse">{pendingText}</span>
               </div>
             </div>
           )}
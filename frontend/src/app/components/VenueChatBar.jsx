@@ -1,12 +1,12 @@
 import { useState, useRef, useEffect } from "react";
 import { Send, Sparkles, ChevronDown } from "lucide-react";
-
-const API_BASE = import.meta.env.VITE_API_BASE_URL ?? "http://localhost:8000";
+import { streamAnalysis } from "./Chat/streamAnalysis";
 
 export function VenueChatBar({ venueName, venueId }) {
   const [input, setInput] = useState("");
   const [messages, setMessages] = useState([]);
   const [isLoading, setIsLoading] = useState(false);
+  const [pendingText, setPendingText] = useState(null);
   const [isExpanded, setIsExpanded] = useState(false);
   const messagesEndRef = useRef(null);
   const messagesContainerRef = useRef(null);
@@ -15,7 +15,7 @@ export function VenueChatBar({ venueName, venueId }) {
     if (isExpanded && messagesContainerRef.current) {
       messagesContainerRef.current.scrollTop = messagesContainerRef.current.scrollHeight;
     }
-  }, [messages, isExpanded]);
+  }, [messages, pendingText, isExpanded]);
 
   async function handleSend() {
     if (!input.trim() || isLoading) return;
@@ -25,24 +25,31 @@ export function VenueChatBar({ venueName, venueId }) {
     setIsExpanded(true);
     setMessages((prev) => [...prev, { sender: "user", text: userText }]);
     setIsLoading(true);
+    setPendingText("...");
 
+    // The answer streams in: the first token adds the bot message, later ones update it
+    let answerStarted = false;
     try {
-      const response = await fetch(`${API_BASE}/ai/analyze`, {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({
+      await streamAnalysis(
+        {
           input_data: { question: userText, venue_name: venueName, venue_id: venueId },
           instructions: `You are a helpful venue assistant for ${venueName}. Always use the DB functions before answering. Never guess or fabricate ratings, reviews, or events.`,
-        }),
-      });
-
-      if (!response.ok) throw new Error("API Error");
-      const data = await response.json();
-      setMessages((prev) => [...prev, { sender: "bot", text: data.analysis }]);
+        },
+        {
+          onTool: (event) => event === "tool_start" && setPendingText(`Looking up ${venueName}...`),
+          onToken: (text) => {
+            const replace = answerStarted;
+            answerStarted = true;
+            setPendingText(null);
+            setMessages((prev) => [...(replace ? prev.slice(0, -1) : prev), { sender: "bot", text }]);
+          },
+        },
+      );
     } catch {
       setMessages((prev) => [...prev, { sender: "bot", text: "Sorry, I'm having trouble connecting. Please try again." }]);
     } finally {
       setIsLoading(false);
+      setPendingText(null);
     }
   }
 
@@ -95,10 +102,10 @@ export function VenueChatBar({ venueName, venueId }) {
               </div>
             </div>
           ))}
-          {isLoading && (
+          {pendingText && (
             <div className="flex justify-start">
               <div className="bg-gray-700/60 px-3 py-2 rounded-xl text-sm text-gray-400">
-                <span className="animate-pulse">...</span>
+                <span className="animate-pulse">{pendingText}</span>
               </div>
             </div>
           )}
@@ -9,6 +9,8 @@ const API_BASE = import.meta.env.VITE_API_BASE_URL ?? "http://localhost:8000";
 
 export function LandingPage() {
   const [query, setQuery] = useState("");
+  const [suggestions, setSuggestions] = useState([]);
+  const [suggestOpen, setSuggestOpen] = useState(false);
   const [venues, setVenues] = useState([]);
   const [total, setTotal] = useState(0);
   const [loading, setLoading] = useState(true);
@@ -63,10 +65,29 @@ export function LandingPage() {
       .catch((e) => console.error("Failed to fetch stats", e));
   }, []);
 
+  // Autocomplete is served from an in-memory index, so it can run per keystroke
+  useEffect(() => {
+    if (!query.trim()) {
+      setSuggestions([]);
+      return;
+    }
+    const controller = new AbortController();
+    fetch(`${API_BASE}/search/suggest?${new URLSearchParams({ q: query, type: "venue", limit: "6" })}`, { signal: controller.signal })
+      .then((r) => r.json())
+      .then((data) => setSuggestions(data.results ?? []))
+      .catch(() => {});
+    return () => controller.abort();
+  }, [query]);
+
   useEffect(() => {
     const timeout = setTimeout(() => {
       const params = new URLSearchParams({ limit: "50", sort_by: sortBy, order });
       if (query) params.set("q", query);
+      // "Relevance" ranks by match quality while searching, by name otherwise
+      if (query && sortBy === "name") {
+        params.set("sort_by", "relevance");
+        params.set("order", "desc");
+      }
       setLoading(true);
       fetch(`${API_BASE}/search/venues?${params}`)
         .then((r) => r.json())
@@ -78,7 +99,7 @@ export function LandingPage() {
         })
         .catch(() => setVenues([]))
         .finally(() => setLoading(false));
-    }, 150);
+    }, 400);
     return () => clearTimeout(timeout);
   }, [query, sortBy, order]);
 
@@ -227,10 +248,22 @@ export function LandingPage() {
               <input
                 type="text"
                 value={query}
-                onChange={(e) => setQuery(e.target.value)}
+                onChange={(e) => { setQuery(e.target.value); setSuggestOpen(true); }}
+                onFocus={() => setSuggestOpen(true)}
+                onBlur={() => setTimeout(() => setSuggestOpen(false), 150)}
                 placeholder="Search venues..."
                 className="w-full pl-12 pr-4 py-3 rounded-lg bg-gray-800/50 border border-gray-700 text-white placeholder-gray-500 focus:outline-none focus:ring-2 focus:ring-blue-500 focus:border-transparent backdrop-blur-sm"
               />
+              {suggestOpen && suggestions.length > 0 && (
+                <div className="absolute left-0 right-0 mt-2 bg-gray-800 border border-gray-700 rounded-lg shadow-xl z-20 overflow-hidden text-left">
+                  {suggestions.map((s) => (
+                    <Link key={s.id} to={`/venue/${s.id}`} className="block px-4 py-2 text-sm hover:bg-gray-700">
+                      <span className="text-gray-200">{s.text}</span>
+                      {s.subtitle && <span className="ml-2 text-xs text-gray-500">{s.subtitle}</span>}
+                    </Link>
+                  ))}
+                </div>
+              )}
             </div>
             <div ref={sortRef} className="relative">
               <button
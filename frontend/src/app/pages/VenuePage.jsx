@@ -33,7 +33,7 @@ export function VenuePage() {
   const [reviewsKey, setReviewsKey] = useState(0);
   const [showSuccess, setShowSuccess] = useState(false);
   const successTimerRef = useRef(null);
-  const [reviewOffset, setReviewOffset] = useState(0);
+  const [reviewCursor, setReviewCursor] = useState(null);
   const [reviewTotal, setReviewTotal] = useState(0);
   const [loadingMore, setLoadingMore] = useState(false);
   const PAGE_SIZE = 20;
@@ -105,26 +105,31 @@ export function VenuePage() {
 
   useEffect(() => {
     // Reset to first page whenever filters/sort/key change
-    setReviewOffset(0);
-    const params = new URLSearchParams({ venue_id: venueId, limit: PAGE_SIZE, offset: 0, sort_by: reviewSortBy, order: reviewOrder });
+    setReviewCursor(null);
+    const params = new URLSearchParams({ venue_id: venueId, limit: PAGE_SIZE, sort_by: reviewSortBy, order: reviewOrder });
     if (filterSection) params.set("section", filterSection);
     fetch(`${API_BASE}/search/reviews?${params}`)
       .then((r) => r.json())
-      .then((data) => { setReviews(data.results ?? []); setReviewTotal(data.total ?? 0); })
+      .then((data) => {
+        setReviews(data.results ?? []);
+        setReviewTotal(data.total ?? 0);
+        setReviewCursor(data.next_cursor ?? null);
+      })
       .catch(() => setReviews([]));
   }, [venueId, reviewSortBy, reviewOrder, filterSection, reviewsKey]);
 
   function loadMoreReviews() {
-    const nextOffset = reviewOffset + PAGE_SIZE;
+    if (!reviewCursor) return;
     setLoadingMore(true);
-    const params = new URLSearchParams({ venue_id: venueId, limit: PAGE_SIZE, offset: nextOffset, sort_by: reviewSortBy, order: reviewOrder });
+    // Keyset pagination: the cursor picks up right after the last loaded review.
+    // The total is already known from the first page, so skip counting again.
+    const params = new URLSearchParams({ venue_id: venueId, limit: PAGE_SIZE, cursor: reviewCursor, count_mode: "none", sort_by: reviewSortBy, order: reviewOrder });
     if (filterSection) params.set("section", filterSection);
     fetch(`${API_BASE}/search/reviews?${params}`)
       .then((r) => r.json())
       .then((data) => {
         setReviews((prev) => [...prev, ...(data.results ?? [])]);
-        setReviewTotal(data.total ?? 0);
-        setReviewOffset(nextOffset);
+        setReviewCursor(data.next_cursor ?? null);
       })
       .catch(() => { })
       .finally(() => setLoadingMore(false));
@@ -441,7 +446,7 @@ export function VenuePage() {
           </div>
 
           {/* Load More */}
-          {reviews.length < reviewTotal && (
+          {reviewCursor && (
             <div className="flex justify-center mt-6">
               <button
                 onClick={loadMoreReviews}